@@ -1 +1,7 @@
-from empire.core.empire import run_empire  # noqa
+def __getattr__(name: str):
+    # The model, and with it Pyomo, is imported when it is used, so empire-report runs without Pyomo
+    if name == "run_empire":
+        from empire.core.empire import run_empire
+
+        return run_empire
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,244 @@
+"""
+Benchmarks of the throughput of EMPIRE on synthetic datasets.
+
+Every case of a size grid generates a synthetic dataset (see
+:mod:`empire.core.synthetic_dataset`) and runs the whole model on it: scenario generation,
+writing the .tab files, building the instance, writing the LP file, solving, the resolve for
+the operational duals and writing the results. The stages are timed by the telemetry of the
+run (see :mod:`empire.core.telemetry`).
+
+The telemetry of all cases can be stored as a baseline. A later run of the same grid is
+compared with the baseline, and a stage that became slower, or a run that needed more memory,
+by more than a tolerance is a regression. Baselines depend on the machine and the solver, so
+they are made and compared on the same machine.
+"""
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from empire.core.config import EmpireConfiguration, EmpireRunConfiguration
+from empire.core.model_runner import run_empire_model
+from empire.core.synthetic_dataset import generate_synthetic_dataset
+from empire.core.telemetry import PERF_FILE, compare_perf, read_perf
+from empire.utils import create_if_not_exist
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    Size of a benchmark run.
+
+    :param name: Name of the case.
+    :param n_nodes: Number of nodes.
+    :param generators_per_node: Number of generator types in every node.
+    :param line_density: Probability that two nodes that are not neighbours are connected.
+    :param number_of_scenarios: Number of scenarios in every period.
+    :param n_periods: Number of investment periods.
+    :param regular_seasons: Regular seasons.
+    :param length_of_regular_season: Number of hours in a regular season.
+    :param inert_share: Share of the generators, lines and storages that can not operate.
+    """
+
+    name: str
+    n_nodes: int
+    generators_per_node: int = 9
+    line_density: float = 0.0
+    number_of_scenarios: int = 2
+    n_periods: int = 2
+    regular_seasons: list[str] = field(default_factory=lambda: ["winter", "spring", "summer", "fall"])
+    length_of_regular_season: int = 24
+    inert_share: float = 0.0
+
+
+BENCHMARK_GRIDS = {
+    "small": [
+        BenchmarkCase("n2_g6_s1", n_nodes=2, generators_per_node=6, number_of_scenarios=1, n_periods=1,
+                      regular_seasons=["winter", "summer"]),
+        BenchmarkCase("n4_g9_s2", n_nodes=4),
+    ],
+    "medium": [
+        BenchmarkCase("n4_g9_s2", n_nodes=4),
+        BenchmarkCase("n8_g9_s3", n_nodes=8, line_density=0.2, number_of_scenarios=3),
+        BenchmarkCase("n8_g9_s3_h72", n_nodes=8, line_density=0.2, number_of_scenarios=3, length_of_regular_season=72),
+    ],
+    "large": [
+        BenchmarkCase("n16_g9_s3", n_nodes=16, line_density=0.1, number_of_scenarios=3, n_periods=3),
+        BenchmarkCase("n32_g9_s3", n_nodes=32, line_density=0.05, number_of_scenarios=3, n_periods=3),
+        BenchmarkCase("n32_g9_s5_h72", n_nodes=32, line_density=0.05, number_of_scenarios=5, n_periods=3,
+                      length_of_regular_season=72),
+    ],
+}
+
+# Increases of these metrics by more than the tolerance are regressions
+REGRESSION_METRICS = ["wall_time", "peak_rss_mb"]
+
+
+def run_benchmark_case(case: BenchmarkCase, config: dict, solver: str, run_path: Path,
+                       empire_path: Path | None = None) -> dict:
+    """
+    Generate the dataset of a case and run the model on it.
+
+    :param case: The case.
+    :param config: Configuration the case is run with, e.g. read from config/testrun.yaml. The
+        sizes of the case, the solver and the settings of the benchmark replace its values.
+    :param solver: Name of the solver, e.g. "GLPK" or "HiGHS".
+    :param run_path: Folder of the run of the case, with the dataset in Input/Xlsx.
+    :param empire_path: Path to the empire project, with config/countries.json. Defaults to the
+        working directory.
+    :return: Telemetry of the run, as written to perf.json.
+    """
+    if empire_path is None:
+        empire_path = Path.cwd()
+    input_path = create_if_not_exist(run_path / "Input")
+    dataset_path = create_if_not_exist(input_path / "Xlsx")
+    generate_synthetic_dataset(
+        dataset_path,
+        n_nodes=case.n_nodes,
+        generators_per_node=case.generators_per_node,
+        line_density=case.line_density,
+        n_periods=case.n_periods,
+        regular_seasons=case.regular_seasons,
+        length_of_regular_season=case.length_of_regular_season,
+        inert_share=case.inert_share,
+    )
+
+    config = {
+        **config,
+        "optimization_solver": solver,
+        "number_of_scenarios": case.number_of_scenarios,
+        "regular_seasons": case.regular_seasons,
+        "length_of_regular_season": case.length_of_regular_season,
+        "forecast_horizon_year": 2020 + 5 * case.n_periods,
+        "leap_years_investment": 5,
+        "use_scenario_generation": True,
+        "use_fixed_sample": False,
+        "scenario_seed": 1,
+        "moment_matching": False,
+        "north_sea": False,
+        "use_tab_files": True,
+        "write_in_lp_format": True,
+        "compute_operational_duals": True,
+        # The IAMC report only knows the European nodes
+        "print_in_iamc_format": False,
+        "use_temporary_directory": True,
+        "temporary_directory": run_path,
+        "use_input_cache": False,
+        "use_instance_cache": False,
+        "use_matrix_model": False,
+        "use_benders_decomposition": False,
+    }
+    empire_config = EmpireConfiguration.from_dict(config=config)
+    run_config = EmpireRunConfiguration(
+        run_name=case.name,
+        dataset_path=dataset_path,
+        tab_path=create_if_not_exist(input_path / "Tab"),
+        scenario_data_path=dataset_path / "ScenarioData",
+        results_path=create_if_not_exist(run_path / "Output"),
+        empire_path=empire_path,
+    )
+
+    logger.info("Running benchmark case %s: %s", case.name, asdict(case))
+    run_empire_model(empire_config=empire_config, run_config=run_config, data_managers=[], test_run=False)
+    return read_perf(run_config.results_path / PERF_FILE)
+
+
+def run_benchmarks(cases: list[BenchmarkCase], config: dict, solver: str, run_path: Path,
+                   empire_path: Path | None = None) -> dict[str, dict]:
+    """
+    Run the cases of a grid.
+
+    :param cases: The cases.
+    :param config: Configuration the cases are run with, see :func:`run_benchmark_case`.
+    :param solver: Name of the solver.
+    :param run_path: Folder with the runs of the cases in subfolders named after the cases.
+    :param empire_path: Path to the empire project. Defaults to the working directory.
+    :return: Telemetry of every case by its name.
+    """
+    return {case.name: run_benchmark_case(case, config, solver, run_path / case.name, empire_path) for case in cases}
+
+
+def summarize_benchmarks(results: dict[str, dict]) -> pd.DataFrame:
+    """
+    Wall time of every stage and the model size of the cases.
+
+    :param results: Telemetry of every case by its name.
+    :return: Table with one row per case.
+    """
+    rows = {}
+    for name, perf in results.items():
+        row = {f"{stage['name']}_s": stage["wall_time"] for stage in perf["stages"] if stage["name"] != "total"}
+        row.update({
+            "total_s": (perf["total"] or {}).get("wall_time"),
+            "rows": perf["model"].get("rows"),
+            "columns": perf["model"].get("columns"),
+            "peak_rss_mb": (perf["total"] or {}).get("peak_rss_mb"),
+        })
+        rows[name] = row
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def write_baseline(path: Path, solver: str, results: dict[str, dict]) -> None:
+    """
+    Store the telemetry of the cases as the baseline later runs are compared with.
+
+    :param path: JSON file to write.
+    :param solver: Name of the solver the cases were run with.
+    :param results: Telemetry of every case by its name.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"solver": solver, "cases": results}, file, indent=4)
+    logger.info("Benchmark baseline written to: %s", path)
+
+
+def read_baseline(path: Path) -> dict:
+    """
+    Read a baseline written by :func:`write_baseline`.
+
+    :param path: The JSON file.
+    :return: The solver and the telemetry of every case.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def find_regressions(baseline: dict[str, dict], results: dict[str, dict], tolerance: float = 0.25,
+                     min_seconds: float = 1.0) -> pd.DataFrame:
+    """
+    Compare the cases with a baseline.
+
+    A regression is a stage whose wall time, or a run whose peak memory, increased by more than
+    the tolerance. Stages that took less than ``min_seconds`` in the baseline are left out, as
+    their times are mostly noise. Cases that are not in the baseline are left out.
+
+    :param baseline: Telemetry of every case in the baseline by its name.
+    :param results: Telemetry of every case by its name.
+    :param tolerance: Relative increase allowed, e.g. 0.25 for 25%.
+    :param min_seconds: Minimum wall time in the baseline of the stages that are compared.
+    :return: Table of the regressions with the case, the metric, the values and the relative change.
+    """
+    regressions = []
+    for name, perf in results.items():
+        if name not in baseline:
+            logger.warning("No baseline of benchmark case %s", name)
+            continue
+        table = compare_perf(baseline[name], perf)
+        metric = table.index.str.rsplit(".", n=1).str[-1]
+        compared = metric.isin(REGRESSION_METRICS) & ((metric != "wall_time") | (table["base"] >= min_seconds))
+        regressed = table[compared & (table["relative_change"] > tolerance)]
+        regressions.append(regressed.rename_axis("metric").reset_index().assign(case=name))
+
+        rows, base_rows = perf["model"].get("rows"), baseline[name]["model"].get("rows")
+        if rows != base_rows:
+            logger.warning("Benchmark case %s has %s rows, the baseline %s. Store a new baseline if the model changed.",
+                           name, rows, base_rows)
+
+    columns = ["case", "metric", "base", "other", "change", "relative_change"]
+    if not regressions:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(regressions, ignore_index=True)[columns]
@@ -0,0 +1,493 @@
+"""
+Benders decomposition of the EMPIRE linear program.
+
+The investment decisions are the only variables shared by the operational problems of the
+periods and scenarios. The linear program generated by :func:`build_matrix_model` is split
+into a master problem with the investment decisions and one operational subproblem per
+(period, scenario). The subproblems are solved for the investments proposed by the master,
+in parallel over worker processes that keep their subproblems in HiGHS between iterations,
+and every subproblem returns an optimality cut to the master.
+
+Rows that couple the operational variables of several subproblems (``hydro_node_limit``
+sums the production of all scenarios of a period) are split: every subproblem gets its own
+budget variable, decided by the master, which bounds its part of the row, and the budgets
+are subject to the original row in the master.
+"""
+import logging
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+from pyomo.environ import Var
+from scipy.sparse import coo_matrix
+
+from empire.core.matrix_model import FIRST_STAGE_VARIABLES, LinearProgram, MatrixSolution
+
+logger = logging.getLogger(__name__)
+
+# Constraints whose dual values are written to the result files.
+DUAL_CONSTRAINTS = ("FlowBalance", "emission_cap")
+
+
+def _minimum_activity(coefs: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    # Smallest value of every term coef*x with lower <= x <= upper.
+    with np.errstate(invalid="ignore"):
+        return np.where(coefs > 0, coefs * lower, np.where(coefs < 0, coefs * upper, 0.0))
+
+
+def _highs(cost, col_lower, col_upper, matrix, row_lower, row_upper):
+    import highspy
+
+    matrix = matrix.tocsc()
+    model = highspy.HighsLp()
+    model.num_col_ = matrix.shape[1]
+    model.num_row_ = matrix.shape[0]
+    model.col_cost_ = cost
+    model.col_lower_ = col_lower
+    model.col_upper_ = col_upper
+    model.row_lower_ = row_lower
+    model.row_upper_ = row_upper
+    model.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    model.a_matrix_.start_ = matrix.indptr
+    model.a_matrix_.index_ = matrix.indices
+    model.a_matrix_.value_ = matrix.data
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.passModel(model)
+    return highs
+
+
+def _run(highs, name: str) -> None:
+    import highspy
+
+    highs.run()
+    status = highs.getModelStatus()
+    if status != highspy.HighsModelStatus.kOptimal:
+        raise RuntimeError(f"HiGHS did not find an optimal solution of the {name}: {highs.modelStatusToString(status)}")
+
+
+def _run_master(master) -> None:
+    # The cuts span many orders of magnitude, which neither the simplex nor the interior point
+    # method handles on every master problem. The interior point method, followed by crossover,
+    # fails less often; if it does, the master problem is solved from scratch with the simplex method.
+    import highspy
+
+    master.setOptionValue("solver", "ipm")
+    master.run()
+    if master.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+        logger.debug("Interior point method failed on the master problem, using the simplex method")
+        master.clearSolver()
+        master.setOptionValue("solver", "simplex")
+        _run(master, "master problem")
+
+
+class Subproblem:
+    """
+    Operational problem of one (period, scenario), or period, for given investment decisions.
+
+    The master columns in the rows of the subproblem are kept as columns fixed by their
+    bounds, so the derivatives of the optimal value with respect to them are their
+    reduced costs.
+
+    :param label: (period, scenario), or period, of the subproblem.
+    :param cost: Objective coefficients of the operational columns.
+    :param col_lower: Lower bounds of the operational columns.
+    :param col_upper: Upper bounds of the operational columns.
+    :param matrix: Rows of the subproblem, on the operational columns followed by the linked master columns.
+    :param row_lower: Lower bounds of the rows.
+    :param row_upper: Upper bounds of the rows.
+    :param link_cols: Positions of the linked columns in the master problem.
+    """
+
+    def __init__(self, label: tuple, cost: np.ndarray, col_lower: np.ndarray, col_upper: np.ndarray, matrix,
+                 row_lower: np.ndarray, row_upper: np.ndarray, link_cols: np.ndarray):
+        self.label = label
+        self.cost = cost
+        self.col_lower = col_lower
+        self.col_upper = col_upper
+        self.matrix = matrix
+        self.row_lower = row_lower
+        self.row_upper = row_upper
+        self.link_cols = link_cols
+        self._highs = None
+
+    def __getstate__(self):
+        # The HiGHS model is built again in the process the subproblem is sent to.
+        return {**self.__dict__, "_highs": None}
+
+    @property
+    def n_cols(self) -> int:
+        return len(self.cost)
+
+    @property
+    def lower_bound(self) -> float:
+        """Lower bound of the optimal value, from the bounds of the operational columns."""
+        return float(_minimum_activity(self.cost, self.col_lower, self.col_upper).sum())
+
+    def evaluate(self, x_master: np.ndarray) -> tuple[float, np.ndarray]:
+        """
+        Solve the subproblem for the given master solution.
+
+        Consecutive calls re-optimize from the previous basis.
+
+        :param x_master: Values of the master columns.
+        :return: Optimal value and its derivatives with respect to the linked master columns.
+        """
+        if self._highs is None:
+            n_links = len(self.link_cols)
+            self._highs = _highs(
+                np.concatenate([self.cost, np.zeros(n_links)]),
+                np.concatenate([self.col_lower, np.zeros(n_links)]),
+                np.concatenate([self.col_upper, np.zeros(n_links)]),
+                self.matrix, self.row_lower, self.row_upper,
+            )
+        x_link = x_master[self.link_cols]
+        links = np.arange(self.n_cols, self.n_cols + len(x_link), dtype=np.int32)
+        self._highs.changeColsBounds(len(links), links, x_link, x_link)
+        _run(self._highs, f"subproblem {self.label}")
+        solution = self._highs.getSolution()
+        return self._highs.getInfo().objective_function_value, np.array(solution.col_dual)[self.n_cols:]
+
+    def solution(self, x_master: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Solve the subproblem for the given master solution and return its solution.
+
+        :param x_master: Values of the master columns.
+        :return: Values of the operational columns and dual values of the rows.
+        """
+        self.evaluate(x_master)
+        solution = self._highs.getSolution()
+        return np.array(solution.col_value)[:self.n_cols], np.array(solution.row_dual)
+
+
+def _serve(connection, subproblems: dict[int, Subproblem]) -> None:
+    # Worker process: apply the commands of the pool to its subproblems until it is closed.
+    while True:
+        command, x_master = connection.recv()
+        if command is None:
+            break
+        try:
+            connection.send({b: getattr(sub, command)(x_master) for b, sub in subproblems.items()})
+        except RuntimeError as error:
+            # A subproblem without an optimal solution is reported to the pool. Any other error
+            # ends the worker, with its traceback, and the pool stops when it can not read the result.
+            connection.send(error)
+    connection.close()
+
+
+class SubproblemPool:
+    """
+    Subproblems distributed over worker processes.
+
+    Every worker holds a fixed share of the subproblems, so a subproblem is always solved by
+    the same process and can re-optimize from its previous basis. The results do not depend
+    on the number of workers.
+
+    :param subproblems: The subproblems.
+    :param workers: Number of worker processes. With one worker, the subproblems are solved in this process.
+    """
+
+    def __init__(self, subproblems: list[Subproblem], workers: int = 1):
+        self.subproblems = subproblems
+        self._connections = []
+        self._processes = []
+        if workers > 1:
+            for k in range(min(workers, len(subproblems))):
+                share = {b: sub for b, sub in enumerate(subproblems) if b % workers == k}
+                connection, child = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=_serve, args=(child, share), daemon=True)
+                process.start()
+                child.close()
+                self._connections.append(connection)
+                self._processes.append(process)
+
+    def _apply(self, command: str, x_master: np.ndarray) -> list:
+        if not self._connections:
+            return [getattr(sub, command)(x_master) for sub in self.subproblems]
+        for connection in self._connections:
+            connection.send((command, x_master))
+        results = {}
+        for connection in self._connections:
+            try:
+                result = connection.recv()
+            except EOFError:
+                raise RuntimeError(f"A subproblem worker stopped in {command}, see its error above") from None
+            if isinstance(result, Exception):
+                raise result
+            results.update(result)
+        return [results[b] for b in range(len(self.subproblems))]
+
+    def evaluate(self, x_master: np.ndarray) -> list[tuple[float, np.ndarray]]:
+        """Optimal values and derivatives of all subproblems, see :meth:`Subproblem.evaluate`."""
+        return self._apply("evaluate", x_master)
+
+    def solutions(self, x_master: np.ndarray) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Solutions of all subproblems, see :meth:`Subproblem.solution`."""
+        return self._apply("solution", x_master)
+
+    def close(self) -> None:
+        for connection in self._connections:
+            try:
+                connection.send((None, None))
+            except BrokenPipeError:
+                # The worker stopped with an error
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections, self._processes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BendersDecomposition:
+    """
+    Split of a linear program into a master problem with the first stage decisions and one
+    subproblem per (period, scenario), or per period.
+
+    The columns of the operational variables are assigned to the subproblem of their period
+    and scenario, the last two axes of their blocks. A row that holds operational columns of
+    several subproblems must only be upper bounded. It is split into one row per subproblem,
+    bounding the subproblem's part of the row by a new master column (its budget), and a
+    master row on the first stage columns and the budgets of the subproblems.
+
+    :param lp: The linear program, e.g. from :func:`build_matrix_model`.
+    :param by_scenario: If true, there is a subproblem per (period, scenario), otherwise per period.
+    :raises ValueError: If a row coupling several subproblems has a lower bound, or the
+        operational costs of a subproblem are not bounded below.
+    """
+
+    def __init__(self, lp: LinearProgram, by_scenario: bool = True):
+        self.lp = lp
+        n_cols, n_rows = lp.n_cols, lp.n_rows
+
+        col_block = np.full(n_cols, -1, dtype=np.int64)
+        for name, (cols, index) in lp.variables.items():
+            if name not in FIRST_STAGE_VARIABLES:
+                periods, scenarios = index[-2], index[-1]
+                if by_scenario:
+                    col_block[cols] = np.arange(len(periods))[:, None] * len(scenarios) + np.arange(len(scenarios))
+                else:
+                    col_block[cols] = np.arange(len(periods))[:, None]
+        self.labels = [(i, w) for i in periods for w in scenarios] if by_scenario else list(periods)
+        n_blocks = len(self.labels)
+
+        matrix = lp.matrix()
+        rows, cols, coefs = matrix.row, matrix.col, matrix.data
+        entry_block = col_block[cols]
+        operational = entry_block >= 0
+        first_block = np.full(n_rows, n_blocks, dtype=np.int64)
+        last_block = np.full(n_rows, -1, dtype=np.int64)
+        np.minimum.at(first_block, rows[operational], entry_block[operational])
+        np.maximum.at(last_block, rows[operational], entry_block[operational])
+        row_block = np.where(last_block >= 0, first_block, -1)
+        coupling = (last_block >= 0) & (last_block != first_block)
+
+        col_lower, col_upper = lp.col_lower, lp.col_upper
+        row_lower, row_upper = lp.row_lower, lp.row_upper
+        if np.any(np.isfinite(row_lower[coupling])):
+            raise ValueError("Rows coupling several subproblems must only be upper bounded")
+
+        # A budget column and a subproblem row for every (coupling row, subproblem) pair.
+        moved = operational & coupling[rows]
+        pairs, pair_of_entry = np.unique(np.stack([rows[moved], entry_block[moved]], axis=1), axis=0,
+                                         return_inverse=True)
+        pair_of_entry = pair_of_entry.ravel()
+        n_pairs = self.n_budgets = len(pairs)
+        budget_cols = n_cols + np.arange(n_pairs)
+        budget_rows = n_rows + np.arange(n_pairs)
+        budget_lower = np.zeros(n_pairs)
+        np.add.at(budget_lower, pair_of_entry,
+                  _minimum_activity(coefs[moved], col_lower[cols[moved]], col_upper[cols[moved]]))
+
+        entry_rows = rows.copy()
+        entry_rows[moved] = budget_rows[pair_of_entry]
+        entry_rows = np.concatenate([entry_rows, pairs[:, 0], budget_rows])
+        entry_cols = np.concatenate([cols, budget_cols, budget_cols])
+        entry_coefs = np.concatenate([coefs, np.ones(n_pairs), -np.ones(n_pairs)])
+        matrix = coo_matrix((entry_coefs, (entry_rows, entry_cols)), shape=(n_rows + n_pairs, n_cols + n_pairs)).tocsr()
+        col_block = np.concatenate([col_block, np.full(n_pairs, -1)])
+        row_block = np.concatenate([np.where(coupling, -1, row_block), pairs[:, 1]])
+        cost = np.concatenate([lp.objective, np.zeros(n_pairs)])
+        col_lower = np.concatenate([col_lower, budget_lower])
+        col_upper = np.concatenate([col_upper, np.full(n_pairs, np.inf)])
+        row_lower = np.concatenate([row_lower, np.full(n_pairs, -np.inf)])
+        row_upper = np.concatenate([row_upper, np.zeros(n_pairs)])
+
+        # Positions of the columns in the master problem or in their subproblem.
+        self.master_cols = np.flatnonzero(col_block < 0)
+        self.master_rows = np.flatnonzero(row_block < 0)
+        self.block_cols = [np.flatnonzero(col_block == b) for b in range(n_blocks)]
+        self.block_rows = [np.flatnonzero(row_block == b) for b in range(n_blocks)]
+        master_pos = np.full(len(col_block), -1, dtype=np.int64)
+        master_pos[self.master_cols] = np.arange(len(self.master_cols))
+
+        self.master_cost = cost[self.master_cols]
+        self.master_col_lower = col_lower[self.master_cols]
+        self.master_col_upper = col_upper[self.master_cols]
+        self.master_matrix = matrix[self.master_rows][:, self.master_cols]
+        self.master_row_lower = row_lower[self.master_rows]
+        self.master_row_upper = row_upper[self.master_rows]
+
+        self.subproblems = []
+        for b, label in enumerate(self.labels):
+            block_matrix = matrix[self.block_rows[b]]
+            own = self.block_cols[b]
+            links = np.unique(block_matrix.indices[col_block[block_matrix.indices] < 0])
+            self.subproblems.append(Subproblem(
+                label, cost[own], col_lower[own], col_upper[own], block_matrix[:, np.concatenate([own, links])],
+                row_lower[self.block_rows[b]], row_upper[self.block_rows[b]], master_pos[links],
+            ))
+            if not np.isfinite(self.subproblems[-1].lower_bound):
+                raise ValueError(f"The operational costs of {label} are not bounded below")
+
+        logger.info("Decomposed linear program into a master problem with %d variables and %d subproblems "
+                    "with up to %d variables", len(self.master_cols), n_blocks, max(map(len, self.block_cols)))
+
+    def solution(self, x_master: np.ndarray, master_duals: np.ndarray,
+                 block_solutions: list[tuple[np.ndarray, np.ndarray]]) -> MatrixSolution:
+        """
+        Assemble the solution of the original linear program.
+
+        The duals of the rows coupling several subproblems are those of the master row.
+
+        :param x_master: Values of the master columns.
+        :param master_duals: Dual values of the master rows.
+        :param block_solutions: Column values and row duals of every subproblem.
+        :return: The solution.
+        """
+        n_cols, n_rows = self.lp.n_cols, self.lp.n_rows
+        x = np.zeros(n_cols + self.n_budgets)
+        duals = np.zeros(n_rows + self.n_budgets)
+        x[self.master_cols] = x_master
+        duals[self.master_rows] = master_duals
+        for b, (x_block, duals_block) in enumerate(block_solutions):
+            x[self.block_cols[b]] = x_block
+            duals[self.block_rows[b]] = duals_block
+        x, duals = x[:n_cols], duals[:n_rows]
+        return MatrixSolution(float(self.lp.objective @ x), x, duals)
+
+
+def solve_benders(lp: LinearProgram, workers: int = 1, tolerance: float = 1e-6, max_iterations: int = 1000,
+                  stabilization: float = 0.8, logfile: Path | None = None) -> MatrixSolution:
+    """
+    Solve a linear program by Benders decomposition with HiGHS (highspy).
+
+    Every iteration solves the master problem, with one variable bounding the operational
+    costs of every subproblem from below, and adds an optimality cut for every subproblem.
+    The cuts are generated at a point between the master solution and the best investment
+    decisions found so far (in-out stabilization), which avoids the oscillation of the master
+    solutions in the first iterations. If none of the cuts is violated at the master solution,
+    the next cuts are generated at the master solution itself. The iterations stop when the
+    gap between the lower bound from the master problem and the costs of the best investment
+    decisions is within the tolerance. The subproblems are then solved once more for the best
+    investment decisions to obtain the operational solution.
+
+    :param lp: The linear program.
+    :param workers: Number of worker processes solving the subproblems.
+    :param tolerance: Relative gap at which the iterations stop.
+    :param max_iterations: Maximum number of iterations.
+    :param stabilization: Weight of the best investment decisions in the point the cuts are generated at.
+    :param logfile: File for the log of the master problem solver.
+    :return: The solution with the best investment decisions.
+    :raises RuntimeError: If a master or subproblem has no optimal solution.
+    """
+    decomposition = BendersDecomposition(lp)
+    subproblems = decomposition.subproblems
+    n_master = len(decomposition.master_cols)
+    n_blocks = len(subproblems)
+
+    # Master problem columns: first stage decisions and budgets, then one cost variable per subproblem.
+    theta = np.arange(n_master, n_master + n_blocks, dtype=np.int32)
+    master_matrix = decomposition.master_matrix.tocoo()
+    master = _highs(
+        np.concatenate([decomposition.master_cost, np.ones(n_blocks)]),
+        np.concatenate([decomposition.master_col_lower, [sub.lower_bound for sub in subproblems]]),
+        np.concatenate([decomposition.master_col_upper, np.full(n_blocks, np.inf)]),
+        coo_matrix((master_matrix.data, (master_matrix.row, master_matrix.col)),
+                   shape=(master_matrix.shape[0], n_master + n_blocks)),
+        decomposition.master_row_lower, decomposition.master_row_upper,
+    )
+    if logfile is not None:
+        master.setOptionValue("log_file", str(logfile))
+
+    lower, upper = -np.inf, np.inf
+    best = None
+    weight = 0.0
+    with SubproblemPool(subproblems, workers) as pool:
+        for iteration in range(1, max_iterations + 1):
+            _run_master(master)
+            lower = master.getInfo().objective_function_value
+            solution = np.array(master.getSolution().col_value)
+            x_master, estimates = solution[:n_master], solution[n_master:]
+
+            x_sep = x_master if best is None else weight * best + (1 - weight) * x_master
+            results = pool.evaluate(x_sep)
+            costs = float(decomposition.master_cost @ x_sep) + sum(obj for obj, _ in results)
+            if costs < upper:
+                upper, best = costs, x_sep
+            gap = (upper - lower) / max(abs(upper), 1e-10)
+            logger.info("Benders iteration %d: lower bound %.8e, upper bound %.8e, gap %.2e",
+                        iteration, lower, upper, gap)
+            if gap <= tolerance:
+                break
+
+            violated = False
+            for b, (obj, gradient) in enumerate(results):
+                links = subproblems[b].link_cols
+                # theta_b >= obj + gradient'(x_link - x_sep_link)
+                if obj + gradient @ (x_master[links] - x_sep[links]) - estimates[b] > 1e-9 * max(abs(obj), 1.0):
+                    violated = True
+                master.addRow(obj - gradient @ x_sep[links], np.inf, len(links) + 1,
+                              np.concatenate([[theta[b]], links]).astype(np.int32),
+                              np.concatenate([[1.0], -gradient]))
+            weight = stabilization if violated else 0.0
+        else:
+            logger.warning("Benders decomposition stopped after %d iterations with a gap of %.2e",
+                           max_iterations, gap)
+
+        master_duals = np.array(master.getSolution().row_dual)[:len(decomposition.master_rows)]
+        block_solutions = pool.solutions(best)
+
+    solution = decomposition.solution(best, master_duals, block_solutions)
+    solution.statistics = {"iterations": iteration, "lower_bound": lower, "upper_bound": upper, "gap": gap}
+    return solution
+
+
+def load_solution(instance, lp: LinearProgram, solution: MatrixSolution, constraints=DUAL_CONSTRAINTS) -> None:
+    """
+    Load the solution of the linear program into the variables and the dual suffix of an
+    instance, so the results are written as if the instance was solved.
+
+    :param instance: Instance the linear program was generated from, with its variables and
+        the constraints in ``constraints`` constructed.
+    :param lp: The linear program.
+    :param solution: Its solution.
+    :param constraints: Names of the constraints whose dual values are loaded.
+    """
+    for name, (cols, _) in lp.variables.items():
+        component = getattr(instance, name)
+        if component.ctype is not Var:
+            # The investment decisions of out-of-sample runs are parameters
+            continue
+        values = solution.x[cols].ravel().tolist()
+        if len(component) != len(values):
+            raise ValueError(f"Variable {name} of the instance does not match the linear program")
+        # Dense components iterate in the product order of their index sets, the order of the columns.
+        for var, v in zip(component.values(), values):
+            var.set_value(v, skip_validation=True)
+
+    for name in constraints:
+        if name not in lp.constraints:
+            continue
+        component = getattr(instance, name)
+        duals = solution.duals[lp.constraints[name]].ravel().tolist()
+        if len(component) != len(duals):
+            raise ValueError(f"Constraint {name} of the instance does not match the linear program")
+        for constraint, d in zip(component.values(), duals):
+            instance.dual[constraint] = d
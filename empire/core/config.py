@@ -4,6 +4,8 @@ from typing import Dict
 
 import yaml
 
+from empire.core.result_tables import RESULTS_FORMATS
+
 
 def read_config_file(path: Path) -> Dict:
     with open(path) as file:
@@ -48,6 +50,30 @@ class EmpireConfiguration:
         len_peak_season: int = 24,
         leap_years_investment: int = 5,
         time_format: str = "%d/%m/%Y %H:%M",
+        results_format: str = "csv",
+        use_tab_files: bool = False,
+        use_input_cache: bool = False,
+        input_cache_directory: str | Path = "./.input_cache",
+        input_cache_max_size_mb: float = 1024,
+        use_instance_cache: bool = False,
+        instance_cache_directory: str | Path = "./.instance_cache",
+        instance_cache_max_size_mb: float = 20480,
+        use_persistent_solver: bool = False,
+        use_direct_solver: bool = False,
+        use_matrix_model: bool = False,
+        scenario_seed: int | None = None,
+        scenario_workers: int = 1,
+        use_benders_decomposition: bool = False,
+        benders_workers: int = 1,
+        benders_tolerance: float = 1e-6,
+        benders_max_iterations: int = 1000,
+        out_of_sample_workers: int = 1,
+        sensitivity_workers: int = 1,
+        profile_model_construction: bool = False,
+        use_lean_build: bool = False,
+        use_model_reduction: bool = False,
+        write_solution_snapshot: bool = False,
+        write_operational_results: bool = True,
         **kwargs,
     ):
         """
@@ -60,7 +86,7 @@ class EmpireConfiguration:
         :param length_of_regular_season: The number of chronological time steps in a regular season. NB! Must correspond with data for version.
         :param discount_rate: Rate used to discount future cash flows to present value.
         :param wacc: The Weighted Average Cost of Capital (WACC).
-        :param optimization_solver: Mathematical solver used for optimization tasks. Options: “Xpress”, “Gurobi”, “CPLEX”.
+        :param optimization_solver: Mathematical solver used for optimization tasks. Options: “Xpress”, “Gurobi”, “CPLEX”, “GLPK”, “HiGHS”.
         :param use_scenario_generation: If true, new operational scenarios will be generated. NB! If false, .tab-files or sampling key must be manually added to the ‘ScenarioData’-folder in the version.
         :param use_fixed_sample: If true, operational scenarios will be generated according to a fixed sampling key located in the ‘Scenario Data’ folder to ensure the same operational scenarios are generated.
         :param load_change_module:
@@ -79,6 +105,30 @@ class EmpireConfiguration:
         :param n_peak_seasons:  Peak seasons.
         :param leap_years_investment: Years between investment decisions
         :param time_format: Time format
+        :param results_format: Format of the tabular result files. Options: "csv", "parquet" (requires pyarrow).
+        :param use_tab_files: If true, the input data is written to .tab files and read back from them, which is useful for debugging. If false, the input data is passed to the model in memory.
+        :param use_input_cache: If true, tables read from the input workbooks are cached, so unchanged sheets are not read again.
+        :param input_cache_directory: Directory of the input cache. Can be shared between runs.
+        :param input_cache_max_size_mb: Size limit of the input cache. The least recently used tables are evicted first.
+        :param use_instance_cache: If true, built instances are cached and reused by runs that only differ in the stochastic data.
+        :param instance_cache_directory: Directory of the instance cache. Can be shared between runs.
+        :param instance_cache_max_size_mb: Size limit of the instance cache. The least recently used instances are evicted first.
+        :param use_persistent_solver: If true, the persistent interface of the solver (CPLEX, Xpress, Gurobi) is used when operational duals are computed, so the resolve with fixed investments updates the model held by the solver. Falls back to the file-based interface if the solver's Python API is not installed.
+        :param use_direct_solver: If true, the model is always built through the Python API of the solver (CPLEX, Xpress, Gurobi) instead of being written to an LP file, which avoids disk I/O in the temporary directory. The time spent building the model in the solver and solving it is logged.
+        :param use_matrix_model: If true, the linear program is generated as a sparse matrix with NumPy instead of Pyomo constraint rules and solved through the matrix API of Gurobi (gurobipy), or of HiGHS (highspy) for the other solvers. The solution is loaded into the instance and the results are written as for the Pyomo formulation.
+        :param scenario_seed: Master seed of the scenario generation. Every tree is drawn with its own random generator seeded from it, so the scenarios are reproducible for any number of workers. If not set, a random seed is used and logged.
+        :param scenario_workers: Number of worker processes generating and scoring the trees compared in moment matching.
+        :param use_benders_decomposition: If true, the linear program is generated as a sparse matrix and solved by Benders decomposition with HiGHS (highspy), with a master problem for the investment decisions and one operational subproblem per period and scenario. The solution is loaded into the instance, so the same results are written.
+        :param benders_workers: Number of worker processes solving the Benders subproblems.
+        :param benders_tolerance: Relative gap between the lower and upper bound at which the Benders iterations stop.
+        :param benders_max_iterations: Maximum number of Benders iterations.
+        :param out_of_sample_workers: Number of worker processes solving the periods of the out-of-sample trees when several trees are evaluated from one instance.
+        :param sensitivity_workers: Number of worker processes a sensitivity sweep is shared between. Every worker builds the instance once and solves its points in turn.
+        :param profile_model_construction: Profile the construction of the instance and write the time, rule calls, rows and nonzeros of every component to the results folder.
+        :param use_lean_build: Release the abstract model, the loaded data and the raw stochastic parameters once the instance is built, and keep only the duals that are written, to lower the memory of a run.
+        :param use_model_reduction: Leave out the operational variables and constraints of the generators, lines and storages that can not operate according to the input data. The result files are unchanged.
+        :param write_solution_snapshot: Write the solution, the parameters and the sets to a compressed snapshot file, from which the result files can be written again with empire-report without solving the model.
+        :param write_operational_results: Write the hourly operational result files after the solve. If false, they can be written from the solution snapshot on demand.
         """
         # Model parameters
         self.use_temporary_directory = use_temporary_directory
@@ -116,6 +166,30 @@ class EmpireConfiguration:
         self.len_peak_season = len_peak_season
         self.leap_years_investment = leap_years_investment
         self.time_format = time_format
+        self.results_format = results_format
+        self.use_tab_files = use_tab_files
+        self.use_input_cache = use_input_cache
+        self.input_cache_directory = Path(input_cache_directory).absolute()
+        self.input_cache_max_size_mb = input_cache_max_size_mb
+        self.use_instance_cache = use_instance_cache
+        self.instance_cache_directory = Path(instance_cache_directory).absolute()
+        self.instance_cache_max_size_mb = instance_cache_max_size_mb
+        self.use_persistent_solver = use_persistent_solver
+        self.use_direct_solver = use_direct_solver
+        self.use_matrix_model = use_matrix_model
+        self.scenario_seed = scenario_seed
+        self.scenario_workers = scenario_workers
+        self.use_benders_decomposition = use_benders_decomposition
+        self.benders_workers = benders_workers
+        self.benders_tolerance = benders_tolerance
+        self.benders_max_iterations = benders_max_iterations
+        self.out_of_sample_workers = out_of_sample_workers
+        self.sensitivity_workers = sensitivity_workers
+        self.profile_model_construction = profile_model_construction
+        self.use_lean_build = use_lean_build
+        self.use_model_reduction = use_model_reduction
+        self.write_solution_snapshot = write_solution_snapshot
+        self.write_operational_results = write_operational_results
 
         # Computed attributes
         self.n_reg_season = len(regular_seasons)
@@ -129,7 +203,8 @@ class EmpireConfiguration:
         """
         Validates the configuration. Raises an error if the configuration is invalid.
         """
-        pass
+        if self.results_format not in RESULTS_FORMATS:
+            raise ValueError(f"Invalid results format '{self.results_format}'. Options: {RESULTS_FORMATS}")
 
     @classmethod
     def from_dict(cls, config: Dict) -> "EmpireConfiguration":
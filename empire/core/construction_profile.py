@@ -0,0 +1,147 @@
+"""
+Profile of the construction of the Pyomo instance.
+
+Pyomo reports the time it takes to construct every component (sets, parameters, build actions,
+variables and constraints) to the ``pyomo.common.timing.construction`` logger, which is what
+``create_instance(report_timing=True)`` prints. The profiler collects these reports while the
+instance is built, together with a cProfile profile of the build, and writes:
+
+* ``construction_profile.csv``: one row per component, sorted by construction time, with the
+  number of indices, the number of calls of its rule, and for constraints the number of rows
+  and nonzeros generated.
+* ``construction_profile.folded``: the construction times in the folded stack format read by
+  flamegraph.pl and speedscope.
+* ``construction_profile.prof``: the cProfile statistics, readable with ``pstats``, snakeviz or
+  gprof2dot.
+
+cProfile slows the build down, so the times are only comparable between profiled runs.
+"""
+import cProfile
+import logging
+import pstats
+from pathlib import Path
+
+import pandas as pd
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.environ import Constraint
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FILE = "construction_profile"
+
+_construction_logger = logging.getLogger("pyomo.common.timing.construction")
+
+
+class _TimerHandler(logging.Handler):
+    # The messages of the construction logger are the ConstructionTimer objects
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.timers = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.timers.append((record.msg.obj, record.msg.timer))
+
+
+def _rule_function(component):
+    # Rules are stored as the function or as an initializer wrapping it
+    rule = getattr(component, "_rule", None)
+    rule = getattr(rule, "_fcn", rule)
+    return getattr(rule, "__code__", None)
+
+
+def _constraint_size(component) -> tuple[int, int]:
+    rows = nonzeros = 0
+    for constraint in component.values():
+        rows += 1
+        nonzeros += sum(1 for _ in identify_variables(constraint.body, include_fixed=False))
+    return rows, nonzeros
+
+
+class ConstructionProfiler:
+    """
+    Context manager profiling the construction of an instance.
+
+    Example::
+
+        with ConstructionProfiler() as profiler:
+            instance = model.create_instance(data)
+        profiler.write(result_file_path)
+    """
+
+    def __init__(self):
+        self._handler = _TimerHandler()
+        self._profile = cProfile.Profile()
+        self._level = None
+        self._propagate = None
+
+    def __enter__(self):
+        self._level, self._propagate = _construction_logger.level, _construction_logger.propagate
+        _construction_logger.setLevel(logging.INFO)
+        # The reports are collected, not printed
+        _construction_logger.propagate = False
+        _construction_logger.addHandler(self._handler)
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profile.disable()
+        _construction_logger.removeHandler(self._handler)
+        _construction_logger.setLevel(self._level)
+        _construction_logger.propagate = self._propagate
+        return False
+
+    def table(self) -> pd.DataFrame:
+        """
+        Construction time and size of every component.
+
+        :return: Table with one row per component, sorted by construction time.
+        """
+        calls = {
+            (filename, lineno, funcname): stats[1]
+            for (filename, lineno, funcname), stats in pstats.Stats(self._profile).stats.items()
+        }
+        rows = []
+        for component, seconds in self._handler.timers:
+            if component.parent_block() is None:
+                # The model itself, whose time includes all components
+                continue
+            code = _rule_function(component)
+            rule_calls = None
+            if code is not None:
+                rule_calls = calls.get((code.co_filename, code.co_firstlineno, code.co_name), 0)
+            constraint_rows = nonzeros = None
+            if component.ctype is Constraint:
+                constraint_rows, nonzeros = _constraint_size(component)
+            rows.append({
+                "component": component.name,
+                "type": component.ctype.__name__,
+                "seconds": seconds,
+                "indices": len(component) if component.is_indexed() else 1,
+                "rule_calls": rule_calls,
+                "rows": constraint_rows,
+                "nonzeros": nonzeros,
+            })
+        table = pd.DataFrame(rows, columns=["component", "type", "seconds", "indices", "rule_calls", "rows",
+                                            "nonzeros"])
+        table[["rule_calls", "rows", "nonzeros"]] = table[["rule_calls", "rows", "nonzeros"]].astype("Int64")
+        return table.sort_values("seconds", ascending=False, ignore_index=True)
+
+    def write(self, result_file_path: Path) -> pd.DataFrame:
+        """
+        Write the table, the folded stacks and the cProfile statistics.
+
+        :param result_file_path: Folder to write the files to.
+        :return: The table of :meth:`table`.
+        """
+        table = self.table()
+        table.to_csv(result_file_path / f"{PROFILE_FILE}.csv", index=False)
+
+        # Folded stacks, with the time in microseconds as the sample count
+        with open(result_file_path / f"{PROFILE_FILE}.folded", "w", encoding="utf-8") as file:
+            file.writelines(f"create_instance;{row.type};{row.component} {max(round(row.seconds * 1e6), 1)}\n"
+                            for row in table.itertuples())
+        self._profile.dump_stats(result_file_path / f"{PROFILE_FILE}.prof")
+
+        logger.info("Slowest components to construct:\n%s", table.head(10).to_string(index=False))
+        logger.info("Construction profile written to: %s", result_file_path / f"{PROFILE_FILE}.csv")
+        return table
@@ -0,0 +1,419 @@
+"""
+Parameters derived from the raw input data.
+
+The investment costs, the initial and maximum generator capacities, the seasonal limits of
+regulated hydro, the generator availability and the electric load of every hour are derived
+from raw input parameters. They are computed with pandas on whole tables before the instance
+is built, and handed to ``create_instance`` as data together with the input data, instead of
+by build actions evaluating every index of the instance one by one. The values are computed in
+the order the build actions computed them, so they are the same to the last digit, and keep
+integers where the build actions stored integers.
+
+The same computation updates a built instance when its raw parameters change: a cached
+instance with new scenarios, every out-of-sample tree and every point of a sensitivity sweep.
+Hours whose scaled electric load is negative are set to a small load, and are reported in
+AdjustedNegativeLoad_<run>.txt.
+"""
+import logging
+from functools import reduce
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pyomo.environ import DataPortal, Param, value
+
+logger = logging.getLogger(__name__)
+
+INVESTMENT_COST_PARAMS = ("genInvCost", "storPWInvCost", "storENInvCost", "transmissionInvCost")
+# Derived from the stochastic parameters, so they change with the scenarios
+STOCHASTIC_DERIVED_PARAMS = ("maxRegHydroGen", "genCapAvail", "sload")
+DERIVED_PARAMS = INVESTMENT_COST_PARAMS + ("genInitCap", "genMaxInstalledCap") + STOCHASTIC_DERIVED_PARAMS
+
+ADJUSTED_LOAD_FILE = "AdjustedNegativeLoad"
+# Load in MW of the hours whose scaled load is negative
+ADJUSTED_LOAD = 10
+
+
+def bidirectional_arcs(directional_links) -> list[tuple]:
+    """
+    One arc per pair of linked nodes, in the order of the first of its directional links.
+
+    :param directional_links: Pairs of nodes.
+    :return: List of arcs.
+    """
+    arcs = []
+    seen = set()
+    for (i, j) in directional_links:
+        if i != j and (j, i) not in seen:
+            arcs.append((i, j))
+            seen.add((i, j))
+    return arcs
+
+
+class PortalInput:
+    """
+    Input data of an instance that is not built yet, read from the data portal it is built from.
+    """
+
+    def __init__(self, data: DataPortal, model, sets: dict[str, list], scalars: dict | None = None):
+        """
+        :param data: DataPortal with the loaded input data.
+        :param model: The abstract model, with the defaults of the parameters.
+        :param sets: Members of the sets initialized by the model instead of loaded, e.g. PeriodActive.
+        :param scalars: Values of the scalar parameters initialized by the model, e.g. WACC.
+        """
+        self._data = data.data()
+        self._model = model
+        self._sets = sets
+        self._scalars = scalars or {}
+
+    def has(self, name: str) -> bool:
+        return self._model.component(name) is not None
+
+    def members(self, name: str) -> list:
+        if name in self._sets:
+            return list(self._sets[name])
+        if name == "BidirectionalArc":
+            return bidirectional_arcs(self.members("DirectionalLink"))
+        return list(self._data.get(name, {}).get(None, []))
+
+    def values(self, name: str) -> dict:
+        return self._data.get(name, {})
+
+    def default(self, name: str):
+        default = self._model.component(name).default()
+        return np.nan if default is Param.NoValue else default
+
+    def scalar(self, name: str):
+        if name in self._data:
+            return self._data[name][None]
+        return self._scalars[name]
+
+
+class InstanceInput:
+    """
+    Input data of a built instance.
+    """
+
+    def __init__(self, instance):
+        """
+        :param instance: The instance.
+        """
+        self._instance = instance
+
+    def has(self, name: str) -> bool:
+        return self._instance.component(name) is not None
+
+    def members(self, name: str) -> list:
+        return list(self._instance.component(name))
+
+    def values(self, name: str) -> dict:
+        return self._instance.component(name).extract_values_sparse()
+
+    def default(self, name: str):
+        default = self._instance.component(name).default()
+        return np.nan if default is Param.NoValue else default
+
+    def scalar(self, name: str):
+        return value(self._instance.component(name))
+
+
+def _frame(names: list[str], members: list) -> pd.DataFrame:
+    if len(names) == 1:
+        return pd.DataFrame({names[0]: members})
+    return pd.DataFrame(members, columns=names)
+
+
+def _product(*frames: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_frame(reduce(lambda left, right: left.merge(right, how="cross"), frames))
+
+
+def _numbers(values: list) -> np.ndarray:
+    # Floats, unless the values hold other numbers, e.g. integers from the input data, which are kept
+    # as Python numbers so that the derived values are of the same type as those of the build actions
+    if all(v.__class__ is float for v in values):
+        return np.array(values, dtype=float)
+    return np.array(values, dtype=object)
+
+
+def _series(inputs, name: str, names: list[str], index: pd.Index | None = None) -> pd.Series:
+    # Values of a parameter, on the given index with the default of the parameter for missing values
+    values = inputs.values(name)
+    keys = list(values)
+    if len(names) == 1:
+        raw_index = pd.Index(keys, name=names[0])
+    else:
+        raw_index = pd.MultiIndex.from_tuples(keys, names=names) if keys else pd.MultiIndex.from_arrays(
+            [[]] * len(names), names=names)
+    raw = pd.Series(_numbers(list(values.values())), index=raw_index)
+    if index is None:
+        return raw
+    return raw.reindex(index, fill_value=inputs.default(name))
+
+
+def _on(series: pd.Series, index: pd.Index) -> np.ndarray:
+    # Values of a series for every entry of an index with some of its levels
+    return series.reindex(index.droplevel([n for n in index.names if n not in series.index.names])).to_numpy()
+
+
+def _power(base: float, exponents: np.ndarray) -> np.ndarray:
+    # Powers with the pow of Python, which the vectorized power of numpy differs from in the last digit
+    return np.array([base ** e for e in exponents.tolist()])
+
+
+def _ordered_sum(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    # Sums of the values of every group, adding the values one by one in their order like the built-in
+    # sum (numpy sums pairwise and pandas with compensation). Groups without values sum to the integer 0.
+    totals = np.zeros(n_groups, dtype=values.dtype)
+    order = np.argsort(groups, kind="stable")
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = groups[order][1:] != groups[order][:-1]
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order)) - np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))
+    # Every group has one value at a position, so the values of a position are added at once
+    by_position = np.argsort(position, kind="stable")
+    bounds = np.cumsum(np.bincount(position))
+    for begin, end in zip(np.r_[0, bounds[:-1]], bounds):
+        rows = by_position[begin:end]
+        totals[groups[rows]] = totals[groups[rows]] + values[rows]
+    empty = np.bincount(groups, minlength=n_groups) == 0
+    if empty.any():
+        totals = totals.astype(object)
+        totals[empty] = 0
+    return totals
+
+
+def _investment_costs(inputs) -> dict[str, pd.Series]:
+    # Annual cost over the lifetime, discounted for the remaining years of the horizon (or the lifetime)
+    wacc, rate = inputs.scalar("WACC"), inputs.scalar("discountrate")
+    periods = inputs.members("PeriodActive")
+    years = pd.Series([(len(periods) - i + 1) * inputs.scalar("LeapYearsInvestment") for i in periods],
+                      index=pd.Index(periods, name="Period"), dtype=float)
+
+    def annuity(lifetime):
+        return wacc / (1 - _power(1 + wacc, -lifetime))
+
+    def discounted(cost, lifetime, index):
+        return cost * (1 - _power(1 + rate, -np.minimum(_on(years, index), lifetime))) / (1 - (1 / (1 + rate)))
+
+    costs = {}
+    generators = pd.Index(inputs.members("Generator"), name="Generator")
+    index = _product(generators.to_frame(index=False), _frame(["Period"], periods))
+    lifetime = _on(_series(inputs, "genLifetime", ["Generator"], generators), index)
+    per_year = annuity(lifetime) * _series(inputs, "genCapitalCost", ["Generator", "Period"], index).to_numpy() + \
+        _series(inputs, "genFixedOMCost", ["Generator", "Period"], index).to_numpy()
+    cost = discounted(per_year * 1000, lifetime, index)
+    # CCS generators pay for the transport and storage of the captured CO2
+    ccs = [g for t, g in inputs.members("GeneratorsOfTechnology") if t == "CCS"]
+    co2 = _on(_series(inputs, "genCO2TypeFactor", ["Generator"], generators), index)
+    efficiency = _series(inputs, "genEfficiency", ["Generator", "Period"], index).to_numpy()
+    ccs_cost = inputs.scalar("CCSCostTSFix") * inputs.scalar("CCSRemFrac") * co2 * (3.6 / efficiency)
+    costs["genInvCost"] = pd.Series(np.where(index.get_level_values("Generator").isin(ccs), cost + ccs_cost, cost),
+                                    index=index)
+
+    storages = pd.Index(inputs.members("Storage"), name="Storage")
+    index = _product(storages.to_frame(index=False), _frame(["Period"], periods))
+    lifetime = _on(_series(inputs, "storageLifetime", ["Storage"], storages), index)
+    for param, capital_cost, fixed_cost in [("storPWInvCost", "storPWCapitalCost", "storPWFixedOMCost"),
+                                            ("storENInvCost", "storENCapitalCost", "storENFixedOMCost")]:
+        per_year = annuity(lifetime) * _series(inputs, capital_cost, ["Storage", "Period"], index).to_numpy() + \
+            _series(inputs, fixed_cost, ["Storage", "Period"], index).to_numpy()
+        costs[param] = pd.Series(discounted(per_year * 1000, lifetime, index), index=index)
+
+    # The last type of a line, in the order of the transmission types, sets its cost
+    arcs = pd.MultiIndex.from_tuples(inputs.members("BidirectionalArc"), names=["FromNode", "ToNode"]) \
+        if inputs.members("BidirectionalArc") else pd.MultiIndex.from_arrays([[], []], names=["FromNode", "ToNode"])
+    line_types = _frame(["FromNode", "ToNode", "Type"], inputs.members("TransmissionTypeOfDirectionalLink"))
+    order = {t: k for k, t in enumerate(inputs.members("TransmissionType"))}
+    line_types = line_types.assign(order=line_types["Type"].map(order)).dropna(subset="order")
+    line_types = line_types[pd.MultiIndex.from_frame(line_types[["FromNode", "ToNode"]]).isin(arcs)]
+    line_types = line_types.sort_values("order", kind="stable").drop_duplicates(["FromNode", "ToNode"], keep="last")
+    index = _product(line_types[["FromNode", "ToNode", "Type"]], _frame(["Period"], periods))
+    lifetime = _on(_series(inputs, "transmissionLifetime", ["FromNode", "ToNode"], arcs), index)
+    length = _on(_series(inputs, "transmissionLength", ["FromNode", "ToNode"], arcs), index)
+    type_index = index.droplevel(["FromNode", "ToNode"])
+    per_year = annuity(lifetime) * length * \
+        _series(inputs, "transmissionTypeCapitalCost", ["Type", "Period"], type_index).to_numpy() + \
+        _series(inputs, "transmissionTypeFixedOMCost", ["Type", "Period"], type_index).to_numpy()
+    costs["transmissionInvCost"] = pd.Series(discounted(per_year, lifetime, index), index=index.droplevel("Type"))
+    return costs
+
+
+def _initial_generator_capacity(inputs) -> pd.Series:
+    # Initial capacities that are not given are scaled from the reference capacity
+    index = _product(_frame(["Node", "Generator"], inputs.members("GeneratorsOfNode")),
+                     _frame(["Period"], inputs.members("PeriodActive")))
+    capacity = _series(inputs, "genInitCap", ["Node", "Generator", "Period"], index).to_numpy()
+    reference = _series(inputs, "genRefInitCap", ["Node", "Generator"], index.droplevel("Period")).to_numpy()
+    scale = _series(inputs, "genScaleInitCap", ["Generator", "Period"], index.droplevel("Node")).to_numpy()
+    return pd.Series(np.where(capacity == 0, reference * (1 - scale), capacity), index=index)
+
+
+def _max_installed_generator_capacity(inputs, initial_capacity: pd.Series) -> pd.Series:
+    # The resource limit of a technology is at least its initial capacity, to avoid infeasibility
+    index = _product(_frame(["Node"], inputs.members("Node")), _frame(["Technology"], inputs.members("Technology")),
+                     _frame(["Period"], inputs.members("PeriodActive")))
+    technologies = _frame(["Technology", "Generator"], inputs.members("GeneratorsOfTechnology"))
+    initial = initial_capacity.rename("capacity").reset_index().merge(technologies, on="Generator")
+    # The capacities of the generators of a technology are added in the order of the generators
+    generator_order = {g: k for k, g in enumerate(inputs.members("Generator"))}
+    initial = initial.iloc[np.argsort(initial["Generator"].map(generator_order).to_numpy(), kind="stable")]
+    groups = index.get_indexer(pd.MultiIndex.from_frame(initial[["Node", "Technology", "Period"]]))
+    initial = _ordered_sum(initial["capacity"].to_numpy()[groups >= 0], groups[groups >= 0], len(index))
+    limit = _series(inputs, "genMaxInstalledCapRaw", ["Node", "Technology"], index.droplevel("Period")).to_numpy()
+    return pd.Series(np.where(limit <= initial, initial, limit), index=index)
+
+
+def _reg_hydro_limits(inputs) -> pd.Series:
+    # Seasonal limit of regulated hydro, the sum of the raw limits of the hours of the season
+    index = _product(_frame(["Node"], inputs.members("Node")), _frame(["Period"], inputs.members("PeriodActive")),
+                     _frame(["Season"], inputs.members("Season")), _frame(["Scenario"], inputs.members("Scenario")))
+    # The raw limits of a season are added in the order of the hours
+    hour_order = {h: k for k, h in enumerate(inputs.members("Operationalhour"))}
+    hours_of_season = _frame(["Season", "Operationalhour"], inputs.members("HoursOfSeason"))
+    hours_of_season = hours_of_season[hours_of_season["Operationalhour"].isin(hour_order)]
+    hours_of_season = hours_of_season.iloc[np.argsort(hours_of_season["Operationalhour"].map(hour_order).to_numpy(),
+                                                      kind="stable")]
+    raw_index = _product(_frame(["Node"], inputs.members("Node")), _frame(["Period"], inputs.members("PeriodActive")),
+                         hours_of_season, _frame(["Scenario"], inputs.members("Scenario")))
+    raw = _series(inputs, "maxRegHydroGenRaw", ["Node", "Period", "Season", "Operationalhour", "Scenario"], raw_index)
+    groups = index.get_indexer(raw_index.droplevel("Operationalhour"))
+    return pd.Series(_ordered_sum(raw.to_numpy()[groups >= 0], groups[groups >= 0], len(index)), index=index)
+
+
+def _generator_availability(inputs) -> pd.Series:
+    # Generators with an availability of zero by type have a stochastic availability
+    index = _product(_frame(["Node", "Generator"], inputs.members("GeneratorsOfNode")),
+                     _frame(["Operationalhour"], inputs.members("Operationalhour")),
+                     _frame(["Scenario"], inputs.members("Scenario")),
+                     _frame(["Period"], inputs.members("PeriodActive")))
+    by_type = _series(inputs, "genCapAvailTypeRaw", ["Generator"])
+    by_type = by_type.reindex(index.get_level_values("Generator"), fill_value=inputs.default("genCapAvailTypeRaw"))
+    by_type = by_type.to_numpy()
+    stochastic = _series(inputs, "genCapAvailStochRaw", ["Node", "Generator", "Operationalhour", "Scenario", "Period"],
+                         index).to_numpy()
+    return pd.Series(np.where(by_type == 0, stochastic, by_type), index=index)
+
+
+def _electric_load(inputs) -> tuple[pd.Series, pd.DataFrame]:
+    # The raw load is scaled to the annual demand, counting the hours of the regular seasons
+    nodes, periods = inputs.members("Node"), inputs.members("PeriodActive")
+    hours, scenarios = inputs.members("Operationalhour"), inputs.members("Scenario")
+    index = _product(_frame(["Node"], nodes), _frame(["Period"], periods), _frame(["Operationalhour"], hours),
+                     _frame(["Scenario"], scenarios))
+    raw = _series(inputs, "sloadRaw", ["Node", "Operationalhour", "Scenario", "Period"])
+    raw = raw.reorder_levels(index.names).reindex(index, fill_value=inputs.default("sloadRaw")).to_numpy()
+    raw = raw.reshape(len(nodes), len(periods), len(hours), len(scenarios))
+
+    # The raw demand adds the weighted load of every scenario of every hour, in the order of the hours of the seasons
+    end_of_regular_seasons = inputs.members("FirstHoursOfRegSeason")[-1] + inputs.scalar("lengthRegSeason")
+    regular_hours = [(s, h) for s, h in inputs.members("HoursOfSeason") if h < end_of_regular_seasons]
+    hour_position = {h: k for k, h in enumerate(hours)}
+    season_scale = _series(inputs, "seasScale", ["Season"], pd.Index([s for s, _ in regular_hours], name="Season"))
+    weight = (1 / len(scenarios)) * season_scale.to_numpy()
+    weighted = weight[None, None, :, None] * raw[:, :, [hour_position[h] for _, h in regular_hours], :]
+    weighted = weighted.reshape(len(nodes), len(periods), -1)
+    raw_demand = np.cumsum(weighted, axis=-1)[:, :, -1] if weighted.shape[-1] else np.zeros(weighted.shape[:2])
+
+    demand_index = _product(_frame(["Node"], nodes), _frame(["Period"], periods))
+    annual_demand = _series(inputs, "sloadAnnualDemand", ["Node", "Period"], demand_index).to_numpy()
+    annual_demand = annual_demand.reshape(raw_demand.shape)
+    missing = (annual_demand >= 1) & (raw_demand == 0)
+    if missing.any():
+        raise ValueError(f"No raw electric load in the regular seasons to scale to the annual demand of "
+                         f"{', '.join(map(str, demand_index[missing.ravel()]))}")
+    no_demand = annual_demand < 1
+    scale = np.where(no_demand, 0.0, annual_demand / np.where(missing | no_demand, 1.0, raw_demand))
+
+    load = (raw * scale[:, :, None, None]).ravel()
+    if inputs.has("sloadMod"):
+        load_change = _series(inputs, "sloadMod", ["Node", "Operationalhour", "Scenario", "Period"])
+        load = load + load_change.reorder_levels(index.names).reindex(
+            index, fill_value=inputs.default("sloadMod")).to_numpy()
+
+    negative = load < 0
+    adjusted = index[negative].to_frame(index=False).assign(ElectricLoad=load[negative])
+    if negative.any():
+        load = load.astype(object)
+        load[negative] = ADJUSTED_LOAD
+    load = pd.Series(load, index=index.reorder_levels(["Node", "Operationalhour", "Period", "Scenario"]))
+    return load, adjusted
+
+
+def derive_params(inputs, names=DERIVED_PARAMS) -> tuple[dict[str, pd.Series], pd.DataFrame | None]:
+    """
+    Compute derived parameters.
+
+    :param inputs: Input data, a :class:`PortalInput` or an :class:`InstanceInput`.
+    :param names: Names of the derived parameters to compute.
+    :return: Values of the derived parameters by name, and the table of the hours whose load
+        was adjusted, or None if the load is not computed.
+    """
+    derived = {}
+    if any(name in INVESTMENT_COST_PARAMS for name in names):
+        derived.update(_investment_costs(inputs))
+    if "genInitCap" in names or "genMaxInstalledCap" in names:
+        derived["genInitCap"] = _initial_generator_capacity(inputs)
+        derived["genMaxInstalledCap"] = _max_installed_generator_capacity(inputs, derived["genInitCap"])
+    if "maxRegHydroGen" in names:
+        derived["maxRegHydroGen"] = _reg_hydro_limits(inputs)
+    if "genCapAvail" in names:
+        derived["genCapAvail"] = _generator_availability(inputs)
+    adjusted = None
+    if "sload" in names:
+        derived["sload"], adjusted = _electric_load(inputs)
+    return {name: derived[name] for name in names}, adjusted
+
+
+def _param_values(series: pd.Series) -> dict:
+    return dict(zip(series.index, series.to_numpy().tolist()))
+
+
+def add_derived_params(data: DataPortal, model, scalars: dict, **sets) -> pd.DataFrame:
+    """
+    Compute the derived parameters from the loaded input data and add them to the data.
+
+    :param data: DataPortal with the loaded input data, that the instance is built from.
+    :param model: The abstract model.
+    :param scalars: Values of the scalar parameters initialized by the model: WACC, discountrate,
+        LeapYearsInvestment, lengthRegSeason, CCSCostTSFix and CCSRemFrac.
+    :param sets: Members of the sets initialized by the model instead of loaded, e.g. PeriodActive.
+    :return: Table of the hours whose load was adjusted.
+    """
+    derived, adjusted = derive_params(PortalInput(data, model, sets, scalars))
+    loaded = data.data()
+    for name, values in derived.items():
+        # Derived values replace loaded values of the same parameter, e.g. of genInitCap
+        data[name] = {**loaded.get(name, {}), **_param_values(values)}
+    return adjusted
+
+
+def update_derived_params(instance, names=DERIVED_PARAMS) -> pd.DataFrame | None:
+    """
+    Recompute derived parameters of a built instance from its raw parameters.
+
+    :param instance: The instance.
+    :param names: Names of the derived parameters to recompute.
+    :return: Table of the hours whose load was adjusted, or None if the load is not recomputed.
+    """
+    derived, adjusted = derive_params(InstanceInput(instance), names)
+    for name, values in derived.items():
+        instance.component(name).store_values(_param_values(values))
+    return adjusted
+
+
+def write_adjusted_load(adjusted: pd.DataFrame, result_file_path: Path, name: str) -> None:
+    """
+    Write the hours whose scaled electric load was negative and set to a small load, one line per hour.
+
+    :param adjusted: Table of the hours with the scaled load before the adjustment.
+    :param result_file_path: Folder to write the file to.
+    :param name: Name of the run.
+    """
+    with open(result_file_path / f"{ADJUSTED_LOAD_FILE}_{name}.txt", 'w') as f:
+        f.writelines(
+            f"Adjusted electricity load: {load}, {ADJUSTED_LOAD} MW for hour {h} and scenario {sce} in {n}\n"
+            for n, h, sce, load in zip(adjusted["Node"].tolist(), adjusted["Operationalhour"].tolist(),
+                                       adjusted["Scenario"].tolist(), adjusted["ElectricLoad"].tolist())
+        )
+        f.write(f"Hours with too small raw electricity load: {len(adjusted)}")
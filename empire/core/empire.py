@@ -5,22 +5,65 @@ import logging
 import os
 import sys
 import time
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
 
 import cloudpickle
+from empire.core.benders import DUAL_CONSTRAINTS, load_solution, solve_benders
+from empire.core.construction_profile import ConstructionProfiler
+from empire.core.derived_params import (INVESTMENT_COST_PARAMS,
+                                        STOCHASTIC_DERIVED_PARAMS,
+                                        add_derived_params, bidirectional_arcs,
+                                        update_derived_params,
+                                        write_adjusted_load)
+from empire.core.input_data import InputDataPortal
+from empire.core.instance_cache import InstanceCache, update_stochastic_params
+from empire.core.lean_build import drop_raw_params, keep_duals, release_solutions
+from empire.core.matrix_model import MatrixModelSolver, build_matrix_model
+from empire.core.model_reduction import add_inert_sets
+from empire.core.out_of_sample import OutOfSampleEvaluator
+from empire.core.reports import (OPERATIONAL_REPORTS, OUT_OF_SAMPLE_REPORTS,
+                                 REPORTS, RESOLVED_REPORTS, write_reports)
+from empire.core.sensitivity import SensitivityPoint, SensitivitySweep
+from empire.core.solution_snapshot import (SNAPSHOT_FILE, SolutionSnapshot,
+                                           write_snapshot)
+from empire.core.solvers import create_solver, fix_variable, is_persistent
+from empire.core.telemetry import RunTelemetry
 from empire.utils import get_name_of_last_folder_in_path
 from pyomo.common.tempfiles import TempfileManager
 from pyomo.environ import *
 
 logger = logging.getLogger(__name__)
 
+# NB! Hard-coded cost of the transport and storage of CO2, and fraction of the CO2 captured by CCS
+CCS_COST_TS_FIX = 1149873.72
+CCS_REM_FRAC = 0.9
+
 
 def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_path,
                solver, temp_dir, FirstHoursOfRegSeason, FirstHoursOfPeakSeason, lengthRegSeason,
                lengthPeakSeason, Period, Operationalhour, Scenario, Season, HoursOfSeason,
                discountrate, WACC, LeapYearsInvestment, IAMC_PRINT, WRITE_LP,
                PICKLE_INSTANCE, EMISSION_CAP, USE_TEMP_DIR, LOADCHANGEMODULE, OPERATIONAL_DUALS, north_sea, 
-               OUT_OF_SAMPLE: bool = False, sample_file_path: Path | None = None) -> None | float:
+               OUT_OF_SAMPLE: bool = False, sample_file_path: Path | None = None,
+               RESULTS_FORMAT: str = "csv", input_tables: dict | None = None,
+               instance_cache: InstanceCache | None = None,
+               PERSISTENT_SOLVER: bool = False, DIRECT_SOLVER: bool = False,
+               MATRIX_MODEL: bool = False, BENDERS: bool = False, BENDERS_WORKERS: int = 1,
+               BENDERS_TOLERANCE: float = 1e-6, BENDERS_MAX_ITERATIONS: int = 1000,
+               OUT_OF_SAMPLE_TREES: list[Path] | None = None,
+               OUT_OF_SAMPLE_WORKERS: int = 1,
+               SENSITIVITY_POINTS: list[SensitivityPoint] | None = None,
+               telemetry: RunTelemetry | None = None,
+               PROFILE_CONSTRUCTION: bool = False,
+               LEAN_BUILD: bool = False,
+               MODEL_REDUCTION: bool = False,
+               SOLUTION_SNAPSHOT: bool = False,
+               OPERATIONAL_RESULTS: bool = True) -> None | float | list[float]:
+
+    if telemetry is None:
+        telemetry = RunTelemetry(name)
 
     if USE_TEMP_DIR:
         TempfileManager.tempdir = temp_dir
@@ -42,8 +85,10 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
         logger.info("Solver: Gurobi")
     elif solver == "GLPK":
         logger.info("Solver: GLPK")
+    elif solver == "HiGHS":
+        logger.info("Solver: HiGHS")
     else:
-        sys.exit("ERROR! Invalid solver! Options: CPLEX, Xpress, Gurobi")
+        sys.exit("ERROR! Invalid solver! Options: CPLEX, Xpress, Gurobi, GLPK, HiGHS")
 
     ##########
     ##MODULE##
@@ -55,6 +100,36 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
     if PICKLE_INSTANCE:
         logger.info("Will pickle instance...")
 
+    if SOLUTION_SNAPSHOT:
+        logger.info("Will write a snapshot of the solution...")
+    elif not OPERATIONAL_RESULTS:
+        logger.warning("The operational results are not written, and can not be written later without a snapshot.")
+
+    if MATRIX_MODEL:
+        logger.info("Will generate the linear program as a matrix...")
+
+    if WRITE_LP and (MATRIX_MODEL or BENDERS or SENSITIVITY_POINTS):
+        logger.warning("No LP-file is written when the linear program is generated as a matrix.")
+
+    if LEAN_BUILD:
+        logger.info("Will release build data, raw parameters and unused duals...")
+
+    if BENDERS:
+        logger.info("Will solve the model by Benders decomposition...")
+
+    if MODEL_REDUCTION:
+        if MATRIX_MODEL or BENDERS or SENSITIVITY_POINTS or (OUT_OF_SAMPLE and OUT_OF_SAMPLE_TREES):
+            # The linear program is generated from the parameters as a matrix, not from the constraints
+            logger.info("The model is not reduced when the linear program is generated as a matrix.")
+            MODEL_REDUCTION = False
+        else:
+            logger.info("Will leave out the operation of generators, lines and storages that can not operate...")
+
+    if SENSITIVITY_POINTS:
+        if OUT_OF_SAMPLE:
+            raise ValueError("Sensitivity sweeps can not be run out-of-sample")
+        logger.info("Will solve a sensitivity sweep of %d points...", len(SENSITIVITY_POINTS))
+
     if EMISSION_CAP:
         logger.info("Absolute emission cap in each scenario...")
     else:
@@ -106,7 +181,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     #Load the data
 
-    data = DataPortal()
+    data = InputDataPortal(input_tables)
     data.load(filename=str(tab_file_path / 'Sets_Generator.tab'),format="set", set=model.Generator)
     data.load(filename=str(tab_file_path / 'Sets_ThermalGenerators.tab'),format="set", set=model.ThermalGenerators)
     data.load(filename=str(tab_file_path / 'Sets_HydroGenerator.tab'),format="set", set=model.HydroGenerator)
@@ -129,22 +204,87 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     #Build arc subsets
 
-    def NodesLinked_init(model, node):
-        retval = []
+    def NodesLinked_init(model):
+        retval = {node: [] for node in model.Node}
         for (i,j) in model.DirectionalLink:
-            if j == node:
-                retval.append(i)
+            retval[j].append(i)
         return retval
     model.NodesLinked = Set(model.Node, initialize=NodesLinked_init)
 
     def BidirectionalArc_init(model):
-        retval = []
-        for (i,j) in model.DirectionalLink:
-            if i != j and ((j,i) not in retval):
-                retval.append((i,j))
-        return retval
+        return bidirectional_arcs(model.DirectionalLink)
     model.BidirectionalArc = Set(dimen=2, initialize=BidirectionalArc_init, ordered=True) #l
 
+    #Build lookup indexes of the subsets in one pass, so rules iterate them instead of filtering all generators or storages.
+    #The elements of every index keep the order of the full set.
+
+    def NodesOfGenerator_init(model):
+        retval = {g: [] for g in model.Generator}
+        for (n,g) in model.GeneratorsOfNode:
+            retval[g].append(n)
+        return {g: sorted(nodes, key=model.Node.ord) for g, nodes in retval.items()}
+    model.NodesOfGenerator = Set(model.Generator, initialize=NodesOfGenerator_init, ordered=True)
+
+    def GeneratorsAtNode_init(model):
+        retval = {node: [] for node in model.Node}
+        for (n,g) in model.GeneratorsOfNode:
+            retval[n].append(g)
+        return {node: sorted(gens, key=model.Generator.ord) for node, gens in retval.items()}
+    model.GeneratorsAtNode = Set(model.Node, initialize=GeneratorsAtNode_init, ordered=True)
+
+    def GeneratorsOfTechnologyAtNode_init(model):
+        retval = {(t,node): [] for t in model.Technology for node in model.Node}
+        for (t,g) in model.GeneratorsOfTechnology:
+            for n in model.NodesOfGenerator[g]:
+                retval[t,n].append(g)
+        return {key: sorted(gens, key=model.Generator.ord) for key, gens in retval.items()}
+    model.GeneratorsOfTechnologyAtNode = Set(model.Technology, model.Node, initialize=GeneratorsOfTechnologyAtNode_init, ordered=True)
+
+    def NodesOfStorage_init(model):
+        retval = {b: [] for b in model.Storage}
+        for (n,b) in model.StoragesOfNode:
+            retval[b].append(n)
+        return {b: sorted(nodes, key=model.Node.ord) for b, nodes in retval.items()}
+    model.NodesOfStorage = Set(model.Storage, initialize=NodesOfStorage_init, ordered=True)
+
+    def StoragesAtNode_init(model):
+        retval = {node: [] for node in model.Node}
+        for (n,b) in model.StoragesOfNode:
+            retval[n].append(b)
+        return {node: sorted(stors, key=model.Storage.ord) for node, stors in retval.items()}
+    model.StoragesAtNode = Set(model.Node, initialize=StoragesAtNode_init, ordered=True)
+
+    #Build subsets of the generators, lines and storages that can operate.
+    #The components that can not operate are found from the data when the model is reduced, else the sets are empty.
+
+    model.InertGeneratorsOfNode = Set(dimen=2, within=model.GeneratorsOfNode, initialize=[])
+    model.InertDirectionalLink = Set(dimen=2, within=model.DirectionalLink, initialize=[])
+    model.InertStoragesOfNode = Set(dimen=2, within=model.StoragesOfNode, initialize=[])
+
+    def OperationalGeneratorsOfNode_init(model):
+        return [(n,g) for (n,g) in model.GeneratorsOfNode if (n,g) not in model.InertGeneratorsOfNode]
+    model.OperationalGeneratorsOfNode = Set(dimen=2, initialize=OperationalGeneratorsOfNode_init, ordered=True)
+
+    def OperationalDirectionalLink_init(model):
+        return [(n1,n2) for (n1,n2) in model.DirectionalLink if (n1,n2) not in model.InertDirectionalLink]
+    model.OperationalDirectionalLink = Set(dimen=2, initialize=OperationalDirectionalLink_init, ordered=True)
+
+    def OperationalStoragesOfNode_init(model):
+        return [(n,b) for (n,b) in model.StoragesOfNode if (n,b) not in model.InertStoragesOfNode]
+    model.OperationalStoragesOfNode = Set(dimen=2, initialize=OperationalStoragesOfNode_init, ordered=True)
+
+    def OperationalGeneratorsAtNode_init(model):
+        return {node: [g for g in model.GeneratorsAtNode[node] if (node,g) not in model.InertGeneratorsOfNode] for node in model.Node}
+    model.OperationalGeneratorsAtNode = Set(model.Node, initialize=OperationalGeneratorsAtNode_init, ordered=True)
+
+    def OperationalStoragesAtNode_init(model):
+        return {node: [b for b in model.StoragesAtNode[node] if (node,b) not in model.InertStoragesOfNode] for node in model.Node}
+    model.OperationalStoragesAtNode = Set(model.Node, initialize=OperationalStoragesAtNode_init, ordered=True)
+
+    def OperationalNodesLinked_init(model):
+        return {node: [link for link in model.NodesLinked[node] if (link,node) not in model.InertDirectionalLink] for node in model.Node}
+    model.OperationalNodesLinked = Set(model.Node, initialize=OperationalNodesLinked_init, ordered=True)
+
     ##############
     ##PARAMETERS##
     ##############
@@ -160,7 +300,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
     model.LeapYearsInvestment = Param(initialize=LeapYearsInvestment)
     model.operationalDiscountrate = Param(mutable=True)
     model.sceProbab = Param(model.Scenario, mutable=True)
-    model.seasScale = Param(model.Season, initialize=1.0, mutable=True)
+    model.seasScale = Param(model.Season, default=1.0, mutable=True)
     model.lengthRegSeason = Param(initialize=lengthRegSeason) 
     model.lengthPeakSeason = Param(initialize=lengthPeakSeason) 
 
@@ -185,9 +325,9 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
     model.genCO2TypeFactor = Param(model.Generator, default=0.0, mutable=True)
     model.nodeLostLoadCost = Param(model.Node, model.Period, default=22000.0)
     model.CO2price = Param(model.Period, default=0.0, mutable=True)
-    model.CCSCostTSFix = Param(initialize=1149873.72) #NB! Hard-coded
+    model.CCSCostTSFix = Param(initialize=CCS_COST_TS_FIX)
     model.CCSCostTSVariable = Param(model.Period, default=0.0, mutable=True)
-    model.CCSRemFrac = Param(initialize=0.9)
+    model.CCSRemFrac = Param(initialize=CCS_REM_FRAC)
 
     #Node dependent technology limitations
 
@@ -203,7 +343,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
     model.storENMaxBuiltCap = Param(model.StoragesOfNode, model.Period, default=500000.0, mutable=True)
     model.genMaxInstalledCapRaw = Param(model.Node, model.Technology, default=0.0, mutable=True)
     model.genMaxInstalledCap = Param(model.Node, model.Technology, model.Period, default=0.0, mutable=True)
-    model.transmissionMaxInstalledCapRaw = Param(model.BidirectionalArc, model.Period, default=0.0)
+    model.transmissionMaxInstalledCapRaw = Param(model.BidirectionalArc, model.Period, default=0.0, mutable=True)
     model.transmissionMaxInstalledCap = Param(model.BidirectionalArc, model.Period, default=0.0, mutable=True)
     model.storPWMaxInstalledCap = Param(model.StoragesOfNode, model.Period, default=0.0, mutable=True)
     model.storPWMaxInstalledCapRaw = Param(model.StoragesOfNode, default=0.0, mutable=True)
@@ -331,40 +471,6 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     model.build_SceProbab = BuildAction(rule=prepSceProbab_rule)
 
-    def prepInvCost_rule(model):
-        #Build investment cost for generators, storages and transmission. Annual cost is calculated for the lifetime of the generator and discounted for a year.
-        #Then cost is discounted for the investment period (or the remaining lifetime). CCS generators has additional fixed costs depending on emissions. 
-
-        #Generator 
-        for g in model.Generator:
-            for i in model.PeriodActive:
-                costperyear=(model.WACC/(1-((1+model.WACC)**(-model.genLifetime[g]))))*model.genCapitalCost[g,i]+model.genFixedOMCost[g,i]
-                costperperiod=costperyear*1000*(1-(1+model.discountrate)**-(min(value((len(model.PeriodActive)-i+1)*LeapYearsInvestment), value(model.genLifetime[g]))))/(1-(1/(1+model.discountrate)))
-                if ('CCS',g) in model.GeneratorsOfTechnology:
-                    costperperiod+=model.CCSCostTSFix*model.CCSRemFrac*model.genCO2TypeFactor[g]*(3.6/model.genEfficiency[g,i])
-                model.genInvCost[g,i]=costperperiod
-
-        #Storage
-        for b in model.Storage:
-            for i in model.PeriodActive:
-                costperyearPW=(model.WACC/(1-((1+model.WACC)**(-model.storageLifetime[b]))))*model.storPWCapitalCost[b,i]+model.storPWFixedOMCost[b,i]
-                costperperiodPW=costperyearPW*1000*(1-(1+model.discountrate)**-(min(value((len(model.PeriodActive)-i+1)*LeapYearsInvestment), value(model.storageLifetime[b]))))/(1-(1/(1+model.discountrate)))
-                model.storPWInvCost[b,i]=costperperiodPW
-                costperyearEN=(model.WACC/(1-((1+model.WACC)**(-model.storageLifetime[b]))))*model.storENCapitalCost[b,i]+model.storENFixedOMCost[b,i]
-                costperperiodEN=costperyearEN*1000*(1-(1+model.discountrate)**-(min(value((len(model.PeriodActive)-i+1)*LeapYearsInvestment), value(model.storageLifetime[b]))))/(1-(1/(1+model.discountrate)))
-                model.storENInvCost[b,i]=costperperiodEN
-
-        #Transmission
-        for (n1,n2) in model.BidirectionalArc:
-            for i in model.PeriodActive:
-                for t in model.TransmissionType:
-                    if (n1,n2,t) in model.TransmissionTypeOfDirectionalLink:
-                        costperyear=(model.WACC/(1-((1+model.WACC)**(-model.transmissionLifetime[n1,n2]))))*model.transmissionLength[n1,n2]*model.transmissionTypeCapitalCost[t,i]+model.transmissionTypeFixedOMCost[t,i]
-                        costperperiod=costperyear*(1-(1+model.discountrate)**-(min(value((len(model.PeriodActive)-i+1)*LeapYearsInvestment), value(model.transmissionLifetime[n1,n2]))))/(1-(1/(1+model.discountrate)))
-                        model.transmissionInvCost[n1,n2,i]=costperperiod
-
-    model.build_InvCost = BuildAction(rule=prepInvCost_rule)
-
     def prepOperationalCostGen_rule(model):
         #Build generator short term marginal costs
 
@@ -381,16 +487,6 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     model.build_OperationalCostGen = BuildAction(rule=prepOperationalCostGen_rule)
 
-    def prepInitialCapacityNodeGen_rule(model):
-        #Build initial capacity for generator type in node
-
-        for (n,g) in model.GeneratorsOfNode:
-            for i in model.PeriodActive:
-                if value(model.genInitCap[n,g,i]) == 0:
-                    model.genInitCap[n,g,i] = model.genRefInitCap[n,g]*(1-model.genScaleInitCap[g,i])
-
-    model.build_InitialCapacityNodeGen = BuildAction(rule=prepInitialCapacityNodeGen_rule)
-
     def prepInitialCapacityTransmission_rule(model):
         #Build initial capacity for transmission lines to ensure initial capacity is the upper installation bound if infeasible
 
@@ -410,19 +506,6 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     model.build_operationalDiscountrate = BuildAction(rule=prepOperationalDiscountrate_rule)     
 
-    def prepGenMaxInstalledCap_rule(model):
-        #Build resource limit (installed limit) for all periods. Avoid infeasibility if installed limit lower than initially installed cap.
-
-        for t in model.Technology:
-            for n in model.Node:
-                for i in model.PeriodActive:
-                    if value(model.genMaxInstalledCapRaw[n,t] <= sum(model.genInitCap[n,g,i] for g in model.Generator if (n,g) in model.GeneratorsOfNode and (t,g) in model.GeneratorsOfTechnology)):
-                        model.genMaxInstalledCap[n,t,i]=sum(model.genInitCap[n,g,i] for g in model.Generator if (n,g) in model.GeneratorsOfNode and (t,g) in model.GeneratorsOfTechnology)
-                    else:
-                        model.genMaxInstalledCap[n,t,i]=model.genMaxInstalledCapRaw[n,t]
-                        
-    model.build_genMaxInstalledCap = BuildAction(rule=prepGenMaxInstalledCap_rule)
-
     def storENMaxInstalledCap_rule(model):
         #Build installed limit (resource limit) for storEN
 
@@ -441,61 +524,8 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     model.build_storPWMaxInstalledCap = BuildAction(rule=storPWMaxInstalledCap_rule)
 
-    def prepRegHydro_rule(model):
-        #Build hydrolimits for all periods
-
-        for n in model.Node:
-            for s in model.Season:
-                for i in model.PeriodActive:
-                    for sce in model.Scenario:
-                        model.maxRegHydroGen[n,i,s,sce]=sum(model.maxRegHydroGenRaw[n,i,s,h,sce] for h in model.Operationalhour if (s,h) in model.HoursOfSeason)
-
-    model.build_maxRegHydroGen = BuildAction(rule=prepRegHydro_rule)
-
-    def prepGenCapAvail_rule(model):
-        #Build generator availability for all periods
-
-        for (n,g) in model.GeneratorsOfNode:
-            for h in model.Operationalhour:
-                for s in model.Scenario:
-                    for i in model.PeriodActive:
-                        if value(model.genCapAvailTypeRaw[g]) == 0:
-                            model.genCapAvail[n,g,h,s,i]=model.genCapAvailStochRaw[n,g,h,s,i]
-                        else:
-                            model.genCapAvail[n,g,h,s,i]=model.genCapAvailTypeRaw[g]
-
-    model.build_genCapAvail = BuildAction(rule=prepGenCapAvail_rule)
-
-    def prepSload_rule(model):
-        #Build load profiles for all periods
-
-        counter = 0
-        f = open(result_file_path / f"AdjustedNegativeLoad_{name}.txt", 'w')
-        for n in model.Node:
-            for i in model.PeriodActive:
-                noderawdemand = 0
-                for (s,h) in model.HoursOfSeason:
-                    if value(h) < value(FirstHoursOfRegSeason[-1] + model.lengthRegSeason):
-                        for sce in model.Scenario:
-                                noderawdemand += value(model.sceProbab[sce]*model.seasScale[s]*model.sloadRaw[n,h,sce,i])
-                if value(model.sloadAnnualDemand[n,i]) < 1:
-                    hourlyscale = 0
-                else:
-                    hourlyscale = value(model.sloadAnnualDemand[n,i]) / noderawdemand
-                for h in model.Operationalhour:
-                    for sce in model.Scenario:
-                        model.sload[n, h, i, sce] = model.sloadRaw[n,h,sce,i]*hourlyscale
-                        if LOADCHANGEMODULE:
-                            model.sload[n,h,i,sce] = model.sload[n,h,i,sce] + model.sloadMod[n,h,sce,i]
-                        if value(model.sload[n,h,i,sce]) < 0:
-                            f.write('Adjusted electricity load: ' + str(value(model.sload[n,h,i,sce])) + ', 10 MW for hour ' + str(h) + ' and scenario ' + str(sce) + ' in ' + str(n) + "\n")
-                            model.sload[n,h,i,sce] = 10
-                            counter += 1
-
-        f.write('Hours with too small raw electricity load: ' + str(counter))
-        f.close()
-
-    model.build_sload = BuildAction(rule=prepSload_rule)
+    # The investment costs, initial and maximum generator capacities, seasonal hydro limits,
+    # generator availability and load are derived from the loaded data when the instance is built
 
     logger.info("Sets and parameters declared and read...")
 
@@ -541,11 +571,13 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
         model.storPWInstalledCap = Var(model.StoragesOfNode, model.PeriodActive, domain=NonNegativeReals)
         model.storENInstalledCap = Var(model.StoragesOfNode, model.PeriodActive, domain=NonNegativeReals)
 
-    model.genOperational = Var(model.GeneratorsOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals)
-    model.storOperational = Var(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals)
-    model.transmisionOperational = Var(model.DirectionalLink, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals) #flow
-    model.storCharge = Var(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals)
-    model.storDischarge = Var(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals)
+    #A reduced model only constructs the operational variables its constraints use, the others are zero
+    operational = {"dense": False, "initialize": 0} if MODEL_REDUCTION else {}
+    model.genOperational = Var(model.GeneratorsOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals, **operational)
+    model.storOperational = Var(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals, **operational)
+    model.transmisionOperational = Var(model.DirectionalLink, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals, **operational) #flow
+    model.storCharge = Var(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals, **operational)
+    model.storDischarge = Var(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals, **operational)
     model.loadShed = Var(model.Node, model.Operationalhour, model.PeriodActive, model.Scenario, domain=NonNegativeReals)
 
     ###############
@@ -564,7 +596,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
     model.shedcomponent=Expression(model.PeriodActive,rule=shed_component_rule)
 
     def operational_cost_rule(model,i):
-        return sum(model.operationalDiscountrate*model.seasScale[s]*model.sceProbab[w]*model.genMargCost[g,i]*model.genOperational[n,g,h,i,w] for (n,g) in model.GeneratorsOfNode for (s,h) in model.HoursOfSeason for w in model.Scenario)
+        return sum(model.operationalDiscountrate*model.seasScale[s]*model.sceProbab[w]*model.genMargCost[g,i]*model.genOperational[n,g,h,i,w] for (n,g) in model.OperationalGeneratorsOfNode for (s,h) in model.HoursOfSeason for w in model.Scenario)
     model.operationalcost=Expression(model.PeriodActive,rule=operational_cost_rule)
 
     #############
@@ -585,9 +617,9 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
     ###############
 
     def FlowBalance_rule(model, n, h, i, w):
-        return sum(model.genOperational[n,g,h,i,w] for g in model.Generator if (n,g) in model.GeneratorsOfNode) \
-            + sum((model.storageDischargeEff[b]*model.storDischarge[n,b,h,i,w]-model.storCharge[n,b,h,i,w]) for b in model.Storage if (n,b) in model.StoragesOfNode) \
-            + sum((model.lineEfficiency[link,n]*model.transmisionOperational[link,n,h,i,w] - model.transmisionOperational[n,link,h,i,w]) for link in model.NodesLinked[n]) \
+        return sum(model.genOperational[n,g,h,i,w] for g in model.OperationalGeneratorsAtNode[n]) \
+            + sum((model.storageDischargeEff[b]*model.storDischarge[n,b,h,i,w]-model.storCharge[n,b,h,i,w]) for b in model.OperationalStoragesAtNode[n]) \
+            + sum((model.lineEfficiency[link,n]*model.transmisionOperational[link,n,h,i,w] - model.transmisionOperational[n,link,h,i,w]) for link in model.OperationalNodesLinked[n]) \
             - model.sload[n,h,i,w] + model.loadShed[n,h,i,w] \
             == 0
     model.FlowBalance = Constraint(model.Node, model.Operationalhour, model.PeriodActive, model.Scenario, rule=FlowBalance_rule)
@@ -596,7 +628,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     def genMaxProd_rule(model, n, g, h, i, w):
             return model.genOperational[n,g,h,i,w] - model.genCapAvail[n,g,h,w,i]*model.genInstalledCap[n,g,i] <= 0
-    model.maxGenProduction = Constraint(model.GeneratorsOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=genMaxProd_rule)
+    model.maxGenProduction = Constraint(model.OperationalGeneratorsOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=genMaxProd_rule)
 
     #################################################################
 
@@ -608,7 +640,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
                 return model.genOperational[n,g,h,i,w]-model.genOperational[n,g,(h-1),i,w] - model.genRampUpCap[g]*model.genInstalledCap[n,g,i] <= 0   #
             else:
                 return Constraint.Skip
-    model.ramping = Constraint(model.GeneratorsOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=ramping_rule)
+    model.ramping = Constraint(model.OperationalGeneratorsOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=ramping_rule)
 
     #################################################################
 
@@ -617,7 +649,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
             return model.storOperationalInit[b]*model.storENInstalledCap[n,b,i] + model.storageChargeEff[b]*model.storCharge[n,b,h,i,w]-model.storDischarge[n,b,h,i,w]-model.storOperational[n,b,h,i,w] == 0   #
         else:
             return model.storageBleedEff[b]*model.storOperational[n,b,(h-1),i,w] + model.storageChargeEff[b]*model.storCharge[n,b,h,i,w]-model.storDischarge[n,b,h,i,w]-model.storOperational[n,b,h,i,w] == 0   #
-    model.storage_energy_balance = Constraint(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_energy_balance_rule)
+    model.storage_energy_balance = Constraint(model.OperationalStoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_energy_balance_rule)
 
     #################################################################
 
@@ -628,25 +660,25 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
             return model.storOperational[n,b,h+value(model.lengthPeakSeason)-1,i,w] - model.storOperationalInit[b]*model.storENInstalledCap[n,b,i] == 0  #
         else:
             return Constraint.Skip
-    model.storage_seasonal_net_zero_balance = Constraint(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_seasonal_net_zero_balance_rule)
+    model.storage_seasonal_net_zero_balance = Constraint(model.OperationalStoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_seasonal_net_zero_balance_rule)
 
     #################################################################
 
     def storage_operational_cap_rule(model, n, b, h, i, w):
         return model.storOperational[n,b,h,i,w] - model.storENInstalledCap[n,b,i]  <= 0   #
-    model.storage_operational_cap = Constraint(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_operational_cap_rule)
+    model.storage_operational_cap = Constraint(model.OperationalStoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_operational_cap_rule)
 
     #################################################################
 
     def storage_power_discharg_cap_rule(model, n, b, h, i, w):
         return model.storDischarge[n,b,h,i,w] - model.storageDiscToCharRatio[b]*model.storPWInstalledCap[n,b,i] <= 0   #
-    model.storage_power_discharg_cap = Constraint(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_power_discharg_cap_rule)
+    model.storage_power_discharg_cap = Constraint(model.OperationalStoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_power_discharg_cap_rule)
 
     #################################################################
 
     def storage_power_charg_cap_rule(model, n, b, h, i, w):
         return model.storCharge[n,b,h,i,w] - model.storPWInstalledCap[n,b,i] <= 0   #
-    model.storage_power_charg_cap = Constraint(model.StoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_power_charg_cap_rule)
+    model.storage_power_charg_cap = Constraint(model.OperationalStoragesOfNode, model.Operationalhour, model.PeriodActive, model.Scenario, rule=storage_power_charg_cap_rule)
 
     #################################################################
 
@@ -655,12 +687,12 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
             return sum(model.genOperational[n,g,h,i,w] for h in model.Operationalhour if (s,h) in model.HoursOfSeason) - model.maxRegHydroGen[n,i,s,w] <= 0
         else:
             return Constraint.Skip  #
-    model.hydro_gen_limit = Constraint(model.GeneratorsOfNode, model.Season, model.PeriodActive, model.Scenario, rule=hydro_gen_limit_rule)
+    model.hydro_gen_limit = Constraint(model.OperationalGeneratorsOfNode, model.Season, model.PeriodActive, model.Scenario, rule=hydro_gen_limit_rule)
 
     #################################################################
 
     def hydro_node_limit_rule(model, n, i):
-        return sum(model.genOperational[n,g,h,i,w]*model.seasScale[s]*model.sceProbab[w] for g in model.HydroGenerator if (n,g) in model.GeneratorsOfNode for (s,h) in model.HoursOfSeason for w in model.Scenario) - model.maxHydroNode[n] <= 0   #
+        return sum(model.genOperational[n,g,h,i,w]*model.seasScale[s]*model.sceProbab[w] for g in model.HydroGenerator if (n,g) in model.OperationalGeneratorsOfNode for (s,h) in model.HoursOfSeason for w in model.Scenario) - model.maxHydroNode[n] <= 0   #
     model.hydro_node_limit = Constraint(model.Node, model.PeriodActive, rule=hydro_node_limit_rule)
 
 
@@ -671,7 +703,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
             return model.transmisionOperational[(n1,n2),h,i,w]  - model.transmissionInstalledCap[(n1,n2),i] <= 0
         elif (n2,n1) in model.BidirectionalArc:
             return model.transmisionOperational[(n1,n2),h,i,w]  - model.transmissionInstalledCap[(n2,n1),i] <= 0
-    model.transmission_cap = Constraint(model.DirectionalLink, model.Operationalhour, model.PeriodActive, model.Scenario, rule=transmission_cap_rule)
+    model.transmission_cap = Constraint(model.OperationalDirectionalLink, model.Operationalhour, model.PeriodActive, model.Scenario, rule=transmission_cap_rule)
 
     #################################################################
 
@@ -680,14 +712,14 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
             if n1 in model.OffshoreNode or n2 in model.OffshoreNode:
                 if (n1,n2) in model.BidirectionalArc:
                     if n1 in model.OffshoreNode:
-                        return model.transmissionInstalledCap[(n1,n2),i] <= sum(model.genInstalledCap[n1,g,i] for g in model.Generator if (n1,g) in model.GeneratorsOfNode)
+                        return model.transmissionInstalledCap[(n1,n2),i] <= sum(model.genInstalledCap[n1,g,i] for g in model.GeneratorsAtNode[n1])
                     else:
-                        return model.transmissionInstalledCap[(n1,n2),i] <= sum(model.genInstalledCap[n2,g,i] for g in model.Generator if (n2,g) in model.GeneratorsOfNode)
+                        return model.transmissionInstalledCap[(n1,n2),i] <= sum(model.genInstalledCap[n2,g,i] for g in model.GeneratorsAtNode[n2])
                 elif (n2,n1) in model.BidirectionalArc:
                     if n1 in model.OffshoreNode:
-                        return model.transmissionInstalledCap[(n2,n1),i] <= sum(model.genInstalledCap[n1,g,i] for g in model.Generator if (n1,g) in model.GeneratorsOfNode)
+                        return model.transmissionInstalledCap[(n2,n1),i] <= sum(model.genInstalledCap[n1,g,i] for g in model.GeneratorsAtNode[n1])
                     else:
-                        return model.transmissionInstalledCap[(n2,n1),i] <= sum(model.genInstalledCap[n2,g,i] for g in model.Generator if (n2,g) in model.GeneratorsOfNode)
+                        return model.transmissionInstalledCap[(n2,n1),i] <= sum(model.genInstalledCap[n2,g,i] for g in model.GeneratorsAtNode[n2])
                 else:
                     return Constraint.Skip
             else:
@@ -697,7 +729,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     if EMISSION_CAP:
         def emission_cap_rule(model, i, w):
-            return sum(model.seasScale[s]*model.genCO2TypeFactor[g]*(3.6/model.genEfficiency[g,i])*model.genOperational[n,g,h,i,w] for (n,g) in model.GeneratorsOfNode for (s,h) in model.HoursOfSeason)/1000000 \
+            return sum(model.seasScale[s]*model.genCO2TypeFactor[g]*(3.6/model.genEfficiency[g,i])*model.genOperational[n,g,h,i,w] for (n,g) in model.OperationalGeneratorsOfNode for (s,h) in model.HoursOfSeason)/1000000 \
                 - model.CO2cap[i] <= 0   #
         model.emission_cap = Constraint(model.PeriodActive, model.Scenario, rule=emission_cap_rule)
 
@@ -743,7 +775,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
         ############################################################
 
         def investment_gen_cap_rule(model, t, n, i):
-            return sum(model.genInvCap[n,g,i] for g in model.Generator if (n,g) in model.GeneratorsOfNode and (t,g) in model.GeneratorsOfTechnology) - model.genMaxBuiltCap[n,t,i] <= 0
+            return sum(model.genInvCap[n,g,i] for g in model.GeneratorsOfTechnologyAtNode[t,n]) - model.genMaxBuiltCap[n,t,i] <= 0
         model.investment_gen_cap = Constraint(model.Technology, model.Node, model.PeriodActive, rule=investment_gen_cap_rule)
 
         ############################################################
@@ -767,7 +799,7 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
         ############################################################
 
         def installed_gen_cap_rule(model, t, n, i):
-            return sum(model.genInstalledCap[n,g,i] for g in model.Generator if (n,g) in model.GeneratorsOfNode and (t,g) in model.GeneratorsOfTechnology) - model.genMaxInstalledCap[n,t,i] <= 0
+            return sum(model.genInstalledCap[n,g,i] for g in model.GeneratorsOfTechnologyAtNode[t,n]) - model.genMaxInstalledCap[n,t,i] <= 0
         model.installed_gen_cap = Constraint(model.Technology, model.Node, model.PeriodActive, rule=installed_gen_cap_rule)
 
         ############################################################
@@ -807,14 +839,76 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     logger.info("Building instance...")
 
+    if OUT_OF_SAMPLE and OUT_OF_SAMPLE_TREES:
+        # Only the sets and parameters are constructed, the program is generated from them as a matrix
+        for component in list(model.component_objects((Var, Expression, Objective, Constraint))):
+            model.del_component(component)
+
+    if MATRIX_MODEL or BENDERS or SENSITIVITY_POINTS:
+        # The program is generated as a matrix. The variables, and the constraints whose duals
+        # are written, are only constructed to hold the solution for the results.
+        for component in list(model.component_objects(Constraint)):
+            if component.local_name not in DUAL_CONSTRAINTS:
+                model.del_component(component)
+
     start = time.time()
 
-    instance = model.create_instance(data) #, report_timing=True)
-    instance.dual = Suffix(direction=Suffix.IMPORT) #Make sure the dual value is collected into solver results (if solver supplies dual information)
+    with telemetry.stage("build_instance"):
+        instance = None
+        profiler = None
+        if MODEL_REDUCTION:
+            # The sets depend on the data, so they are part of the key of a cached instance
+            add_inert_sets(data, model, PeriodActive=Period, Operationalhour=Operationalhour, Scenario=Scenario,
+                           Season=Season, HoursOfSeason=HoursOfSeason, FirstHoursOfRegSeason=FirstHoursOfRegSeason)
+        if instance_cache is not None:
+            cache_key = InstanceCache.key(data, Period=Period, Operationalhour=Operationalhour, Scenario=Scenario,
+                                          Season=Season, HoursOfSeason=HoursOfSeason,
+                                          FirstHoursOfRegSeason=FirstHoursOfRegSeason,
+                                          FirstHoursOfPeakSeason=FirstHoursOfPeakSeason,
+                                          lengthRegSeason=lengthRegSeason, lengthPeakSeason=lengthPeakSeason,
+                                          discountrate=discountrate, WACC=WACC,
+                                          LeapYearsInvestment=LeapYearsInvestment, EMISSION_CAP=EMISSION_CAP,
+                                          LOADCHANGEMODULE=LOADCHANGEMODULE, OUT_OF_SAMPLE=OUT_OF_SAMPLE,
+                                          north_sea=north_sea, MATRIX_MODEL=MATRIX_MODEL, BENDERS=BENDERS,
+                                          OUT_OF_SAMPLE_TREES=bool(OUT_OF_SAMPLE and OUT_OF_SAMPLE_TREES),
+                                          SENSITIVITY=bool(SENSITIVITY_POINTS))
+            instance = instance_cache.get(cache_key)
+
+        if instance is None:
+            logger.info("Deriving parameter values...")
+            scalars = dict(WACC=WACC, discountrate=discountrate, LeapYearsInvestment=LeapYearsInvestment,
+                           lengthRegSeason=lengthRegSeason, CCSCostTSFix=CCS_COST_TS_FIX, CCSRemFrac=CCS_REM_FRAC)
+            adjusted_load = add_derived_params(data, model, scalars, PeriodActive=Period,
+                                               Operationalhour=Operationalhour, Scenario=Scenario, Season=Season,
+                                               HoursOfSeason=HoursOfSeason, FirstHoursOfRegSeason=FirstHoursOfRegSeason)
+            profiler = ConstructionProfiler() if PROFILE_CONSTRUCTION else None
+            with profiler or nullcontext():
+                instance = model.create_instance(data.to_data_portal()) #, report_timing=True)
+            instance.dual = Suffix(direction=Suffix.IMPORT) #Make sure the dual value is collected into solver results (if solver supplies dual information)
+            if instance_cache is not None:
+                instance_cache.put(cache_key, instance)
+        else:
+            logger.info("Reusing cached instance, updating stochastic parameters...")
+            update_stochastic_params(instance, data)
+            adjusted_load = update_derived_params(instance, STOCHASTIC_DERIVED_PARAMS)
+        write_adjusted_load(adjusted_load, result_file_path, name)
 
     end = time.time()
     logger.info("Building instance took [sec]: %d", end - start)
 
+    if profiler is not None:
+        profiler.write(result_file_path)
+    elif PROFILE_CONSTRUCTION:
+        logger.info("The instance is reused from the cache, so its construction is not profiled.")
+
+    if LEAN_BUILD:
+        # Only the instance is used from here on
+        del model, data
+        if OUT_OF_SAMPLE_TREES or SENSITIVITY_POINTS:
+            logger.info("Keeping the raw parameters, the derived parameters are rebuilt from them.")
+        else:
+            drop_raw_params(instance)
+
     #import pdb; pdb.set_trace()
     #instance.CO2price.pprint()
     if not OUT_OF_SAMPLE:	
@@ -826,6 +920,10 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
         logger.info("TotalGenerators: %s", len(instance.GeneratorsOfNode))
         logger.info("StorageTypes: %s", len(instance.Storage))
         logger.info("TotalStorages: %s", len(instance.StoragesOfNode))
+        if MODEL_REDUCTION:
+            logger.info("InertGenerators: %s", len(instance.InertGeneratorsOfNode))
+            logger.info("InertDirectionalLines: %s", len(instance.InertDirectionalLink))
+            logger.info("InertStorages: %s", len(instance.InertStoragesOfNode))
         logger.info("")
         logger.info("InvestmentUntil: %s", value(2020+int(len(instance.PeriodActive)*LeapYearsInvestment)))
         logger.info("Scenarios: %s", len(instance.Scenario))
@@ -841,58 +939,134 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
         logger.info("Operational discount scale: %s", value(instance.operationalDiscountrate))
         logger.info("--------------------------------------------------------------")
         
-        if WRITE_LP:
+        if WRITE_LP and not MATRIX_MODEL and not BENDERS and not SENSITIVITY_POINTS:
             logger.info("Writing LP-file...")
             start = time.time()
             lpstring = f"LP_{name}.lp"
             if USE_TEMP_DIR:
                 lpstring = temp_dir / lpstring
-            instance.write(str(lpstring), io_options={'symbolic_solver_labels': True})
+            with telemetry.stage("write_lp"):
+                instance.write(str(lpstring), io_options={'symbolic_solver_labels': True})
             end = time.time()
             logger.info("Writing LP-file took [sec]: %d", end - start)
 
-        # Write marginal costs to results folder
-        f = open(result_file_path / 'marginal_costs.csv', 'w', newline='')
-        writer = csv.writer(f)
-        writer.writerow(["Generator","Period","MarginalCost_EurperMWh"])
-        for g in instance.Generator:
-            for i in instance.PeriodActive:
-                writer.writerow([g, i, value(instance.genMargCost[g,i])])
+        write_cost_tables(instance, result_file_path)
+
+    if OUT_OF_SAMPLE and OUT_OF_SAMPLE_TREES:
+        # The instance is built with the data of the first tree and updated for every tree
+        def update_stochastic_derived_params():
+            write_adjusted_load(update_derived_params(instance, STOCHASTIC_DERIVED_PARAMS), result_file_path, name)
+
+        logger.info("Evaluating %d out-of-sample trees...", len(OUT_OF_SAMPLE_TREES))
+        evaluator = OutOfSampleEvaluator(instance, update_stochastic_derived_params, emission_cap=EMISSION_CAP,
+                                         north_sea=north_sea, workers=OUT_OF_SAMPLE_WORKERS)
+        with telemetry.stage("out_of_sample"):
+            return evaluator.evaluate(OUT_OF_SAMPLE_TREES)
+
+    if SENSITIVITY_POINTS:
+        # Rules rebuilding the parameters derived from the parameters a point can change
+        update_investment_costs = partial(update_derived_params, names=INVESTMENT_COST_PARAMS)
+        derived_param_rules = {
+            "genCapitalCost": update_investment_costs,
+            "genFixedOMCost": update_investment_costs,
+            "storPWCapitalCost": update_investment_costs,
+            "storENCapitalCost": update_investment_costs,
+            "transmissionTypeCapitalCost": update_investment_costs,
+            "genFuelCost": prepOperationalCostGen_rule,
+            "genVariableOMCost": prepOperationalCostGen_rule,
+            "CO2price": prepOperationalCostGen_rule,
+            "genCapAvailTypeRaw": partial(update_derived_params, names=("genCapAvail",)),
+            "genMaxInstalledCapRaw": partial(update_derived_params, names=("genMaxInstalledCap",)),
+            "transmissionMaxInstalledCapRaw": prepInitialCapacityTransmission_rule,
+            "storENMaxInstalledCapRaw": storENMaxInstalledCap_rule,
+            "storPWMaxInstalledCapRaw": storPWMaxInstalledCap_rule,
+        }
+        sweep = SensitivitySweep(instance, derived_param_rules, solver, emission_cap=EMISSION_CAP, north_sea=north_sea)
+
+        objectives = []
+        for point in SENSITIVITY_POINTS:
+            point_path = result_file_path / point.name
+            if not os.path.exists(point_path):
+                os.makedirs(point_path)
 
-        f.close()
-        
-        # Write investment costs to results folder
-        f = open(result_file_path / 'investment_costs.csv', 'w', newline='')
-        writer = csv.writer(f)
-        writer.writerow(["Generator","Period","InvestmentCost_EurperMW"])
-        for g in instance.Generator:
-            for i in instance.PeriodActive:
-                writer.writerow([g, i, value(instance.genInvCost[g,i])])
+            start = time.time()
+            with telemetry.stage("solve"):
+                lp, solution = sweep.solve(point, logfile=point_path / f"logfile_{name}.log")
+                load_solution(instance, lp, solution)
+            telemetry.record_matrix_solution(lp, solution)
+            end = time.time()
+            logger.info("Solving sensitivity point %s took [sec]: %d", point.name, end - start)
 
-        f.close()
+            with telemetry.stage("write_results"):
+                write_cost_tables(instance, point_path)
+                write_results(instance, point_path, name, None, LeapYearsInvestment, lengthRegSeason,
+                              lengthPeakSeason, IAMC_PRINT, EMISSION_CAP, OPERATIONAL_DUALS, OUT_OF_SAMPLE,
+                              RESULTS_FORMAT, SENSITIVITY=True, SOLUTION_SNAPSHOT=SOLUTION_SNAPSHOT,
+                              OPERATIONAL_RESULTS=OPERATIONAL_RESULTS)
+            objectives.append(solution.objective)
+        return objectives
 
     logger.info("Solving...")
 
-    if solver == "CPLEX":
-        opt = SolverFactory("cplex", Verbose=True)
-        opt.options["lpmethod"] = 4
-        opt.options["solutiontype"] = 2
-        #instance.display('outputs_cplex.txt')
-    if solver == "Xpress":
-        opt = SolverFactory("xpress") #Verbose=True
-        opt.options["defaultAlg"] = 4
-        opt.options["crossover"] = 0
-        opt.options["lpLog"] = 1
-        opt.options["Trace"] = 1
-        #instance.display('outputs_xpress.txt')
-    if solver == "Gurobi":
-        opt = SolverFactory('gurobi', Verbose=True)
-        opt.options["Crossover"]=0
-        opt.options["Method"]=2
-    if solver == "GLPK":
-        opt = SolverFactory("glpk", Verbose=True)
-
-    opt.solve(instance, tee=True, logfile=result_file_path / f"logfile_{name}.log")#, keepfiles=True, symbolic_solver_labels=True)
+    opt = None
+    if MATRIX_MODEL:
+        start = time.time()
+        with telemetry.stage("generate_matrix_model"):
+            lp = build_matrix_model(instance, out_of_sample=OUT_OF_SAMPLE, emission_cap=EMISSION_CAP,
+                                    north_sea=north_sea)
+        end = time.time()
+        logger.info("Generating matrix model took [sec]: %d", end - start)
+
+        start = time.time()
+        # Solves the linear program as the solver objects of Pyomo solve an instance, also the
+        # resolve with the investments fixed for the operational duals
+        opt = MatrixModelSolver(lp, solver)
+        with telemetry.stage("solve"):
+            solution = opt.solve(instance, logfile=result_file_path / f"logfile_{name}.log")
+        telemetry.record_matrix_solution(lp, solution)
+        end = time.time()
+        logger.info("Solving matrix model took [sec]: %d", end - start)
+    elif BENDERS:
+        start = time.time()
+        with telemetry.stage("generate_matrix_model"):
+            lp = build_matrix_model(instance, out_of_sample=OUT_OF_SAMPLE, emission_cap=EMISSION_CAP,
+                                    north_sea=north_sea)
+        end = time.time()
+        logger.info("Generating matrix model took [sec]: %d", end - start)
+
+        start = time.time()
+        with telemetry.stage("solve"):
+            solution = solve_benders(lp, workers=BENDERS_WORKERS, tolerance=BENDERS_TOLERANCE,
+                                     max_iterations=BENDERS_MAX_ITERATIONS,
+                                     logfile=result_file_path / f"logfile_{name}.log")
+            load_solution(instance, lp, solution)
+        telemetry.record_matrix_solution(lp, solution)
+        end = time.time()
+        logger.info("Solving with Benders decomposition took [sec]: %d", end - start)
+    else:
+        # A persistent interface builds the model through the solver's Python API, so no LP file
+        # is written. The resolve for the operational duals then only updates the fixed variables.
+        persistent = DIRECT_SOLVER or (PERSISTENT_SOLVER and OPERATIONAL_DUALS and not OUT_OF_SAMPLE)
+        opt = create_solver(solver, persistent=persistent)
+        if is_persistent(opt):
+            start = time.time()
+            with telemetry.stage("build_solver_model"):
+                opt.set_instance(instance)
+            end = time.time()
+            logger.info("Building model in solver took [sec]: %d", end - start)
+
+        start = time.time()
+        with telemetry.stage("solve"):
+            results = opt.solve(instance, tee=True, logfile=result_file_path / f"logfile_{name}.log")#, keepfiles=True, symbolic_solver_labels=True)
+        telemetry.record_solver_results(results, instance)
+        if LEAN_BUILD:
+            keep_duals(instance)
+            release_solutions(instance)
+        end = time.time()
+        if is_persistent(opt):
+            logger.info("Solving took [sec]: %d", end - start)
+        else:
+            logger.info("Writing model file and solving took [sec]: %d", end - start)
 
     if PICKLE_INSTANCE:
         start = time.time()
@@ -908,551 +1082,129 @@ def run_empire(name, tab_file_path: Path, result_file_path: Path, scenario_data_
 
     #import pdb; pdb.set_trace()
 
+    with telemetry.stage("write_results"):
+        return write_results(instance, result_file_path, name, opt, LeapYearsInvestment, lengthRegSeason,
+                             lengthPeakSeason, IAMC_PRINT, EMISSION_CAP, OPERATIONAL_DUALS, OUT_OF_SAMPLE,
+                             RESULTS_FORMAT, BENDERS=BENDERS, telemetry=telemetry, LEAN_BUILD=LEAN_BUILD,
+                             SOLUTION_SNAPSHOT=SOLUTION_SNAPSHOT, OPERATIONAL_RESULTS=OPERATIONAL_RESULTS)
+
+
+def write_results(instance, result_file_path: Path, name, opt, LeapYearsInvestment, lengthRegSeason, lengthPeakSeason,
+                  IAMC_PRINT, EMISSION_CAP, OPERATIONAL_DUALS, OUT_OF_SAMPLE, RESULTS_FORMAT: str = "csv",
+                  BENDERS: bool = False, SENSITIVITY: bool = False,
+                  telemetry: RunTelemetry | None = None, LEAN_BUILD: bool = False,
+                  SOLUTION_SNAPSHOT: bool = False, OPERATIONAL_RESULTS: bool = True) -> None | float:
+    """
+    Write the results of a solved instance.
+
+    The results are written from a snapshot of the solution (see :mod:`empire.core.reports`).
+
+    :param instance: The solved instance.
+    :param result_file_path: Folder to write the results to.
+    :param name: Name of the run, used in the names of the log files.
+    :param opt: Solver object the instance was solved with, used to resolve for the operational duals.
+        None if the solution was loaded from a linear program solved as a matrix.
+    :param BENDERS: If true, the instance was solved by Benders decomposition.
+    :param SENSITIVITY: If true, the instance was solved as a point of a sensitivity sweep.
+    :param telemetry: Records the resolve for the operational duals as a stage, if given.
+    :param LEAN_BUILD: If true, only the duals that are written are kept after the resolve.
+    :param SOLUTION_SNAPSHOT: If true, the snapshot of the solution is written, from which the results can be
+        written again with empire-report.
+    :param OPERATIONAL_RESULTS: If false, the hourly operational results are not written.
+    :return: Objective value of an out-of-sample run, otherwise None.
+    """
+
     ###########
     ##RESULTS##
     ###########
 
     logger.info("Writing results to .csv...")
 
-    f = open(result_file_path / 'results_objective.csv', 'w', newline='')
-    writer = csv.writer(f)
-    writer.writerow(["Objective function value:" + str(value(instance.Obj))])
-    
-    inv_per = []
-    for i in instance.PeriodActive:
-        my_string = str(value(2020+int(i-1)*LeapYearsInvestment))+"-"+str(value(2020+int(i)*LeapYearsInvestment))
-        inv_per.append(my_string)
-
-    f = open(result_file_path / 'results_output_gen.csv', 'w', newline='')
-    writer = csv.writer(f)
-    my_string = ["Node","GeneratorType","Period","genInvCap_MW","genInstalledCap_MW","genExpectedCapacityFactor","DiscountedInvestmentCost_Euro","genExpectedAnnualProduction_GWh"]
-    writer.writerow(my_string)
-    for (n,g) in instance.GeneratorsOfNode:
-        for i in instance.PeriodActive:
-            writer.writerow([
-                n,
-                g,
-                inv_per[int(i-1)],
-                value(instance.genInvCap[n,g,i]),
-                value(instance.genInstalledCap[n,g,i]), 
-                value(sum(instance.sceProbab[w]*instance.seasScale[s]*instance.genOperational[n,g,h,i,w] for (s,h) in instance.HoursOfSeason for w in instance.Scenario)/(instance.genInstalledCap[n,g,i]*8760) if value(instance.genInstalledCap[n,g,i]) != 0 else 0), 
-                value(instance.discount_multiplier[i]*instance.genInvCap[n,g,i]*instance.genInvCost[g,i]),
-                value(sum(instance.seasScale[s]*instance.sceProbab[w]*instance.genOperational[n,g,h,i,w]/1000 for (s,h) in instance.HoursOfSeason for w in instance.Scenario))
-            ])
-    f.close()
-
-    f = open(result_file_path / 'results_output_stor.csv', 'w', newline='')
-    writer = csv.writer(f)
-    writer.writerow(["Node","StorageType","Period","storPWInvCap_MW","storPWInstalledCap_MW","storENInvCap_MWh","storENInstalledCap_MWh","DiscountedInvestmentCostPWEN_EuroPerMWMWh","ExpectedAnnualDischargeVolume_GWh","ExpectedAnnualLossesChargeDischarge_GWh"])
-    for (n,b) in instance.StoragesOfNode:
-        for i in instance.PeriodActive:
-            writer.writerow([
-                n,
-                b,
-                inv_per[int(i-1)],
-                value(instance.storPWInvCap[n,b,i]),
-                value(instance.storPWInstalledCap[n,b,i]), 
-                value(instance.storENInvCap[n,b,i]),
-                value(instance.storENInstalledCap[n,b,i]), 
-                value(instance.discount_multiplier[i]*(instance.storPWInvCap[n,b,i]*instance.storPWInvCost[b,i] + instance.storENInvCap[n,b,i]*instance.storENInvCost[b,i])), 
-                value(sum(instance.sceProbab[w]*instance.seasScale[s]*instance.storDischarge[n,b,h,i,w]/1000 for (s,h) in instance.HoursOfSeason for w in instance.Scenario)), 
-                value(sum(instance.sceProbab[w]*instance.seasScale[s]*((1 - instance.storageDischargeEff[b])*instance.storDischarge[n,b,h,i,w] + (1 - instance.storageChargeEff[b])*instance.storCharge[n,b,h,i,w])/1000 for (s,h) in instance.HoursOfSeason for w in instance.Scenario))])
-    f.close()
-
-    f = open(result_file_path / 'results_output_transmision.csv', 'w', newline='')
-    writer = csv.writer(f)
-    writer.writerow(["BetweenNode","AndNode","Period","transmisionInvCap_MW","transmissionInstalledCap_MW","DiscountedInvestmentCost_Euro","transmisionExpectedAnnualVolume_GWh","ExpectedAnnualLosses_GWh"])
-    for (n1,n2) in instance.BidirectionalArc:
-        for i in instance.PeriodActive:
-            writer.writerow([
-                n1,
-                n2,
-                inv_per[int(i-1)],
-                value(instance.transmisionInvCap[n1,n2,i]),
-                value(instance.transmissionInstalledCap[n1,n2,i]), 
-                value(instance.discount_multiplier[i]*instance.transmisionInvCap[n1,n2,i]*instance.transmissionInvCost[n1,n2,i]), 
-                value(sum(instance.sceProbab[w]*instance.seasScale[s]*(instance.transmisionOperational[n1,n2,h,i,w]+instance.transmisionOperational[n2,n1,h,i,w])/1000 for (s,h) in instance.HoursOfSeason for w in instance.Scenario)), 
-                value(sum(instance.sceProbab[w]*instance.seasScale[s]*((1 - instance.lineEfficiency[n1,n2])*instance.transmisionOperational[n1,n2,h,i,w] + (1 - instance.lineEfficiency[n2,n1])*instance.transmisionOperational[n2,n1,h,i,w])/1000 for (s,h) in instance.HoursOfSeason for w in instance.Scenario))
-            ])
-    f.close()
-
-    if not OUT_OF_SAMPLE:
-        # Not interested in operational-files
-        
-        f = open(result_file_path / 'results_output_transmision_operational.csv', 'w', newline='')
-        writer = csv.writer(f)
-        writer.writerow(["FromNode","ToNode","Period","Season","Scenario","Hour","TransmissionRecieved_MW","Losses_MW"])
-        for (n1,n2) in instance.DirectionalLink:
-            for i in instance.PeriodActive:
-                for (s,h) in instance.HoursOfSeason:
-                    for w in instance.Scenario:
-                        writer.writerow([
-                            n1,
-                            n2,
-                            inv_per[int(i-1)],
-                            s,
-                            w,
-                            h, 
-                            value(instance.lineEfficiency[n1,n2]*instance.transmisionOperational[n1,n2,h,i,w]), 
-                            value((1 - instance.lineEfficiency[n1,n2])*instance.transmisionOperational[n1,n2,h,i,w])
-                        ])
-        f.close()
-        
-        f = open(result_file_path / 'results_output_Operational.csv', 'w', newline='')
-        writer = csv.writer(f)
-        my_header = ["Node","Period","Scenario","Season","Hour","AllGen_MW","Load_MW","Net_load_MW"]
-        for g in instance.Generator:
-            my_string = str(g)+"_MW"
-            my_header.append(my_string)
-        my_header.extend(["storCharge_MW","storDischarge_MW","storEnergyLevel_MWh","LossesChargeDischargeBleed_MW","FlowOut_MW","FlowIn_MW","LossesFlowIn_MW","LoadShed_MW","Price_EURperMWh","AvgCO2_kgCO2perMWh"])    
-        writer.writerow(my_header)
-        for n in instance.Node:
-            for i in instance.PeriodActive:
-                for w in instance.Scenario:
-                    for (s,h) in instance.HoursOfSeason:
-                        my_string=[
-                            n,
-                            inv_per[int(i-1)],
-                            w,
-                            s,
-                            h, 
-                            value(sum(instance.genOperational[n,g,h,i,w] for g in instance.Generator if (n,g) in instance.GeneratorsOfNode)), 
-                            value(-instance.sload[n,h,i,w]), 
-                            value(-(instance.sload[n,h,i,w] - instance.loadShed[n,h,i,w] + sum(instance.storCharge[n,b,h,i,w] - instance.storageDischargeEff[b]*instance.storDischarge[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode) + 
-                            sum(instance.transmisionOperational[n,link,h,i,w] - instance.lineEfficiency[link,n]*instance.transmisionOperational[link,n,h,i,w] for link in instance.NodesLinked[n])))
-                        ]
-                        for g in instance.Generator:
-                            if (n,g) in instance.GeneratorsOfNode:
-                                my_string.append(value(instance.genOperational[n,g,h,i,w]))
-                            else:
-                                my_string.append(0)
-                        my_string.extend([value(sum(-instance.storCharge[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode)), 
-                            value(sum(instance.storDischarge[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode)), 
-                            value(sum(instance.storOperational[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode)), 
-                            value(sum(-(1 - instance.storageDischargeEff[b])*instance.storDischarge[n,b,h,i,w] - (1 - instance.storageChargeEff[b])*instance.storCharge[n,b,h,i,w] - (1 - instance.storageBleedEff[b])*instance.storOperational[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode)), 
-                            value(sum(-instance.transmisionOperational[n,link,h,i,w] for link in instance.NodesLinked[n])), 
-                            value(sum(instance.transmisionOperational[link,n,h,i,w] for link in instance.NodesLinked[n])), 
-                            value(sum(-(1 - instance.lineEfficiency[link,n])*instance.transmisionOperational[link,n,h,i,w] for link in instance.NodesLinked[n])), 
-                            value(instance.loadShed[n,h,i,w]), 
-                            value(instance.dual[instance.FlowBalance[n,h,i,w]]/(instance.operationalDiscountrate*instance.seasScale[s]*instance.sceProbab[w])),
-                            value(sum(instance.genOperational[n,g,h,i,w]*instance.genCO2TypeFactor[g]*(3.6/instance.genEfficiency[g,i]) for g in instance.Generator if (n,g) in instance.GeneratorsOfNode)/sum(instance.genOperational[n,g,h,i,w] for g in instance.Generator if (n,g) in instance.GeneratorsOfNode) if value(sum(instance.genOperational[n,g,h,i,w] for g in instance.Generator if (n,g) in instance.GeneratorsOfNode)) != 0 else 0)])
-                        writer.writerow(my_string)
-        f.close()
-
-        f = open(result_file_path / 'results_output_curtailed_operational.csv', 'w', newline='')
-        writer = csv.writer(f)
-        writer.writerow(["Node", "Period", "Scenario", "Season", "Hour", "RESGeneratorType", "Curtailment_MWh"])
-        for t in instance.Technology:
-            if t == 'Hydro_ror' or t == 'Wind_onshr' or t == 'Wind_offshr' or t == 'Solar':
-                for (n,g) in instance.GeneratorsOfNode:
-                    if (t,g) in instance.GeneratorsOfTechnology: 
-                        for i in instance.PeriodActive:
-                            for w in instance.Scenario:
-                                for (s,h) in instance.HoursOfSeason:
-                                    writer.writerow([
-                                        n,
-                                        inv_per[int(i-1)],
-                                        w,
-                                        s,
-                                        h,
-                                        g,
-                                        value(instance.sceProbab[w]*instance.seasScale[s]*(instance.genCapAvail[n,g,h,w,i]*instance.genInstalledCap[n,g,i] - instance.genOperational[n,g,h,i,w]))
-                                    ])
-        f.close()
-
-    f = open(result_file_path / 'results_output_curtailed_prod.csv', 'w', newline='')
-    writer = csv.writer(f)
-    writer.writerow(["Node","RESGeneratorType","Period","ExpectedAnnualCurtailment_GWh"])
-    for t in instance.Technology:
-        if t == 'Hydro_ror' or t == 'Wind_onshr' or t == 'Wind_offshr' or t == 'Solar':
-            for (n,g) in instance.GeneratorsOfNode:
-                if (t,g) in instance.GeneratorsOfTechnology: 
-                    for i in instance.PeriodActive:
-                        writer.writerow([
-                            n,
-                            g,
-                            inv_per[int(i-1)], 
-                            value(sum(instance.sceProbab[w]*instance.seasScale[s]*(instance.genCapAvail[n,g,h,w,i]*instance.genInstalledCap[n,g,i] - instance.genOperational[n,g,h,i,w])/1000 for w in instance.Scenario for (s,h) in instance.HoursOfSeason))
-                        ])
-    f.close()
-
-    f = open(result_file_path / 'results_output_EuropePlot.csv', 'w', newline='')
-    writer = csv.writer(f)
-    writer.writerow(["Period","genInstalledCap_MW"])
-    my_string=[""]
-    for g in instance.Generator:
-        my_string.append(g)
-    writer.writerow(my_string)
-    my_string=["Initial"]
-    for g in instance.Generator:
-        my_string.append((value(sum(instance.genInitCap[n,g,1] for n in instance.Node if (n,g) in instance.GeneratorsOfNode))))
-    writer.writerow(my_string)
-    for i in instance.PeriodActive:
-        my_string=[inv_per[int(i-1)]]
-        for g in instance.Generator:
-            my_string.append(value(sum(instance.genInstalledCap[n,g,i] for n in instance.Node if (n,g) in instance.GeneratorsOfNode)))
-        writer.writerow(my_string)
-    writer.writerow([""])
-    writer.writerow(["Period","genExpectedAnnualProduction_GWh"])
-    my_string=[""]
-    for g in instance.Generator:
-        my_string.append(g)
-    writer.writerow(my_string)
-    for i in instance.PeriodActive:
-        my_string=[inv_per[int(i-1)]]
-        for g in instance.Generator:
-            my_string.append(value(sum(instance.sceProbab[w]*instance.seasScale[s]*instance.genOperational[n,g,h,i,w]/1000 for n in instance.Node if (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason for w in instance.Scenario)))
-        writer.writerow(my_string)
-    writer.writerow([""])
-    writer.writerow(["Period","storPWInstalledCap_MW"])
-    my_string=[""]
-    for b in instance.Storage:
-        my_string.append(b)
-    writer.writerow(my_string)
-    for i in instance.PeriodActive:
-        my_string=[inv_per[int(i-1)]]
-        for b in instance.Storage:
-            my_string.append(value(sum(instance.storPWInstalledCap[n,b,i] for n in instance.Node if (n,b) in instance.StoragesOfNode)))
-        writer.writerow(my_string)
-    writer.writerow([""])
-    writer.writerow(["Period","storENInstalledCap_MW"])
-    my_string=[""]
-    for b in instance.Storage:
-        my_string.append(b)
-    writer.writerow(my_string)
-    for i in instance.PeriodActive:
-        my_string=[inv_per[int(i-1)]]
-        for b in instance.Storage:
-            my_string.append(value(sum(instance.storENInstalledCap[n,b,i] for n in instance.Node if (n,b) in instance.StoragesOfNode)))
-        writer.writerow(my_string)
-    writer.writerow([""])
-    writer.writerow(["Period","storExpectedAnnualDischarge_GWh"])
-    my_string=[""]
-    for b in instance.Storage:
-        my_string.append(b)
-    writer.writerow(my_string)
-    for i in instance.PeriodActive:
-        my_string=[inv_per[int(i-1)]]
-        for b in instance.Storage:
-            my_string.append(value(sum(instance.sceProbab[w]*instance.seasScale[s]*instance.storDischarge[n,b,h,i,w]/1000 for n in instance.Node if (n,b) in instance.StoragesOfNode for (s,h) in instance.HoursOfSeason for w in instance.Scenario)))
-        writer.writerow(my_string)
-    f.close()
-
-    f = open(result_file_path / 'results_output_EuropeSummary.csv', 'w', newline='')
-    writer = csv.writer(f)
-    writer.writerow(["Period","Scenario","AnnualCO2emission_Ton","CO2Price_EuroPerTon","CO2Cap_Ton","AnnualGeneration_GWh","AvgCO2factor_TonPerMWh","AvgELPrice_EuroPerMWh","TotAnnualCurtailedRES_GWh","TotAnnualLossesChargeDischarge_GWh","AnnualLossesTransmission_GWh"])
-    for i in instance.PeriodActive:
-        for w in instance.Scenario:
-            my_string=[inv_per[int(i-1)],w, 
-            value(sum(instance.seasScale[s]*instance.genOperational[n,g,h,i,w]*instance.genCO2TypeFactor[g]*(3.6/instance.genEfficiency[g,i]) for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason))]
-            if EMISSION_CAP:
-                my_string.extend([value(instance.dual[instance.emission_cap[i,w]]/(instance.operationalDiscountrate*instance.sceProbab[w]*1e6)),value(instance.CO2cap[i]*1e6)])
-            else:
-                my_string.extend([value(instance.CO2price[i]),0])
-            my_string.extend([value(sum(instance.seasScale[s]*instance.genOperational[n,g,h,i,w]/1000 for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)), 
-            value(sum(instance.seasScale[s]*instance.genOperational[n,g,h,i,w]*instance.genCO2TypeFactor[g]*(3.6/instance.genEfficiency[g,i]) for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)/sum(instance.seasScale[s]*instance.genOperational[n,g,h,i,w] for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)), 
-            value(sum(instance.dual[instance.FlowBalance[n,h,i,w]]/(instance.operationalDiscountrate*instance.seasScale[s]*instance.sceProbab[w]) for n in instance.Node for (s,h) in instance.HoursOfSeason)/value(len(instance.HoursOfSeason)*len(instance.Node))),
-            value(sum(instance.seasScale[s]*(instance.genCapAvail[n,g,h,w,i]*instance.genInstalledCap[n,g,i] - instance.genOperational[n,g,h,i,w])/1000 for (n,g) in instance.GeneratorsOfNode if g == 'Hydrorun-of-the-river' or g == 'Windonshore' or g == 'Windoffshore' or g == 'Solar' for (s,h) in instance.HoursOfSeason)), 
-            value(sum(instance.seasScale[s]*((1 - instance.storageDischargeEff[b])*instance.storDischarge[n,b,h,i,w] + (1 - instance.storageChargeEff[b])*instance.storCharge[n,b,h,i,w])/1000 for (n,b) in instance.StoragesOfNode for (s,h) in instance.HoursOfSeason)), 
-            value(sum(instance.seasScale[s]*((1 - instance.lineEfficiency[n1,n2])*instance.transmisionOperational[n1,n2,h,i,w] + (1 - instance.lineEfficiency[n2,n1])*instance.transmisionOperational[n2,n1,h,i,w])/1000 for (n1,n2) in instance.BidirectionalArc for (s,h) in instance.HoursOfSeason))])
-            writer.writerow(my_string)
-    writer.writerow([""])
-    writer.writerow(["GeneratorType","Period","genInvCap_MW","genInstalledCap_MW","TotDiscountedInvestmentCost_Euro","genExpectedAnnualProduction_GWh"])
-    for g in instance.Generator:
-        for i in instance.PeriodActive:
-            writer.writerow([g,inv_per[int(i-1)],value(sum(instance.genInvCap[n,g,i] for n in instance.Node if (n,g) in instance.GeneratorsOfNode)), 
-            value(sum(instance.genInstalledCap[n,g,i] for n in instance.Node if (n,g) in instance.GeneratorsOfNode)), 
-            value(sum(instance.discount_multiplier[i]*instance.genInvCap[n,g,i]*instance.genInvCost[g,i] for n in instance.Node if (n,g) in instance.GeneratorsOfNode)), 
-            value(sum(instance.seasScale[s]*instance.sceProbab[w]*instance.genOperational[n,g,h,i,w]/1000 for n in instance.Node if (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason for w in instance.Scenario))])
-    writer.writerow([""])
-    writer.writerow(["StorageType","Period","storPWInvCap_MW","storPWInstalledCap_MW","storENInvCap_MWh","storENInstalledCap_MWh","TotDiscountedInvestmentCostPWEN_Euro","ExpectedAnnualDischargeVolume_GWh"])
-    for b in instance.Storage:
-        for i in instance.PeriodActive:
-            writer.writerow([b,inv_per[int(i-1)],value(sum(instance.storPWInvCap[n,b,i] for n in instance.Node if (n,b) in instance.StoragesOfNode)), 
-            value(sum(instance.storPWInstalledCap[n,b,i] for n in instance.Node if (n,b) in instance.StoragesOfNode)), 
-            value(sum(instance.storENInvCap[n,b,i] for n in instance.Node if (n,b) in instance.StoragesOfNode)), 
-            value(sum(instance.storENInstalledCap[n,b,i] for n in instance.Node if (n,b) in instance.StoragesOfNode)), 
-            value(sum(instance.discount_multiplier[i]*(instance.storPWInvCap[n,b,i]*instance.storPWInvCost[b,i] + instance.storENInvCap[n,b,i]*instance.storENInvCost[b,i]) for n in instance.Node if (n,b) in instance.StoragesOfNode)), 
-            value(sum(instance.seasScale[s]*instance.sceProbab[w]*instance.storDischarge[n,b,h,i,w]/1000 for n in instance.Node if (n,b) in instance.StoragesOfNode for (s,h) in instance.HoursOfSeason for w in instance.Scenario))])
-    f.close()
+    snapshot = SolutionSnapshot.from_instance(instance, emission_cap=EMISSION_CAP, out_of_sample=OUT_OF_SAMPLE,
+                                           iamc=IAMC_PRINT)
 
     if OUT_OF_SAMPLE:
-        return float(value(instance.Obj))
-
-    # Print first stage decisions for out-of-sample
-    f = open(result_file_path / 'genInvCap.tab', 'w', newline='')
-    writer = csv.writer(f, delimiter='\t')
-    writer.writerow(["Node","Generator","Period","genInvCap"])
-    for (n,g) in instance.GeneratorsOfNode:
-        for i in instance.PeriodActive:
-            writer.writerow([n,g,i,value(instance.genInvCap[n,g,i])])
-    f.close()
-
-    f = open(result_file_path / 'transmisionInvCap.tab', 'w', newline='')
-    writer = csv.writer(f, delimiter='\t')
-    writer.writerow(["FromNode","ToNode","Period","transmisionInvCap"])
-    for (n1,n2) in instance.BidirectionalArc:
-        for i in instance.PeriodActive:
-            writer.writerow([n1,n2,i,value(instance.transmisionInvCap[n1,n2,i])])
-    f.close()
-
-    f = open(result_file_path / 'storPWInvCap.tab', 'w', newline='')
-    writer = csv.writer(f, delimiter='\t')
-    writer.writerow(["Node","Storage","Period","storPWInvCap"])
-    for (n,b) in instance.StoragesOfNode:
-        for i in instance.PeriodActive:
-            writer.writerow([n,b,i,value(instance.storPWInvCap[n,b,i])])
-    f.close()
-
-    f = open(result_file_path / 'storENInvCap.tab', 'w', newline='')
-    writer = csv.writer(f, delimiter='\t')
-    writer.writerow(["Node","Storage","Period","storENInvCap"])
-    for (n,b) in instance.StoragesOfNode:
-        for i in instance.PeriodActive:
-            writer.writerow([n,b,i,value(instance.storENInvCap[n,b,i])])
-    f.close()
-
-    f = open(result_file_path / 'genInstalledCap.tab', 'w', newline='')
-    writer = csv.writer(f, delimiter='\t')
-    writer.writerow(["Node","Generator","Period","genInstalledCap"])
-    for (n,g) in instance.GeneratorsOfNode:
-        for i in instance.PeriodActive:
-            writer.writerow([n,g,i,value(instance.genInstalledCap[n,g,i])])
-    f.close()
-
-    f = open(result_file_path / 'transmissionInstalledCap.tab', 'w', newline='')
-    writer = csv.writer(f, delimiter='\t')
-    writer.writerow(["FromNode","ToNode","Period","transmissionInstalledCap"])
-    for (n1,n2) in instance.BidirectionalArc:
-        for i in instance.PeriodActive:
-            writer.writerow([n1,n2,i,value(instance.transmissionInstalledCap[n1,n2,i])])
-    f.close()
-
-    f = open(result_file_path / 'storPWInstalledCap.tab', 'w', newline='')
-    writer = csv.writer(f, delimiter='\t')
-    writer.writerow(["Node","Storage","Period","storPWInstalledCap"])
-    for (n,b) in instance.StoragesOfNode:
-        for i in instance.PeriodActive:
-            writer.writerow([n,b,i,value(instance.storPWInstalledCap[n,b,i])])
-    f.close()
-
-    f = open(result_file_path / 'storENInstalledCap.tab', 'w', newline='')
-    writer = csv.writer(f, delimiter='\t')
-    writer.writerow(["Node","Storage","Period","storENInstalledCap"])
-    for (n,b) in instance.StoragesOfNode:
-        for i in instance.PeriodActive:
-            writer.writerow([n,b,i,value(instance.storENInstalledCap[n,b,i])])
-    f.close()
-
-        
-    if IAMC_PRINT:
-        ####################
-        ###STANDARD PRINT###
-        ####################
-        
-        import pandas as pd
-        
-        Modelname = "EMPIRE"
-        Scenario = "1.5degree"
-
-        dict_countries = {"Austria": "Austria",
-                          "Bosnia and Herzegovina": "BosniaH",
-                          "Belgium": "Belgium", "Bulgaria": "Bulgaria",
-                          "Switzerland": "Switzerland", 
-                          "Czech Republic": "CzechR", "Germany": "Germany",
-                          "Denmark": "Denmark", "Estonia": "Estonia", 
-                          "Spain": "Spain", "Finland": "Finland",
-                          "France": "France", "United Kingdom": "GreatBrit.",
-                          "Greece": "Greece", "Croatia": "Croatia", 
-                          "Hungary": "Hungary", "Ireland": "Ireland", 
-                          "Italy": "Italy", "Lithuania": "Lithuania",
-                          "Luxembourg": "Luxemb.", "Latvia": "Latvia",
-                          "North Macedonia": "Macedonia", 
-                          "The Netherlands": "Netherlands", "Norway": "Norway",
-                          "Poland": "Poland", "Portugal": "Portugal",
-                          "Romania": "Romania", "Serbia": "Serbia", 
-                          "Sweden": "Sweden", "Slovenia": "Slovenia",
-                          "Slovakia": "Slovakia", "Norway|Ostland": "NO1", 
-                          "Norway|Sorland": "NO2", "Norway|Norgemidt": "NO3",
-                          "Norway|Troms": "NO4", "Norway|Vestmidt": "NO5"}
-
-        dict_countries_reversed = dict([reversed(i) for i in dict_countries.items()])
-
-        dict_generators = {"Bio": "Biomass", "Bioexisting": "Biomass",
-                           "Coalexisting": "Coal|w/o CCS",
-                           "Coal": "Coal|w/o CCS", "CoalCCS": "Coal|w/ CCS",
-                           "CoalCCSadv": "Coal|w/ CCS", 
-                           "Lignite": "Lignite|w/o CCS",
-                           "Liginiteexisting": "Lignite|w/o CCS", 
-                           "LigniteCCSadv": "Lignite|w/ CCS", 
-                           "Gasexisting": "Gas|CCGT|w/o CCS", 
-                           "GasOCGT": "Gas|OCGT|w/o CCS", 
-                           "GasCCGT": "Gas|CCGT|w/o CCS", 
-                           "GasCCS": "Gas|CCGT|w/ CCS", 
-                           "GasCCSadv": "Gas|CCGT|w/ CCS", 
-                           "Oilexisting": "Oil", "Nuclear": "Nuclear", 
-                           "Wave": "Ocean", "Geo": "Geothermal", 
-                           "Hydroregulated": "Hydro|Reservoir", 
-                           "Hydrorun-of-the-river": "Hydro|Run-of-River", 
-                           "Windonshore": "Wind|Onshore", 
-                           "Windoffshore": "Wind|Offshore",
-                           "Windoffshoregrounded": "Wind|Offshore", 
-                           "Windoffshorefloating": "Wind|Offshore", 
-                           "Solar": "Solar|PV", "Waste": "Waste", 
-                           "Bio10cofiring": "Coal|w/o CCS", 
-                           "Bio10cofiringCCS": "Coal|w/ CCS", 
-                           "LigniteCCSsup": "Lignite|w/ CCS"}
-        
-        #Make datetime from HoursOfSeason       
-        seasonstart={"winter": '2020-01-01',
-                     "spring": '2020-04-01',
-                     "summer": '2020-07-01',
-                     "fall": '2020-10-01',
-                     "peak1": '2020-11-01',
-                     "peak2": '2020-12-01'}
-        
-        seasonhours=[]
-    
-        for s in instance.Season:
-            if s not in 'peak':
-                t=pd.to_datetime(list(range(lengthRegSeason)), unit='h', origin=pd.Timestamp(seasonstart[s]))
-                t=[str(i)[5:-3] for i in t]
-                t=[str(i)+"+01:00" for i in t]
-                seasonhours+=t
-            else:
-                t=pd.to_datetime(list(range(lengthPeakSeason)), unit='h', origin=pd.Timestamp(seasonstart[s]))
-                t=[str(i)[5:-3] for i in t]
-                t=[str(i)+"+01:00" for i in t]
-                seasonhours+=t       
-        
-        #Scalefactors to make units
-        Mtonperton = (1/1000000)
-
-        GJperMWh = 3.6
-        EJperMWh = 3.6*10**(-9)
-
-        GWperMW = (1/1000)
-
-        USD10perEUR10 = 1.33 #Source: https://www.statista.com/statistics/412794/euro-to-u-s-dollar-annual-average-exchange-rate/ 
-        EUR10perEUR18 = 154/171 #Source: https://www.inflationtool.com/euro 
-        USD10perEUR18 = USD10perEUR10*EUR10perEUR18 
-
-        logger.info("Writing standard output to .csv...")
-        
-        f = pd.DataFrame(columns=["model", "scenario", "region", "variable", "unit", "subannual"]+[value(2020+(i)*instance.LeapYearsInvestment) for i in instance.PeriodActive])
-
-        def row_write(df, region, variable, unit, subannual, input_value, scenario=Scenario, modelname=Modelname):
-            df2 = pd.DataFrame([[modelname, scenario, region, variable, unit, subannual]+input_value],
-                               columns=["model", "scenario", "region", "variable", "unit", "subannual"]+[value(2020+(i)*instance.LeapYearsInvestment) for i in instance.PeriodActive])
-            df = pd.concat([df, df2], ignore_index=True)
-            return df
-
-        f = row_write(f, "Europe", "Discount rate|Electricity", "%", "Year", [value(instance.discountrate*100)]*len(instance.PeriodActive)) #Discount rate
-        f = row_write(f, "Europe", "Capacity|Electricity", "GW", "Year", [value(sum(instance.genInstalledCap[n,g,i]*GWperMW for (n,g) in instance.GeneratorsOfNode)) for i in instance.PeriodActive]) #Total European installed generator capacity 
-        f = row_write(f, "Europe", "Investment|Energy Supply|Electricity", "billion US$2010/yr", "Year", [value((1/instance.LeapYearsInvestment)*USD10perEUR18* \
-                    sum(instance.genInvCost[g,i]*instance.genInvCap[n,g,i] for (n,g) in instance.GeneratorsOfNode) + \
-                    sum(instance.transmissionInvCost[n1,n2,i]*instance.transmisionInvCap[n1,n2,i] for (n1,n2) in instance.BidirectionalArc) + \
-                    sum((instance.storPWInvCost[b,i]*instance.storPWInvCap[n,b,i]+instance.storENInvCost[b,i]*instance.storENInvCap[n,b,i]) for (n,b) in instance.StoragesOfNode)) for i in instance.PeriodActive]) #Total European investment cost (gen+stor+trans)
-        f = row_write(f, "Europe", "Investment|Energy Supply|Electricity|Electricity storage", "billion US$2010/yr", "Year", [value((1/instance.LeapYearsInvestment)*USD10perEUR18* \
-                    sum((instance.storPWInvCost[b,i]*instance.storPWInvCap[n,b,i]+instance.storENInvCost[b,i]*instance.storENInvCap[n,b,i]) for (n,b) in instance.StoragesOfNode)) for i in instance.PeriodActive]) #Total European storage investment cost
-        f = row_write(f, "Europe", "Investment|Energy Supply|Electricity|Transmission and Distribution", "billion US$2010/yr", "Year", [value((1/instance.LeapYearsInvestment)*USD10perEUR18* \
-                    sum(instance.transmissionInvCost[n1,n2,i]*instance.transmisionInvCap[n1,n2,i] for (n1,n2) in instance.BidirectionalArc)) for i in instance.PeriodActive]) #Total European transmission investment cost
-        for w in instance.Scenario:
-            f = row_write(f, "Europe", "Emissions|CO2|Energy|Supply|Electricity", "Mt CO2/yr", "Year", [value(Mtonperton*sum(instance.seasScale[s]*instance.genCO2TypeFactor[g]*(GJperMWh/instance.genEfficiency[g,i])* \
-                    instance.genOperational[n,g,h,i,w] for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)) for i in instance.PeriodActive], Scenario+"|"+str(w)) #Total European emissions per scenario
-            f = row_write(f, "Europe", "Secondary Energy|Electricity", "EJ/yr", "Year", \
-                    [value(sum(EJperMWh*instance.seasScale[s]*instance.genOperational[n,g,h,i,w] for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)) for i in instance.PeriodActive], Scenario+"|"+str(w)) #Total European generation per scenario
-            for g in instance.Generator:
-                f = row_write(f, "Europe", "Active Power|Electricity|"+dict_generators[str(g)], "MWh", "Year", \
-                    [value(sum(instance.seasScale[s]*instance.genOperational[n,g,h,i,w] for n in instance.Node if (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)) for i in instance.PeriodActive], Scenario+"|"+str(w)) #Total generation per type and scenario
-            for (s,h) in instance.HoursOfSeason:
-                for n in instance.Node:
-                    f = row_write(f, dict_countries_reversed[str(n)], "Price|Secondary Energy|Electricity", "US$2010/GJ", seasonhours[h-1], \
-                        [value(instance.dual[instance.FlowBalance[n,h,i,w]]/(GJperMWh*instance.operationalDiscountrate*instance.seasScale[s]*instance.sceProbab[w])) for i in instance.PeriodActive], Scenario+"|"+str(w)+str(s))
-        for g in instance.Generator:
-            f = row_write(f, "Europe", "Capacity|Electricity|"+dict_generators[str(g)], "GW", "Year", [value(sum(instance.genInstalledCap[n,g,i]*GWperMW for n in instance.Node if (n,g) in instance.GeneratorsOfNode)) for i in instance.PeriodActive]) #Total European installed generator capacity per type
-            f = row_write(f, "Europe", "Capital Cost|Electricity|"+dict_generators[str(g)], "US$2010/kW", "Year", [value(instance.genCapitalCost[g,i]*USD10perEUR18) for i in instance.PeriodActive]) #Capital generator cost
-            if value(instance.genMargCost[g,instance.PeriodActive[1]]) != 0: 
-                f = row_write(f, "Europe", "Variable Cost|Electricity|"+dict_generators[str(g)], "EUR/MWh", "Year", [value(instance.genMargCost[g,i]) for i in instance.PeriodActive])
-            f = row_write(f, "Europe", "Investment|Energy Supply|Electricity|"+dict_generators[str(g)], "billion US$2010/yr", "Year", [value((1/instance.LeapYearsInvestment)*USD10perEUR18* \
-                    sum(instance.genInvCost[g,i]*instance.genInvCap[n,g,i] for n in instance.Node if (n,g) in instance.GeneratorsOfNode)) for i in instance.PeriodActive]) #Total generator investment cost per type
-            if value(instance.genCO2TypeFactor[g]) != 0:
-                f = row_write(f, "Europe", "CO2 Emmissions|Electricity|"+dict_generators[str(g)], "tons/MWh", "Year", [value(instance.genCO2TypeFactor[g]*(GJperMWh/instance.genEfficiency[g,i])) for i in instance.PeriodActive]) #CO2 factor per generator type
-        for (n,g) in instance.GeneratorsOfNode:
-            f = row_write(f, dict_countries_reversed[str(n)], "Capacity|Electricity|"+dict_generators[str(g)], "GW", "Year", [value(instance.genInstalledCap[n,g,i]*GWperMW) for i in instance.PeriodActive]) #Installed generator capacity per country and type
-        
-        f = f.groupby(['model','scenario','region','variable','unit','subannual']).sum().reset_index() #NB! DOES NOT WORK FOR UNIT COSTS; SHOULD BE FIXED
-        
-        if not os.path.exists(result_file_path / 'IAMC'):
-            os.makedirs(result_file_path / 'IAMC')
-        f.to_csv(result_file_path / 'IAMC/empire_iamc.csv', index=None)
-
-    if OPERATIONAL_DUALS and not OUT_OF_SAMPLE:
+        # Not interested in operational-files
+        write_reports(snapshot, result_file_path, OUT_OF_SAMPLE_REPORTS, RESULTS_FORMAT)
+        if SOLUTION_SNAPSHOT:
+            write_snapshot(result_file_path / SNAPSHOT_FILE, snapshot)
+        return snapshot.objective
+
+    reports = [report for report in REPORTS if report != "iamc" or IAMC_PRINT]
+    if not OPERATIONAL_RESULTS:
+        logger.info("Operational results are not written.")
+        reports = [report for report in reports if report not in OPERATIONAL_REPORTS]
+    write_reports(snapshot, result_file_path, reports, RESULTS_FORMAT)
+
+    if OPERATIONAL_DUALS and BENDERS:
+        # The subproblems are solved with the investments fixed, so their duals are the operational duals.
+        logger.info("Operational dual values are taken from the Benders subproblems.")
+    elif OPERATIONAL_DUALS and SENSITIVITY:
+        # The duals of the linear program remain optimal when the investments are fixed at their optimal values.
+        logger.info("Operational dual values are taken from the solution of the sensitivity point.")
+    elif OPERATIONAL_DUALS:
         logger.info("Computing operational dual values by fixing investment variables and resolving.")
 
         logger.info("Fixing investment variables")
         for (n,g) in instance.GeneratorsOfNode:
             for i in instance.PeriodActive:
-                instance.genInvCap[n,g,i].fix()
+                fix_variable(opt, instance.genInvCap[n,g,i])
 
         for (n1,n2) in instance.BidirectionalArc:
             for i in instance.PeriodActive:        
-                instance.transmisionInvCap[n1,n2,i].fix()
+                fix_variable(opt, instance.transmisionInvCap[n1,n2,i])
 
         for (n,b) in instance.StoragesOfNode:
             for i in instance.PeriodActive:
-                instance.storPWInvCap[n,b,i].fix()
-                instance.storENInvCap[n,b,i].fix()
+                fix_variable(opt, instance.storPWInvCap[n,b,i])
+                fix_variable(opt, instance.storENInvCap[n,b,i])
 
         logger.info("Resolving")
 
-        opt.solve(instance, tee=True, logfile=result_file_path / f"logfile_{name}_resolved.log")
+        if telemetry is None:
+            telemetry = RunTelemetry(name)
+        with telemetry.stage("resolve_operational_duals"):
+            opt.solve(instance, tee=True, logfile=result_file_path / f"logfile_{name}_resolved.log")
+        if LEAN_BUILD:
+            keep_duals(instance)
+            release_solutions(instance)
 
+    resolved = None
+    if OPERATIONAL_DUALS:
         logger.info("Writing new operational results to .csv..")
 
-        f = open(result_file_path / 'results_output_Operational_resolved.csv', 'w', newline='')
-        writer = csv.writer(f)
-        my_header = ["Node","Period","Scenario","Season","Hour","AllGen_MW","Load_MW","Net_load_MW"]
-        for g in instance.Generator:
-            my_string = str(g)+"_MW"
-            my_header.append(my_string)
-        my_header.extend(["storCharge_MW","storDischarge_MW","storEnergyLevel_MWh","LossesChargeDischargeBleed_MW","FlowOut_MW","FlowIn_MW","LossesFlowIn_MW","LoadShed_MW","Price_EURperMWh","AvgCO2_kgCO2perMWh"])    
-        writer.writerow(my_header)
-        for n in instance.Node:
-            for i in instance.PeriodActive:
-                for w in instance.Scenario:
-                    for (s,h) in instance.HoursOfSeason:
-                        my_string=[n,inv_per[int(i-1)],w,s,h, 
-                            value(sum(instance.genOperational[n,g,h,i,w] for g in instance.Generator if (n,g) in instance.GeneratorsOfNode)), 
-                            value(-instance.sload[n,h,i,w]), 
-                            value(-(instance.sload[n,h,i,w] - instance.loadShed[n,h,i,w] + sum(instance.storCharge[n,b,h,i,w] - instance.storageDischargeEff[b]*instance.storDischarge[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode) + 
-                            sum(instance.transmisionOperational[n,link,h,i,w] - instance.lineEfficiency[link,n]*instance.transmisionOperational[link,n,h,i,w] for link in instance.NodesLinked[n])))]
-                        for g in instance.Generator:
-                            if (n,g) in instance.GeneratorsOfNode:
-                                my_string.append(value(instance.genOperational[n,g,h,i,w]))
-                            else:
-                                my_string.append(0)
-                        my_string.extend([value(sum(-instance.storCharge[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode)), 
-                            value(sum(instance.storDischarge[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode)), 
-                            value(sum(instance.storOperational[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode)), 
-                            value(sum(-(1 - instance.storageDischargeEff[b])*instance.storDischarge[n,b,h,i,w] - (1 - instance.storageChargeEff[b])*instance.storCharge[n,b,h,i,w] - (1 - instance.storageBleedEff[b])*instance.storOperational[n,b,h,i,w] for b in instance.Storage if (n,b) in instance.StoragesOfNode)), 
-                            value(sum(-instance.transmisionOperational[n,link,h,i,w] for link in instance.NodesLinked[n])), 
-                            value(sum(instance.transmisionOperational[link,n,h,i,w] for link in instance.NodesLinked[n])), 
-                            value(sum(-(1 - instance.lineEfficiency[link,n])*instance.transmisionOperational[link,n,h,i,w] for link in instance.NodesLinked[n])), 
-                            value(instance.loadShed[n,h,i,w]), 
-                            value(instance.dual[instance.FlowBalance[n,h,i,w]]/(instance.operationalDiscountrate*instance.seasScale[s]*instance.sceProbab[w])),
-                            value(sum(instance.genOperational[n,g,h,i,w]*instance.genCO2TypeFactor[g]*(3.6/instance.genEfficiency[g,i]) for g in instance.Generator if (n,g) in instance.GeneratorsOfNode)/sum(instance.genOperational[n,g,h,i,w] for g in instance.Generator if (n,g) in instance.GeneratorsOfNode) if value(sum(instance.genOperational[n,g,h,i,w] for g in instance.Generator if (n,g) in instance.GeneratorsOfNode)) != 0 else 0)])
-                        writer.writerow(my_string)
-        f.close()
-
-        f = open(result_file_path / 'results_co2_price_resolved.csv', 'w', newline='')
-        writer = csv.writer(f)
-        writer.writerow(["Period","Scenario","AnnualCO2emission_Ton","CO2Price_EuroPerTon"])
+        resolved = snapshot.with_solution_of(instance)
+        write_reports(resolved, result_file_path,
+                      [report for report in RESOLVED_REPORTS if OPERATIONAL_RESULTS or report not in OPERATIONAL_REPORTS],
+                      RESULTS_FORMAT)
+
+    if SOLUTION_SNAPSHOT:
+        write_snapshot(result_file_path / SNAPSHOT_FILE, snapshot, resolved)
+
+
+def write_cost_tables(instance, result_file_path: Path) -> None:
+    """
+    Write the marginal and investment costs of the generators.
+
+    :param instance: Instance with the parameters constructed.
+    :param result_file_path: Folder to write the tables to.
+    """
+    # Write marginal costs to results folder
+    f = open(result_file_path / 'marginal_costs.csv', 'w', newline='')
+    writer = csv.writer(f)
+    writer.writerow(["Generator","Period","MarginalCost_EurperMWh"])
+    for g in instance.Generator:
         for i in instance.PeriodActive:
-            for w in instance.Scenario:
-                my_string=[inv_per[int(i-1)],w, 
-                value(sum(instance.seasScale[s]*instance.genOperational[n,g,h,i,w]*instance.genCO2TypeFactor[g]*(3.6/instance.genEfficiency[g,i]) for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason))]
-                if EMISSION_CAP:
-                    my_string.extend([value(instance.dual[instance.emission_cap[i,w]]/(instance.operationalDiscountrate*instance.sceProbab[w]*1e6)),value(instance.CO2cap[i]*1e6)])
-                else:
-                    my_string.extend([value(instance.CO2price[i]),0])
\ No newline at end of file
+            writer.writerow([g, i, value(instance.genMargCost[g,i])])
+
+    f.close()
+
+    # Write investment costs to results folder
+    f = open(result_file_path / 'investment_costs.csv', 'w', newline='')
+    writer = csv.writer(f)
+    writer.writerow(["Generator","Period","InvestmentCost_EurperMW"])
+    for g in instance.Generator:
+        for i in instance.PeriodActive:
+            writer.writerow([g, i, value(instance.genInvCost[g,i])])
+
+    f.close()
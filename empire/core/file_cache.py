@@ -0,0 +1,93 @@
+import logging
+import os
+import pickle
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class FileCache:
+    """
+    Directory of pickled objects stored under content hashes.
+
+    The directory can be shared by runs. Entries are written atomically and evicted least
+    recently used first when the cache grows beyond its size limit.
+    """
+
+    pickler = pickle
+
+    def __init__(self, cache_dir: Path, max_size_mb: float = 1024):
+        """
+        :param cache_dir: Directory of the cache. Created if it does not exist.
+        :param max_size_mb: Size limit of the cache in megabytes.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_mb = max_size_mb
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str):
+        """
+        Look up a cached object and mark it as recently used.
+
+        :param key: Key of the object.
+        :return: The object, or None if it is not cached or can not be loaded.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                obj = self.pickler.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # noqa: BLE001
+            # A damaged entry, or one pickled by code that changed since, is a miss
+            logger.warning("Could not load %s from cache %s, it is removed: %s", key, self.cache_dir, e)
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return obj
+
+    def put(self, key: str, obj) -> None:
+        """
+        Store an object in the cache and evict old entries if the cache is too large.
+
+        :param key: Key of the object.
+        :param obj: Object to store.
+        """
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                self.pickler.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not store %s in cache %s: %s", key, self.cache_dir, e)
+            tmp_path.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is within its size limit.
+        """
+        entries = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry[1] for entry in entries)
+        max_size = self.max_size_mb * 1024**2
+        for _, entry_size, path in sorted(entries):
+            if size <= max_size:
+                break
+            logger.info("Evicting %s from cache %s", path.name, self.cache_dir)
+            path.unlink(missing_ok=True)
+            size -= entry_size
@@ -0,0 +1,92 @@
+"""
+Content-addressed cache of the input tables read from the dataset workbooks.
+
+Reading the workbooks with pandas is the slow part of generating the .tab files. The cache
+stores the tables read from each sheet under a hash of the sheet's content, so a sheet is
+only read again when it changed.
+"""
+import hashlib
+import logging
+import posixpath
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+import pandas as pd
+
+from empire.core.file_cache import FileCache
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate existing entries when the way tables are read from the sheets changes.
+CACHE_VERSION = 1
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sheet_digests(path: Path) -> dict[str, str]:
+    """
+    Hash the content of every sheet of a workbook.
+
+    The hash of a sheet covers the sheet itself and the parts of the workbook that are shared
+    by all sheets and affect the values read (shared strings, styles and workbook properties),
+    so a sheet keeps its hash when only other sheets are edited. For files that are not in the
+    .xlsx format, all sheets get the hash of the whole file.
+
+    :param path: Path to the workbook.
+    :return: Dictionary from sheet name to hex digest.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+            workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+            relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+
+            shared = hashlib.sha256()
+            for part in ("xl/sharedStrings.xml", "xl/styles.xml"):
+                if part in names:
+                    shared.update(archive.read(part))
+            properties = workbook.find(f"{_MAIN_NS}workbookPr")
+            if properties is not None:
+                shared.update(ElementTree.tostring(properties))
+
+            targets = {rel.get("Id"): rel.get("Target") for rel in relations.iter(f"{_PACKAGE_REL_NS}Relationship")}
+            digests = {}
+            for sheet in workbook.iter(f"{_MAIN_NS}sheet"):
+                target = targets[sheet.get(f"{_REL_NS}id")]
+                part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+                digest = shared.copy()
+                digest.update(archive.read(part))
+                digests[sheet.get("name")] = digest.hexdigest()
+            return digests
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        digest = _file_digest(path)
+        return {sheet: digest for sheet in pd.ExcelFile(path).sheet_names}
+
+
+class InputCache(FileCache):
+    """
+    Directory of cached input tables, keyed on the content of the sheet they were read from.
+    """
+
+    @staticmethod
+    def key(sheet_digest: str, columns: list | None) -> str:
+        """
+        Key of the tables read from a sheet.
+
+        :param sheet_digest: Hash of the content of the sheet.
+        :param columns: Columns read from the sheet, or None for a sets sheet.
+        :return: Hex digest identifying the tables.
+        """
+        description = f"{CACHE_VERSION}|{pd.__version__}|{columns}|{sheet_digest}"
+        return hashlib.sha256(description.encode()).hexdigest()
@@ -0,0 +1,145 @@
+import logging
+import re
+from pathlib import Path
+
+import pandas as pd
+from pyomo.environ import DataPortal
+
+try:
+    # The parser of the .tab reader is private to Pyomo, so it may move in a later release
+    from pyomo.dataportal.process_data import _process_token
+except ImportError:
+    _process_token = None
+
+logger = logging.getLogger(__name__)
+
+_TRUE_VALUES = {"TRUE", "true", "True"}
+_FALSE_VALUES = {"FALSE", "false", "False"}
+_NUMBER = re.compile(r"^([-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)$")
+
+
+def _parse_number(token: str):
+    number = float(token)
+    if "." in token:
+        return number
+    integer = int(number)
+    return integer if integer == number else number
+
+
+def _parse_token(token: str):
+    """
+    Parse a token of a .tab file as the .tab reader of Pyomo 6 does.
+
+    Used when the parser of Pyomo can not be imported.
+
+    :param token: Token as written to the file.
+    :return: Boolean, number, string or tuple.
+    """
+    if token in _TRUE_VALUES or token in _FALSE_VALUES:
+        return token in _TRUE_VALUES
+    if token[0] == '"' and token[-1] == '"':
+        return token[1:-1]
+    if token[0] == "[" and token[-1] == "]":
+        values = []
+        for item in token[1:-1].split(","):
+            if item[0] in "\"'" and item[0] == item[-1]:
+                values.append(item[1:-1])
+            elif _NUMBER.match(item):
+                values.append(_parse_number(item))
+            else:
+                values.append(item)
+        return tuple(values)
+    if _NUMBER.match(token):
+        return _parse_number(token)
+    return token
+
+
+def _tab_value(value):
+    """
+    Convert a table value to the value Pyomo reads from the same value in a .tab file.
+
+    :param value: Value as stored in a DataFrame.
+    :return: Value as parsed by the .tab reader of Pyomo.
+    """
+    if _process_token is None:
+        return _parse_token(str(value))
+    return _process_token(str(value))
+
+
+def table_rows(table: pd.DataFrame) -> list[tuple]:
+    """
+    Rows of a table with the values converted as if the table was read from a .tab file.
+
+    :param table: Table as saved to a .tab file.
+    :return: List of row tuples.
+    """
+    columns = [[_tab_value(value) for value in table[col].tolist()] for col in table.columns]
+    return list(zip(*columns))
+
+
+def set_data(table: pd.DataFrame) -> list:
+    """
+    Members of a set stored in the 'set' format.
+
+    :param table: Table with one column per dimension of the set.
+    :return: List of members, as tuples for sets of more than one dimension.
+    """
+    rows = table_rows(table)
+    if len(table.columns) > 1:
+        return rows
+    return [row[0] for row in rows]
+
+
+def param_data(table: pd.DataFrame) -> dict:
+    """
+    Values of a parameter stored in the 'table' format.
+
+    :param table: Table with the index in the leading columns and the values in the last column.
+    :return: Dictionary from index to value.
+    """
+    rows = table_rows(table)
+    if len(table.columns) > 2:
+        return {row[:-1]: row[-1] for row in rows}
+    return {row[0]: row[-1] for row in rows}
+
+
+class InputDataPortal(DataPortal):
+    """
+    DataPortal that takes input tables from memory instead of from .tab files.
+
+    Loads of a .tab file for which a table is held in memory store the table directly as the
+    data of the set or parameter, which gives the same data as reading the file. Other files
+    are read from disk as usual.
+    """
+
+    def __init__(self, tables: dict[Path, pd.DataFrame] | None = None, **kwds):
+        """
+        :param tables: Dictionary from .tab file path to the table that would be stored in it.
+        """
+        super().__init__(**kwds)
+        self.tables = {Path(path): table for path, table in (tables or {}).items()}
+
+    def load(self, **kwds):
+        path = Path(kwds["filename"]) if "filename" in kwds else None
+        if path not in self.tables:
+            return super().load(**kwds)
+
+        table = self.tables[path]
+        if table.empty:
+            logger.warning("No data in %s, the defaults are used.", path.name)
+            return
+        if kwds.get("format") == "set":
+            self[kwds["set"].local_name] = {None: set_data(table)}
+        elif kwds.get("format") == "table":
+            self[kwds["param"].local_name] = param_data(table)
+        else:
+            raise ValueError(f"Unsupported format '{kwds.get('format')}' for the in-memory table {path.name}.")
+
+    def to_data_portal(self) -> DataPortal:
+        """
+        Plain DataPortal with the loaded data, as ``create_instance`` does not accept subclasses.
+
+        :return: DataPortal sharing the data of this portal.
+        """
+        return DataPortal(data_dict={namespace: self.data(namespace=namespace)
+                                     for namespace in self.namespaces()})
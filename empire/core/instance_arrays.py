@@ -0,0 +1,118 @@
+"""
+Dense NumPy arrays of the components of a solved EMPIRE instance.
+
+Every variable, parameter and dual that a result file needs is pulled out of the instance
+once as an array with one axis per factor set of its index. The operational result files
+are written from these arrays by :mod:`empire.core.operational_results`.
+"""
+import logging
+from math import prod
+
+import numpy as np
+from pyomo.common.numeric_types import native_numeric_types
+from pyomo.environ import Var, value
+
+logger = logging.getLogger(__name__)
+
+
+class InstanceArrays:
+    """
+    Dense NumPy views of the components of a (solved) Pyomo instance.
+
+    Components are extracted lazily and cached. The array of a component has one axis per
+    factor set of its index, e.g. ``genOperational`` has the shape
+    ``(|GeneratorsOfNode|, |Operationalhour|, |PeriodActive|, |Scenario|)``. Multi-dimensional
+    sets such as ``GeneratorsOfNode`` span a single axis.
+
+    :param instance: Pyomo model instance.
+    """
+
+    def __init__(self, instance):
+        self.instance = instance
+        self._arrays = {}
+        self._duals = {}
+        self._positions = {}
+
+    def elements(self, set_name: str) -> list:
+        """
+        Elements of a set in model order.
+
+        :param set_name: Name of the set component, e.g. 'Node'.
+        :return: List of set elements.
+        """
+        return list(getattr(self.instance, set_name))
+
+    def positions(self, set_name: str) -> dict:
+        """
+        Map from set element to its position along an array axis.
+
+        :param set_name: Name of the set component, e.g. 'GeneratorsOfNode'.
+        :return: Dictionary element -> position.
+        """
+        if set_name not in self._positions:
+            self._positions[set_name] = {e: p for p, e in enumerate(self.elements(set_name))}
+        return self._positions[set_name]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Values of a variable or parameter.
+
+        Arrays hold float64 values, unless a component holds non-float values (e.g. integers
+        from input data), in which case an object array keeps the original Python numbers.
+
+        :param name: Name of the variable or parameter component.
+        :return: Array of values.
+        """
+        if name not in self._arrays:
+            component = getattr(self.instance, name)
+            if component.ctype is Var:
+                # Variables a reduced model does not construct are zero
+                self._arrays[name] = self._extract(component, lambda v: v.value, fill=0.0)
+            else:
+                self._arrays[name] = self._extract(component, _param_value)
+        return self._arrays[name]
+
+    def dual(self, name: str) -> np.ndarray:
+        """
+        Dual values of an indexed constraint, read from the instance's dual suffix.
+
+        :param name: Name of the constraint component, e.g. 'FlowBalance'.
+        :return: Array of dual values.
+        """
+        if name not in self._duals:
+            suffix = self.instance.dual
+            self._duals[name] = self._extract(getattr(self.instance, name), lambda c: suffix[c])
+        return self._duals[name]
+
+    def _extract(self, component, getter, fill=np.nan) -> np.ndarray:
+        if not component.is_indexed():
+            return _as_array([getter(component)]).reshape(())
+
+        subsets = list(component.index_set().subsets())
+        shape = tuple(len(s) for s in subsets)
+
+        if len(component) == prod(shape):
+            # Dense components iterate in the (ordered) product order of their index sets.
+            return _as_array([getter(v) for v in component.values()]).reshape(shape)
+
+        positions = [self.positions(s.local_name) for s in subsets]
+        dimens = [s.dimen for s in subsets]
+        array = np.full(shape, fill, dtype=object)
+        for key, v in component.items():
+            key = key if isinstance(key, tuple) else (key,)
+            pos, start = [], 0
+            for p, d in zip(positions, dimens):
+                pos.append(p[key[start] if d == 1 else key[start : start + d]])
+                start += d
+            array[tuple(pos)] = getter(v)
+        return _as_array(array.ravel().tolist()).reshape(shape)
+
+
+def _param_value(v):
+    return v if v.__class__ in native_numeric_types else value(v)
+
+
+def _as_array(values: list) -> np.ndarray:
+    if all(v.__class__ is float for v in values):
+        return np.array(values, dtype=float)
+    return np.array(values, dtype=object)
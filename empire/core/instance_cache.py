@@ -0,0 +1,85 @@
+"""
+Cache of constructed model instances for repeated builds.
+
+Runs that only differ in their operational scenarios, such as the in-sample and
+out-of-sample runs of the stability tests, build the same instance apart from the
+stochastic parameters. The cache stores the constructed instance under a hash of all other
+input data and the structural settings of the run. On a hit the stored instance is read
+back and only the stochastic parameters are updated, after which the parameters derived
+from them are rebuilt by the caller.
+"""
+import hashlib
+import logging
+from pathlib import Path
+
+import cloudpickle
+import pyomo
+from pyomo.environ import DataPortal
+
+from empire.core.file_cache import FileCache
+
+logger = logging.getLogger(__name__)
+
+# Mutable parameters read from the scenario files. All other data is part of the cache key.
+STOCHASTIC_PARAMS = ["maxRegHydroGenRaw", "genCapAvailStochRaw", "sloadRaw", "sloadMod"]
+
+# The code that builds the instance is part of the key, so a cached instance is not reused after
+# it changes: the model formulation, the input readers and the parameters derived before the build.
+MODEL_FILES = tuple(Path(__file__).with_name(name) for name in [
+    "empire.py", "reader.py", "input_data.py", "derived_params.py", "model_reduction.py", "lean_build.py",
+    "instance_cache.py",
+])
+# Increase to invalidate the cached instances after a change that the files above do not show,
+# e.g. of how the instance is pickled.
+CACHE_VERSION = 1
+
+
+class InstanceCache(FileCache):
+    """
+    Directory of constructed model instances, keyed on everything but the stochastic data.
+    """
+
+    pickler = cloudpickle
+
+    @staticmethod
+    def key(data: DataPortal, **settings) -> str:
+        """
+        Key of the instance built from the given data.
+
+        :param data: DataPortal with the data the instance is created from.
+        :param settings: Settings of the run that change the structure of the model, e.g. the
+            sets of periods, scenarios and hours, and which modules are used.
+        :return: Hex digest identifying the instance.
+        """
+        digest = hashlib.sha256()
+        digest.update(str(CACHE_VERSION).encode())
+        for path in MODEL_FILES:
+            digest.update(path.read_bytes())
+        digest.update(pyomo.version.version.encode())
+        digest.update(repr(sorted(settings.items())).encode())
+        for name, values in sorted(data.data().items()):
+            if name not in STOCHASTIC_PARAMS:
+                digest.update(repr((name, values)).encode())
+        return digest.hexdigest()
+
+
+def update_stochastic_params(instance, data: DataPortal) -> None:
+    """
+    Set the stochastic parameters of a cached instance to the values in the data.
+
+    Entries that are not in the data are set back to the default of the parameter. The
+    parameters derived from the stochastic parameters are not updated.
+
+    :param instance: Instance read from the cache.
+    :param data: DataPortal with the data of the current run.
+    """
+    loaded = data.data()
+    for name in STOCHASTIC_PARAMS:
+        if not hasattr(instance, name):
+            continue
+        param = getattr(instance, name)
+        values = loaded.get(name, {})
+        default = param.default()
+        param.store_values({index: default for index in param.sparse_keys() if index not in values})
+        param.store_values(values)
+        logger.info("Updated %d values of %s", len(values), name)
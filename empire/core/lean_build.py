@@ -0,0 +1,67 @@
+"""
+Release of the memory a run does not need once the instance is built and solved.
+
+After ``create_instance`` the abstract model and the loaded data are no longer used, and the
+raw stochastic parameters have been turned into the derived parameters the constraints use
+(e.g. ``sloadRaw`` into ``sload``). After a solve, Pyomo keeps a copy of the solution in
+``instance.solutions`` and the duals of every constraint in the dual suffix, while the
+results writers only read the duals of the flow balance and the emission cap. In the lean
+build mode these are released, which lowers the memory a run holds while the model is
+written, solved and its results are written.
+"""
+import gc
+import logging
+
+from empire.core.benders import DUAL_CONSTRAINTS
+from empire.core.instance_cache import STOCHASTIC_PARAMS
+
+logger = logging.getLogger(__name__)
+
+
+def drop_raw_params(instance) -> None:
+    """
+    Delete the raw stochastic parameters of an instance whose derived parameters are built.
+
+    The derived parameters can not be rebuilt afterwards, so the instance can not be updated
+    with other scenarios.
+
+    :param instance: The constructed instance.
+    """
+    for name in STOCHASTIC_PARAMS:
+        if hasattr(instance, name):
+            instance.del_component(name)
+            logger.info("Dropped raw parameter %s", name)
+    gc.collect()
+
+
+def keep_duals(instance, constraints=DUAL_CONSTRAINTS) -> None:
+    """
+    Remove the duals of all but the given constraints from the dual suffix of a solved instance.
+
+    :param instance: The solved instance.
+    :param constraints: Names of the constraints whose duals are kept.
+    """
+    suffix = instance.dual
+    kept = []
+    for name in constraints:
+        component = instance.component(name)
+        if component is None:
+            continue
+        for constraint in component.values():
+            dual = suffix.get(constraint)
+            if dual is not None:
+                kept.append((constraint, dual))
+    suffix.clear()
+    suffix.update(kept)
+
+
+def release_solutions(instance) -> None:
+    """
+    Drop the copy of the solution Pyomo keeps in the instance after loading it.
+
+    The values stay in the variables and the dual suffix.
+
+    :param instance: The solved instance.
+    """
+    instance.solutions.clear()
+    gc.collect()
@@ -0,0 +1,663 @@
+"""
+Matrix-based generation of the EMPIRE linear program.
+
+The Pyomo formulation in ``empire.py`` builds every constraint through a Python rule that
+is called once per index, i.e. once per node, hour, period and scenario for the operational
+constraints. This module assembles the same linear program directly as a sparse matrix:
+each family of constraints is generated with NumPy index arithmetic over whole blocks of
+variables, and the matrix is passed to the solver through its Python API.
+
+The parameters are read from the instance, so the input data and the derived parameters
+are the same as in the Pyomo formulation. The solution can be loaded back into the
+variables and duals of the instance to write the results.
+"""
+import logging
+from pathlib import Path
+
+import numpy as np
+from pyomo.environ import Var, value
+from scipy.sparse import coo_matrix
+
+from empire.core.instance_arrays import InstanceArrays
+
+logger = logging.getLogger(__name__)
+
+# First stage decisions, with the names of their index columns.
+FIRST_STAGE_VARIABLES = {
+    "genInvCap": ["Node", "Generator", "Period"],
+    "transmisionInvCap": ["FromNode", "ToNode", "Period"],
+    "storPWInvCap": ["Node", "Storage", "Period"],
+    "storENInvCap": ["Node", "Storage", "Period"],
+    "genInstalledCap": ["Node", "Generator", "Period"],
+    "transmissionInstalledCap": ["FromNode", "ToNode", "Period"],
+    "storPWInstalledCap": ["Node", "Storage", "Period"],
+    "storENInstalledCap": ["Node", "Storage", "Period"],
+}
+
+
+class LinearProgram:
+    """
+    Linear program ``min c'x  s.t.  row_lower <= Ax <= row_upper,  col_lower <= x <= col_upper``.
+
+    Variables and constraints are added in blocks. A block of variables is returned as an
+    array of column numbers with one axis per factor set of its index, so the columns of a
+    term can be selected and broadcast with NumPy indexing. Coefficients are collected in
+    coordinate format, and repeated entries of the same row and column are summed.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.constraints = {}
+        self.n_cols = 0
+        self.n_rows = 0
+        self._col_lower = []
+        self._col_upper = []
+        self._row_lower = []
+        self._row_upper = []
+        self._rows = []
+        self._cols = []
+        self._coefs = []
+        self._objective_cols = []
+        self._objective_coefs = []
+
+    def add_variables(self, name: str, index: list[list], lower=0.0, upper=np.inf) -> np.ndarray:
+        """
+        Add a block of variables.
+
+        :param name: Name of the block, e.g. 'genOperational'.
+        :param index: Elements of every factor set of the index, in order.
+        :param lower: Lower bounds, broadcastable to the shape of the block.
+        :param upper: Upper bounds, broadcastable to the shape of the block.
+        :return: Column numbers of the variables, with one axis per factor set.
+        """
+        shape = tuple(len(elements) for elements in index)
+        size = int(np.prod(shape))
+        cols = np.arange(self.n_cols, self.n_cols + size).reshape(shape)
+        self.variables[name] = (cols, index)
+        self._col_lower.append(np.broadcast_to(np.asarray(lower, dtype=float), shape).ravel())
+        self._col_upper.append(np.broadcast_to(np.asarray(upper, dtype=float), shape).ravel())
+        self.n_cols += size
+        return cols
+
+    def add_constraints(self, name: str, shape: tuple, lower=-np.inf, upper=np.inf) -> np.ndarray:
+        """
+        Add a block of constraints without coefficients.
+
+        :param name: Name of the block, e.g. 'FlowBalance'.
+        :param shape: Shape of the block.
+        :param lower: Lower bounds of the rows, broadcastable to the shape.
+        :param upper: Upper bounds of the rows, broadcastable to the shape.
+        :return: Row numbers of the constraints.
+        """
+        size = int(np.prod(shape))
+        rows = np.arange(self.n_rows, self.n_rows + size).reshape(shape)
+        self.constraints[name] = rows
+        self._row_lower.append(np.broadcast_to(np.asarray(lower, dtype=float), shape).ravel())
+        self._row_upper.append(np.broadcast_to(np.asarray(upper, dtype=float), shape).ravel())
+        self.n_rows += size
+        return rows
+
+    def add_terms(self, rows, cols, coefs) -> None:
+        """
+        Add coefficients to the constraint matrix. The arguments are broadcast against each other.
+
+        :param rows: Row numbers.
+        :param cols: Column numbers.
+        :param coefs: Coefficients.
+        """
+        rows, cols, coefs = np.broadcast_arrays(rows, cols, np.asarray(coefs, dtype=float))
+        nonzero = coefs != 0
+        self._rows.append(rows[nonzero])
+        self._cols.append(cols[nonzero])
+        self._coefs.append(coefs[nonzero])
+
+    def add_objective(self, cols, coefs) -> None:
+        """
+        Add coefficients to the objective. The arguments are broadcast against each other.
+
+        :param cols: Column numbers.
+        :param coefs: Coefficients.
+        """
+        cols, coefs = np.broadcast_arrays(cols, np.asarray(coefs, dtype=float))
+        self._objective_cols.append(cols.ravel())
+        self._objective_coefs.append(coefs.ravel())
+
+    @property
+    def objective(self) -> np.ndarray:
+        c = np.zeros(self.n_cols)
+        for cols, coefs in zip(self._objective_cols, self._objective_coefs):
+            np.add.at(c, cols, coefs)
+        return c
+
+    @property
+    def col_lower(self) -> np.ndarray:
+        return np.concatenate(self._col_lower)
+
+    @property
+    def col_upper(self) -> np.ndarray:
+        return np.concatenate(self._col_upper)
+
+    @property
+    def row_lower(self) -> np.ndarray:
+        return np.concatenate(self._row_lower)
+
+    @property
+    def row_upper(self) -> np.ndarray:
+        return np.concatenate(self._row_upper)
+
+    def matrix(self) -> coo_matrix:
+        """
+        Constraint matrix, with repeated entries summed.
+
+        :return: Sparse matrix of shape (number of rows, number of columns).
+        """
+        matrix = coo_matrix(
+            (np.concatenate(self._coefs), (np.concatenate(self._rows), np.concatenate(self._cols))),
+            shape=(self.n_rows, self.n_cols),
+        )
+        matrix.sum_duplicates()
+        return matrix
+
+    def set_bounds(self, name: str, lower, upper) -> None:
+        """
+        Replace the bounds of a block of variables.
+
+        :param name: Name of the block.
+        :param lower: Lower bounds, broadcastable to the shape of the block.
+        :param upper: Upper bounds, broadcastable to the shape of the block.
+        """
+        cols, _ = self.variables[name]
+        block = list(self.variables).index(name)
+        self._col_lower[block] = np.broadcast_to(np.asarray(lower, dtype=float), cols.shape).ravel()
+        self._col_upper[block] = np.broadcast_to(np.asarray(upper, dtype=float), cols.shape).ravel()
+
+    def values(self, name: str, x: np.ndarray) -> np.ndarray:
+        """
+        Values of a block of variables in a solution.
+
+        :param name: Name of the block.
+        :param x: Values of all columns.
+        :return: Values with the shape of the block.
+        """
+        cols, _ = self.variables[name]
+        return x[cols]
+
+
+class MatrixSolution:
+    """
+    Solution of a :class:`LinearProgram`.
+
+    :param objective: Objective value.
+    :param x: Values of the columns.
+    :param duals: Dual values of the rows.
+    :param basis: Basis of the solution in the format of the solver, if the solver returned one. It
+        can warm start a solve of a program with the same rows and columns.
+    :param statistics: Statistics reported by the solver, e.g. the number of iterations.
+    """
+
+    def __init__(self, objective: float, x: np.ndarray, duals: np.ndarray, basis=None,
+                 statistics: dict | None = None):
+        self.objective = objective
+        self.x = x
+        self.duals = duals
+        self.basis = basis
+        self.statistics = statistics or {}
+
+
+def _values(arrays: InstanceArrays, name: str) -> np.ndarray:
+    return np.asarray(arrays[name], dtype=float)
+
+
+def _lifetime_start(periods: np.ndarray, lifetime: np.ndarray, leap_years: int, exact: bool) -> np.ndarray:
+    # First period whose investments are still alive in each period, for every element (element, period).
+    # The storage and transmission rules test the lifetime as lifetime*(1/leap_years).
+    if exact:
+        condition = 1 + periods[None, :] - (lifetime / leap_years)[:, None]
+    else:
+        condition = 1 + periods[None, :] - (lifetime * (1 / leap_years))[:, None]
+    return np.where(condition > 1, 1 + periods[None, :] - (lifetime / leap_years)[:, None], 1)
+
+
+def _add_lifetime_constraints(lp: LinearProgram, name: str, inv: np.ndarray, installed: np.ndarray,
+                              init: np.ndarray, start: np.ndarray, periods: np.ndarray) -> None:
+    rows = lp.add_constraints(name, installed.shape, lower=-init, upper=-init)
+    alive = (periods[None, None, :] >= start[:, :, None]) & (periods[None, None, :] <= periods[None, :, None])
+    element, period, invested = np.nonzero(alive)
+    lp.add_terms(rows[element, period], inv[element, invested], 1.0)
+    lp.add_terms(rows, installed, -1.0)
+
+
+def _add_group_constraints(lp: LinearProgram, name: str, groups: list[list[int]], cols: np.ndarray,
+                           upper: np.ndarray) -> None:
+    # One row per group and period on the sum of the columns of the members of the group.
+    members = [(g, k) for g, group in enumerate(groups) for k in group]
+    rows = lp.add_constraints(name, upper.shape, upper=upper)
+    if members:
+        group_idx, member_idx = (np.array(a) for a in zip(*members))
+        lp.add_terms(rows[group_idx], cols[member_idx], 1.0)
+
+
+def build_matrix_model(instance, out_of_sample: bool = False, emission_cap: bool = True,
+                       north_sea: bool = True) -> LinearProgram:
+    """
+    Generate the EMPIRE linear program from the sets and parameters of an instance.
+
+    The program has the same variables, constraints and objective as the Pyomo formulation.
+    Constraints without variables, which the Pyomo formulation only checks for feasibility,
+    are left out.
+
+    :param instance: Instance with the sets and (derived) parameters constructed.
+    :param out_of_sample: If true, the investment decisions are fixed to the parameter values of the instance.
+    :param emission_cap: If true, the emissions of every period and scenario are capped.
+    :param north_sea: If true, the transmission from offshore nodes is limited by the installed generation.
+    :return: The linear program.
+    """
+    arrays = InstanceArrays(instance)
+    lp = LinearProgram()
+
+    nodes = arrays.elements("Node")
+    gen_of_node = arrays.elements("GeneratorsOfNode")
+    stor_of_node = arrays.elements("StoragesOfNode")
+    links = arrays.elements("DirectionalLink")
+    arcs = arrays.elements("BidirectionalArc")
+    hours = arrays.elements("Operationalhour")
+    periods = arrays.elements("PeriodActive")
+    scenarios = arrays.elements("Scenario")
+    seasons = arrays.elements("Season")
+    H, P, W = len(hours), len(periods), len(scenarios)
+
+    node_pos = arrays.positions("Node")
+    gen_pos = arrays.positions("GeneratorsOfNode")
+    hour_pos = arrays.positions("Operationalhour")
+    link_pos = arrays.positions("DirectionalLink")
+    arc_pos = arrays.positions("BidirectionalArc")
+    generator_pos = arrays.positions("Generator")
+    storage_pos = arrays.positions("Storage")
+    period_idx = [arrays.positions("Period")[i] for i in periods]
+    period_values = np.array(periods, dtype=float)
+
+    gen_node = np.array([node_pos[n] for (n, g) in gen_of_node], dtype=int)
+    gen_type = np.array([generator_pos[g] for (n, g) in gen_of_node], dtype=int)
+    stor_node = np.array([node_pos[n] for (n, b) in stor_of_node], dtype=int)
+    stor_type = np.array([storage_pos[b] for (n, b) in stor_of_node], dtype=int)
+
+    hours_of_season = arrays.elements("HoursOfSeason")
+    season_pos = arrays.positions("Season")
+    hs_hour = np.array([hour_pos[h] for (s, h) in hours_of_season], dtype=int)
+    hs_season = np.array([season_pos[s] for (s, h) in hours_of_season], dtype=int)
+    seas_scale = _values(arrays, "seasScale")
+    sce_probab = _values(arrays, "sceProbab")
+    # Sum of the season scales of every hour, as hours are summed over (season, hour) pairs.
+    hour_weight = np.zeros(H)
+    np.add.at(hour_weight, hs_hour, seas_scale[hs_season])
+
+    first_hours_reg = set(arrays.elements("FirstHoursOfRegSeason"))
+    first_hours_peak = set(arrays.elements("FirstHoursOfPeakSeason"))
+    first = np.array([hour_pos[h] for h in hours if h in first_hours_reg or h in first_hours_peak], dtype=int)
+    later = np.array([hour_pos[h] for h in hours if h not in first_hours_reg and h not in first_hours_peak], dtype=int)
+    previous = np.array([hour_pos[h - 1] for h in hours if h not in first_hours_reg and h not in first_hours_peak],
+                        dtype=int)
+
+    ###########
+    # Variables
+    ###########
+
+    first_stage = {
+        "genInvCap": gen_of_node,
+        "transmisionInvCap": arcs,
+        "storPWInvCap": stor_of_node,
+        "storENInvCap": stor_of_node,
+        "genInstalledCap": gen_of_node,
+        "transmissionInstalledCap": arcs,
+        "storPWInstalledCap": stor_of_node,
+        "storENInstalledCap": stor_of_node,
+    }
+    cols = {}
+    for name, elements in first_stage.items():
+        if out_of_sample:
+            fixed = _values(arrays, name)
+            cols[name] = lp.add_variables(name, [elements, periods], lower=fixed, upper=fixed)
+        else:
+            cols[name] = lp.add_variables(name, [elements, periods])
+    gen_inv, trans_inv = cols["genInvCap"], cols["transmisionInvCap"]
+    stor_pw_inv, stor_en_inv = cols["storPWInvCap"], cols["storENInvCap"]
+    gen_inst, trans_inst = cols["genInstalledCap"], cols["transmissionInstalledCap"]
+    stor_pw_inst, stor_en_inst = cols["storPWInstalledCap"], cols["storENInstalledCap"]
+
+    gen_op = lp.add_variables("genOperational", [gen_of_node, hours, periods, scenarios])
+    stor_op = lp.add_variables("storOperational", [stor_of_node, hours, periods, scenarios])
+    flow = lp.add_variables("transmisionOperational", [links, hours, periods, scenarios])
+    charge = lp.add_variables("storCharge", [stor_of_node, hours, periods, scenarios])
+    discharge = lp.add_variables("storDischarge", [stor_of_node, hours, periods, scenarios])
+    shed = lp.add_variables("loadShed", [nodes, hours, periods, scenarios])
+
+    ###########
+    # Objective
+    ###########
+
+    discount_rate = value(instance.discountrate)
+    leap_years = value(instance.LeapYearsInvestment)
+    discount = np.array([1 if i <= 1 else pow(1.0 + discount_rate, -leap_years * (int(i) - 1)) for i in periods])
+    operational_discount = value(instance.operationalDiscountrate)
+    # (hour, scenario)
+    operational_weight = operational_discount * hour_weight[:, None] * sce_probab[None, :]
+
+    lp.add_objective(gen_inv, discount[None, :] * _values(arrays, "genInvCost")[gen_type][:, period_idx])
+    lp.add_objective(trans_inv, discount[None, :] * _values(arrays, "transmissionInvCost")[:, period_idx])
+    lp.add_objective(stor_pw_inv, discount[None, :] * _values(arrays, "storPWInvCost")[stor_type][:, period_idx])
+    lp.add_objective(stor_en_inv, discount[None, :] * _values(arrays, "storENInvCost")[stor_type][:, period_idx])
+    lost_load_cost = _values(arrays, "nodeLostLoadCost")[:, period_idx]
+    lp.add_objective(shed, discount[None, None, :, None] * operational_weight[None, :, None, :]
+                     * lost_load_cost[:, None, :, None])
+    marginal_cost = _values(arrays, "genMargCost")[gen_type][:, period_idx]
+    lp.add_objective(gen_op, discount[None, None, :, None] * operational_weight[None, :, None, :]
+                     * marginal_cost[:, None, :, None])
+
+    #############
+    # Constraints
+    #############
+
+    sload = _values(arrays, "sload")[:, :, period_idx, :]
+    rows = lp.add_constraints("FlowBalance", shed.shape, lower=sload, upper=sload)
+    lp.add_terms(rows[gen_node], gen_op, 1.0)
+    discharge_eff = _values(arrays, "storageDischargeEff")[stor_type]
+    lp.add_terms(rows[stor_node], discharge, discharge_eff[:, None, None, None])
+    lp.add_terms(rows[stor_node], charge, -1.0)
+    # Every link (n1, n2) brings the flow into n2 and the flow of the reverse link out of n2.
+    link_to = np.array([node_pos[n2] for (n1, n2) in links], dtype=int)
+    reverse = np.array([link_pos[(n2, n1)] for (n1, n2) in links], dtype=int)
+    line_eff = _values(arrays, "lineEfficiency")
+    lp.add_terms(rows[link_to], flow, line_eff[:, None, None, None])
+    lp.add_terms(rows[link_to], flow[reverse], -1.0)
+    lp.add_terms(rows, shed, 1.0)
+
+    gen_cap_avail = _values(arrays, "genCapAvail")[:, :, :, period_idx].transpose(0, 1, 3, 2)
+    rows = lp.add_constraints("maxGenProduction", gen_op.shape, upper=0.0)
+    lp.add_terms(rows, gen_op, 1.0)
+    lp.add_terms(rows, gen_inst[:, None, :, None], -gen_cap_avail)
+
+    thermal_pos = arrays.positions("ThermalGenerators")
+    thermal = np.array([k for k, (n, g) in enumerate(gen_of_node) if g in thermal_pos], dtype=int)
+    ramp_rate = _values(arrays, "genRampUpCap")[[thermal_pos[gen_of_node[k][1]] for k in thermal]]
+    rows = lp.add_constraints("ramping", (len(thermal), len(later), P, W), upper=0.0)
+    lp.add_terms(rows, gen_op[thermal[:, None], later], 1.0)
+    lp.add_terms(rows, gen_op[thermal[:, None], previous], -1.0)
+    lp.add_terms(rows, gen_inst[thermal][:, None, :, None], -ramp_rate[:, None, None, None])
+
+    charge_eff = _values(arrays, "storageChargeEff")[stor_type]
+    bleed_eff = _values(arrays, "storageBleedEff")[stor_type]
+    stor_init = _values(arrays, "storOperationalInit")[stor_type]
+    rows = lp.add_constraints("storage_energy_balance", stor_op.shape, lower=0.0, upper=0.0)
+    lp.add_terms(rows[:, first], stor_en_inst[:, None, :, None], stor_init[:, None, None, None])
+    lp.add_terms(rows[:, later], stor_op[:, previous], bleed_eff[:, None, None, None])
+    lp.add_terms(rows, charge, charge_eff[:, None, None, None])
+    lp.add_terms(rows, discharge, -1.0)
+    lp.add_terms(rows, stor_op, -1.0)
+
+    length_reg_season = value(instance.lengthRegSeason)
+    length_peak_season = value(instance.lengthPeakSeason)
+    season_end = []
+    for h in hours:
+        if h in first_hours_reg:
+            season_end.append(hour_pos[h + length_reg_season - 1])
+        elif h in first_hours_peak:
+            season_end.append(hour_pos[h + length_peak_season - 1])
+    season_end = np.array(season_end, dtype=int)
+    rows = lp.add_constraints("storage_seasonal_net_zero_balance", (len(stor_of_node), len(season_end), P, W),
+                              lower=0.0, upper=0.0)
+    lp.add_terms(rows, stor_op[:, season_end], 1.0)
+    lp.add_terms(rows, stor_en_inst[:, None, :, None], -stor_init[:, None, None, None])
+
+    rows = lp.add_constraints("storage_operational_cap", stor_op.shape, upper=0.0)
+    lp.add_terms(rows, stor_op, 1.0)
+    lp.add_terms(rows, stor_en_inst[:, None, :, None], -1.0)
+
+    disc_to_char_ratio = _values(arrays, "storageDiscToCharRatio")[stor_type]
+    rows = lp.add_constraints("storage_power_discharg_cap", discharge.shape, upper=0.0)
+    lp.add_terms(rows, discharge, 1.0)
+    lp.add_terms(rows, stor_pw_inst[:, None, :, None], -disc_to_char_ratio[:, None, None, None])
+
+    rows = lp.add_constraints("storage_power_charg_cap", charge.shape, upper=0.0)
+    lp.add_terms(rows, charge, 1.0)
+    lp.add_terms(rows, stor_pw_inst[:, None, :, None], -1.0)
+
+    reg_hydro = set(arrays.elements("RegHydroGenerator"))
+    reg_hydro_gens = np.array([k for k, (n, g) in enumerate(gen_of_node) if g in reg_hydro], dtype=int)
+    # (generator of node, season, period, scenario)
+    max_reg_hydro = _values(arrays, "maxRegHydroGen")[gen_node[reg_hydro_gens]][:, period_idx].transpose(0, 2, 1, 3)
+    rows = lp.add_constraints("hydro_gen_limit", (len(reg_hydro_gens), len(seasons), P, W), upper=max_reg_hydro)
+    lp.add_terms(rows[:, hs_season], gen_op[reg_hydro_gens[:, None], hs_hour], 1.0)
+
+    hydro = set(arrays.elements("HydroGenerator"))
+    hydro_gens = np.array([k for k, (n, g) in enumerate(gen_of_node) if g in hydro], dtype=int)
+    hydro_nodes = sorted(set(gen_node[hydro_gens].tolist()))
+    hydro_row = {n: r for r, n in enumerate(hydro_nodes)}
+    max_hydro_node = _values(arrays, "maxHydroNode")[hydro_nodes]
+    rows = lp.add_constraints("hydro_node_limit", (len(hydro_nodes), P), upper=max_hydro_node[:, None])
+    hydro_gen_rows = rows[[hydro_row[n] for n in gen_node[hydro_gens]]]
+    lp.add_terms(hydro_gen_rows[:, None, :, None], gen_op[hydro_gens[:, None], hs_hour],
+                 seas_scale[hs_season][None, :, None, None] * sce_probab[None, None, None, :])
+
+    capped_links, link_arcs = [], []
+    for a, (n1, n2) in enumerate(links):
+        if (n1, n2) in arc_pos:
+            capped_links.append(a)
+            link_arcs.append(arc_pos[(n1, n2)])
+        elif (n2, n1) in arc_pos:
+            capped_links.append(a)
+            link_arcs.append(arc_pos[(n2, n1)])
+    capped_links = np.array(capped_links, dtype=int)
+    rows = lp.add_constraints("transmission_cap", (len(capped_links), H, P, W), upper=0.0)
+    lp.add_terms(rows, flow[capped_links], 1.0)
+    lp.add_terms(rows, trans_inst[link_arcs][:, None, :, None], -1.0)
+
+    if north_sea:
+        offshore = set(arrays.elements("OffshoreNode"))
+        # Both directions of an arc with an offshore end, limited by the generation of the
+        # offshore node (the first node of the direction if both ends are offshore).
+        farm_arcs, farm_nodes = [], []
+        for a, (n1, n2) in enumerate(arcs):
+            for (m1, m2) in ((n1, n2), (n2, n1)):
+                if m1 in offshore or m2 in offshore:
+                    farm_arcs.append(a)
+                    farm_nodes.append(m1 if m1 in offshore else m2)
+        rows = lp.add_constraints("wind_farm_transmission_cap", (len(farm_arcs), P), upper=0.0)
+        lp.add_terms(rows, trans_inst[farm_arcs], 1.0)
+        farm_gens = [(r, gen_pos[n, g]) for r, n in enumerate(farm_nodes) for g in instance.GeneratorsAtNode[n]]
+        if farm_gens:
+            farm_rows, farm_gen_idx = (np.array(a) for a in zip(*farm_gens))
+            lp.add_terms(rows[farm_rows], gen_inst[farm_gen_idx], -1.0)
+
+    if emission_cap:
+        co2_factor = _values(arrays, "genCO2TypeFactor")[gen_type]
+        gen_eff = _values(arrays, "genEfficiency")[gen_type][:, period_idx]
+        # (generator of node, hour, period)
+        emission = hour_weight[None, :, None] * co2_factor[:, None, None] * (3.6 / gen_eff)[:, None, :] / 1000000
+        rows = lp.add_constraints("emission_cap", (P, W), upper=_values(arrays, "CO2cap")[period_idx][:, None])
+        lp.add_terms(rows[None, None, :, :], gen_op, emission[:, :, :, None])
+
+    if not out_of_sample:
+        gen_lifetime = _values(arrays, "genLifetime")[gen_type]
+        stor_lifetime = _values(arrays, "storageLifetime")[stor_type]
+        trans_lifetime = _values(arrays, "transmissionLifetime")
+        _add_lifetime_constraints(lp, "installedCapDefinitionGen", gen_inv, gen_inst,
+                                  _values(arrays, "genInitCap")[:, period_idx],
+                                  _lifetime_start(period_values, gen_lifetime, leap_years, exact=True), period_values)
+        stor_start = _lifetime_start(period_values, stor_lifetime, leap_years, exact=False)
+        _add_lifetime_constraints(lp, "installedCapDefinitionStorEN", stor_en_inv, stor_en_inst,
+                                  _values(arrays, "storENInitCap")[:, period_idx], stor_start, period_values)
+        _add_lifetime_constraints(lp, "installedCapDefinitionStorPOW", stor_pw_inv, stor_pw_inst,
+                                  _values(arrays, "storPWInitCap")[:, period_idx], stor_start, period_values)
+        _add_lifetime_constraints(lp, "installedCapDefinitionTrans", trans_inv, trans_inst,
+                                  _values(arrays, "transmissionInitCap")[:, period_idx],
+                                  _lifetime_start(period_values, trans_lifetime, leap_years, exact=False),
+                                  period_values)
+
+        # Generators of every (technology, node), leaving out the pairs without generators.
+        technology_pos = arrays.positions("Technology")
+        groups, group_node, group_technology = [], [], []
+        for t in arrays.elements("Technology"):
+            for n in nodes:
+                group = [gen_pos[n, g] for g in instance.GeneratorsOfTechnologyAtNode[t, n]]
+                if group:
+                    groups.append(group)
+                    group_node.append(node_pos[n])
+                    group_technology.append(technology_pos[t])
+        max_built = _values(arrays, "genMaxBuiltCap")[group_node, group_technology][:, period_idx]
+        _add_group_constraints(lp, "investment_gen_cap", groups, gen_inv, max_built.reshape(len(groups), P))
+        max_installed = _values(arrays, "genMaxInstalledCap")[group_node, group_technology][:, period_idx]
+        _add_group_constraints(lp, "installed_gen_cap", groups, gen_inst, max_installed.reshape(len(groups), P))
+
+        for name, var, bound in [
+            ("investment_trans_cap", trans_inv, "transmissionMaxBuiltCap"),
+            ("investment_storage_power_cap", stor_pw_inv, "storPWMaxBuiltCap"),
+            ("investment_storage_energy_cap", stor_en_inv, "storENMaxBuiltCap"),
+            ("installed_trans_cap", trans_inst, "transmissionMaxInstalledCap"),
+            ("installed_storage_power_cap", stor_pw_inst, "storPWMaxInstalledCap"),
+            ("installed_storage_energy_cap", stor_en_inst, "storENMaxInstalledCap"),
+        ]:
+            rows = lp.add_constraints(name, var.shape, upper=_values(arrays, bound)[:, period_idx])
+            lp.add_terms(rows, var, 1.0)
+
+        dependent_pos = arrays.positions("DependentStorage")
+        dependent = np.array([k for k, (n, b) in enumerate(stor_of_node) if b in dependent_pos], dtype=int)
+        pow_to_energy = _values(arrays, "storagePowToEnergy")[[dependent_pos[stor_of_node[k][1]] for k in dependent]]
+        rows = lp.add_constraints("power_energy_relate", (len(dependent), P), lower=0.0, upper=0.0)
+        lp.add_terms(rows, stor_pw_inst[dependent], 1.0)
+        lp.add_terms(rows, stor_en_inst[dependent], -pow_to_energy[:, None])
+
+    logger.info("Generated matrix model with %d variables, %d constraints", lp.n_cols, lp.n_rows)
+    return lp
+
+
+def _solve_highs(lp: LinearProgram, logfile: Path | None, basis=None) -> MatrixSolution:
+    import highspy
+
+    matrix = lp.matrix().tocsc()
+    model = highspy.HighsLp()
+    model.num_col_ = lp.n_cols
+    model.num_row_ = lp.n_rows
+    model.col_cost_ = lp.objective
+    model.col_lower_ = lp.col_lower
+    model.col_upper_ = lp.col_upper
+    model.row_lower_ = lp.row_lower
+    model.row_upper_ = lp.row_upper
+    model.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    model.a_matrix_.start_ = matrix.indptr
+    model.a_matrix_.index_ = matrix.indices
+    model.a_matrix_.value_ = matrix.data
+
+    highs = highspy.Highs()
+    if logfile is not None:
+        highs.setOptionValue("log_file", str(logfile))
+    highs.passModel(model)
+    if basis is not None:
+        highs.setBasis(basis)
+    highs.run()
+    status = highs.getModelStatus()
+    if status != highspy.HighsModelStatus.kOptimal:
+        raise RuntimeError(f"HiGHS did not find an optimal solution: {highs.modelStatusToString(status)}")
+    solution = highs.getSolution()
+    info = highs.getInfo()
+    statistics = {
+        "nonzeros": matrix.nnz,
+        "simplex_iterations": info.simplex_iteration_count,
+        "ipm_iterations": info.ipm_iteration_count,
+        "crossover_iterations": info.crossover_iteration_count,
+        "time": highs.getRunTime(),
+    }
+    return MatrixSolution(info.objective_function_value, np.array(solution.col_value),
+                          np.array(solution.row_dual), highs.getBasis(), statistics)
+
+
+def _solve_gurobi(lp: LinearProgram, logfile: Path | None) -> MatrixSolution:
+    import gurobipy as gp
+
+    model = gp.Model()
+    if logfile is not None:
+        model.Params.LogFile = str(logfile)
+    model.Params.Crossover = 0
+    model.Params.Method = 2
+    x = model.addMVar(lp.n_cols, lb=lp.col_lower, ub=lp.col_upper, obj=lp.objective)
+    # The rows are either equalities or upper bounded.
+    row_lower, row_upper = lp.row_lower, lp.row_upper
+    sense = np.where(row_lower == row_upper, gp.GRB.EQUAL, gp.GRB.LESS_EQUAL)
+    constraints = model.addMConstr(lp.matrix().tocsr(), x, sense, row_upper)
+    model.optimize()
+    if model.Status != gp.GRB.OPTIMAL:
+        raise RuntimeError(f"Gurobi did not find an optimal solution, status {model.Status}")
+    statistics = {
+        "nonzeros": model.NumNZs,
+        "simplex_iterations": int(model.IterCount),
+        "ipm_iterations": model.BarIterCount,
+        "time": model.Runtime,
+    }
+    return MatrixSolution(model.ObjVal, x.X, np.array(constraints.Pi), statistics=statistics)
+
+
+def solve_matrix_model(lp: LinearProgram, solver: str, logfile: Path | None = None, basis=None) -> MatrixSolution:
+    """
+    Pass the linear program to a solver through its matrix API and solve it.
+
+    Gurobi is used through gurobipy. All other solvers are replaced by HiGHS through highspy,
+    as their Python APIs do not take the matrix directly. HiGHS returns the optimal basis, from
+    which the simplex method can start when a program with the same rows and columns is solved.
+    Gurobi solves with the barrier method without crossover, so it has no basis to start from.
+
+    :param lp: The linear program.
+    :param solver: Name of the solver. Options: "CPLEX", "Xpress", "Gurobi", "GLPK", "HiGHS".
+    :param logfile: File for the solver log.
+    :param basis: Basis of an earlier solution to warm start from, see :class:`MatrixSolution`.
+    :return: The optimal solution.
+    :raises RuntimeError: If no optimal solution is found.
+    """
+    if solver == "Gurobi":
+        return _solve_gurobi(lp, logfile)
+    logger.info("Solving matrix model with HiGHS")
+    return _solve_highs(lp, logfile, basis)
+
+
+class MatrixModelSolver:
+    """
+    Solves the linear program of an instance in place of a Pyomo solver object.
+
+    The solution is loaded into the variables and the dual suffix of the instance, so the
+    results are written as for an instance solved by Pyomo. Variables fixed in the instance,
+    e.g. the investments for the resolve for the operational duals, are fixed in the linear
+    program. Each solve starts from scratch, as the basis of the previous solution stays optimal
+    when variables are fixed at its values and would give the same duals.
+
+    :param lp: The linear program generated from the instance.
+    :param solver: Name of the solver, see :func:`solve_matrix_model`.
+    """
+
+    def __init__(self, lp: LinearProgram, solver: str):
+        self.lp = lp
+        self.solver = solver
+        self.solution = None
+
+    def solve(self, instance, logfile: Path | None = None, **_) -> MatrixSolution:
+        """
+        Solve the linear program and load the solution into the instance.
+
+        :param instance: Instance the linear program was generated from.
+        :param logfile: File for the solver log.
+        :return: The optimal solution.
+        """
+        from empire.core.benders import load_solution
+
+        col_lower, col_upper = self.lp.col_lower, self.lp.col_upper
+        for name, (cols, _) in self.lp.variables.items():
+            component = getattr(instance, name)
+            if component.ctype is not Var:
+                continue
+            fixed = np.array([var.fixed for var in component.values()]).reshape(cols.shape)
+            if fixed.any():
+                values = np.array([var.value if var.fixed else np.nan for var in component.values()],
+                                  dtype=float).reshape(cols.shape)
+                self.lp.set_bounds(name, np.where(fixed, values, col_lower[cols]),
+                                   np.where(fixed, values, col_upper[cols]))
+
+        self.solution = solve_matrix_model(self.lp, self.solver, logfile=logfile)
+        load_solution(instance, self.lp, self.solution)
+        return self.solution
@@ -0,0 +1,117 @@
+"""
+Reduction of the model by the generators, lines and storages that can not operate.
+
+A generator whose initial capacity is zero and that can not be built, either because its
+maximum built capacity or its maximum installed capacity is zero in every period, has no
+capacity to produce with. Neither has a generator whose availability is zero in every hour.
+The same holds for a line without initial capacity that can not be built, e.g. a connection
+removed by setting its maximum installed capacity to zero, and for a storage whose power and
+energy capacity can not be built.
+
+These components are found from the input data before the instance is built. Their
+operational variables, which are zero in every solution, and the operational constraints of
+their index are not constructed. The variables are created with a value of zero when the
+results are written, so the result files keep all rows.
+"""
+import logging
+
+import pandas as pd
+from pyomo.environ import DataPortal
+
+from empire.core.derived_params import PortalInput, derive_params
+
+logger = logging.getLogger(__name__)
+
+INERT_SETS = ("InertGeneratorsOfNode", "InertDirectionalLink", "InertStoragesOfNode")
+
+
+def _zero_in_all_periods(inputs, name: str, keys: list[tuple], periods: list) -> set[tuple]:
+    # Keys of a parameter indexed by the keys and the periods that are zero in every period
+    values = inputs.values(name)
+    default = inputs.default(name)
+    return {key for key in keys if all(values.get((*key, i), default) == 0 for i in periods)}
+
+
+def _inert_generators(inputs, periods: list) -> list[tuple]:
+    generators_of_node = inputs.members("GeneratorsOfNode")
+    technology = {g: t for t, g in inputs.members("GeneratorsOfTechnology")}
+    derived, _ = derive_params(inputs, ["genInitCap", "genMaxInstalledCap"])
+
+    no_initial = derived["genInitCap"].eq(0).groupby(level=["Node", "Generator"]).all()
+    no_initial = set(no_initial[no_initial].index)
+    no_limit = derived["genMaxInstalledCap"].eq(0).groupby(level=["Node", "Technology"]).all()
+    node_technologies = list({(n, technology[g]) for n, g in generators_of_node if g in technology})
+    not_buildable = _zero_in_all_periods(inputs, "genMaxBuiltCap", node_technologies, periods) | \
+        set(no_limit[no_limit].index)
+    no_capacity = {(n, g) for n, g in generators_of_node
+                   if (n, g) in no_initial and (n, technology.get(g)) in not_buildable}
+
+    # Generators with an availability of zero by type have the stochastic availability
+    by_type = inputs.values("genCapAvailTypeRaw")
+    type_default = inputs.default("genCapAvailTypeRaw")
+    stochastic = pd.Series(inputs.values("genCapAvailStochRaw"), dtype=float)
+    if stochastic.empty:
+        available = set()
+    else:
+        nonzero = (stochastic != 0).groupby(level=[0, 1]).any()
+        available = set(nonzero[nonzero].index)
+    unavailable = {(n, g) for n, g in generators_of_node
+                   if by_type.get(g, type_default) == 0 and (n, g) not in available}
+
+    return [key for key in generators_of_node if key in no_capacity or key in unavailable]
+
+
+def _inert_arcs(inputs, periods: list) -> set[tuple]:
+    arcs = inputs.members("BidirectionalArc")
+    no_initial = _zero_in_all_periods(inputs, "transmissionInitCap", arcs, periods)
+    # The maximum installed capacity is at least the initial capacity
+    not_buildable = _zero_in_all_periods(inputs, "transmissionMaxBuiltCap", arcs, periods) | \
+        _zero_in_all_periods(inputs, "transmissionMaxInstalledCapRaw", arcs, periods)
+    return no_initial & not_buildable
+
+
+def _inert_storages(inputs, periods: list) -> list[tuple]:
+    storages_of_node = inputs.members("StoragesOfNode")
+    inert = set(storages_of_node)
+    for capacity in ["storPW", "storEN"]:
+        limit = inputs.values(f"{capacity}MaxInstalledCapRaw")
+        limit_default = inputs.default(f"{capacity}MaxInstalledCapRaw")
+        no_limit = {key for key in storages_of_node if limit.get(key, limit_default) == 0}
+        inert &= _zero_in_all_periods(inputs, f"{capacity}InitCap", storages_of_node, periods) & \
+            (_zero_in_all_periods(inputs, f"{capacity}MaxBuiltCap", storages_of_node, periods) | no_limit)
+    return [key for key in storages_of_node if key in inert]
+
+
+def find_inert_components(inputs) -> dict[str, list[tuple]]:
+    """
+    Find the generators, directional lines and storages that can not operate.
+
+    :param inputs: Input data, a :class:`~empire.core.derived_params.PortalInput` or an
+        :class:`~empire.core.derived_params.InstanceInput`.
+    :return: Members of the sets in :data:`INERT_SETS` by the name of the set.
+    """
+    periods = inputs.members("PeriodActive")
+    inert_arcs = _inert_arcs(inputs, periods)
+    return {
+        "InertGeneratorsOfNode": _inert_generators(inputs, periods),
+        "InertDirectionalLink": [(n1, n2) for n1, n2 in inputs.members("DirectionalLink")
+                                 if (n1, n2) in inert_arcs or (n2, n1) in inert_arcs],
+        "InertStoragesOfNode": _inert_storages(inputs, periods),
+    }
+
+
+def add_inert_sets(data: DataPortal, model, **sets) -> dict[str, list[tuple]]:
+    """
+    Find the components that can not operate from the loaded input data and add them to the data.
+
+    :param data: DataPortal with the loaded input data, that the instance is built from.
+    :param model: The abstract model.
+    :param sets: Members of the sets initialized by the model instead of loaded, e.g. PeriodActive.
+    :return: Members of the sets in :data:`INERT_SETS` by the name of the set.
+    """
+    inert = find_inert_components(PortalInput(data, model, sets))
+    for name, members in inert.items():
+        data[name] = {None: members}
+    logger.info("Model reduction: %d generators, %d directional lines and %d storages can not operate",
+                *(len(members) for members in inert.values()))
+    return inert
@@ -1,14 +1,19 @@
 #!/usr/bin/env python
 import json
 import logging
+from functools import partial
 from pathlib import Path
 
 from empire import run_empire
 from empire.core.config import (EmpireConfiguration, EmpireRunConfiguration,
                                 read_config_file)
-from empire.core.reader import generate_tab_files
+from empire.core.input_cache import InputCache
+from empire.core.instance_cache import InstanceCache
+from empire.core.reader import generate_tab_files, read_input_tables
 from empire.core.scenario_random import (check_scenarios_exist_and_copy,
                                          generate_random_scenario)
+from empire.core.sensitivity import SensitivityPoint, run_sweep_pool
+from empire.core.telemetry import PERF_FILE, PERF_FILE_OUT_OF_SAMPLE, RunTelemetry
 from empire.input_data_manager import IDataManager
 from empire.utils import (copy_dataset, copy_scenario_data,
                           create_if_not_exist, get_run_name)
@@ -22,8 +27,30 @@ def run_empire_model(
     data_managers: list[IDataManager],
     test_run: bool,
     OUT_OF_SAMPLE: bool = False, 
-    sample_file_path: Path | None = None
-    ) -> None | float:
+    sample_file_path: Path | None = None,
+    out_of_sample_trees: list[Path] | None = None,
+    sensitivity_points: list[SensitivityPoint] | None = None,
+    ) -> None | float | list[float]:
+    telemetry = RunTelemetry(run_config.run_name)
+    with telemetry.stage("total"):
+        obj_value = _run_empire_model(empire_config, run_config, data_managers, test_run, telemetry, OUT_OF_SAMPLE,
+                                      sample_file_path, out_of_sample_trees, sensitivity_points)
+
+    telemetry.write(run_config.results_path / (PERF_FILE_OUT_OF_SAMPLE if OUT_OF_SAMPLE else PERF_FILE))
+    return obj_value
+
+
+def _run_empire_model(
+    empire_config: EmpireConfiguration,
+    run_config: EmpireRunConfiguration,
+    data_managers: list[IDataManager],
+    test_run: bool,
+    telemetry: RunTelemetry,
+    OUT_OF_SAMPLE: bool = False,
+    sample_file_path: Path | None = None,
+    out_of_sample_trees: list[Path] | None = None,
+    sensitivity_points: list[SensitivityPoint] | None = None,
+    ) -> None | float | list[float]:
     for manager in data_managers:
         manager.apply()
 
@@ -102,12 +129,13 @@ def run_empire_model(
         if empire_config.use_fixed_sample and not (scenario_data_path / "sampling_key.csv").exists():
             raise ValueError("Missing 'sampling_key.csv' in ScenarioData folder.")
         else:
-            generate_random_scenario(
-                empire_config=empire_config,
-                dict_countries=dict_countries,
-                scenario_data_path=scenario_data_path,
-                tab_file_path=tab_file_path,
-            )
+            with telemetry.stage("generate_random_scenario"):
+                generate_random_scenario(
+                    empire_config=empire_config,
+                    dict_countries=dict_countries,
+                    scenario_data_path=scenario_data_path,
+                    tab_file_path=tab_file_path,
+                )
 
     else:
         if not empire_config.use_fixed_sample:
@@ -117,10 +145,26 @@ def run_empire_model(
             )
         check_scenarios_exist_and_copy(run_config)
 
-    generate_tab_files(file_path=workbook_path, tab_file_path=tab_file_path)
+    input_cache = None
+    if empire_config.use_input_cache:
+        input_cache = InputCache(empire_config.input_cache_directory, empire_config.input_cache_max_size_mb)
+
+    if empire_config.use_tab_files:
+        with telemetry.stage("generate_tab_files"):
+            generate_tab_files(file_path=workbook_path, tab_file_path=tab_file_path, cache=input_cache)
+        input_tables = None
+    else:
+        with telemetry.stage("read_input_tables"):
+            input_tables = read_input_tables(file_path=workbook_path, tab_file_path=tab_file_path, cache=input_cache)
+
+    instance_cache = None
+    if empire_config.use_instance_cache:
+        instance_cache = InstanceCache(empire_config.instance_cache_directory, empire_config.instance_cache_max_size_mb)
 
+    obj_value = None
     if not test_run:
-        obj_value = run_empire(
+        run = partial(
+            run_empire,
             name=run_config.run_name,
             tab_file_path=tab_file_path,
             result_file_path=result_file_path,
@@ -148,8 +192,34 @@ def run_empire_model(
             OPERATIONAL_DUALS=empire_config.compute_operational_duals,
             north_sea=empire_config.north_sea,
             OUT_OF_SAMPLE=OUT_OF_SAMPLE, 
-            sample_file_path=sample_file_path
+            sample_file_path=sample_file_path,
+            RESULTS_FORMAT=empire_config.results_format,
+            input_tables=input_tables,
+            instance_cache=instance_cache,
+            PERSISTENT_SOLVER=empire_config.use_persistent_solver,
+            DIRECT_SOLVER=empire_config.use_direct_solver,
+            MATRIX_MODEL=empire_config.use_matrix_model,
+            BENDERS=empire_config.use_benders_decomposition,
+            BENDERS_WORKERS=empire_config.benders_workers,
+            BENDERS_TOLERANCE=empire_config.benders_tolerance,
+            BENDERS_MAX_ITERATIONS=empire_config.benders_max_iterations,
+            OUT_OF_SAMPLE_TREES=out_of_sample_trees,
+            OUT_OF_SAMPLE_WORKERS=empire_config.out_of_sample_workers,
+            PROFILE_CONSTRUCTION=empire_config.profile_model_construction,
+            LEAN_BUILD=empire_config.use_lean_build,
+            MODEL_REDUCTION=empire_config.use_model_reduction,
+            SOLUTION_SNAPSHOT=empire_config.write_solution_snapshot,
+            OPERATIONAL_RESULTS=empire_config.write_operational_results,
             )
+        with telemetry.stage("run_empire"):
+            if sensitivity_points and empire_config.sensitivity_workers > 1:
+                # The stages of the worker processes are not recorded, only the sweep as a whole
+                obj_value = run_sweep_pool(partial(_run_sweep, run), sensitivity_points,
+                                           workers=empire_config.sensitivity_workers)
+            elif sensitivity_points:
+                obj_value = run(SENSITIVITY_POINTS=sensitivity_points, telemetry=telemetry)
+            else:
+                obj_value = run(telemetry=telemetry)
 
     config_path = run_config.dataset_path / "config.txt"
     logger.info("Writing config to: %s", config_path)
@@ -157,6 +227,11 @@ def run_empire_model(
         json.dump(empire_config.to_dict(), file, ensure_ascii=False, indent=4)
     return obj_value
 
+
+def _run_sweep(run: partial, points: list[SensitivityPoint]) -> list[float]:
+    return run(SENSITIVITY_POINTS=points)
+
+
 def setup_run_paths(
     version: str,
     empire_config: EmpireConfiguration,
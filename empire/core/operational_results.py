@@ -0,0 +1,280 @@
+"""
+Vectorised writers for the operational result files of a solved EMPIRE instance.
+
+Instead of evaluating one Pyomo expression per cell, every variable, parameter and dual
+that a result file needs is pulled out of the instance once as a dense NumPy array with
+one axis per factor set of its index (see :class:`~empire.core.instance_arrays.InstanceArrays`).
+The derived columns are then computed on whole arrays and each file is written in blocks of
+whole columns, one block per node, link or generator.
+
+The arithmetic mirrors the order in which Pyomo evaluates the original expressions, so
+the written files are identical to the ones produced by the cell-by-cell loops.
+
+The writers only use arrays, so they also write from a
+:class:`~empire.core.solution_snapshot.SolutionSnapshot`, and this module does not import
+Pyomo.
+"""
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from empire.core.result_tables import open_result_table
+
+if TYPE_CHECKING:
+    from empire.core.instance_arrays import InstanceArrays
+
+logger = logging.getLogger(__name__)
+
+RES_TECHNOLOGIES = ("Hydro_ror", "Wind_onshr", "Wind_offshr", "Solar")
+
+OPERATIONAL_FILE = "results_output_Operational.csv"
+OPERATIONAL_RESOLVED_FILE = "results_output_Operational_resolved.csv"
+TRANSMISSION_OPERATIONAL_FILE = "results_output_transmision_operational.csv"
+CURTAILED_OPERATIONAL_FILE = "results_output_curtailed_operational.csv"
+
+
+def _sequential_sum(terms: list):
+    # Pyomo sums the terms of an expression from left to right, starting with the first term.
+    if not terms:
+        return 0
+    total = terms[0]
+    for term in terms[1:]:
+        total = total + term
+    return total
+
+
+def _product_index(*sizes: int) -> np.ndarray:
+    # Position in every factor of the rows of a product of factors, in product order
+    return np.indices(sizes).reshape(len(sizes), -1)
+
+
+def _labels(members: list) -> np.ndarray:
+    # Object arrays keep the members as they are, so they are written as csv.writer writes them
+    labels = np.empty(len(members), dtype=object)
+    labels[:] = members
+    return labels
+
+
+def _hours_of_season(arrays: "InstanceArrays") -> tuple[list, np.ndarray, np.ndarray]:
+    hours_of_season = arrays.elements("HoursOfSeason")
+    hour_pos = arrays.positions("Operationalhour")
+    season_pos = arrays.positions("Season")
+    hour_idx = np.array([hour_pos[h] for (s, h) in hours_of_season], dtype=int)
+    season_idx = np.array([season_pos[s] for (s, h) in hours_of_season], dtype=int)
+    return hours_of_season, hour_idx, season_idx
+
+
+def write_operational_results(arrays: "InstanceArrays", result_file_path: Path, inv_per: list,
+                              file_name: str = OPERATIONAL_FILE, results_format: str = "csv") -> None:
+    """
+    Write the hourly balance of every node: generation, load, storage, flows, price and CO2 intensity.
+
+    :param arrays: Array view of the solved instance, or a solution snapshot.
+    :param result_file_path: Folder to write the file to.
+    :param inv_per: Label of every active period, e.g. '2020-2025'.
+    :param file_name: Name of the result file.
+    :param results_format: Format of the result file, 'csv' or 'parquet'.
+    """
+    nodes = arrays.elements("Node")
+    generators = arrays.elements("Generator")
+    storages = arrays.elements("Storage")
+    periods = arrays.elements("PeriodActive")
+    scenarios = arrays.elements("Scenario")
+    hours_of_season, hour_idx, season_idx = _hours_of_season(arrays)
+
+    node_pos = arrays.positions("Node")
+    gen_pos = arrays.positions("GeneratorsOfNode")
+    stor_pos = arrays.positions("StoragesOfNode")
+    link_pos = arrays.positions("DirectionalLink")
+    generator_pos = arrays.positions("Generator")
+    storage_pos = arrays.positions("Storage")
+    period_idx = [arrays.positions("Period")[i] for i in periods]
+
+    gen_op = arrays["genOperational"]
+    stor_op = arrays["storOperational"]
+    stor_charge = arrays["storCharge"]
+    stor_discharge = arrays["storDischarge"]
+    flow = arrays["transmisionOperational"]
+    load_shed = arrays["loadShed"]
+    sload = arrays["sload"]
+    line_eff = arrays["lineEfficiency"]
+    charge_eff = arrays["storageChargeEff"]
+    discharge_eff = arrays["storageDischargeEff"]
+    bleed_eff = arrays["storageBleedEff"]
+    co2_factor = arrays["genCO2TypeFactor"]
+    gen_eff = arrays["genEfficiency"]
+    flow_balance_dual = arrays.dual("FlowBalance")
+    # (hour of season, scenario)
+    price_denominator = (arrays["operationalDiscountrate"] * arrays["seasScale"][season_idx])[:, None] * arrays[
+        "sceProbab"
+    ][None, :]
+
+    header = ["Node", "Period", "Scenario", "Season", "Hour", "AllGen_MW", "Load_MW", "Net_load_MW"]
+    header.extend(f"{g}_MW" for g in generators)
+    header.extend(["storCharge_MW", "storDischarge_MW", "storEnergyLevel_MWh", "LossesChargeDischargeBleed_MW",
+                   "FlowOut_MW", "FlowIn_MW", "LossesFlowIn_MW", "LoadShed_MW", "Price_EURperMWh",
+                   "AvgCO2_kgCO2perMWh"])
+
+    def to_rows(values):
+        # (hour, period, scenario) -> rows ordered by (period, scenario, hour of season)
+        if not isinstance(values, np.ndarray):
+            return values
+        return np.moveaxis(values[hour_idx], 0, -1).ravel()
+
+    # The label columns are the same for every node
+    p_idx, w_idx, hs_idx = _product_index(len(periods), len(scenarios), len(hours_of_season))
+    label_columns = [
+        _labels([inv_per[int(i - 1)] for i in periods])[p_idx],
+        _labels(scenarios)[w_idx],
+        _labels([s for (s, h) in hours_of_season])[hs_idx],
+        _labels([h for (s, h) in hours_of_season])[hs_idx],
+    ]
+
+    with open_result_table(result_file_path / file_name, header, results_format) as writer:
+        for n in nodes:
+            gens = list(arrays.instance.GeneratorsAtNode[n])
+            stors = [storage_pos[b] for b in arrays.instance.StoragesAtNode[n]]
+            links = list(arrays.instance.NodesLinked[n])
+
+            gen_ops = [gen_op[gen_pos[n, g]] for g in gens]
+            charge = [stor_charge[stor_pos[n, storages[b]]] for b in stors]
+            discharge = [stor_discharge[stor_pos[n, storages[b]]] for b in stors]
+            level = [stor_op[stor_pos[n, storages[b]]] for b in stors]
+            flow_out = [flow[link_pos[n, link]] for link in links]
+            flow_in = [flow[link_pos[link, n]] for link in links]
+            eff_in = [line_eff[link_pos[link, n]] for link in links]
+            node_sload = sload[node_pos[n]][:, period_idx, :]
+            node_shed = load_shed[node_pos[n]]
+
+            all_gen = _sequential_sum(gen_ops)
+            net_load = -_sequential_sum(
+                [node_sload, -node_shed]
+                + [t for c, d, b in zip(charge, discharge, stors) for t in (c, -discharge_eff[b] * d)]
+                + [t for out, inn, e in zip(flow_out, flow_in, eff_in) for t in (out, -e * inn)]
+            )
+            losses = _sequential_sum(
+                [
+                    t
+                    for c, d, o, b in zip(charge, discharge, level, stors)
+                    for t in (-(1 - discharge_eff[b]) * d, -(1 - charge_eff[b]) * c, -(1 - bleed_eff[b]) * o)
+                ]
+            )
+            emissions = _sequential_sum(
+                [
+                    (co2_factor[generator_pos[g]] * (3.6 / gen_eff[generator_pos[g]][period_idx]))[None, :, None] * x
+                    for g, x in zip(gens, gen_ops)
+                ]
+            )
+            price = flow_balance_dual[node_pos[n]][hour_idx] / price_denominator[:, None, :]
+
+            columns = [to_rows(all_gen), to_rows(-node_sload), to_rows(net_load)]
+            columns.extend(to_rows(gen_op[gen_pos[n, g]] if (n, g) in gen_pos else 0) for g in generators)
+            columns.extend(
+                [
+                    to_rows(_sequential_sum([-c for c in charge])),
+                    to_rows(_sequential_sum(discharge)),
+                    to_rows(_sequential_sum(level)),
+                    to_rows(losses),
+                    to_rows(_sequential_sum([-out for out in flow_out])),
+                    to_rows(_sequential_sum(flow_in)),
+                    to_rows(_sequential_sum([-(1 - e) * inn for inn, e in zip(flow_in, eff_in)])),
+                    to_rows(node_shed),
+                    np.moveaxis(price, 0, -1).ravel(),
+                    to_rows(_average_intensity(emissions, all_gen)),
+                ]
+            )
+
+            writer.write_columns([n, *label_columns, *columns])
+
+
+def _average_intensity(emissions, generation):
+    # Emissions per unit of generation, and (integer) zero where nothing is generated.
+    if not isinstance(generation, np.ndarray):
+        return 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        intensity = (emissions / generation).astype(object)
+    intensity[generation == 0] = 0
+    return intensity
+
+
+def write_transmission_operational_results(arrays: "InstanceArrays", result_file_path: Path, inv_per: list,
+                                           results_format: str = "csv") -> None:
+    """
+    Write the hourly flow received and lost on every directional link.
+
+    :param arrays: Array view of the solved instance, or a solution snapshot.
+    :param result_file_path: Folder to write the file to.
+    :param inv_per: Label of every active period, e.g. '2020-2025'.
+    :param results_format: Format of the result file, 'csv' or 'parquet'.
+    """
+    links = arrays.elements("DirectionalLink")
+    periods = arrays.elements("PeriodActive")
+    scenarios = arrays.elements("Scenario")
+    hours_of_season, hour_idx, _ = _hours_of_season(arrays)
+
+    # (link, hour, period, scenario) -> rows ordered by (link, period, hour of season, scenario)
+    flow = arrays["transmisionOperational"][:, hour_idx].transpose(0, 2, 1, 3)
+    line_eff = arrays["lineEfficiency"][:, None, None, None]
+    p_idx, hs_idx, w_idx = _product_index(len(periods), len(hours_of_season), len(scenarios))
+    received = (line_eff * flow).reshape(len(links), p_idx.size)
+    losses = ((1 - line_eff) * flow).reshape(len(links), p_idx.size)
+
+    label_columns = [
+        _labels([inv_per[int(i - 1)] for i in periods])[p_idx],
+        _labels([s for (s, h) in hours_of_season])[hs_idx],
+        _labels(scenarios)[w_idx],
+        _labels([h for (s, h) in hours_of_season])[hs_idx],
+    ]
+    header = ["FromNode", "ToNode", "Period", "Season", "Scenario", "Hour", "TransmissionRecieved_MW", "Losses_MW"]
+    with open_result_table(result_file_path / TRANSMISSION_OPERATIONAL_FILE, header, results_format) as writer:
+        for k, (n1, n2) in enumerate(links):
+            writer.write_columns([n1, n2, *label_columns, received[k], losses[k]])
+
+
+def write_curtailed_operational_results(arrays: "InstanceArrays", result_file_path: Path, inv_per: list,
+                                        results_format: str = "csv") -> None:
+    """
+    Write the expected hourly curtailment of every variable renewable generator.
+
+    :param arrays: Array view of the solved instance, or a solution snapshot.
+    :param result_file_path: Folder to write the file to.
+    :param inv_per: Label of every active period, e.g. '2020-2025'.
+    :param results_format: Format of the result file, 'csv' or 'parquet'.
+    """
+    periods = arrays.elements("PeriodActive")
+    scenarios = arrays.elements("Scenario")
+    hours_of_season, hour_idx, season_idx = _hours_of_season(arrays)
+    generators_of_technology = set(arrays.elements("GeneratorsOfTechnology"))
+    gen_pos = arrays.positions("GeneratorsOfNode")
+
+    res_generators = [
+        (n, g)
+        for t in arrays.elements("Technology")
+        if t in RES_TECHNOLOGIES
+        for (n, g) in gen_pos
+        if (t, g) in generators_of_technology
+    ]
+    idx = [gen_pos[ng] for ng in res_generators]
+
+    # (generator, hour of season, period, scenario)
+    avail = arrays["genCapAvail"][idx][:, hour_idx].transpose(0, 1, 3, 2)
+    installed = arrays["genInstalledCap"][idx][:, None, :, None]
+    operational = arrays["genOperational"][idx][:, hour_idx]
+    weight = (arrays["sceProbab"][None, :] * arrays["seasScale"][season_idx][:, None])[None, :, None, :]
+    curtailed = weight * (avail * installed - operational)
+    # -> rows ordered by (generator, period, scenario, hour of season)
+    p_idx, w_idx, hs_idx = _product_index(len(periods), len(scenarios), len(hours_of_season))
+    curtailed = curtailed.transpose(0, 2, 3, 1).reshape(len(res_generators), p_idx.size)
+
+    label_columns = [
+        _labels([inv_per[int(i - 1)] for i in periods])[p_idx],
+        _labels(scenarios)[w_idx],
+        _labels([s for (s, h) in hours_of_season])[hs_idx],
+        _labels([h for (s, h) in hours_of_season])[hs_idx],
+    ]
+    header = ["Node", "Period", "Scenario", "Season", "Hour", "RESGeneratorType", "Curtailment_MWh"]
+    with open_result_table(result_file_path / CURTAILED_OPERATIONAL_FILE, header, results_format) as writer:
+        for k, (n, g) in enumerate(res_generators):
+            writer.write_columns([n, *label_columns, g, curtailed[k]])
@@ -0,0 +1,128 @@
+"""
+Out-of-sample evaluation of fixed investment decisions on many scenario trees.
+
+With the investments fixed, the operational problems of the periods are independent. The
+scenarios of a period remain coupled by the annual hydro limit of every node, and the load
+of every scenario is scaled to the expected annual demand of its tree, so a period of one
+tree is the smallest independent piece.
+
+The instance is built once, with the investments of the in-sample run as parameters and
+without the Pyomo variables and constraints. For every tree only the stochastic parameters
+are read and the parameters derived from them rebuilt, the linear program is generated as a
+matrix and split into one piece per period, and the pieces of all trees are solved in a
+pool of worker processes.
+"""
+import logging
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from pyomo.environ import DataPortal
+
+from empire.core.benders import BendersDecomposition, Subproblem
+from empire.core.instance_cache import update_stochastic_params
+from empire.core.matrix_model import build_matrix_model
+
+logger = logging.getLogger(__name__)
+
+# Stochastic parameters of a tree and the files they are read from.
+STOCHASTIC_FILES = {
+    "maxRegHydroGenRaw": "Stochastic_HydroGenMaxSeasonalProduction.tab",
+    "genCapAvailStochRaw": "Stochastic_StochasticAvailability.tab",
+    "sloadRaw": "Stochastic_ElectricLoadRaw.tab",
+}
+
+
+def load_stochastic_data(instance, sample_file_path: Path) -> DataPortal:
+    """
+    Read the stochastic parameters of a scenario tree.
+
+    :param instance: Instance the parameters are read for.
+    :param sample_file_path: Folder with the .tab files of the tree.
+    :return: DataPortal with the stochastic parameters.
+    """
+    data = DataPortal()
+    for name, filename in STOCHASTIC_FILES.items():
+        data.load(filename=str(sample_file_path / filename), param=getattr(instance, name), format="table")
+    return data
+
+
+def _solve_piece(piece: Subproblem, x_master: np.ndarray) -> float:
+    objective, _ = piece.evaluate(x_master)
+    return objective
+
+
+def _total(path: Path, investment_costs: float, operational_costs: list[float]) -> float:
+    objective = investment_costs + sum(operational_costs)
+    logger.info("Out-of-sample tree %s: objective value %s", path, objective)
+    return objective
+
+
+class OutOfSampleEvaluator:
+    """
+    Expected costs of fixed investment decisions on scenario trees, from one instance.
+
+    :param instance: Out-of-sample instance with the sets and (derived) parameters constructed.
+    :param update_derived_params: Rebuilds the parameters derived from the stochastic parameters of the instance.
+    :param emission_cap: If true, the emissions of every period and scenario are capped.
+    :param north_sea: If true, the transmission from offshore nodes is limited by the installed generation.
+    :param workers: Number of worker processes solving the pieces.
+    """
+
+    def __init__(self, instance, update_derived_params: Callable[[], None], emission_cap: bool = True,
+                 north_sea: bool = True, workers: int = 1):
+        self.instance = instance
+        self.update_derived_params = update_derived_params
+        self.emission_cap = emission_cap
+        self.north_sea = north_sea
+        self.workers = workers
+
+    def pieces(self, sample_file_path: Path) -> tuple[float, np.ndarray, list[Subproblem]]:
+        """
+        Set the stochastic data of a tree and split its operational problem into pieces.
+
+        :param sample_file_path: Folder with the .tab files of the tree.
+        :return: Investment costs, values of the investment decisions and one piece per period.
+        :raises ValueError: If the investment decisions are not fixed.
+        """
+        update_stochastic_params(self.instance, load_stochastic_data(self.instance, sample_file_path))
+        self.update_derived_params()
+        lp = build_matrix_model(self.instance, out_of_sample=True, emission_cap=self.emission_cap,
+                                north_sea=self.north_sea)
+        decomposition = BendersDecomposition(lp, by_scenario=False)
+        x_master = decomposition.master_col_lower
+        if not np.array_equal(x_master, decomposition.master_col_upper):
+            raise ValueError("The investment decisions must be fixed for the out-of-sample evaluation")
+        return float(decomposition.master_cost @ x_master), x_master, decomposition.subproblems
+
+    def evaluate(self, sample_file_paths: list[Path]) -> list[float]:
+        """
+        Objective values of the instance on scenario trees.
+
+        The pieces of a tree are solved while the pieces of the next tree are generated.
+
+        :param sample_file_paths: Folders with the .tab files of the trees.
+        :return: Objective value for every tree, as in an out-of-sample run of the tree.
+        :raises RuntimeError: If a piece has no optimal solution.
+        """
+        if self.workers <= 1:
+            objectives = []
+            for path in sample_file_paths:
+                investment_costs, x_master, pieces = self.pieces(path)
+                objectives.append(_total(path, investment_costs, [_solve_piece(piece, x_master) for piece in pieces]))
+            return objectives
+
+        objectives, submitted = [], []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for path in sample_file_paths:
+                investment_costs, x_master, pieces = self.pieces(path)
+                futures = [executor.submit(_solve_piece, piece, x_master) for piece in pieces]
+                submitted.append((path, investment_costs, futures))
+                # At most the pieces of two trees are held in the pool
+                if len(submitted) > 1:
+                    path, investment_costs, futures = submitted.pop(0)
+                    objectives.append(_total(path, investment_costs, [future.result() for future in futures]))
+            for path, investment_costs, futures in submitted:
+                objectives.append(_total(path, investment_costs, [future.result() for future in futures]))
+        return objectives
@@ -4,22 +4,96 @@ from pathlib import Path
 
 import pandas as pd
 
+from empire.core.input_cache import InputCache, sheet_digests
+
 logger = logging.getLogger(__name__)
 
-def read_file(excelfile: pd.ExcelFile, sheet: str, columns: list, 
-              tab_file_path: Path, filename: str, skipheaders: int = 0) -> None:
+# Sheets read from each workbook of the dataset, with the columns to keep. Sheets without
+# columns are set sheets, of which every column is a separate set. The first two rows of
+# the other sheets are descriptive headers and are skipped.
+INPUT_SHEETS = {
+    "Sets": [
+        ("Nodes", None),
+        ("OffshoreNodes", None),
+        ("Horizon", None),
+        ("LineType", None),
+        ("Technology", None),
+        ("Storage", None),
+        ("Generators", None),
+        ("StorageOfNodes", [0, 1]),
+        ("GeneratorsOfNode", [0, 1]),
+        ("GeneratorsOfTechnology", [0, 1]),
+        ("DirectionalLines", [0, 1]),
+        ("LineTypeOfDirectionalLines", [0, 1, 2]),
+    ],
+    "Generator": [
+        ("FixedOMCosts", [0, 1, 2]),
+        ("CapitalCosts", [0, 1, 2]),
+        ("VariableOMCosts", [0, 1]),
+        ("FuelCosts", [0, 1, 2]),
+        ("CCSCostTSVariable", [0, 1]),
+        ("Efficiency", [0, 1, 2]),
+        ("RefInitialCap", [0, 1, 2]),
+        ("ScaleFactorInitialCap", [0, 1, 2]),
+        ("InitialCapacity", [0, 1, 2, 3]),
+        ("MaxBuiltCapacity", [0, 1, 2, 3]),
+        ("MaxInstalledCapacity", [0, 1, 2]),
+        ("RampRate", [0, 1]),
+        ("GeneratorTypeAvailability", [0, 1]),
+        ("CO2Content", [0, 1]),
+        ("Lifetime", [0, 1]),
+    ],
+    "Transmission": [
+        ("lineEfficiency", [0, 1, 2]),
+        ("MaxInstallCapacityRaw", [0, 1, 2, 3]),
+        ("MaxBuiltCapacity", [0, 1, 2, 3]),
+        ("Length", [0, 1, 2]),
+        ("TypeCapitalCost", [0, 1, 2]),
+        ("TypeFixedOMCost", [0, 1, 2]),
+        ("InitialCapacity", [0, 1, 2, 3]),
+        ("Lifetime", [0, 1, 2]),
+    ],
+    "Node": [
+        ("ElectricAnnualDemand", [0, 1, 2]),
+        ("NodeLostLoadCost", [0, 1, 2]),
+        ("HydroGenMaxAnnualProduction", [0, 1]),
+    ],
+    "General": [
+        ("seasonScale", [0, 1]),
+        ("CO2Cap", [0, 1]),
+        ("CO2Price", [0, 1]),
+    ],
+    "Storage": [
+        ("StorageBleedEfficiency", [0, 1]),
+        ("StorageChargeEff", [0, 1]),
+        ("StorageDischargeEff", [0, 1]),
+        ("StoragePowToEnergy", [0, 1]),
+        ("StorageInitialEnergyLevel", [0, 1]),
+        ("InitialPowerCapacity", [0, 1, 2, 3]),
+        ("PowerCapitalCost", [0, 1, 2]),
+        ("PowerFixedOMCost", [0, 1, 2]),
+        ("PowerMaxBuiltCapacity", [0, 1, 2, 3]),
+        ("EnergyCapitalCost", [0, 1, 2]),
+        ("EnergyFixedOMCost", [0, 1, 2]),
+        ("EnergyInitialCapacity", [0, 1, 2, 3]),
+        ("EnergyMaxBuiltCapacity", [0, 1, 2, 3]),
+        ("EnergyMaxInstalledCapacity", [0, 1, 2]),
+        ("PowerMaxInstalledCapacity", [0, 1, 2]),
+        ("Lifetime", [0, 1]),
+    ],
+}
+
+
+def sheet_table(excelfile: pd.ExcelFile, sheet: str, columns: list, skipheaders: int = 0) -> pd.DataFrame:
     """
-    Reads data from an Excel file and saves it as a .tab file.
-    
+    Reads a table from an Excel sheet in the form it is stored in a .tab file.
+
     :param excelfile: The Excel file object.
     :param sheet: The name of the sheet to read from.
     :param columns: List of columns to be read.
-    :param tab_file_path: Path to save the .tab file.
-    :param filename: Base name for the .tab file.
     :param skipheaders: Number of header rows to skip. Defaults to 0.
+    :return: DataFrame with the non-empty rows, without whitespace in values and column names.
     """
-    logger.info("Reading %s sheet from %s.xlsx", sheet, filename)
-
     input_sheet = excelfile[sheet]
     data_table = input_sheet.iloc[skipheaders:, columns]
     data_table.columns = pd.Series(data_table.columns).str.replace(' ', '_')
@@ -27,125 +101,106 @@ def read_file(excelfile: pd.ExcelFile, sheet: str, columns: list,
 
     save_csv_frame = pd.DataFrame(data_nonempty)
     save_csv_frame.replace('\s', '', regex=True, inplace=True)
+    return save_csv_frame
 
-    tab_file_path.mkdir(parents=True, exist_ok=True)
-    save_csv_frame.to_csv(tab_file_path / f"{filename}_{sheet}.tab", header=True, index=None, sep='\t', mode='w')
 
-def read_sets(excelfile: pd.ExcelFile, sheet: str, tab_file_path: Path, 
-              filename: str) -> None:
+def set_tables(excelfile: pd.ExcelFile, sheet: str) -> dict[str, pd.DataFrame]:
     """
-    Reads sets data from an Excel file and saves each column as a separate .tab file.
-    
+    Reads every column of a sets sheet in the form it is stored in a .tab file.
+
     :param excelfile: The Excel file object.
     :param sheet: The name of the sheet to read from.
-    :param tab_file_path: Path to save the .tab files.
-    :param filename: Base name for the .tab files.
+    :return: Dictionary from column name to a DataFrame with the non-empty values of the column.
     """
-    logger.info("Reading %s sheet from %s.xlsx", sheet, filename)
-
     input_sheet = excelfile[sheet]
 
+    tables = {}
     for ind, column in enumerate(input_sheet.columns):
         data_table = input_sheet.iloc[0:, ind]
         data_nonempty = data_table.dropna()
         data_nonempty.replace(" ", "")
         save_csv_frame = pd.DataFrame(data_nonempty)
         save_csv_frame.replace('\s', '', regex=True, inplace=True)
-        tab_file_path.mkdir(parents=True, exist_ok=True)
-        save_csv_frame.to_csv(tab_file_path / f"{filename}_{column}.tab", header=True, index=None, sep='\t', mode='w')        
+        tables[column] = save_csv_frame
+    return tables
+
+
+def write_tab_file(table: pd.DataFrame, path: Path) -> None:
+    """
+    Saves a table as a .tab file.
 
+    :param table: Table to save.
+    :param path: Path of the .tab file.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(path, header=True, index=None, sep='\t', mode='w')
+
+
+def _sheet_tables(excelfile: pd.ExcelFile, workbook: str, sheet: str, columns: list | None) -> dict[str, pd.DataFrame]:
+    logger.info("Reading %s sheet from %s.xlsx", sheet, workbook)
+    if columns is None:
+        return {f"{workbook}_{column}.tab": table for column, table in set_tables(excelfile, sheet).items()}
+    return {f"{workbook}_{sheet}.tab": sheet_table(excelfile, sheet, columns, skipheaders=2)}
 
-def generate_tab_files(file_path, tab_file_path):
+
+def read_input_tables(file_path: Path, tab_file_path: Path, cache: InputCache | None = None) -> dict[Path, pd.DataFrame]:
+    """
+    Read the input data of all workbooks of a dataset into memory.
+
+    The tables are keyed on the path of the .tab file they are saved to by
+    :func:`generate_tab_files`, so they can stand in for the files when the model data is loaded.
+
+    :param file_path: Path to the dataset.
+    :param tab_file_path: Folder of the .tab files.
+    :param cache: Optional cache of tables. Only sheets that are not in the cache are read from the workbooks.
+    :return: Dictionary from .tab file path to table.
+    """
+    tables = {}
+    for workbook, sheets in INPUT_SHEETS.items():
+        workbook_path = Path(file_path) / f"{workbook}.xlsx"
+
+        keys = {}
+        sheet_tables = {}
+        if cache is not None:
+            digests = sheet_digests(workbook_path)
+            for sheet, columns in sheets:
+                if sheet in digests:
+                    keys[sheet] = InputCache.key(digests[sheet], columns)
+                    cached = cache.get(keys[sheet])
+                    if cached is not None:
+                        sheet_tables[sheet] = cached
+
+        missing = [sheet for sheet, _ in sheets if sheet not in sheet_tables]
+        if missing:
+            logger.info("Reading %s.xlsx", workbook)
+            excel_data = pd.read_excel(workbook_path, sheet_name=None if cache is None else missing)
+            for sheet, columns in sheets:
+                if sheet in missing:
+                    sheet_tables[sheet] = _sheet_tables(excel_data, workbook, sheet, columns)
+                    if sheet in keys:
+                        cache.put(keys[sheet], sheet_tables[sheet])
+        else:
+            logger.info("Using cached tables of %s.xlsx", workbook)
+
+        for sheet, _ in sheets:
+            for name, table in sheet_tables[sheet].items():
+                tables[Path(tab_file_path) / name] = table
+    return tables
+
+
+def generate_tab_files(file_path, tab_file_path, cache: InputCache | None = None):
     """
     Read column value from excel sheet and save as .tab file "sheet.tab"
 
     :param file_path: Path to the dataset.
     :param tab_file_path: Path to save the .tab files.
+    :param cache: Optional cache of tables. Only sheets that are not in the cache are read from the workbooks.
     """
     
     logger.info("Generating .tab-files...")
 
-    # Reading Excel workbooks using our function read_file
-
     if not os.path.exists(tab_file_path):
         os.makedirs(tab_file_path)
 
-    logger.info("Reading Sets.xlsx")
-    SetsExcelData = pd.read_excel(file_path / "Sets.xlsx", sheet_name=None)
-    read_sets(SetsExcelData, 'Nodes', tab_file_path, "Sets")
-    read_sets(SetsExcelData, 'OffshoreNodes', tab_file_path, "Sets")
-    read_sets(SetsExcelData, 'Horizon', tab_file_path, "Sets")
-    read_sets(SetsExcelData, 'LineType', tab_file_path, "Sets")
-    read_sets(SetsExcelData, 'Technology', tab_file_path, "Sets")
-    read_sets(SetsExcelData, 'Storage', tab_file_path, "Sets")
-    read_sets(SetsExcelData, 'Generators', tab_file_path, "Sets")
-    read_file(SetsExcelData, 'StorageOfNodes', [0, 1], tab_file_path, "Sets", skipheaders=2)
-    read_file(SetsExcelData, 'GeneratorsOfNode', [0, 1], tab_file_path, "Sets", skipheaders=2)
-    read_file(SetsExcelData, 'GeneratorsOfTechnology', [0, 1], tab_file_path, "Sets", skipheaders=2)
-    read_file(SetsExcelData, 'DirectionalLines', [0, 1], tab_file_path, "Sets", skipheaders=2)
-    read_file(SetsExcelData, 'LineTypeOfDirectionalLines', [0, 1, 2], tab_file_path, "Sets", skipheaders=2)
-
-    # Reading GeneratorPeriod
-    logger.info("Reading Generator.xlsx")
-    GeneratorExcelData = pd.read_excel(file_path / "Generator.xlsx", sheet_name=None)
-    read_file(GeneratorExcelData, 'FixedOMCosts', [0, 1, 2], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'CapitalCosts', [0, 1, 2], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'VariableOMCosts', [0, 1], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'FuelCosts', [0, 1, 2], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'CCSCostTSVariable', [0, 1], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'Efficiency', [0, 1, 2], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'RefInitialCap', [0, 1, 2], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'ScaleFactorInitialCap', [0, 1, 2], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'InitialCapacity', [0, 1, 2, 3], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'MaxBuiltCapacity', [0, 1, 2, 3], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'MaxInstalledCapacity', [0, 1, 2], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'RampRate', [0, 1], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'GeneratorTypeAvailability', [0, 1], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'CO2Content', [0, 1], tab_file_path, "Generator", skipheaders=2)
-    read_file(GeneratorExcelData, 'Lifetime', [0, 1], tab_file_path, "Generator", skipheaders=2)
-
-    #Reading InterConnector
-    logger.info("Reading Transmission.xlsx")
-    TransmissionExcelData = pd.read_excel(file_path / "Transmission.xlsx", sheet_name=None)
-    read_file(TransmissionExcelData, 'lineEfficiency', [0, 1, 2], tab_file_path,  "Transmission", skipheaders=2)
-    read_file(TransmissionExcelData, 'MaxInstallCapacityRaw', [0, 1, 2, 3], tab_file_path,  "Transmission", skipheaders=2)
-    read_file(TransmissionExcelData, 'MaxBuiltCapacity', [0, 1, 2, 3], tab_file_path,  "Transmission", skipheaders=2)
-    read_file(TransmissionExcelData, 'Length', [0, 1, 2], tab_file_path,  "Transmission", skipheaders=2)
-    read_file(TransmissionExcelData, 'TypeCapitalCost', [0, 1, 2], tab_file_path,  "Transmission", skipheaders=2)
-    read_file(TransmissionExcelData, 'TypeFixedOMCost', [0, 1, 2], tab_file_path,  "Transmission", skipheaders=2)
-    read_file(TransmissionExcelData, 'InitialCapacity', [0, 1, 2, 3], tab_file_path,  "Transmission", skipheaders=2)
-    read_file(TransmissionExcelData, 'Lifetime', [0, 1, 2], tab_file_path,  "Transmission", skipheaders=2)
-
-    #Reading Node
-    logger.info("Reading Node.xlsx")
-    NodeExcelData = pd.read_excel(file_path / "Node.xlsx", sheet_name=None)
-    read_file(NodeExcelData , 'ElectricAnnualDemand', [0, 1, 2],tab_file_path,  "Node", skipheaders=2)
-    read_file(NodeExcelData , 'NodeLostLoadCost', [0, 1, 2],tab_file_path,  "Node", skipheaders=2)
-    read_file(NodeExcelData , 'HydroGenMaxAnnualProduction', [0, 1],tab_file_path,  "Node", skipheaders=2)
-
-    #Reading Season
-    logger.info("Reading General.xlsx")
-    GeneralExcelData = pd.read_excel(file_path / "General.xlsx", sheet_name=None)
-    read_file(GeneralExcelData, 'seasonScale', [0, 1], tab_file_path, "General", skipheaders=2)
-    read_file(GeneralExcelData, 'CO2Cap', [0, 1], tab_file_path, "General", skipheaders=2)
-    read_file(GeneralExcelData, 'CO2Price', [0, 1], tab_file_path, "General", skipheaders=2)
-    
-    #Reading Storage
-    logger.info("Reading Storage.xlsx")
-    StorageExcelData = pd.read_excel(file_path / "Storage.xlsx", sheet_name=None)
-    read_file(StorageExcelData, 'StorageBleedEfficiency', [0, 1], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'StorageChargeEff', [0, 1], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'StorageDischargeEff', [0, 1], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'StoragePowToEnergy', [0, 1], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'StorageInitialEnergyLevel', [0, 1], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'InitialPowerCapacity', [0, 1, 2, 3], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'PowerCapitalCost', [0, 1, 2], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'PowerFixedOMCost', [0, 1, 2], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'PowerMaxBuiltCapacity', [0, 1, 2, 3], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'EnergyCapitalCost', [0, 1, 2], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'EnergyFixedOMCost', [0, 1, 2], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'EnergyInitialCapacity', [0, 1, 2, 3], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'EnergyMaxBuiltCapacity', [0, 1, 2, 3], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'EnergyMaxInstalledCapacity', [0, 1, 2], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'PowerMaxInstalledCapacity', [0, 1, 2], tab_file_path, "Storage", skipheaders=2)
-    read_file(StorageExcelData, 'Lifetime', [0, 1], tab_file_path, "Storage", skipheaders=2)
+    for path, table in read_input_tables(file_path, tab_file_path, cache=cache).items():
+        write_tab_file(table, path)
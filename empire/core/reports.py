@@ -0,0 +1,596 @@
+"""
+Result files of EMPIRE, written from a solution snapshot.
+
+Every report is written from a :class:`~empire.core.solution_snapshot.SolutionSnapshot`
+rather than from the solved instance, so the same functions write the results right after
+the solve and, with ``empire-report``, again from a snapshot file without building the
+model, e.g. when a writer failed, or when the operational files were left out of the run.
+
+The values are computed in the order in which Pyomo evaluates the expressions of the
+instance, which puts the coefficients of a variable before the variable, so the written
+files are identical to the ones written from the instance.
+"""
+import argparse
+import csv
+import logging
+import os
+from functools import partial
+from pathlib import Path
+
+from empire.core.operational_results import (
+    OPERATIONAL_RESOLVED_FILE,
+    RES_TECHNOLOGIES,
+    write_curtailed_operational_results,
+    write_operational_results,
+    write_transmission_operational_results,
+)
+from empire.core.result_tables import open_result_table
+from empire.core.solution_snapshot import SNAPSHOT_FILE, SolutionSnapshot, read_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def _sum(terms):
+    # Pyomo evaluates a sum from its first term, which keeps the sign of a single term of -0.0
+    terms = iter(terms)
+    total = next(terms, 0)
+    for term in terms:
+        total = total + term
+    return total
+
+
+def _capacity_sum(snapshot: SolutionSnapshot):
+    # The capacities of an out-of-sample run are parameters, which Python sums from 0
+    return _sum if "genInstalledCap" in snapshot.variables else sum
+
+
+def period_labels(snapshot: SolutionSnapshot) -> list[str]:
+    """
+    Label of every active period, e.g. '2020-2025'.
+
+    :param snapshot: Snapshot of the solution.
+    :return: Labels in the order of the periods.
+    """
+    leap_years = snapshot.instance.LeapYearsInvestment
+    return [str(2020 + int(i - 1) * leap_years) + "-" + str(2020 + int(i) * leap_years)
+            for i in snapshot.instance.PeriodActive]
+
+
+def write_objective(snapshot: SolutionSnapshot, result_file_path: Path, **_) -> None:
+    with open(result_file_path / 'results_objective.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Objective function value:" + str(snapshot.instance.Obj)])
+
+
+def write_gen_results(snapshot: SolutionSnapshot, result_file_path: Path, inv_per: list,
+                      results_format: str = "csv") -> None:
+    instance = snapshot.instance
+    my_string = ["Node","GeneratorType","Period","genInvCap_MW","genInstalledCap_MW","genExpectedCapacityFactor",
+                 "DiscountedInvestmentCost_Euro","genExpectedAnnualProduction_GWh"]
+    with open_result_table(result_file_path / 'results_output_gen.csv', my_string, results_format) as writer:
+        for (n,g) in instance.GeneratorsOfNode:
+            for i in instance.PeriodActive:
+                writer.writerow([
+                    n,
+                    g,
+                    inv_per[int(i-1)],
+                    instance.genInvCap[n,g,i],
+                    instance.genInstalledCap[n,g,i],
+                    _sum(instance.sceProbab[w]*instance.seasScale[s]*instance.genOperational[n,g,h,i,w]
+                         for (s,h) in instance.HoursOfSeason for w in instance.Scenario)
+                    / (instance.genInstalledCap[n,g,i]*8760) if instance.genInstalledCap[n,g,i] != 0 else 0,
+                    instance.discount_multiplier[i]*instance.genInvCap[n,g,i]*instance.genInvCost[g,i],
+                    _sum(instance.seasScale[s]*instance.sceProbab[w]/1000*instance.genOperational[n,g,h,i,w]
+                         for (s,h) in instance.HoursOfSeason for w in instance.Scenario)
+                ])
+
+
+def write_stor_results(snapshot: SolutionSnapshot, result_file_path: Path, inv_per: list,
+                       results_format: str = "csv") -> None:
+    instance = snapshot.instance
+    my_string = ["Node","StorageType","Period","storPWInvCap_MW","storPWInstalledCap_MW","storENInvCap_MWh",
+                 "storENInstalledCap_MWh","DiscountedInvestmentCostPWEN_EuroPerMWMWh",
+                 "ExpectedAnnualDischargeVolume_GWh","ExpectedAnnualLossesChargeDischarge_GWh"]
+    with open_result_table(result_file_path / 'results_output_stor.csv', my_string, results_format) as writer:
+        for (n,b) in instance.StoragesOfNode:
+            for i in instance.PeriodActive:
+                writer.writerow([
+                    n,
+                    b,
+                    inv_per[int(i-1)],
+                    instance.storPWInvCap[n,b,i],
+                    instance.storPWInstalledCap[n,b,i],
+                    instance.storENInvCap[n,b,i],
+                    instance.storENInstalledCap[n,b,i],
+                    instance.discount_multiplier[i]*(instance.storPWInvCap[n,b,i]*instance.storPWInvCost[b,i]
+                                                     + instance.storENInvCap[n,b,i]*instance.storENInvCost[b,i]),
+                    _sum(instance.sceProbab[w]*instance.seasScale[s]/1000*instance.storDischarge[n,b,h,i,w]
+                         for (s,h) in instance.HoursOfSeason for w in instance.Scenario),
+                    _sum(instance.sceProbab[w]*instance.seasScale[s]
+                         * ((1 - instance.storageDischargeEff[b])*instance.storDischarge[n,b,h,i,w]
+                            + (1 - instance.storageChargeEff[b])*instance.storCharge[n,b,h,i,w])/1000
+                         for (s,h) in instance.HoursOfSeason for w in instance.Scenario)])
+
+
+def write_transmision_results(snapshot: SolutionSnapshot, result_file_path: Path, inv_per: list,
+                              results_format: str = "csv") -> None:
+    instance = snapshot.instance
+    my_string = ["BetweenNode","AndNode","Period","transmisionInvCap_MW","transmissionInstalledCap_MW",
+                 "DiscountedInvestmentCost_Euro","transmisionExpectedAnnualVolume_GWh","ExpectedAnnualLosses_GWh"]
+    with open_result_table(result_file_path / 'results_output_transmision.csv', my_string, results_format) as writer:
+        for (n1,n2) in instance.BidirectionalArc:
+            for i in instance.PeriodActive:
+                writer.writerow([
+                    n1,
+                    n2,
+                    inv_per[int(i-1)],
+                    instance.transmisionInvCap[n1,n2,i],
+                    instance.transmissionInstalledCap[n1,n2,i],
+                    instance.discount_multiplier[i]*instance.transmisionInvCap[n1,n2,i]
+                    * instance.transmissionInvCost[n1,n2,i],
+                    _sum(instance.sceProbab[w]*instance.seasScale[s]
+                         * (instance.transmisionOperational[n1,n2,h,i,w]+instance.transmisionOperational[n2,n1,h,i,w])
+                         / 1000
+                         for (s,h) in instance.HoursOfSeason for w in instance.Scenario),
+                    _sum(instance.sceProbab[w]*instance.seasScale[s]
+                         * ((1 - instance.lineEfficiency[n1,n2])*instance.transmisionOperational[n1,n2,h,i,w]
+                            + (1 - instance.lineEfficiency[n2,n1])*instance.transmisionOperational[n2,n1,h,i,w])/1000
+                         for (s,h) in instance.HoursOfSeason for w in instance.Scenario)
+                ])
+
+
+def write_curtailed_prod_results(snapshot: SolutionSnapshot, result_file_path: Path, inv_per: list,
+                                 results_format: str = "csv") -> None:
+    instance = snapshot.instance
+    generators_of_technology = set(instance.GeneratorsOfTechnology)
+    my_string = ["Node","RESGeneratorType","Period","ExpectedAnnualCurtailment_GWh"]
+    with open_result_table(result_file_path / 'results_output_curtailed_prod.csv', my_string,
+                           results_format) as writer:
+        for t in instance.Technology:
+            if t in RES_TECHNOLOGIES:
+                for (n,g) in instance.GeneratorsOfNode:
+                    if (t,g) in generators_of_technology:
+                        for i in instance.PeriodActive:
+                            writer.writerow([
+                                n,
+                                g,
+                                inv_per[int(i-1)],
+                                _sum(instance.sceProbab[w]*instance.seasScale[s]
+                                     * (instance.genCapAvail[n,g,h,w,i]*instance.genInstalledCap[n,g,i]
+                                        - instance.genOperational[n,g,h,i,w])/1000
+                                     for w in instance.Scenario for (s,h) in instance.HoursOfSeason)
+                            ])
+
+
+def write_europe_plot(snapshot: SolutionSnapshot, result_file_path: Path, inv_per: list, **_) -> None:
+    instance = snapshot.instance
+    sum_capacity = _capacity_sum(snapshot)
+    with open(result_file_path / 'results_output_EuropePlot.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Period","genInstalledCap_MW"])
+        writer.writerow([""] + list(instance.Generator))
+        writer.writerow(["Initial"] + [_sum(instance.genInitCap[n,g,1] for n in instance.NodesOfGenerator[g])
+                                       for g in instance.Generator])
+        for i in instance.PeriodActive:
+            writer.writerow([inv_per[int(i-1)]]
+                            + [sum_capacity(instance.genInstalledCap[n,g,i] for n in instance.NodesOfGenerator[g])
+                               for g in instance.Generator])
+        writer.writerow([""])
+        writer.writerow(["Period","genExpectedAnnualProduction_GWh"])
+        writer.writerow([""] + list(instance.Generator))
+        for i in instance.PeriodActive:
+            writer.writerow([inv_per[int(i-1)]]
+                            + [_sum(instance.sceProbab[w]*instance.seasScale[s]/1000*instance.genOperational[n,g,h,i,w]
+                                    for n in instance.NodesOfGenerator[g] for (s,h) in instance.HoursOfSeason
+                                    for w in instance.Scenario)
+                               for g in instance.Generator])
+        writer.writerow([""])
+        writer.writerow(["Period","storPWInstalledCap_MW"])
+        writer.writerow([""] + list(instance.Storage))
+        for i in instance.PeriodActive:
+            writer.writerow([inv_per[int(i-1)]]
+                            + [sum_capacity(instance.storPWInstalledCap[n,b,i] for n in instance.NodesOfStorage[b])
+                               for b in instance.Storage])
+        writer.writerow([""])
+        writer.writerow(["Period","storENInstalledCap_MW"])
+        writer.writerow([""] + list(instance.Storage))
+        for i in instance.PeriodActive:
+            writer.writerow([inv_per[int(i-1)]]
+                            + [sum_capacity(instance.storENInstalledCap[n,b,i] for n in instance.NodesOfStorage[b])
+                               for b in instance.Storage])
+        writer.writerow([""])
+        writer.writerow(["Period","storExpectedAnnualDischarge_GWh"])
+        writer.writerow([""] + list(instance.Storage))
+        for i in instance.PeriodActive:
+            writer.writerow([inv_per[int(i-1)]]
+                            + [_sum(instance.sceProbab[w]*instance.seasScale[s]/1000*instance.storDischarge[n,b,h,i,w]
+                                    for n in instance.NodesOfStorage[b] for (s,h) in instance.HoursOfSeason
+                                    for w in instance.Scenario)
+                               for b in instance.Storage])
+
+
+def write_europe_summary(snapshot: SolutionSnapshot, result_file_path: Path, inv_per: list, **_) -> None:
+    instance = snapshot.instance
+    sum_capacity = _capacity_sum(snapshot)
+    with open(result_file_path / 'results_output_EuropeSummary.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Period","Scenario","AnnualCO2emission_Ton","CO2Price_EuroPerTon","CO2Cap_Ton",
+                         "AnnualGeneration_GWh","AvgCO2factor_TonPerMWh","AvgELPrice_EuroPerMWh",
+                         "TotAnnualCurtailedRES_GWh","TotAnnualLossesChargeDischarge_GWh",
+                         "AnnualLossesTransmission_GWh"])
+        for i in instance.PeriodActive:
+            for w in instance.Scenario:
+                my_string=[inv_per[int(i-1)],w,
+                _sum(instance.seasScale[s]*instance.genCO2TypeFactor[g]*(3.6/instance.genEfficiency[g,i])
+                     * instance.genOperational[n,g,h,i,w]
+                     for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)]
+                if snapshot.metadata.get("emission_cap"):
+                    my_string.extend([instance.dual[instance.emission_cap[i,w]]
+                                      / (instance.operationalDiscountrate*instance.sceProbab[w]*1e6),
+                                      instance.CO2cap[i]*1e6])
+                else:
+                    my_string.extend([instance.CO2price[i],0])
+                my_string.extend([
+                _sum(instance.seasScale[s]/1000*instance.genOperational[n,g,h,i,w]
+                     for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason),
+                _sum(instance.seasScale[s]*instance.genCO2TypeFactor[g]*(3.6/instance.genEfficiency[g,i])
+                     * instance.genOperational[n,g,h,i,w]
+                     for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)
+                / _sum(instance.seasScale[s]*instance.genOperational[n,g,h,i,w]
+                       for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason),
+                _sum(instance.dual[instance.FlowBalance[n,h,i,w]]
+                     / (instance.operationalDiscountrate*instance.seasScale[s]*instance.sceProbab[w])
+                     for n in instance.Node for (s,h) in instance.HoursOfSeason)
+                / (len(instance.HoursOfSeason)*len(instance.Node)),
+                _sum(instance.seasScale[s]*(instance.genCapAvail[n,g,h,w,i]*instance.genInstalledCap[n,g,i]
+                                            - instance.genOperational[n,g,h,i,w])/1000
+                     for (n,g) in instance.GeneratorsOfNode
+                     if g == 'Hydrorun-of-the-river' or g == 'Windonshore' or g == 'Windoffshore' or g == 'Solar'
+                     for (s,h) in instance.HoursOfSeason),
+                _sum(instance.seasScale[s]*((1 - instance.storageDischargeEff[b])*instance.storDischarge[n,b,h,i,w]
+                                            + (1 - instance.storageChargeEff[b])*instance.storCharge[n,b,h,i,w])/1000
+                     for (n,b) in instance.StoragesOfNode for (s,h) in instance.HoursOfSeason),
+                _sum(instance.seasScale[s]
+                     * ((1 - instance.lineEfficiency[n1,n2])*instance.transmisionOperational[n1,n2,h,i,w]
+                        + (1 - instance.lineEfficiency[n2,n1])*instance.transmisionOperational[n2,n1,h,i,w])/1000
+                     for (n1,n2) in instance.BidirectionalArc for (s,h) in instance.HoursOfSeason)])
+                writer.writerow(my_string)
+        writer.writerow([""])
+        writer.writerow(["GeneratorType","Period","genInvCap_MW","genInstalledCap_MW","TotDiscountedInvestmentCost_Euro",
+                         "genExpectedAnnualProduction_GWh"])
+        for g in instance.Generator:
+            for i in instance.PeriodActive:
+                writer.writerow([g,inv_per[int(i-1)],
+                sum_capacity(instance.genInvCap[n,g,i] for n in instance.NodesOfGenerator[g]),
+                sum_capacity(instance.genInstalledCap[n,g,i] for n in instance.NodesOfGenerator[g]),
+                _sum(instance.discount_multiplier[i]*instance.genInvCap[n,g,i]*instance.genInvCost[g,i]
+                     for n in instance.NodesOfGenerator[g]),
+                _sum(instance.seasScale[s]*instance.sceProbab[w]/1000*instance.genOperational[n,g,h,i,w]
+                     for n in instance.NodesOfGenerator[g] for (s,h) in instance.HoursOfSeason
+                     for w in instance.Scenario)])
+        writer.writerow([""])
+        writer.writerow(["StorageType","Period","storPWInvCap_MW","storPWInstalledCap_MW","storENInvCap_MWh",
+                         "storENInstalledCap_MWh","TotDiscountedInvestmentCostPWEN_Euro",
+                         "ExpectedAnnualDischargeVolume_GWh"])
+        for b in instance.Storage:
+            for i in instance.PeriodActive:
+                writer.writerow([b,inv_per[int(i-1)],
+                sum_capacity(instance.storPWInvCap[n,b,i] for n in instance.NodesOfStorage[b]),
+                sum_capacity(instance.storPWInstalledCap[n,b,i] for n in instance.NodesOfStorage[b]),
+                sum_capacity(instance.storENInvCap[n,b,i] for n in instance.NodesOfStorage[b]),
+                sum_capacity(instance.storENInstalledCap[n,b,i] for n in instance.NodesOfStorage[b]),
+                _sum(instance.discount_multiplier[i]*(instance.storPWInvCap[n,b,i]*instance.storPWInvCost[b,i]
+                                                      + instance.storENInvCap[n,b,i]*instance.storENInvCost[b,i])
+                     for n in instance.NodesOfStorage[b]),
+                _sum(instance.seasScale[s]*instance.sceProbab[w]/1000*instance.storDischarge[n,b,h,i,w]
+                     for n in instance.NodesOfStorage[b] for (s,h) in instance.HoursOfSeason
+                     for w in instance.Scenario)])
+
+
+def write_first_stage_tab_files(snapshot: SolutionSnapshot, result_file_path: Path, **_) -> None:
+    """
+    Write the investment and installed capacities as .tab files, the input of an out-of-sample run.
+    """
+    instance = snapshot.instance
+    tables = [
+        ('genInvCap', ["Node","Generator"], instance.GeneratorsOfNode),
+        ('transmisionInvCap', ["FromNode","ToNode"], instance.BidirectionalArc),
+        ('storPWInvCap', ["Node","Storage"], instance.StoragesOfNode),
+        ('storENInvCap', ["Node","Storage"], instance.StoragesOfNode),
+        ('genInstalledCap', ["Node","Generator"], instance.GeneratorsOfNode),
+        ('transmissionInstalledCap', ["FromNode","ToNode"], instance.BidirectionalArc),
+        ('storPWInstalledCap', ["Node","Storage"], instance.StoragesOfNode),
+        ('storENInstalledCap', ["Node","Storage"], instance.StoragesOfNode),
+    ]
+    for name, columns, index in tables:
+        values = getattr(instance, name)
+        with open(result_file_path / f'{name}.tab', 'w', newline='') as f:
+            writer = csv.writer(f, delimiter='\t')
+            writer.writerow(columns + ["Period", name])
+            for (n1,n2) in index:
+                for i in instance.PeriodActive:
+                    writer.writerow([n1,n2,i,values[n1,n2,i]])
+
+
+def write_iamc_results(snapshot: SolutionSnapshot, result_file_path: Path, **_) -> None:
+    """
+    Write the results in the IAMC format to IAMC/empire_iamc.csv.
+    """
+    import pandas as pd
+
+    instance = snapshot.instance
+    lengthRegSeason = instance.lengthRegSeason
+    lengthPeakSeason = instance.lengthPeakSeason
+
+    Modelname = "EMPIRE"
+    Scenario = "1.5degree"
+
+    dict_countries = {"Austria": "Austria",
+                      "Bosnia and Herzegovina": "BosniaH",
+                      "Belgium": "Belgium", "Bulgaria": "Bulgaria",
+                      "Switzerland": "Switzerland",
+                      "Czech Republic": "CzechR", "Germany": "Germany",
+                      "Denmark": "Denmark", "Estonia": "Estonia",
+                      "Spain": "Spain", "Finland": "Finland",
+                      "France": "France", "United Kingdom": "GreatBrit.",
+                      "Greece": "Greece", "Croatia": "Croatia",
+                      "Hungary": "Hungary", "Ireland": "Ireland",
+                      "Italy": "Italy", "Lithuania": "Lithuania",
+                      "Luxembourg": "Luxemb.", "Latvia": "Latvia",
+                      "North Macedonia": "Macedonia",
+                      "The Netherlands": "Netherlands", "Norway": "Norway",
+                      "Poland": "Poland", "Portugal": "Portugal",
+                      "Romania": "Romania", "Serbia": "Serbia",
+                      "Sweden": "Sweden", "Slovenia": "Slovenia",
+                      "Slovakia": "Slovakia", "Norway|Ostland": "NO1",
+                      "Norway|Sorland": "NO2", "Norway|Norgemidt": "NO3",
+                      "Norway|Troms": "NO4", "Norway|Vestmidt": "NO5"}
+
+    dict_countries_reversed = dict([reversed(i) for i in dict_countries.items()])
+
+    dict_generators = {"Bio": "Biomass", "Bioexisting": "Biomass",
+                       "Coalexisting": "Coal|w/o CCS",
+                       "Coal": "Coal|w/o CCS", "CoalCCS": "Coal|w/ CCS",
+                       "CoalCCSadv": "Coal|w/ CCS",
+                       "Lignite": "Lignite|w/o CCS",
+                       "Liginiteexisting": "Lignite|w/o CCS",
+                       "LigniteCCSadv": "Lignite|w/ CCS",
+                       "Gasexisting": "Gas|CCGT|w/o CCS",
+                       "GasOCGT": "Gas|OCGT|w/o CCS",
+                       "GasCCGT": "Gas|CCGT|w/o CCS",
+                       "GasCCS": "Gas|CCGT|w/ CCS",
+                       "GasCCSadv": "Gas|CCGT|w/ CCS",
+                       "Oilexisting": "Oil", "Nuclear": "Nuclear",
+                       "Wave": "Ocean", "Geo": "Geothermal",
+                       "Hydroregulated": "Hydro|Reservoir",
+                       "Hydrorun-of-the-river": "Hydro|Run-of-River",
+                       "Windonshore": "Wind|Onshore",
+                       "Windoffshore": "Wind|Offshore",
+                       "Windoffshoregrounded": "Wind|Offshore",
+                       "Windoffshorefloating": "Wind|Offshore",
+                       "Solar": "Solar|PV", "Waste": "Waste",
+                       "Bio10cofiring": "Coal|w/o CCS",
+                       "Bio10cofiringCCS": "Coal|w/ CCS",
+                       "LigniteCCSsup": "Lignite|w/ CCS"}
+
+    #Make datetime from HoursOfSeason
+    seasonstart={"winter": '2020-01-01',
+                 "spring": '2020-04-01',
+                 "summer": '2020-07-01',
+                 "fall": '2020-10-01',
+                 "peak1": '2020-11-01',
+                 "peak2": '2020-12-01'}
+
+    seasonhours=[]
+
+    for s in instance.Season:
+        if s not in 'peak':
+            t=pd.to_datetime(list(range(lengthRegSeason)), unit='h', origin=pd.Timestamp(seasonstart[s]))
+            t=[str(i)[5:-3] for i in t]
+            t=[str(i)+"+01:00" for i in t]
+            seasonhours+=t
+        else:
+            t=pd.to_datetime(list(range(lengthPeakSeason)), unit='h', origin=pd.Timestamp(seasonstart[s]))
+            t=[str(i)[5:-3] for i in t]
+            t=[str(i)+"+01:00" for i in t]
+            seasonhours+=t
+
+    #Scalefactors to make units
+    Mtonperton = (1/1000000)
+
+    GJperMWh = 3.6
+    EJperMWh = 3.6*10**(-9)
+
+    GWperMW = (1/1000)
+
+    USD10perEUR10 = 1.33 #Source: https://www.statista.com/statistics/412794/euro-to-u-s-dollar-annual-average-exchange-rate/
+    EUR10perEUR18 = 154/171 #Source: https://www.inflationtool.com/euro
+    USD10perEUR18 = USD10perEUR10*EUR10perEUR18
+
+    logger.info("Writing standard output to .csv...")
+
+    years = [2020+(i)*instance.LeapYearsInvestment for i in instance.PeriodActive]
+    f = pd.DataFrame(columns=["model", "scenario", "region", "variable", "unit", "subannual"]+years)
+
+    def row_write(df, region, variable, unit, subannual, input_value, scenario=Scenario, modelname=Modelname):
+        df2 = pd.DataFrame([[modelname, scenario, region, variable, unit, subannual]+input_value],
+                           columns=["model", "scenario", "region", "variable", "unit", "subannual"]+years)
+        df = pd.concat([df, df2], ignore_index=True)
+        return df
+
+    def storage_investment(i):
+        # The investment costs of power and energy capacity are summed as one sum
+        return _sum(t for (n,b) in instance.StoragesOfNode
+                    for t in (instance.storPWInvCost[b,i]*instance.storPWInvCap[n,b,i],
+                              instance.storENInvCost[b,i]*instance.storENInvCap[n,b,i]))
+
+    def transmission_investment(i):
+        return _sum(instance.transmissionInvCost[n1,n2,i]*instance.transmisionInvCap[n1,n2,i]
+                    for (n1,n2) in instance.BidirectionalArc)
+
+    #Discount rate
+    f = row_write(f, "Europe", "Discount rate|Electricity", "%", "Year",
+                  [instance.discountrate*100]*len(instance.PeriodActive))
+    #Total European installed generator capacity
+    f = row_write(f, "Europe", "Capacity|Electricity", "GW", "Year",
+                  [_sum(instance.genInstalledCap[n,g,i]*GWperMW for (n,g) in instance.GeneratorsOfNode)
+                   for i in instance.PeriodActive])
+    #Total European investment cost (gen+stor+trans)
+    f = row_write(f, "Europe", "Investment|Energy Supply|Electricity", "billion US$2010/yr", "Year",
+                  [_sum([(1/instance.LeapYearsInvestment)*USD10perEUR18
+                         * _sum(instance.genInvCost[g,i]*instance.genInvCap[n,g,i]
+                                for (n,g) in instance.GeneratorsOfNode),
+                         transmission_investment(i),
+                         storage_investment(i)]) for i in instance.PeriodActive])
+    #Total European storage investment cost
+    f = row_write(f, "Europe", "Investment|Energy Supply|Electricity|Electricity storage", "billion US$2010/yr", "Year",
+                  [(1/instance.LeapYearsInvestment)*USD10perEUR18*storage_investment(i)
+                   for i in instance.PeriodActive])
+    #Total European transmission investment cost
+    f = row_write(f, "Europe", "Investment|Energy Supply|Electricity|Transmission and Distribution",
+                  "billion US$2010/yr", "Year",
+                  [(1/instance.LeapYearsInvestment)*USD10perEUR18*transmission_investment(i)
+                   for i in instance.PeriodActive])
+    for w in instance.Scenario:
+        #Total European emissions per scenario
+        f = row_write(f, "Europe", "Emissions|CO2|Energy|Supply|Electricity", "Mt CO2/yr", "Year",
+                      [Mtonperton*_sum(instance.seasScale[s]*instance.genCO2TypeFactor[g]
+                                       * (GJperMWh/instance.genEfficiency[g,i])*instance.genOperational[n,g,h,i,w]
+                                       for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)
+                       for i in instance.PeriodActive], Scenario+"|"+str(w))
+        #Total European generation per scenario
+        f = row_write(f, "Europe", "Secondary Energy|Electricity", "EJ/yr", "Year",
+                      [_sum(EJperMWh*instance.seasScale[s]*instance.genOperational[n,g,h,i,w]
+                            for (n,g) in instance.GeneratorsOfNode for (s,h) in instance.HoursOfSeason)
+                       for i in instance.PeriodActive], Scenario+"|"+str(w))
+        for g in instance.Generator:
+            #Total generation per type and scenario
+            f = row_write(f, "Europe", "Active Power|Electricity|"+dict_generators[str(g)], "MWh", "Year",
+                          [_sum(instance.seasScale[s]*instance.genOperational[n,g,h,i,w]
+                                for n in instance.NodesOfGenerator[g] for (s,h) in instance.HoursOfSeason)
+                           for i in instance.PeriodActive], Scenario+"|"+str(w))
+        for (s,h) in instance.HoursOfSeason:
+            for n in instance.Node:
+                f = row_write(f, dict_countries_reversed[str(n)], "Price|Secondary Energy|Electricity", "US$2010/GJ",
+                              seasonhours[h-1],
+                              [instance.dual[instance.FlowBalance[n,h,i,w]]
+                               / (GJperMWh*instance.operationalDiscountrate*instance.seasScale[s]*instance.sceProbab[w])
+                               for i in instance.PeriodActive], Scenario+"|"+str(w)+str(s))
+    for g in instance.Generator:
+        #Total European installed generator capacity per type
+        f = row_write(f, "Europe", "Capacity|Electricity|"+dict_generators[str(g)], "GW", "Year",
+                      [_sum(instance.genInstalledCap[n,g,i]*GWperMW for n in instance.NodesOfGenerator[g])
+                       for i in instance.PeriodActive])
+        #Capital generator cost
+        f = row_write(f, "Europe", "Capital Cost|Electricity|"+dict_generators[str(g)], "US$2010/kW", "Year",
+                      [instance.genCapitalCost[g,i]*USD10perEUR18 for i in instance.PeriodActive])
+        if instance.genMargCost[g,instance.PeriodActive[0]] != 0:
+            f = row_write(f, "Europe", "Variable Cost|Electricity|"+dict_generators[str(g)], "EUR/MWh", "Year",
+                          [instance.genMargCost[g,i] for i in instance.PeriodActive])
+        #Total generator investment cost per type
+        f = row_write(f, "Europe", "Investment|Energy Supply|Electricity|"+dict_generators[str(g)],
+                      "billion US$2010/yr", "Year",
+                      [(1/instance.LeapYearsInvestment)*USD10perEUR18
+                       * _sum(instance.genInvCost[g,i]*instance.genInvCap[n,g,i] for n in instance.NodesOfGenerator[g])
+                       for i in instance.PeriodActive])
+        if instance.genCO2TypeFactor[g] != 0:
+            #CO2 factor per generator type
+            f = row_write(f, "Europe", "CO2 Emmissions|Electricity|"+dict_generators[str(g)], "tons/MWh", "Year",
+                          [instance.genCO2TypeFactor[g]*(GJperMWh/instance.genEfficiency[g,i])
+                           for i in instance.PeriodActive])
+    for (n,g) in instance.GeneratorsOfNode:
+        #Installed generator capacity per country and type
+        f = row_write(f, dict_countries_reversed[str(n)], "Capacity|Electricity|"+dict_generators[str(g)], "GW", "Year",
+                      [instance.genInstalledCap[n,g,i]*GWperMW for i in instance.PeriodActive])
+
+    #NB! DOES NOT WORK FOR UNIT COSTS; SHOULD BE FIXED
+    f = f.groupby(['model','scenario','region','variable','unit','subannual']).sum().reset_index()
+
+    if not os.path.exists(result_file_path / 'IAMC'):
+        os.makedirs(result_file_path / 'IAMC')
+    f.to_csv(result_file_path / 'IAMC/empire_iamc.csv', index=None)
+
+
+def write_co2_price_resolved(_snapshot: SolutionSnapshot, result_file_path: Path, **_) -> None:
+    with open(result_file_path / 'results_co2_price_resolved.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Period","Scenario","AnnualCO2emission_Ton","CO2Price_EuroPerTon"])
+
+
+# Reports of the solution, in the order they are written after the solve
+REPORTS = {
+    "objective": write_objective,
+    "gen": write_gen_results,
+    "stor": write_stor_results,
+    "transmision": write_transmision_results,
+    "transmision_operational": write_transmission_operational_results,
+    "operational": write_operational_results,
+    "curtailed_operational": write_curtailed_operational_results,
+    "curtailed_prod": write_curtailed_prod_results,
+    "europe_plot": write_europe_plot,
+    "europe_summary": write_europe_summary,
+    "first_stage": write_first_stage_tab_files,
+    "iamc": write_iamc_results,
+}
+# Reports of the solution of the resolve for the operational duals
+RESOLVED_REPORTS = {
+    "operational_resolved": partial(write_operational_results, file_name=OPERATIONAL_RESOLVED_FILE),
+    "co2_price_resolved": write_co2_price_resolved,
+}
+# Hourly reports, the largest result files
+OPERATIONAL_REPORTS = ("transmision_operational", "operational", "curtailed_operational", "operational_resolved")
+OUT_OF_SAMPLE_REPORTS = ("objective", "gen", "stor", "transmision", "curtailed_prod", "europe_plot", "europe_summary")
+
+
+def write_reports(snapshot: SolutionSnapshot, result_file_path: Path, reports, results_format: str = "csv") -> None:
+    """
+    Write reports of a snapshot.
+
+    :param snapshot: Snapshot of the solution, or of the solution of the resolve for the
+        operational duals for the reports in :data:`RESOLVED_REPORTS`.
+    :param result_file_path: Folder to write the reports to.
+    :param reports: Names of the reports in :data:`REPORTS` or :data:`RESOLVED_REPORTS`.
+    :param results_format: Format of the result tables, 'csv' or 'parquet'.
+    """
+    inv_per = period_labels(snapshot)
+    for report in reports:
+        logger.info("Writing report: %s", report)
+        write = REPORTS.get(report) or RESOLVED_REPORTS[report]
+        write(snapshot, result_file_path, inv_per=inv_per, results_format=results_format)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Write reports of a solution snapshot without solving the model, by default the result files of the run.
+
+    :param argv: Command line arguments, by default those of the process.
+    """
+    parser = argparse.ArgumentParser(description="Write EMPIRE result files from a solution snapshot.")
+    parser.add_argument("snapshot", type=Path, help=f"Snapshot file, e.g. Results/<run>/Output/{SNAPSHOT_FILE}")
+    parser.add_argument("-r", "--reports", nargs="+", choices=list(REPORTS) + list(RESOLVED_REPORTS),
+                        help="Reports to write. Default: the reports of the run.")
+    parser.add_argument("-o", "--output", type=Path,
+                        help="Folder to write the reports to. Default: the folder of the snapshot.")
+    parser.add_argument("-f", "--results-format", choices=["csv", "parquet"], default="csv",
+                        help="Format of the result tables.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    snapshot, resolved = read_snapshot(args.snapshot)
+    output = args.output or args.snapshot.parent
+    os.makedirs(output, exist_ok=True)
+
+    if snapshot.metadata.get("out_of_sample"):
+        run_reports = list(OUT_OF_SAMPLE_REPORTS)
+    else:
+        run_reports = [report for report in REPORTS if report != "iamc" or snapshot.metadata.get("iamc")]
+        run_reports += list(RESOLVED_REPORTS) if resolved is not None else []
+    # By default the reports of the run, but any report of the solution can be written
+    reports = args.reports or run_reports
+    if resolved is None and any(report in RESOLVED_REPORTS for report in reports):
+        parser.error("The snapshot has no solution of the resolve for the operational duals")
+
+    write_reports(snapshot, output, [report for report in reports if report in REPORTS], args.results_format)
+    if resolved is not None:
+        write_reports(resolved, output, [report for report in reports if report in RESOLVED_REPORTS],
+                      args.results_format)
@@ -0,0 +1,318 @@
+"""
+Storage formats of the tabular result files.
+
+Result tables are written as CSV by default. With the Parquet format the same tables are
+written as Parquet (requires ``pyarrow``) next to where the CSV file would be, using a
+``.parquet`` suffix. Tables with both a Period and a Scenario column are written as a
+dataset partitioned on these columns, so a single period or scenario can be read without
+touching the rest of the table. The rows of a partitioned table are numbered, so they are
+read back in the same order as from the CSV file. Parquet tables are written in batches,
+so a table is never held in memory as a whole.
+"""
+import csv
+import logging
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FORMATS = ("csv", "parquet")
+PARTITION_COLUMNS = ["Period", "Scenario"]
+# Integer columns of the result tables, all other numbers are stored as floats in Parquet
+INTEGER_COLUMNS = ["Hour"]
+# Number of every row of a partitioned Parquet table, in the order the rows were written
+ROW_COLUMN = "__row"
+# Rows written to a Parquet table at a time
+BATCH_ROWS = 100_000
+# Characters that make csv.writer quote a field
+_CSV_SPECIAL = (",", '"', "\r", "\n")
+
+# Result files with a single header row, which can be stored in either format. The
+# multi-section Europe files and the objective are always written as CSV.
+TABULAR_RESULT_FILES = [
+    "results_output_gen.csv",
+    "results_output_stor.csv",
+    "results_output_transmision.csv",
+    "results_output_transmision_operational.csv",
+    "results_output_Operational.csv",
+    "results_output_Operational_resolved.csv",
+    "results_output_curtailed_operational.csv",
+    "results_output_curtailed_prod.csv",
+]
+
+
+def parquet_path(path: Path) -> Path:
+    """
+    Location of the Parquet counterpart of a .csv result file.
+
+    :param path: Path to the .csv result file.
+    :return: Path with a .parquet suffix.
+    """
+    return Path(path).with_suffix(".parquet")
+
+
+class _CsvTable:
+    """Writes rows through csv.writer, and blocks of rows given as columns."""
+
+    def __init__(self, file, header: list[str]):
+        self._file = file
+        self._writer = csv.writer(file)
+        self._writer.writerow(header)
+
+    def writerow(self, row):
+        self._writer.writerow(row)
+
+    def writerows(self, rows):
+        self._writer.writerows(rows)
+
+    def write_columns(self, columns: list):
+        """
+        Write a block of rows given as columns.
+
+        The values are formatted column by column, and as csv.writer formats them, so rows
+        can be written either way.
+
+        :param columns: Values of every column, as arrays of the same length or scalars repeated on every row.
+        """
+        n_rows = next(len(c) for c in columns if isinstance(c, np.ndarray))
+        if n_rows == 0:
+            return
+        fields = [_csv_fields(c) if isinstance(c, np.ndarray) else [_csv_field(c)] * n_rows for c in columns]
+        self._file.write("\r\n".join(map(",".join, zip(*fields))) + "\r\n")
+
+
+def _csv_field(v) -> str:
+    if v is None:
+        return ""
+    if v.__class__ is str and any(c in v for c in _CSV_SPECIAL):
+        return '"' + v.replace('"', '""') + '"'
+    return str(v)
+
+
+def _csv_fields(values: np.ndarray) -> list[str]:
+    values = values.tolist()
+    fields = list(map(str, values))
+    # Only strings can need quoting, as numbers never contain these characters
+    if None in values or any(c in "".join(fields) for c in _CSV_SPECIAL):
+        return list(map(_csv_field, values))
+    return fields
+
+
+class _ParquetTable:
+    """
+    Writes rows and blocks of columns to a Parquet table in batches, without holding the table in memory.
+
+    A partitioned table keeps a file open for every partition, and every row is numbered so
+    that :func:`read_parquet_table` can restore the order in which the rows were written.
+    """
+
+    def __init__(self, path: Path, header: list[str]):
+        self.path = Path(path)
+        self.header = header
+        self.partitioned = all(col in header for col in PARTITION_COLUMNS)
+        self._rows = []
+        self._n_rows = 0
+        self._schema = None
+        self._writers = {}
+
+    def writerow(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= BATCH_ROWS:
+            self._flush()
+
+    def writerows(self, rows):
+        for row in rows:
+            self.writerow(row)
+
+    def write_columns(self, columns: list):
+        self._flush()
+        self.write_frame(pd.DataFrame(dict(zip(self.header, columns))))
+
+    def write_frame(self, df: pd.DataFrame):
+        """
+        Write a block of rows.
+
+        Numbers are stored as floats, except in the integer columns, so the blocks share one schema.
+
+        :param df: Rows with the columns of the table.
+        """
+        import pyarrow as pa
+
+        if len(df) == 0:
+            return
+        df = _normalize_types(df)
+        if self.partitioned:
+            df[ROW_COLUMN] = np.arange(self._n_rows, self._n_rows + len(df))
+        self._n_rows += len(df)
+        if self._schema is None:
+            self._schema = pa.Schema.from_pandas(df, preserve_index=False)
+            if self.partitioned:
+                for col in PARTITION_COLUMNS:
+                    self._schema = self._schema.remove(self._schema.get_field_index(col))
+
+        if not self.partitioned:
+            self._write(None, df)
+            return
+        for key, part in df.groupby(PARTITION_COLUMNS, sort=False, dropna=False):
+            self._write(key, part.drop(columns=PARTITION_COLUMNS))
+
+    def _write(self, key, df: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if key not in self._writers:
+            if key is None:
+                path = self.path
+            else:
+                # Hive-style partition folders, e.g. Period=2020-2025/Scenario=scenario1
+                path = self.path.joinpath(*(f"{col}={quote(str(v), safe='')}"
+                                            for col, v in zip(PARTITION_COLUMNS, key)))
+                path.mkdir(parents=True, exist_ok=True)
+                path = path / "part-0.parquet"
+            self._writers[key] = pq.ParquetWriter(path, self._schema)
+        self._writers[key].write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+
+    def _flush(self):
+        if self._rows:
+            rows, self._rows = self._rows, []
+            self.write_frame(pd.DataFrame(rows, columns=self.header))
+
+    def close(self):
+        self._flush()
+        if self._schema is None:
+            # A table without rows is a single file with the columns
+            pd.DataFrame(columns=self.header).to_parquet(self.path, index=False)
+        for writer in self._writers.values():
+            writer.close()
+
+
+def _normalize_types(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for col in df.columns:
+        if col in INTEGER_COLUMNS:
+            df[col] = df[col].astype("int64")
+        elif pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.infer_dtype(df[col], skipna=True) in (
+            "integer", "floating", "mixed-integer-float"
+        ):
+            df[col] = df[col].astype(float)
+    return df
+
+
+@contextmanager
+def open_result_table(path: Path, header: list[str], results_format: str = "csv"):
+    """
+    Open a result table for writing rows through a csv.writer-like object, which also writes
+    blocks of rows given as columns with ``write_columns``.
+
+    A copy of the table in the other format, left from an earlier run, is removed.
+
+    :param path: Path to the .csv result file. Parquet tables are written to the same path with a .parquet suffix.
+    :param header: Column names.
+    :param results_format: One of 'csv' or 'parquet'.
+    :raises ValueError: If the results format is unknown.
+    """
+    if results_format == "csv":
+        _remove(parquet_path(path))
+        with open(path, "w", newline="") as f:
+            yield _CsvTable(f, header)
+    elif results_format == "parquet":
+        _remove(path)
+        _remove(parquet_path(path))
+        table = _ParquetTable(parquet_path(path), header)
+        try:
+            yield table
+        finally:
+            table.close()
+    else:
+        raise ValueError(f"Unknown results format '{results_format}'. Options: {RESULTS_FORMATS}")
+
+
+def _remove(path: Path) -> None:
+    path = Path(path)
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def write_parquet_table(df: pd.DataFrame, path: Path) -> None:
+    """
+    Write a result table as Parquet, replacing an existing table.
+
+    :param df: Result table.
+    :param path: Path to the .parquet file or dataset folder.
+    """
+    _remove(path)
+    table = _ParquetTable(path, list(df.columns))
+    table.write_frame(df)
+    table.close()
+
+
+def read_parquet_table(path: Path, filters: list | None = None) -> pd.DataFrame:
+    """
+    Read a result table written by :func:`write_parquet_table`.
+
+    Partition columns are restored to their original position and type, and the rows to the
+    order in which they were written, as in the CSV file.
+
+    :param path: Path to the .parquet file or dataset folder.
+    :param filters: Optional row filters in pyarrow's format, e.g. [("Node", "==", "Norway")].
+    :return: DataFrame with the result table.
+    """
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    df = pd.read_parquet(path, filters=filters)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+
+    if ROW_COLUMN in df.columns:
+        df = df.sort_values(ROW_COLUMN, kind="stable")
+
+    first_file = path if path.is_file() else next(path.rglob("*.parquet"))
+    columns = [c["name"] for c in pq.read_schema(first_file).pandas_metadata["columns"]]
+    return df[[c for c in columns if c in df.columns and c != ROW_COLUMN]].reset_index(drop=True)
+
+
+def read_result_table(path: Path) -> pd.DataFrame:
+    """
+    Read a result table in whichever format it was written.
+
+    :param path: Path to the .csv result file.
+    :return: DataFrame with the result table.
+    """
+    if parquet_path(path).exists():
+        return read_parquet_table(parquet_path(path))
+    return pd.read_csv(path)
+
+
+def convert_results_to_parquet(output_path: Path, remove_csv: bool = False) -> list[Path]:
+    """
+    Migrate the tabular CSV result files of a result folder to Parquet.
+
+    :param output_path: Folder containing the result files.
+    :param remove_csv: If true, remove each CSV file after it is converted.
+    :return: Paths of the written Parquet tables.
+    """
+    converted = []
+    for file_name in TABULAR_RESULT_FILES:
+        csv_path = Path(output_path) / file_name
+        if not csv_path.exists():
+            continue
+        logger.info("Converting %s to Parquet", csv_path)
+        _remove(parquet_path(csv_path))
+        table = _ParquetTable(parquet_path(csv_path), list(pd.read_csv(csv_path, nrows=0).columns))
+        with pd.read_csv(csv_path, chunksize=BATCH_ROWS) as chunks:
+            for chunk in chunks:
+                table.write_frame(chunk)
+        table.close()
+        converted.append(parquet_path(csv_path))
+        if remove_csv:
+            csv_path.unlink()
+    return converted
@@ -1,15 +1,15 @@
 import json
 import logging
 import os
-import random
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from scipy.stats import kurtosis, skew, wasserstein_distance
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.cluster import KMeans
 
 from empire.core.config import EmpireConfiguration, EmpireRunConfiguration
@@ -19,302 +19,270 @@ from empire.core.scenario_utils import make_datetime, year_season_filter, remove
 
 logger = logging.getLogger(__name__)
 
-def gather_regular_sample(data, season, seasons, regularSeasonHours, sample_hour):
-    data = data.reset_index(drop=True)
-    
-    # Ensure we have enough hours remaining for a full window
-    if sample_hour + regularSeasonHours > len(data):
-        raise ValueError(f"Not enough hours remaining in season {season}. Need {regularSeasonHours} hours but only {len(data) - sample_hour} available.")
-    
-    sample_data = data.iloc[sample_hour : sample_hour + regularSeasonHours, :]
-    # Sort sample_data to start on midnight monday (INACTIVE)
-    # sample_data = sample_data.sort_values(by=['dayofweek','hour'])
+TIME_COLUMNS = ["time", "year", "month", "dayofweek", "hour"]
+OFFSHORE_GENERATORS = ["Windoffshore", "Windoffshoregrounded", "Windoffshorefloating"]
 
-    
-    # Drop non-country columns
-    sample_data = remove_time_index(sample_data)
 
-    # Generate hours list
-    start_hour = 1 + regularSeasonHours * seasons.index(season)
-    hours = list(range(start_hour, start_hour + regularSeasonHours))
-    
-    return [sample_data, hours]
+class ProfileArray:
+    """
+    Hourly profiles of a scenario data file as a NumPy array, with the rows of every year and season indexed.
 
+    Sample windows are gathered from the array by fancy indexing, instead of filtering the data frame for every
+    sampled season.
+    """
 
-def sample_generator(data, regularSeasonHours, scenario, season, seasons, period, generator, sample_hour):
-    [sample_data, hours] = gather_regular_sample(data, season, seasons, regularSeasonHours, sample_hour)
-    generator_data = pd.DataFrame()
-    if generator == "Windoffshore" or generator == "Windoffshoregrounded" or generator == "Windoffshorefloating":
-        startNOnode = 2
-    else:
-        startNOnode = 1
-    for c in sample_data.columns:
-        if c == "NO":  # Split country wide norwegian profiles into per elspot area.
-            for i in range(startNOnode, 6):
-                c_no = c + str(i)
-                df = pd.DataFrame(
-                    data={
-                        "Node": c_no,
-                        "IntermitentGenerators": generator,
-                        "Operationalhour": hours,
-                        "Scenario": "scenario" + str(scenario),
-                        "Period": period,
-                        "GeneratorStochasticAvailabilityRaw": sample_data[c].values,
-                    }
+    def __init__(self, data: pd.DataFrame, seasons: list[str]):
+        """
+        :param data: Profiles with datetime columns, as returned by make_datetime.
+        :param seasons: Regular seasons to index.
+        """
+        self.columns = [c for c in data.columns if c not in TIME_COLUMNS]
+        self.values = data[self.columns].to_numpy()
+        year = data["year"].to_numpy()
+        month = data["month"].to_numpy()
+        self.years = pd.unique(year)
+        self.year_rows = {y: np.flatnonzero(year == y) for y in self.years}
+        self.season_rows = {
+            (y, s): np.flatnonzero((year == y) & np.isin(month, season_month(s)))
+            for y in self.year_rows
+            for s in seasons
+        }
+
+    def season_length(self, year: int, season: str) -> int:
+        return len(self.season_rows[(year, season)])
+
+    def season_values(self, season: str) -> np.ndarray:
+        """
+        :param season: Regular season.
+        :return: Profiles of the season in all years, with shape (hours, columns).
+        """
+        return self.values[np.concatenate([self.season_rows[(y, season)] for y in self.years])]
+
+    def sample(
+        self, regular_keys: list, peak_keys: list, regularSeasonHours: int, peakSeasonHours: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gather the sample windows of the profiles.
+
+        :param regular_keys: (year, season, start hour) of every regular season sample, grouped by scenario.
+        :param peak_keys: (year, country peak hour, overall peak hour) of every scenario.
+        :param regularSeasonHours: Number of hours in a regular season.
+        :param peakSeasonHours: Number of hours in a peak season.
+        :return: Regular season samples with shape (scenarios, seasons, hours, columns) and peak season samples
+            with shape (scenarios, 2, hours, columns), where the country peak comes before the overall peak.
+        :raises ValueError: If a window does not fit within its season or year.
+        """
+        regular_rows = np.empty((len(regular_keys), regularSeasonHours), dtype=np.intp)
+        for k, (year, season, sample_hour) in enumerate(regular_keys):
+            rows = self.season_rows[(year, season)][sample_hour : sample_hour + regularSeasonHours]
+            if len(rows) < regularSeasonHours:
+                raise ValueError(
+                    f"Not enough hours remaining in season {season}. Need {regularSeasonHours} hours but only "
+                    f"{len(rows)} available."
                 )
-                generator_data = pd.concat([generator_data, df], ignore_index=True)
-        else:
-            df = pd.DataFrame(
-                data={
-                    "Node": c,
-                    "IntermitentGenerators": generator,
-                    "Operationalhour": hours,
-                    "Scenario": "scenario" + str(scenario),
-                    "Period": period,
-                    "GeneratorStochasticAvailabilityRaw": sample_data[c].values,
-                }
-            )
-            generator_data = pd.concat([generator_data, df], ignore_index=True)
-    return generator_data
-
-
-def sample_hydro(data, regularSeasonHours, scenario, season, seasons, period, sample_hour):
-    [sample_data, hours] = gather_regular_sample(data, season, seasons, regularSeasonHours, sample_hour)
-    hydro_data = pd.DataFrame()
-    for c in sample_data.columns:
-        if c != "time":
-            df = pd.DataFrame(
-                data={
-                    "Node": c,
-                    "Period": period,
-                    "Season": season,
-                    "Operationalhour": hours,
-                    "Scenario": "scenario" + str(scenario),
-                    "HydroGeneratorMaxSeasonalProduction": sample_data[c].values,
-                }
-            )
-            hydro_data = pd.concat([hydro_data, df], ignore_index=True)
-    return hydro_data
-
-
-def sample_load(data, regularSeasonHours, scenario, season, seasons, period, sample_hour):
-    [sample_data, hours] = gather_regular_sample(data, season, seasons, regularSeasonHours, sample_hour)
-    load = pd.DataFrame()
-    for c in sample_data.columns:
-        if c != "time":
-            df = pd.DataFrame(
-                data={
-                    "Node": c,
-                    "Period": period,
-                    "Operationalhour": hours,
-                    "Scenario": "scenario" + str(scenario),
-                    "ElectricLoadRaw_in_MW": sample_data[c].values,
-                }
-            )
-            load = pd.concat([load, df], ignore_index=True)
-    return load
+            regular_rows[k] = rows
+
+        peak_rows = np.empty((len(peak_keys), 2, peakSeasonHours), dtype=np.intp)
+        for k, (year, *samples) in enumerate(peak_keys):
+            for j, sample in enumerate(samples):
+                rows = self.year_rows[year][int(sample - (peakSeasonHours / 2)) : int(sample + (peakSeasonHours / 2))]
+                if len(rows) < peakSeasonHours:
+                    raise ValueError(
+                        f"Not enough hours around the peak at hour {sample} of {year}. Need {peakSeasonHours} hours "
+                        f"but only {len(rows)} available."
+                    )
+                peak_rows[k, j] = rows
 
+        regular = self.values[regular_rows].reshape(len(peak_keys), -1, regularSeasonHours, len(self.columns))
+        return regular, self.values[peak_rows]
 
-def gather_peak_sample(data, seasons, regularSeasonHours, peakSeasonHours, country_sample, overall_sample):
-    data = data.reset_index(drop=True)
-    country_peak = data.iloc[
-        int(country_sample - (peakSeasonHours / 2)) : int(country_sample + (peakSeasonHours / 2)), :
-    ]
-    overall_peak = data.iloc[
-        int(overall_sample - (peakSeasonHours / 2)) : int(overall_sample + (peakSeasonHours / 2)), :
-    ]
 
-    # Sort data to start on midnight (INACTIVE)
-    # country_peak = country_peak.sort_values(by=['hour'])
-    # overall_peak = overall_peak.sort_values(by=['hour'])
+def node_columns(columns: list[str], generator: str = None) -> Tuple[list[int], list[str]]:
+    """
+    Map the profile columns to nodes. For generators, the country wide Norwegian profiles are split into one
+    profile per elspot area, where offshore wind is not available in NO1.
 
-    # Drop non-country columns
-    country_peak = remove_time_index(country_peak)
-    overall_peak = remove_time_index(overall_peak)
+    :param columns: Country columns of the profiles.
+    :param generator: Name of the generator, or None for load and hydro profiles.
+    :return: Column index and name of every node.
+    """
+    take = []
+    nodes = []
+    for j, c in enumerate(columns):
+        if c == "NO" and generator is not None:
+            startNOnode = 2 if generator in OFFSHORE_GENERATORS else 1
+            for i in range(startNOnode, 6):
+                take.append(j)
+                nodes.append(c + str(i))
+        else:
+            take.append(j)
+            nodes.append(c)
+    return take, nodes
 
-    country_hours = list(
-        range(1 + regularSeasonHours * len(seasons), regularSeasonHours * len(seasons) + peakSeasonHours + 1)
-    )
-    overall_hours = list(
-        range(
-            1 + regularSeasonHours * len(seasons) + peakSeasonHours,
-            regularSeasonHours * len(seasons) + 2 * peakSeasonHours + 1,
-        )
-    )
-    return [country_peak, overall_peak, country_hours, overall_hours]
 
+def find_peak_hours(data: pd.DataFrame, year: int) -> Tuple[int, int]:
+    """
+    Find the peak load hours of a year.
 
-def sample_hydro_peak(
-    data, seasons, scenario, period, regularSeasonHours, peakSeasonHours, overall_sample, country_sample
-):
-    peak_data = pd.DataFrame()
-    [country_peak, overall_peak, country_hours, overall_hours] = gather_peak_sample(
-        data, seasons, regularSeasonHours, peakSeasonHours, country_sample, overall_sample
-    )
-    for c in country_peak.columns:
-        df = pd.DataFrame(
-            data={
-                "Node": c,
-                "Period": period,
-                "Season": "peak1",
-                "Operationalhour": country_hours,
-                "Scenario": "scenario" + str(scenario),
-                "HydroGeneratorMaxSeasonalProduction": country_peak[c].values,
-            }
-        )
-        peak_data = pd.concat([peak_data, df], ignore_index=True)
-        df = pd.DataFrame(
-            data={
-                "Node": c,
-                "Period": period,
-                "Season": "peak2",
-                "Operationalhour": overall_hours,
-                "Scenario": "scenario" + str(scenario),
-                "HydroGeneratorMaxSeasonalProduction": overall_peak[c].values,
-            }
-        )
-        peak_data = pd.concat([peak_data, df], ignore_index=True)
-    return peak_data
+    :param data: Electric load profiles with datetime columns.
+    :param year: Year to search.
+    :return: Hour of the year with the highest load when all loads are summed together, and hour with the
+        highest load of a single country.
+    """
+    data_year = remove_time_index(data.loc[data.year.isin([year]), :])
+    overall_sample = data_year.sum(axis=1).idxmax()
+    max_load_country = data_year.max().idxmax()
+    country_sample = data_year[max_load_country].idxmax()
+    return overall_sample, country_sample
 
 
-def sample_load_peak(
-    data, seasons, scenario, period, regularSeasonHours, peakSeasonHours, overall_sample, country_sample
-):
-    peak_data = pd.DataFrame()
-    [country_peak, overall_peak, country_hours, overall_hours] = gather_peak_sample(
-        data, seasons, regularSeasonHours, peakSeasonHours, country_sample, overall_sample
-    )
-    for c in country_peak.columns:
-        df = pd.DataFrame(
-            data={
-                "Node": c,
-                "Period": period,
-                "Operationalhour": country_hours,
-                "Scenario": "scenario" + str(scenario),
-                "ElectricLoadRaw_in_MW": country_peak[c].values,
-            }
-        )
-        peak_data = pd.concat([peak_data, df], ignore_index=True)
-        df = pd.DataFrame(
-            data={
-                "Node": c,
-                "Period": period,
-                "Operationalhour": overall_hours,
-                "Scenario": "scenario" + str(scenario),
-                "ElectricLoadRaw_in_MW": overall_peak[c].values,
-            }
+def load_moments(values: np.ndarray, axis) -> dict:
+    """
+    Compute the first four moments of profiles in one vectorized pass, equal to numpy.mean, numpy.var and the
+    (biased) scipy.stats.skew and scipy.stats.kurtosis.
+
+    :param values: Profiles.
+    :param axis: Axis or axes over which the moments are computed.
+    :return: Mean, variance, skewness and excess kurtosis, indexed by "mean", "var", "skew" and "kurt".
+    """
+    mean = values.mean(axis=axis, keepdims=True)
+    deviation = values - mean
+    m2 = np.mean(deviation**2, axis=axis)
+    m3 = np.mean(deviation**3, axis=axis)
+    m4 = np.mean(deviation**4, axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {"mean": np.squeeze(mean, axis=axis), "var": m2, "skew": m3 / m2**1.5, "kurt": m4 / m2**2 - 3}
+
+
+def stack_samples(
+    sources: list, blocks: list, seasons: list[str], regularSeasonHours: int, peakSeasonHours: int
+) -> pd.DataFrame:
+    """
+    Build the long-format table of sampled profiles in a single construction.
+
+    Rows are ordered by period and scenario, then by regular season, source, node and hour, followed by the peak
+    seasons ordered by source, node, peak and hour.
+
+    :param sources: (label, regular, peak, columns, nodes) of every sampled profile, where regular and peak are the
+        samples gathered by ProfileArray.sample and columns is the profile column of every node.
+    :param blocks: (period, scenario) of every sampled scenario.
+    :param seasons: Regular seasons.
+    :param regularSeasonHours: Number of hours in a regular season.
+    :param peakSeasonHours: Number of hours in a peak season.
+    :return: Table with columns Node, Source, Season, Operationalhour, Scenario, Period and Value.
+    """
+    n_blocks = len(blocks)
+    regular = np.concatenate([np.swapaxes(r[..., c], 2, 3) for _, r, _, c, _ in sources], axis=2)
+    peak = np.concatenate([p[..., c].transpose(0, 3, 1, 2) for _, _, p, c, _ in sources], axis=1)
+    values = np.concatenate([regular.reshape(n_blocks, -1), peak.reshape(n_blocks, -1)], axis=1)
+
+    nodes = np.array([n for *_, source_nodes in sources for n in source_nodes], dtype=object)
+    labels = np.array([label for label, *_, source_nodes in sources for _ in source_nodes], dtype=object)
+    regular_shape = (len(seasons), len(nodes), regularSeasonHours)
+    peak_shape = (len(nodes), 2, peakSeasonHours)
+    regular_hours = np.arange(1, regularSeasonHours * len(seasons) + 1).reshape(len(seasons), 1, -1)
+    peak_hours = regularSeasonHours * len(seasons) + np.arange(1, 2 * peakSeasonHours + 1).reshape(1, 2, -1)
+
+    def block_column(regular_labels, peak_labels):
+        column = np.concatenate(
+            [np.broadcast_to(regular_labels, regular_shape).ravel(), np.broadcast_to(peak_labels, peak_shape).ravel()]
         )
-        peak_data = pd.concat([peak_data, df], ignore_index=True)
-    return peak_data
+        return np.tile(column, n_blocks)
+
+    block_length = values.shape[1]
+    scenarios = np.array(["scenario" + str(scenario) for _, scenario in blocks], dtype=object)
+    return pd.DataFrame(
+        data={
+            "Node": block_column(nodes[None, :, None], nodes[:, None, None]),
+            "Source": block_column(labels[None, :, None], labels[:, None, None]),
+            "Season": block_column(
+                np.array(seasons, dtype=object)[:, None, None],
+                np.array(["peak1", "peak2"], dtype=object)[None, :, None],
+            ),
+            "Operationalhour": block_column(regular_hours, peak_hours),
+            "Scenario": np.repeat(scenarios, block_length),
+            "Period": np.repeat([period for period, _ in blocks], block_length),
+            "Value": values.ravel(),
+        }
+    )
 
 
-def sample_generator_peak(
-    data, seasons, g, scenario, period, regularSeasonHours, peakSeasonHours, overall_sample, country_sample
-):
-    peak_data = pd.DataFrame()
-    [country_peak, overall_peak, country_hours, overall_hours] = gather_peak_sample(
-        data, seasons, regularSeasonHours, peakSeasonHours, country_sample, overall_sample
-    )
-    if g == "Windoffshore" or g == "Windoffshoregrounded" or g == "Windoffshorefloating":
-        startNOnode = 2
-    else:
-        startNOnode = 1
-    for c in country_peak.columns:
-        if c == "NO":
-            for i in range(startNOnode, 6):
-                c_no = c + str(i)
-                df = pd.DataFrame(
-                    data={
-                        "Node": c_no,
-                        "IntermitentGenerators": g,
-                        "Operationalhour": country_hours,
-                        "Scenario": "scenario" + str(scenario),
-                        "Period": period,
-                        "GeneratorStochasticAvailabilityRaw": country_peak[c].values,
-                    }
-                )
-                peak_data = pd.concat([peak_data, df], ignore_index=True)
-                df = pd.DataFrame(
-                    data={
-                        "Node": c_no,
-                        "IntermitentGenerators": g,
-                        "Operationalhour": overall_hours,
-                        "Scenario": "scenario" + str(scenario),
-                        "Period": period,
-                        "GeneratorStochasticAvailabilityRaw": overall_peak[c].values,
-                    }
-                )
-                peak_data = pd.concat([peak_data, df], ignore_index=True)
-        else:
-            df = pd.DataFrame(
-                data={
-                    "Node": c,
-                    "IntermitentGenerators": g,
-                    "Operationalhour": country_hours,
-                    "Scenario": "scenario" + str(scenario),
-                    "Period": period,
-                    "GeneratorStochasticAvailabilityRaw": country_peak[c].values,
-                }
-            )
-            peak_data = pd.concat([peak_data, df], ignore_index=True)
-            df = pd.DataFrame(
-                data={
-                    "Node": c,
-                    "IntermitentGenerators": g,
-                    "Operationalhour": overall_hours,
-                    "Scenario": "scenario" + str(scenario),
-                    "Period": period,
-                    "GeneratorStochasticAvailabilityRaw": overall_peak[c].values,
-                }
-            )
-            peak_data = pd.concat([peak_data, df], ignore_index=True)
-    return peak_data
+def window_wasserstein_distances(distribution: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """
+    Compute the Wasserstein distance between a distribution and every window in batch, equal to
+    scipy.stats.wasserstein_distance for each window.
 
+    The distance is the integral of the absolute difference between the quantile functions. The quantile function
+    of a window is constant on every interval ((k - 1) / L, k / L] of its sorted values, and the integral of the
+    quantile function of the distribution is evaluated with cumulative sums over its sorted values.
 
-def make_ws(data, regularSeasonHours, seasons):
-    ws = pd.DataFrame(columns=["Year", "Season", "SampleIndex", "Value"])
+    :param distribution: Values of the distribution.
+    :param windows: Values of the windows, with shape (windows, hours).
+    :return: Distance of every window.
+    """
+    u = np.sort(distribution)
+    n = len(u)
+    cumulative = np.concatenate([[0.0], np.cumsum(u) / n])
+
+    def quantile_integral(q):
+        # Integral of the quantile function of the distribution from 0 to q
+        i = np.minimum((q * n).astype(int), n - 1)
+        return cumulative[i] + (q - i / n) * u[i]
+
+    v = np.sort(windows, axis=1)
+    length = v.shape[1]
+    lower = np.arange(length) / length
+    upper = np.arange(1, length + 1) / length
+    # Where the quantile function of the distribution crosses the window value within each interval
+    crossing = np.clip(np.searchsorted(u, v) / n, lower, upper)
+    below = v * (crossing - lower) - (quantile_integral(crossing) - quantile_integral(lower))
+    above = quantile_integral(upper) - quantile_integral(crossing) - v * (upper - crossing)
+    return np.sum(below + above, axis=1)
+
+
+def _total_windows(data, regularSeasonHours, seasons):
+    """
+    Slide a window over the total of all profiles in every season and year.
+
+    :return: Season, year, total of the season in all years and windows of the year with shape (windows, hours).
+    """
     for s in seasons:
         all_data = data.loc[data.month.isin(season_month(s)), :]
-        all_col = []
-        for col in all_data.columns:
-            if col not in ["time", "year", "month", "dayofweek", "hour"]:
-                all_col.append(col)
-        tot_data = pd.DataFrame()
-        tot_data["Tot"] = all_data.loc[:, all_col].sum(axis=1)
-        for col in ["time", "year", "month", "dayofweek", "hour"]:
-            tot_data[col] = all_data[col]
+        tot = remove_time_index(all_data).sum(axis=1).to_numpy()
+        year = all_data["year"].to_numpy()
         for y in range(2015, 2020):
-            sample_base = year_season_filter(tot_data, y, s)
-            max_sample = sample_base.shape[0]
-            for j in range(max_sample - regularSeasonHours - 1):
-                sample = sample_base.iloc[j : j + regularSeasonHours]
-                ws_value = wasserstein_distance(tot_data["Tot"], sample["Tot"])
-                df = pd.DataFrame(data={"Year": y, "Season": s, "SampleIndex": j, "Value": ws_value}, index=[0])
-                ws = pd.concat([ws, df], ignore_index=True)
-    return ws
+            sample_base = tot[year == y]
+            n_windows = max(len(sample_base) - regularSeasonHours - 1, 0)
+            if n_windows > 0:
+                windows = sliding_window_view(sample_base, regularSeasonHours)[:n_windows]
+            else:
+                windows = np.empty((0, regularSeasonHours))
+            yield s, y, tot, windows
+
+
+def make_ws(data, regularSeasonHours, seasons):
+    frames = [
+        pd.DataFrame(
+            data={
+                "Year": y,
+                "Season": s,
+                "SampleIndex": np.arange(len(windows)),
+                "Value": window_wasserstein_distances(tot, windows),
+            }
+        )
+        for s, y, tot, windows in _total_windows(data, regularSeasonHours, seasons)
+    ]
+    return pd.concat(frames, ignore_index=True)
 
 
 def make_mean(data, regularSeasonHours, seasons):
-    ws = pd.DataFrame(columns=["Year", "Season", "SampleIndex", "Value"])
-    for s in seasons:
-        all_data = data.loc[data.month.isin(season_month(s)), :]
-        all_col = []
-        for col in all_data.columns:
-            if col not in ["time", "year", "month", "dayofweek", "hour"]:
-                all_col.append(col)
-        tot_data = pd.DataFrame()
-        tot_data["Tot"] = all_data.loc[:, all_col].sum(axis=1)
-        for col in ["time", "year", "month", "dayofweek", "hour"]:
-            tot_data[col] = all_data[col]
-        for y in range(2015, 2020):
-            sample_base = year_season_filter(tot_data, y, s)
-            max_sample = sample_base.shape[0]
-            for j in range(max_sample - regularSeasonHours - 1):
-                sample = sample_base.iloc[j : j + regularSeasonHours]
-                ws_value = np.mean(sample["Tot"])
-                df = pd.DataFrame(data={"Year": y, "Season": s, "SampleIndex": j, "Value": ws_value}, index=[0])
-                ws = pd.concat([ws, df], ignore_index=True)
-    return ws
+    frames = [
+        pd.DataFrame(
+            data={"Year": y, "Season": s, "SampleIndex": np.arange(len(windows)), "Value": np.mean(windows, axis=1)}
+        )
+        for s, y, _, windows in _total_windows(data, regularSeasonHours, seasons)
+    ]
+    return pd.concat(frames, ignore_index=True)
 
 
 def _calculate_rank_values(data: pd.DataFrame) -> pd.DataFrame:
@@ -421,6 +389,259 @@ def make_filter_result(data1, data2, regularSeasonHours, seasons, n_cluster, fil
     filter_result.to_csv(filepath / "filter_result.csv", index=False)
 
 
+class ScenarioTreeSampler:
+    """
+    Draws scenario trees from the indexed scenario data and gathers their samples.
+
+    Every tree is drawn with its own random generator and its position in the stratified cluster rotation is
+    derived from its number, so trees can be generated and scored in any order, also in worker processes.
+    """
+
+    def __init__(
+        self,
+        empire_config: EmpireConfiguration,
+        generator_profiles: list,
+        electricload_profiles: ProfileArray,
+        hydroseasonal_profiles: ProfileArray,
+        peak_hours: dict,
+        elecLoadMod_profiles: dict = None,
+        sampling_key: pd.DataFrame = None,
+        sample_filter: pd.DataFrame = None,
+        cluster_weights: pd.DataFrame = None,
+        moments: dict = None,
+    ):
+        """
+        :param empire_config: Empire configuration
+        :param generator_profiles: (generator, profiles) of every intermittent generator.
+        :param electricload_profiles: Electric load profiles.
+        :param hydroseasonal_profiles: Seasonal hydro limit profiles.
+        :param peak_hours: Overall and single country peak load hours of every year, see find_peak_hours.
+        :param elecLoadMod_profiles: Load change profiles of every period, if the load change module is used.
+        :param sampling_key: Sampling key indexed by period, scenario and season, if a fixed sample is used.
+        :param sample_filter: Year and start hour of every cluster, if stratified, copula or Voronoi sampling is used.
+        :param cluster_weights: Cluster weights by season for Voronoi sampling. Clusters are rotated if not given.
+        :param moments: Moments of the electric load and weights with shape (seasons, nodes), see load_moments,
+            used to score trees.
+        """
+        self.seasons = empire_config.regular_seasons
+        self.n_periods = empire_config.n_periods
+        self.n_scenarios = empire_config.number_of_scenarios
+        self.n_cluster = empire_config.n_cluster
+        self.len_of_regular_season = empire_config.length_of_regular_season
+        self.len_peak_season = empire_config.len_peak_season
+        self.generator_profiles = generator_profiles
+        self.electricload_profiles = electricload_profiles
+        self.hydroseasonal_profiles = hydroseasonal_profiles
+        self.peak_hours = peak_hours
+        self.elecLoadMod_profiles = elecLoadMod_profiles
+        self.sampling_key = sampling_key
+        self.sample_filter = sample_filter
+        self.cluster_weights = cluster_weights
+        self.moments = moments
+        self.sample_years = generator_profiles[0][1].years
+
+    def draw(self, rng: np.random.Generator, tree: int = 0) -> tuple:
+        """
+        Draw the sample year and start hour of every season in a tree.
+
+        :param rng: Random generator of the tree.
+        :param tree: Number of the tree.
+        :return: Sample keys of the tree: blocks (period, scenario), regular season keys, peak season keys and
+            rows of the sampling key.
+        """
+        fix_sample = self.sampling_key is not None
+        solar_profiles = self.generator_profiles[0][1]
+
+        # Continue the cluster rotation of the previous trees
+        cluster = (self.n_cluster - 1 + tree * self.n_periods * self.n_scenarios * len(self.seasons)) % self.n_cluster
+
+        blocks = []
+        regular_keys = []
+        peak_keys = []
+        sampling_key = []
+        for i in range(1, self.n_periods + 1):
+            for scenario in range(1, self.n_scenarios + 1):
+                blocks.append((i, scenario))
+                for s in self.seasons:
+                    ###################
+                    ##REGULAR SEASONS##
+                    ###################
+
+                    # Get sample year for each season/scenario
+
+                    if self.sample_filter is not None:
+                        if self.cluster_weights is None:
+                            if cluster == self.n_cluster - 1:
+                                cluster = 0
+                            else:
+                                cluster += 1
+                        else:  # voronoi_sgr_use
+                            # Use size-aware rotation for Voronoi clusters
+                            weights = self.cluster_weights.loc[s].values
+                            cluster = rng.choice(np.arange(len(weights)), p=weights)
+
+                        valid_pick = self.sample_filter[self.sample_filter["ClusterGroup"] == cluster]
+                        valid_pick = valid_pick[valid_pick["Season"] == s]
+                        sample_year = rng.choice(valid_pick["Year"])
+                        valid_pick = valid_pick[valid_pick["Year"] == sample_year]
+                        sample_hour = rng.choice(valid_pick["SampleIndex"])
+                    else:
+                        sample_year = rng.choice(self.sample_years)
+
+                    # Set sample year according to key
+
+                    if fix_sample:
+                        sample_year = self.sampling_key.loc[(i, scenario, s), "Year"]
+
+                    # Filter the sample range by K-means if filter_sample=True
+
+                    if self.sample_filter is None:
+                        window = solar_profiles.season_length(sample_year, s) - self.len_of_regular_season - 1
+                        if window <= 0:
+                            sample_hour = 0
+                        else:
+                            sample_hour = rng.integers(0, window)
+
+                    # Choose sample_hour from key or save sampling key
+
+                    if fix_sample:
+                        sample_hour = self.sampling_key.loc[(i, scenario, s), "Hour"]
+                    else:
+                        sampling_key.append((i, scenario, s, sample_year, sample_hour))
+
+                    regular_keys.append((sample_year, s, sample_hour))
+
+                ################
+                ##PEAK SEASONS##
+                ################
+
+                # Get peak sample year
+
+                sample_year = rng.choice(self.sample_years)
+
+                if fix_sample:
+                    sample_year = self.sampling_key.loc[(i, scenario, "peak"), "Year"]
+                else:
+                    sampling_key.append((i, scenario, "peak", sample_year, 0))
+
+                # Peak1: The highest load when all loads are summed together
+                # Peak2: The highest load of a single country
+                overall_sample, country_sample = self.peak_hours[sample_year]
+                if not fix_sample:
+                    sampling_key.append((i, scenario, "peak1", sample_year, overall_sample))
+                    sampling_key.append((i, scenario, "peak2", sample_year, country_sample))
+
+                peak_keys.append((sample_year, country_sample, overall_sample))
+
+        return blocks, regular_keys, peak_keys, sampling_key
+
+    def gather(self, keys: tuple) -> tuple:
+        """
+        Gather the samples of a tree.
+
+        :param keys: Sample keys of the tree, as returned by draw.
+        :return: Generator availability, electric load, seasonal hydro limit and load change (None if the load
+            change module is not used) of the tree.
+        """
+        blocks, regular_keys, peak_keys, _ = keys
+        sample_args = (regular_keys, peak_keys, self.len_of_regular_season, self.len_peak_season)
+        stack_args = (blocks, self.seasons, self.len_of_regular_season, self.len_peak_season)
+
+        # Sample generator availability, electric load and seasonal hydro limit
+        sources = []
+        for g, profiles in self.generator_profiles:
+            regular, peak = profiles.sample(*sample_args)
+            sources.append((g, regular, peak, *node_columns(profiles.columns, g)))
+        genAvail = stack_samples(sources, *stack_args).rename(
+            columns={"Source": "IntermitentGenerators", "Value": "GeneratorStochasticAvailabilityRaw"}
+        )
+
+        regular, peak = self.electricload_profiles.sample(*sample_args)
+        sources = [(None, regular, peak, *node_columns(self.electricload_profiles.columns))]
+        elecLoad = stack_samples(sources, *stack_args).rename(columns={"Value": "ElectricLoadRaw_in_MW"})
+
+        regular, peak = self.hydroseasonal_profiles.sample(*sample_args)
+        sources = [(None, regular, peak, *node_columns(self.hydroseasonal_profiles.columns))]
+        hydroSeasonal = stack_samples(sources, *stack_args).rename(
+            columns={"Value": "HydroGeneratorMaxSeasonalProduction"}
+        )
+
+        # Sample the change of load
+        elecLoadMod = None
+        if self.elecLoadMod_profiles is not None:
+            samples = []
+            n_seasons = len(self.seasons)
+            for i in range(1, self.n_periods + 1):
+                first, last = (i - 1) * self.n_scenarios, i * self.n_scenarios
+                samples.append(
+                    self.elecLoadMod_profiles[i].sample(
+                        regular_keys[first * n_seasons : last * n_seasons],
+                        peak_keys[first:last],
+                        self.len_of_regular_season,
+                        self.len_peak_season,
+                    )
+                )
+            regular = np.concatenate([r for r, _ in samples])
+            peak = np.concatenate([p for _, p in samples])
+            sources = [(None, regular, peak, *node_columns(self.elecLoadMod_profiles[1].columns))]
+            elecLoadMod = stack_samples(sources, *stack_args).rename(columns={"Value": "ElectricLoadRaw_in_MW"})
+
+        return genAvail, elecLoad, hydroSeasonal, elecLoadMod
+
+    def score(self, regular_load: np.ndarray) -> float:
+        """
+        Moment matching score of a tree: the weighted relative distance of the first four moments of the sampled
+        electric load to the moments of the scenario data, summed over regular seasons and nodes. Lower is better.
+
+        :param regular_load: Regular season samples of the electric load, as returned by ProfileArray.sample.
+        :return: Score of the tree.
+        """
+        sample = load_moments(regular_load, axis=(0, 2))
+        distance = sum(np.abs((sample[m] - self.moments[m]) / self.moments[m]) for m in ["mean", "var", "skew", "kurt"])
+        return float(np.sum(self.moments["weight"] * distance))
+
+    def score_tree(self, tree: int, seed: np.random.SeedSequence) -> Tuple[float, tuple]:
+        """
+        Draw and score a tree. Only the electric load is gathered for scoring.
+
+        :param tree: Number of the tree.
+        :param seed: Seed of the random generator of the tree.
+        :return: Score and sample keys of the tree.
+        """
+        keys = self.draw(np.random.default_rng(seed), tree)
+        _, regular_keys, peak_keys, _ = keys
+        regular_load, _ = self.electricload_profiles.sample(
+            regular_keys, peak_keys, self.len_of_regular_season, self.len_peak_season
+        )
+        return self.score(regular_load), keys
+
+
+def _best_tree(results) -> Tuple[int, float, tuple]:
+    """
+    Keep the tree with the lowest score while the trees are scored. Ties go to the first tree.
+
+    :param results: Score and sample keys of every tree, in tree order.
+    :return: Number, score and sample keys of the best tree.
+    """
+    best = (None, np.inf, None)
+    for tree, (score, keys) in enumerate(results):
+        if best[0] is None or score < best[1]:
+            best = (tree, score, keys)
+    return best
+
+
+_worker_sampler = None
+
+
+def _init_sampler_worker(sampler: ScenarioTreeSampler):
+    global _worker_sampler
+    _worker_sampler = sampler
+
+
+def _score_tree(tree: int, seed: np.random.SeedSequence) -> Tuple[float, tuple]:
+    return _worker_sampler.score_tree(tree, seed)
+
+
 def generate_random_scenario(
     empire_config: EmpireConfiguration,
     dict_countries: dict,
@@ -459,14 +680,6 @@ def generate_random_scenario(
     else:
         logger.info("Generating random scenarios...")
 
-    # Generate dataframes to print as stochastic-files
-    genAvail = pd.DataFrame()
-    elecLoad = pd.DataFrame()
-    hydroSeasonal = pd.DataFrame()
-
-    if LOADCHANGEMODULE:
-        elecLoadMod = pd.DataFrame()
-
     # Load all the raw scenario data
     solar_data = pd.read_csv(scenario_data_path / "solar.csv")
     windonshore_data = pd.read_csv(scenario_data_path / "windonshore.csv")
@@ -492,6 +705,9 @@ def generate_random_scenario(
     if LOADCHANGEMODULE:
         elecLoadMod_data = make_datetime(elecLoadMod_data, "%Y-%m-%d %H:%M")
 
+    sample_filter = None
+    cluster_weights = None
+
     # ===== BEGIN VORONOI SGR BRANCH =====
     if getattr(empire_config, "voronoi_sgr_make", False):
         print("Making Voronoi clusters...")
@@ -508,6 +724,8 @@ def generate_random_scenario(
         weights_by_season = sizes.div(sizes.sum(axis=1), axis=0)
         print(f"Cluster sizes by season:\n{sizes}")
         print(f"Cluster weights by season:\n{weights_by_season}")
+        sample_filter = voronoi_filter
+        cluster_weights = weights_by_season
     # ===== END VORONOI SGR BRANCH =====
 
     if filter_make:
@@ -519,8 +737,8 @@ def generate_random_scenario(
 
     if filter_use:
         print("Using stratified filter...")
-        filter_result = pd.read_csv(scenario_data_path / "filter_result.csv")
-        cluster = n_cluster - 1
+        sample_filter = pd.read_csv(scenario_data_path / "filter_result.csv")
+        cluster_weights = None
 
     COPULA_TO_DF_MAPPING = dict({
             "electricload": electricload_data,
@@ -548,514 +766,79 @@ def generate_random_scenario(
         print("Using copula clusters...")
         filepath = Path.cwd() / "Copulas" / "CopulaClusters" 
         copula_filter = pd.read_csv(filepath / "copula_clusters.csv")
-        cluster = n_cluster - 1
+        if not filter_use:
+            sample_filter = copula_filter
+        cluster_weights = None
 
-    if moment_matching:
-        genAvail_dict = {}
-        elecLoad_dict = {}
-        hydroSeasonal_dict = {}
-        score_dict = {}
-        seasonmeansum = {}
-        truemean = {}
-        truevar = {}
-        trueskew = {}
-        truekurt = {}
-        weight = {}
-        for s in seasons:
-            es = electricload_data.loc[electricload_data.month.isin(season_month(s))]
-            es = remove_time_index(es)
-            seasonmeansum[s] = sum(np.mean(es[c]) for c in es.columns)
-            for c in es.columns:
-                truemean[s + c] = np.mean(es[c])  # M1
-                truevar[s + c] = np.var(es[c])  # M2
-                trueskew[s + c] = skew(es[c])  # M3
-                truekurt[s + c] = kurtosis(es[c])  # M4
-                weight[s + c] = truemean[s + c] / seasonmeansum[s]
-    else:
+    if not moment_matching:
         n_tree_compare = 1
 
+    sampling_key = None
     if fix_sample:
         sampling_key = pd.read_csv(scenario_data_path / "sampling_key.csv")
         sampling_key = sampling_key.set_index(["Period", "Scenario", "Season"])
-    else:
-        sampling_key = pd.DataFrame(columns=["Period", "Scenario", "Season", "Year", "Hour"])
-
-    for tree in range(n_tree_compare):
-        for i in range(1, n_periods + 1):
-            for scenario in range(1, n_scenarios + 1):
-                for s in seasons:
-                    ###################
-                    ##REGULAR SEASONS##
-                    ###################
-
-                    # Get sample year for each season/scenario
-
-                    if filter_use or copula_clusters_use or getattr(empire_config, "voronoi_sgr_use", False):
-                        if filter_use or copula_clusters_use:
-                            if cluster == n_cluster - 1:
-                                cluster = 0
-                            else:
-                                cluster += 1
-                        else:  # voronoi_sgr_use
-                            # Use size-aware rotation for Voronoi clusters
-                            cluster = np.random.choice(np.arange(VORONOI_N_CLUSTER), p=weights_by_season.loc[s].values)
-                        
-                        if filter_use:
-                            valid_pick = filter_result[filter_result["ClusterGroup"] == cluster]
-                        elif copula_clusters_use:
-                            valid_pick = copula_filter[copula_filter["ClusterGroup"] == cluster]
-                        else:  # voronoi_sgr_use
-                            valid_pick = voronoi_filter[voronoi_filter["ClusterGroup"] == cluster]
-                        valid_pick = valid_pick[valid_pick["Season"] == s]
-                        sample_year = np.random.choice(valid_pick["Year"])
-                        valid_pick = valid_pick[valid_pick["Year"] == sample_year]
-                        sample_hour = np.random.choice(valid_pick["SampleIndex"])
-                    else:
-                        sample_year = np.random.choice(solar_data["time"].dt.year.unique())
-
-                    # Set sample year according to key
-
-                    if fix_sample:
-                        sample_year = sampling_key.loc[(i, scenario, s), "Year"]
-
-                    # Filter out the hours within the sample year
-
-                    solar_season = year_season_filter(solar_data, sample_year, s)
-                    windonshore_season = year_season_filter(windonshore_data, sample_year, s)
-                    windoffshore_season = year_season_filter(windoffshore_data, sample_year, s)
-                    hydroror_season = year_season_filter(hydroror_data, sample_year, s)
-                    hydroseasonal_season = year_season_filter(hydroseasonal_data, sample_year, s)
-                    electricload_season = year_season_filter(electricload_data, sample_year, s)
-
-                    if LOADCHANGEMODULE:
-                        elecLoadMod_period = elecLoadMod_data.loc[elecLoadMod_data.Period.isin([i])]
-                        elecLoadMod_period = elecLoadMod_period.drop(columns=["Period"])
-                        elecLoadMod_season = year_season_filter(elecLoadMod_period, sample_year, s)
 
-                    # Filter the sample range by K-means if filter_sample=True
-
-                    if filter_use or copula_clusters_use or getattr(empire_config, "voronoi_sgr_use", False):
-                        # sample_hour already selected above, no need to select again
-                        pass
-                    else:
-                        window = solar_season.shape[0] - len_of_regular_season - 1
-                        if window <= 0:
-                            sample_hour = 0
-                        else:
-                            sample_hour = np.random.randint(0, window)
-                    # Choose sample_hour from key or save sampling key
+    # Index the raw scenario data for gathering the samples
+    electricload_profiles = ProfileArray(electricload_data, seasons)
 
-                    if fix_sample:
-                        sample_hour = sampling_key.loc[(i, scenario, s), "Hour"]
-                    else:
-                        df = pd.DataFrame(
-                            data={
-                                "Period": i,
-                                "Scenario": scenario,
-                                "Season": s,
-                                "Year": sample_year,
-                                "Hour": sample_hour,
-                            },
-                            index=[0],
-                        )
-                        sampling_key = pd.concat([sampling_key, df], ignore_index=True)
-
-                    # Sample generator availability for regular seasons
-                    genAvail = pd.concat(
-                        [
-                            genAvail,
-                            sample_generator(
-                                data=solar_season,
-                                regularSeasonHours=len_of_regular_season,
-                                scenario=scenario,
-                                season=s,
-                                seasons=seasons,
-                                period=i,
-                                generator="Solar",
-                                sample_hour=sample_hour,
-                            ),
-                        ],
-                        ignore_index=True,
-                    )
-                    genAvail = pd.concat(
-                        [
-                            genAvail,
-                            sample_generator(
-                                data=windonshore_season,
-                                regularSeasonHours=len_of_regular_season,
-                                scenario=scenario,
-                                season=s,
-                                seasons=seasons,
-                                period=i,
-                                generator="Windonshore",
-                                sample_hour=sample_hour,
-                            ),
-                        ],
-                        ignore_index=True,
-                    )
-                    if north_sea:
-                        genAvail = pd.concat(
-                            [
-                                genAvail,
-                                sample_generator(
-                                    data=windoffshore_season,
-                                    regularSeasonHours=len_of_regular_season,
-                                    scenario=scenario,
-                                    season=s,
-                                    seasons=seasons,
-                                    period=i,
-                                    generator="Windoffshoregrounded",
-                                    sample_hour=sample_hour,
-                                ),
-                            ],
-                            ignore_index=True,
-                        )
-                        genAvail = pd.concat(
-                            [
-                                genAvail,
-                                sample_generator(
-                                    data=windoffshore_season,
-                                    regularSeasonHours=len_of_regular_season,
-                                    scenario=scenario,
-                                    season=s,
-                                    seasons=seasons,
-                                    period=i,
-                                    generator="Windoffshorefloating",
-                                    sample_hour=sample_hour,
-                                ),
-                            ],
-                            ignore_index=True,
-                        )
-                    else:
-                        genAvail = pd.concat(
-                            [
-                                genAvail,
-                                sample_generator(
-                                    data=windoffshore_season,
-                                    regularSeasonHours=len_of_regular_season,
-                                    scenario=scenario,
-                                    season=s,
-                                    seasons=seasons,
-                                    period=i,
-                                    generator="Windoffshore",
-                                    sample_hour=sample_hour,
-                                ),
-                            ],
-                            ignore_index=True,
-                        )
-                    genAvail = pd.concat(
-                        [
-                            genAvail,
-                            sample_generator(
-                                data=hydroror_season,
-                                regularSeasonHours=len_of_regular_season,
-                                scenario=scenario,
-                                season=s,
-                                seasons=seasons,
-                                period=i,
-                                generator="Hydrorun-of-the-river",
-                                sample_hour=sample_hour,
-                            ),
-                        ],
-                        ignore_index=True,
-                    )
-
-                    # Sample electric load for regular seasons
-                    elecLoad = pd.concat(
-                        [
-                            elecLoad,
-                            sample_load(
-                                data=electricload_season,
-                                regularSeasonHours=len_of_regular_season,
-                                scenario=scenario,
-                                season=s,
-                                seasons=seasons,
-                                period=i,
-                                sample_hour=sample_hour,
-                            ),
-                        ],
-                        ignore_index=True,
-                    )
-
-                    # Sample seasonal hydro limit for regular seasons
-                    hydroSeasonal = pd.concat(
-                        [
-                            hydroSeasonal,
-                            sample_hydro(
-                                data=hydroseasonal_season,
-                                regularSeasonHours=len_of_regular_season,
-                                scenario=scenario,
-                                season=s,
-                                seasons=seasons,
-                                period=i,
-                                sample_hour=sample_hour,
-                            ),
-                        ],
-                        ignore_index=True,
-                    )
-
-                    if LOADCHANGEMODULE:
-                        elecLoadMod = pd.concat(
-                            [
-                                elecLoadMod,
-                                sample_load(
-                                    data=elecLoadMod_season,
-                                    regularSeasonHours=len_of_regular_season,
-                                    scenario=scenario,
-                                    season=s,
-                                    seasons=seasons,
-                                    period=i,
-                                    sample_hour=sample_hour,
-                                ),
-                            ],
-                            ignore_index=True,
-                        )
-
-                ################
-                ##PEAK SEASONS##
-                ################
-
-                # Get peak sample year
-
-                sample_year = np.random.choice(solar_data["time"].dt.year.unique())
-
-                if fix_sample:
-                    sample_year = sampling_key.loc[(i, scenario, "peak"), "Year"]
-                else:
-                    df = pd.DataFrame(
-                        data={"Period": i, "Scenario": scenario, "Season": "peak", "Year": sample_year, "Hour": 0},
-                        index=[0],
-                    )
-                    sampling_key = pd.concat([sampling_key, df], ignore_index=True)
-
-                # Filter out the hours within the sample year
-
-                solar_data_year = solar_data.loc[solar_data.year.isin([sample_year]), :]
-                windonshore_data_year = windonshore_data.loc[windonshore_data.year.isin([sample_year]), :]
-                windoffshore_data_year = windoffshore_data.loc[windoffshore_data.year.isin([sample_year]), :]
-                hydroror_data_year = hydroror_data.loc[hydroror_data.year.isin([sample_year]), :]
-                hydroseasonal_data_year = hydroseasonal_data.loc[hydroseasonal_data.year.isin([sample_year]), :]
-                electricload_data_year = electricload_data.loc[electricload_data.year.isin([sample_year]), :]
-
-                if LOADCHANGEMODULE:
-                    elecLoadMod_data_year = elecLoadMod_period.loc[elecLoadMod_period.year.isin([sample_year])]
+    moments = None
+    if moment_matching:
+        season_moments = [load_moments(electricload_profiles.season_values(s), axis=0) for s in seasons]
+        moments = {m: np.stack([season[m] for season in season_moments]) for m in ["mean", "var", "skew", "kurt"]}
+        moments["weight"] = moments["mean"] / moments["mean"].sum(axis=1, keepdims=True)
 
-                # Peak1: The highest load when all loads are summed together
-                electricload_data_year_notime = remove_time_index(electricload_data_year)
-                overall_sample = electricload_data_year_notime.sum(axis=1).idxmax()
-                if not fix_sample:
-                    df = pd.DataFrame(
-                        data={"Period": i, "Scenario": scenario, "Season": "peak1", "Year": sample_year, "Hour": overall_sample},
-                        index=[0],
-                        )
-                    sampling_key = pd.concat([sampling_key, df], ignore_index=True)
-                # Peak2: The highest load of a single country
-                max_load_country = electricload_data_year_notime.max().idxmax()
-                country_sample = electricload_data_year_notime[max_load_country].idxmax()
-                if not fix_sample:
-                    df = pd.DataFrame(
-                        data={"Period": i, "Scenario": scenario, "Season": "peak2", "Year": sample_year, "Hour": country_sample},
-                        index=[0],
-                        )
-                    sampling_key = pd.concat([sampling_key, df], ignore_index=True)
-
-                # Sample generator availability for peak seasons
-                genAvail = pd.concat(
-                    [
-                        genAvail,
-                        sample_generator_peak(
-                            data=solar_data_year,
-                            seasons=seasons,
-                            g="Solar",
-                            scenario=scenario,
-                            period=i,
-                            regularSeasonHours=len_of_regular_season,
-                            peakSeasonHours=len_peak_season,
-                            overall_sample=overall_sample,
-                            country_sample=country_sample,
-                        ),
-                    ],
-                    ignore_index=True,
-                )
-                genAvail = pd.concat(
-                    [
-                        genAvail,
-                        sample_generator_peak(
-                            data=windonshore_data_year,
-                            seasons=seasons,
-                            g="Windonshore",
-                            scenario=scenario,
-                            period=i,
-                            regularSeasonHours=len_of_regular_season,
-                            peakSeasonHours=len_peak_season,
-                            overall_sample=overall_sample,
-                            country_sample=country_sample,
-                        ),
-                    ],
-                    ignore_index=True,
-                )
-                if north_sea:
-                    genAvail = pd.concat(
-                        [
-                            genAvail,
-                            sample_generator_peak(
-                                data=windoffshore_data_year,
-                                seasons=seasons,
-                                g="Windoffshoregrounded",
-                                scenario=scenario,
-                                period=i,
-                                regularSeasonHours=len_of_regular_season,
-                                peakSeasonHours=len_peak_season,
-                                overall_sample=overall_sample,
-                                country_sample=country_sample,
-                            ),
-                        ],
-                        ignore_index=True,
-                    )
-                    genAvail = pd.concat(
-                        [
-                            genAvail,
-                            sample_generator_peak(
-                                data=windoffshore_data_year,
-                                seasons=seasons,
-                                g="Windoffshorefloating",
-                                scenario=scenario,
-                                period=i,
-                                regularSeasonHours=len_of_regular_season,
-                                peakSeasonHours=len_peak_season,
-                                overall_sample=overall_sample,
-                                country_sample=country_sample,
-                            ),
-                        ],
-                        ignore_index=True,
-                    )
-                else:
-                    genAvail = pd.concat(
-                        [
-                            genAvail,
-                            sample_generator_peak(
-                                data=windoffshore_data_year,
-                                seasons=seasons,
-                                g="Windoffshore",
-                                scenario=scenario,
-                                period=i,
-                                regularSeasonHours=len_of_regular_season,
-                                peakSeasonHours=len_peak_season,
-                                overall_sample=overall_sample,
-                                country_sample=country_sample,
-                            ),
-                        ],
-                        ignore_index=True,
-                    )
-                genAvail = pd.concat(
-                    [
-                        genAvail,
-                        sample_generator_peak(
-                            data=hydroror_data_year,
-                            seasons=seasons,
-                            g="Hydrorun-of-the-river",
-                            scenario=scenario,
-                            period=i,
-                            regularSeasonHours=len_of_regular_season,
-                            peakSeasonHours=len_peak_season,
-                            overall_sample=overall_sample,
-                            country_sample=country_sample,
-                        ),
-                    ],
-                    ignore_index=True,
-                )
+    elecLoadMod_profiles = None
+    if LOADCHANGEMODULE:
+        elecLoadMod_profiles = {
+            i: ProfileArray(elecLoadMod_data.loc[elecLoadMod_data.Period.isin([i])].drop(columns=["Period"]), seasons)
+            for i in range(1, n_periods + 1)
+        }
 
-                # Sample electric load for peak seasons
-                elecLoad = pd.concat(
-                    [
-                        elecLoad,
-                        sample_load_peak(
-                            data=electricload_data_year,
-                            seasons=seasons,
-                            scenario=scenario,
-                            period=i,
-                            regularSeasonHours=len_of_regular_season,
-                            peakSeasonHours=len_peak_season,
-                            overall_sample=overall_sample,
-                            country_sample=country_sample,
-                        ),
-                    ],
-                    ignore_index=True,
-                )
+    if north_sea:
+        offshore_generators = ["Windoffshoregrounded", "Windoffshorefloating"]
+    else:
+        offshore_generators = ["Windoffshore"]
+    windoffshore_profiles = ProfileArray(windoffshore_data, seasons)
+    generator_profiles = (
+        [("Solar", ProfileArray(solar_data, seasons)), ("Windonshore", ProfileArray(windonshore_data, seasons))]
+        + [(g, windoffshore_profiles) for g in offshore_generators]
+        + [("Hydrorun-of-the-river", ProfileArray(hydroror_data, seasons))]
+    )
 
-                # Sample seasonal hydro limit for peak seasons
-                hydroSeasonal = pd.concat(
-                    [
-                        hydroSeasonal,
-                        sample_hydro_peak(
-                            data=hydroseasonal_data_year,
-                            seasons=seasons,
-                            scenario=scenario,
-                            period=i,
-                            regularSeasonHours=len_of_regular_season,
-                            peakSeasonHours=len_peak_season,
-                            overall_sample=overall_sample,
-                            country_sample=country_sample,
-                        ),
-                    ],
-                    ignore_index=True,
-                )
+    sampler = ScenarioTreeSampler(
+        empire_config=empire_config,
+        generator_profiles=generator_profiles,
+        electricload_profiles=electricload_profiles,
+        hydroseasonal_profiles=ProfileArray(hydroseasonal_data, seasons),
+        peak_hours={y: find_peak_hours(electricload_data, y) for y in electricload_profiles.years},
+        elecLoadMod_profiles=elecLoadMod_profiles,
+        sampling_key=sampling_key,
+        sample_filter=sample_filter,
+        cluster_weights=cluster_weights,
+        moments=moments,
+    )
 
-                # Sample the change of load
-                if LOADCHANGEMODULE:
-                    elecLoadMod = pd.concat(
-                        [
-                            elecLoadMod,
-                            sample_load_peak(
-                                data=elecLoadMod_data_year,
-                                seasons=seasons,
-                                scenario=scenario,
-                                period=i,
-                                regularSeasonHours=len_of_regular_season,
-                                peakSeasonHours=len_peak_season,
-                                overall_sample=overall_sample,
-                                country_sample=country_sample,
-                            ),
-                        ],
-                        ignore_index=True,
-                    )
+    # Every tree draws from its own generator seeded from the master seed, which makes the trees independent of
+    # the order and the process they are generated in
+    seed_sequence = np.random.SeedSequence(empire_config.scenario_seed)
+    logger.info("Scenario generation seed: %s", seed_sequence.entropy)
+    seeds = seed_sequence.spawn(n_tree_compare)
+
+    if n_tree_compare > 1:
+        n_workers = min(empire_config.scenario_workers, n_tree_compare)
+        if n_workers > 1:
+            logger.info("Generating and scoring %s trees in %s worker processes...", n_tree_compare, n_workers)
+            with ProcessPoolExecutor(n_workers, initializer=_init_sampler_worker, initargs=(sampler,)) as pool:
+                best_tree, best_score, keys = _best_tree(pool.map(_score_tree, range(n_tree_compare), seeds))
+        else:
+            best_tree, best_score, keys = _best_tree(map(sampler.score_tree, range(n_tree_compare), seeds))
 
-        if moment_matching:
-            # Save the tree
-            genAvail_dict[tree] = genAvail
-            elecLoad_dict[tree] = elecLoad
-            hydroSeasonal_dict[tree] = hydroSeasonal
-            # Calculate the tree score
-            score = []
-            for s in seasons:
-                hours = list(
-                    range(
-                        1 + len_of_regular_season * seasons.index(s), len_of_regular_season * (seasons.index(s) + 1) + 1
-                    )
-                )
-                es = elecLoad.loc[elecLoad.Operationalhour.isin(hours)]
-                for c in es.Node.unique():
-                    es_c = es.loc[es.Node.isin([c])]
-                    samplemean = np.mean(es_c["ElectricLoadRaw_in_MW"])  # M1
-                    samplevar = np.var(es_c["ElectricLoadRaw_in_MW"])  # M2
-                    sampleskew = skew(es_c["ElectricLoadRaw_in_MW"])  # M3
-                    samplekurt = kurtosis(es_c["ElectricLoadRaw_in_MW"])  # M4
-                    relmeandist = abs((samplemean - truemean[s + c]) / truemean[s + c])
-                    relvardist = abs((samplevar - truevar[s + c]) / truevar[s + c])
-                    relskewdist = abs((sampleskew - trueskew[s + c]) / trueskew[s + c])
-                    relkurtdist = abs((samplekurt - truekurt[s + c]) / truekurt[s + c])
-                    score.append(weight[s + c] * (relmeandist + relvardist + relskewdist + relkurtdist))
-            score_dict[tree] = sum(score)
-            # Reset the tree
-            genAvail = pd.DataFrame()
-            elecLoad = pd.DataFrame()
-            hydroSeasonal = pd.DataFrame()
+        # Only the sample keys of the best tree are kept, its samples are gathered again
+        logger.info("Using tree %s with the lowest moment matching score %.4f.", best_tree, best_score)
+    else:
+        keys = sampler.draw(np.random.default_rng(seeds[0]))
 
-    if moment_matching:
-        min_tree_key = min(score_dict, key=score_dict.get)
-        genAvail = genAvail_dict[min_tree_key]
-        elecLoad = elecLoad_dict[min_tree_key]
-        hydroSeasonal = hydroSeasonal_dict[min_tree_key]
+    genAvail, elecLoad, hydroSeasonal, elecLoadMod = sampler.gather(keys)
 
     logger.info("Done generating scenarios.")
 
@@ -1092,6 +875,8 @@ def generate_random_scenario(
     # Save sampling key
     if fix_sample:
         sampling_key = sampling_key.reset_index(level=["Period", "Scenario", "Season"])
+    else:
+        sampling_key = pd.DataFrame(keys[3], columns=["Period", "Scenario", "Season", "Year", "Hour"])
 
     logger.info("Saving 'sampling_key.csv'.")
     sampling_key.to_csv(tab_file_path / "sampling_key.csv", header=True, index=None, mode="w")
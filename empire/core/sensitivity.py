@@ -0,0 +1,251 @@
+"""
+Sensitivity sweeps on one instance.
+
+A sweep solves the model for a list of points, e.g. every combination of a few nuclear
+capital costs and availabilities. Instead of writing the input files and building the
+instance for every point, the instance is built once and every point sets the mutable
+parameters it changes, after which the parameters derived from them are rebuilt. The linear
+program of the point is generated as a matrix and solved with HiGHS from the optimal basis of
+the previous point, which is usually close, as only a few parameters change between points.
+
+The points can be shared between worker processes, which each build their own instance.
+"""
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from empire.core.matrix_model import LinearProgram, MatrixSolution, build_matrix_model, solve_matrix_model
+
+logger = logging.getLogger(__name__)
+
+
+def _set_values(param, values: dict) -> None:
+    # Entries that are not in the values are set back to the default of the parameter
+    default = param.default()
+    param.store_values({index: default for index in param.sparse_keys() if index not in values})
+    param.store_values(values)
+
+
+class ParamUpdate(ABC):
+    """
+    Change of mutable parameters of the instance for a point of a sweep.
+    """
+
+    #: Name of the parameter that is changed.
+    param: str
+
+    @abstractmethod
+    def values(self, instance) -> dict:
+        """
+        New values of the parameter.
+
+        :param instance: Instance the parameter is changed in.
+        :return: New values by index.
+        :raises ValueError: If the change does not match any index of the parameter.
+        """
+
+
+class ParamValues(ParamUpdate):
+    """
+    Set values of any mutable parameter.
+
+    :param param: Name of the parameter.
+    :param values: New values by index.
+    """
+
+    def __init__(self, param: str, values: dict) -> None:
+        self.param = param
+        self._values = values
+
+    def values(self, instance) -> dict:
+        return self._values
+
+
+class CapitalCostUpdate(ParamUpdate):
+    """
+    Set the capital cost of a generator in all periods.
+
+    :param generator_technology: The generator, as in :class:`empire.input_data_manager.CapitalCostManager`.
+    :param capital_cost: Capital cost in euro per kW.
+    """
+
+    param = "genCapitalCost"
+
+    def __init__(self, generator_technology: str, capital_cost: float) -> None:
+        self.generator_technology = generator_technology
+        self.capital_cost = capital_cost
+
+    def values(self, instance) -> dict:
+        if self.generator_technology not in instance.Generator:
+            raise ValueError(f"No generator {self.generator_technology}.")
+        return {(self.generator_technology, i): self.capital_cost for i in instance.Period}
+
+
+class AvailabilityUpdate(ParamUpdate):
+    """
+    Set the availability of a generator that does not have a stochastic availability.
+
+    :param generator_technology: The generator, as in :class:`empire.input_data_manager.AvailabilityManager`.
+    :param availability: Availability in [0, 1].
+    """
+
+    param = "genCapAvailTypeRaw"
+
+    def __init__(self, generator_technology: str, availability: float) -> None:
+        if availability < 0.0 or availability > 1.0:
+            raise ValueError("availability has to be in range [0,1]")
+        self.generator_technology = generator_technology
+        self.availability = availability
+
+    def values(self, instance) -> dict:
+        if self.generator_technology not in instance.Generator:
+            raise ValueError(f"No generator {self.generator_technology}.")
+        return {self.generator_technology: self.availability}
+
+
+class MaxInstalledCapacityUpdate(ParamUpdate):
+    """
+    Set the maximum installed capacity of a technology in nodes.
+
+    :param generator_technology: The technology.
+    :param nodes: Nodes to set the capacity in.
+    :param max_installed_capacity: Maximum installed capacity in MW. If lower than the initial
+        capacity, the initial capacity is used.
+    """
+
+    param = "genMaxInstalledCapRaw"
+
+    def __init__(self, generator_technology: str, nodes: list[str], max_installed_capacity: float) -> None:
+        self.generator_technology = generator_technology
+        self.nodes = nodes
+        self.max_installed_capacity = max_installed_capacity
+
+    def values(self, instance) -> dict:
+        if self.generator_technology not in instance.Technology or not set(self.nodes) <= set(instance.Node):
+            raise ValueError(f"No rows found for nodes {self.nodes} and technology {self.generator_technology}.")
+        return {(n, self.generator_technology): self.max_installed_capacity for n in self.nodes}
+
+
+class MaxTransmissionCapacityUpdate(ParamUpdate):
+    """
+    Set the maximum installed transmission capacity between two nodes in all periods.
+
+    :param from_node: From node.
+    :param to_node: To node.
+    :param max_installed_capacity: Maximum installed capacity in MW. If lower than the initial
+        capacity, the initial capacity is used.
+    """
+
+    param = "transmissionMaxInstalledCapRaw"
+
+    def __init__(self, from_node: str, to_node: str, max_installed_capacity: float) -> None:
+        self.from_node = from_node
+        self.to_node = to_node
+        self.max_installed_capacity = max_installed_capacity
+
+    def values(self, instance) -> dict:
+        for arc in [(self.from_node, self.to_node), (self.to_node, self.from_node)]:
+            if arc in instance.BidirectionalArc:
+                return {(*arc, i): self.max_installed_capacity for i in instance.Period}
+        raise ValueError(f"No transmission connection found between {self.from_node} and {self.to_node}.")
+
+
+@dataclass
+class SensitivityPoint:
+    """
+    Point of a sweep. The results of the point are written to a folder with its name.
+
+    :param name: Name of the point.
+    :param updates: Changes of the parameters from the input data.
+    """
+
+    name: str
+    updates: list[ParamUpdate] = field(default_factory=list)
+
+
+class SensitivitySweep:
+    """
+    Solves the points of a sweep on one instance, each from the basis of the previous point.
+
+    :param instance: Instance with the sets and parameters constructed.
+    :param derived_param_rules: Rules that rebuild the parameters derived from a parameter, by
+        the name of the parameter.
+    :param solver: Name of the solver, see :func:`empire.core.matrix_model.solve_matrix_model`.
+    :param emission_cap: If true, the emissions of every period and scenario are capped.
+    :param north_sea: If true, the transmission from offshore nodes is limited by the installed generation.
+    """
+
+    def __init__(self, instance, derived_param_rules: dict[str, Callable], solver: str,
+                 emission_cap: bool = True, north_sea: bool = True):
+        self.instance = instance
+        self.derived_param_rules = derived_param_rules
+        self.solver = solver
+        self.emission_cap = emission_cap
+        self.north_sea = north_sea
+        self.basis = None
+        self._base_values = {}
+
+    def apply(self, point: SensitivityPoint) -> None:
+        """
+        Set the parameters of the instance to those of a point.
+
+        Parameters changed by an earlier point are set back to the input data first, so the
+        result does not depend on the order of the points.
+
+        :param point: The point.
+        :raises ValueError: If an update does not match the instance.
+        """
+        values = {}
+        for update in point.updates:
+            values.setdefault(update.param, {}).update(update.values(self.instance))
+        for name in values:
+            if name not in self._base_values:
+                self._base_values[name] = getattr(self.instance, name).extract_values()
+
+        for name, base in self._base_values.items():
+            _set_values(getattr(self.instance, name), {**base, **values.get(name, {})})
+        rules = dict.fromkeys(rule for name, rule in self.derived_param_rules.items() if name in self._base_values)
+        for rule in rules:
+            rule(self.instance)
+
+    def solve(self, point: SensitivityPoint, logfile: Path | None = None) -> tuple[LinearProgram, MatrixSolution]:
+        """
+        Solve the linear program of a point.
+
+        :param point: The point.
+        :param logfile: File for the solver log.
+        :return: The linear program and its solution.
+        :raises RuntimeError: If no optimal solution is found.
+        """
+        self.apply(point)
+        lp = build_matrix_model(self.instance, emission_cap=self.emission_cap, north_sea=self.north_sea)
+        solution = solve_matrix_model(lp, self.solver, logfile=logfile, basis=self.basis)
+        self.basis = solution.basis
+        logger.info("Sensitivity point %s: objective value %s", point.name, solution.objective)
+        return lp, solution
+
+
+def run_sweep_pool(run: Callable[[list[SensitivityPoint]], list[float]], points: list[SensitivityPoint],
+                   workers: int = 1) -> list[float]:
+    """
+    Share the points of a sweep between worker processes.
+
+    Every worker runs a sweep over its share of the points, so it builds the instance once.
+
+    :param run: Runs a sweep over points and returns their objective values. Must be picklable.
+    :param points: The points.
+    :param workers: Number of worker processes.
+    :return: Objective value of every point.
+    """
+    if workers <= 1 or len(points) <= 1:
+        return run(points)
+
+    shares = [points[k::workers] for k in range(min(workers, len(points)))]
+    objectives = [None] * len(points)
+    with ProcessPoolExecutor(max_workers=len(shares)) as executor:
+        for k, share_objectives in enumerate(executor.map(run, shares)):
+            objectives[k::len(shares)] = share_objectives
+    return objectives
@@ -0,0 +1,330 @@
+"""
+Snapshot of the solution of a solved instance.
+
+The values of the variables, parameters and expressions of a solved instance, and the duals
+of the constraints the results use, are stored as NumPy arrays with one axis per factor set
+of their index, as in :class:`~empire.core.instance_arrays.InstanceArrays`, together with the
+members of the sets. The result files are written from a snapshot (see
+:mod:`empire.core.reports`).
+
+A snapshot is written to a compressed .npz file, which is much smaller and faster to write
+than a pickled instance. The result files, or other reports, can be written again from the
+file with ``empire-report``, without building or solving the model. The solution of the
+resolve for the operational duals is stored in the same file.
+"""
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "solution_snapshot.npz"
+# Constraints whose duals are stored
+SNAPSHOT_DUALS = ("FlowBalance", "emission_cap")
+
+_RESOLVED = "resolved."
+
+
+class SolutionSnapshot:
+    """
+    Values of the components of a solved instance as arrays, and the members of its sets.
+
+    A snapshot has the interface of :class:`~empire.core.instance_arrays.InstanceArrays`, so
+    the array writers of :mod:`empire.core.operational_results` write from it. The
+    :attr:`instance` view gives the values by index, as the components of the instance do.
+
+    :param sets: Members of every set, and the members by index of the indexed sets.
+    :param arrays: Values of the variables, parameters and expressions by name.
+    :param duals: Dual values of constraints by name.
+    :param index_sets: Names of the factor sets of the index of every array and dual.
+    :param variables: Names of the arrays that are values of variables.
+    :param metadata: Settings of the run the results depend on, e.g. whether the emission cap is used.
+    """
+
+    def __init__(self, sets: dict, arrays: dict[str, np.ndarray], duals: dict[str, np.ndarray],
+                 index_sets: dict[str, list[str]], variables: list[str], metadata: dict | None = None):
+        self.sets = sets
+        self.arrays = arrays
+        self.duals = duals
+        self.index_sets = index_sets
+        self.variables = variables
+        self.metadata = metadata or {}
+        self._positions = {}
+        self._views = {}
+
+    @classmethod
+    def from_instance(cls, instance, **metadata) -> "SolutionSnapshot":
+        """
+        Take a snapshot of a solved instance.
+
+        The raw stochastic parameters, from which the derived parameters were computed, are
+        left out.
+
+        :param instance: The solved instance.
+        :param metadata: Settings of the run the results depend on.
+        :return: The snapshot.
+        """
+        from pyomo.environ import Expression, Objective, Param, Set, Var
+
+        from empire.core.instance_arrays import InstanceArrays
+        from empire.core.instance_cache import STOCHASTIC_PARAMS
+
+        sets = {}
+        for component in instance.component_objects(Set, descend_into=False):
+            if component.is_indexed():
+                sets[component.local_name] = {key: list(members) for key, members in component.items()}
+            else:
+                sets[component.local_name] = list(component)
+
+        arrays = InstanceArrays(instance)
+        values = {}
+        for component in instance.component_objects((Var, Param, Expression, Objective), descend_into=False):
+            if component.local_name not in STOCHASTIC_PARAMS:
+                values[component.local_name] = arrays[component.local_name]
+        variables = [component.local_name for component in instance.component_objects(Var, descend_into=False)]
+        snapshot = cls(sets, values, {}, {}, variables, metadata)
+        snapshot._add_solution(instance, arrays)
+        return snapshot
+
+    def with_solution_of(self, instance) -> "SolutionSnapshot":
+        """
+        Snapshot with the sets and parameters of this one and the solution of an instance.
+
+        :param instance: The instance, solved again, e.g. with the investments fixed.
+        :return: The snapshot.
+        """
+        from empire.core.instance_arrays import InstanceArrays
+
+        snapshot = SolutionSnapshot(self.sets, dict(self.arrays), {}, dict(self.index_sets), self.variables,
+                                    self.metadata)
+        snapshot._add_solution(instance, InstanceArrays(instance))
+        return snapshot
+
+    def _add_solution(self, instance, arrays) -> None:
+        for name in self.variables:
+            self.arrays[name] = arrays[name]
+        for name in SNAPSHOT_DUALS:
+            if instance.component(name) is None:
+                continue
+            try:
+                self.duals[name] = arrays.dual(name)
+            except KeyError:
+                logger.info("No duals of %s in the solution", name)
+        for name in list(self.arrays) + list(self.duals):
+            component = instance.component(name)
+            self.index_sets[name] = [s.local_name for s in component.index_set().subsets()] \
+                if component.is_indexed() else []
+
+    @property
+    def objective(self) -> float:
+        return float(self.arrays["Obj"])
+
+    @property
+    def instance(self) -> "SnapshotInstance":
+        """
+        View of the snapshot with the sets, values and duals by the names of the components of the instance.
+        """
+        return SnapshotInstance(self)
+
+    def elements(self, set_name: str) -> list:
+        """
+        Members of a set in model order.
+
+        :param set_name: Name of the set, e.g. 'Node'.
+        :return: List of set members.
+        """
+        return self.sets[set_name]
+
+    def positions(self, set_name: str) -> dict:
+        """
+        Map from set member to its position along an array axis.
+
+        :param set_name: Name of the set, e.g. 'GeneratorsOfNode'.
+        :return: Dictionary member -> position.
+        """
+        if set_name not in self._positions:
+            self._positions[set_name] = {e: p for p, e in enumerate(self.elements(set_name))}
+        return self._positions[set_name]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def dual(self, name: str) -> np.ndarray:
+        return self.duals[name]
+
+    def view(self, name: str, dual: bool = False) -> "IndexedValues":
+        key = (name, dual)
+        if key not in self._views:
+            array = self.duals[name] if dual else self.arrays[name]
+            self._views[key] = IndexedValues(array, [self.positions(s) for s in self.index_sets[name]],
+                                             [_dimen(self.sets[s]) for s in self.index_sets[name]])
+        return self._views[key]
+
+
+class IndexedValues:
+    """
+    Values of an indexed component of a snapshot by index.
+
+    :param array: Values with one axis per factor set of the index.
+    :param positions: Map from member to position of every factor set.
+    :param dimens: Dimension of every factor set.
+    """
+
+    def __init__(self, array: np.ndarray, positions: list[dict], dimens: list[int]):
+        self._values = array.tolist()
+        self._positions = positions
+        self._dimens = dimens
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        values, start = self._values, 0
+        for positions, dimen in zip(self._positions, self._dimens):
+            values = values[positions[key[start] if dimen == 1 else key[start:start + dimen]]]
+            start += dimen
+        return values
+
+
+class SnapshotInstance:
+    """
+    Attribute access to a snapshot by the names of the components of the instance.
+
+    Sets are lists, and indexed sets dictionaries of lists. Scalar values are numbers and
+    indexed values :class:`IndexedValues`. The duals are read as from the dual suffix of an
+    instance, e.g. ``instance.dual[instance.FlowBalance[n, h, i, w]]``.
+
+    :param snapshot: The snapshot.
+    """
+
+    def __init__(self, snapshot: SolutionSnapshot):
+        self._snapshot = snapshot
+        self.dual = _Duals(snapshot)
+
+    def __getattr__(self, name: str):
+        snapshot = self._snapshot
+        if name in snapshot.sets:
+            return snapshot.sets[name]
+        if name in snapshot.arrays:
+            if not snapshot.index_sets[name]:
+                return snapshot.arrays[name].tolist()
+            return snapshot.view(name)
+        if name in snapshot.duals:
+            return _Constraint(name)
+        raise AttributeError(f"The snapshot has no component {name}")
+
+
+class _Constraint:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getitem__(self, key):
+        return self.name, key
+
+
+class _Duals:
+    def __init__(self, snapshot: SolutionSnapshot):
+        self._snapshot = snapshot
+
+    def __getitem__(self, constraint):
+        name, key = constraint
+        return self._snapshot.view(name, dual=True)[key]
+
+
+def _dimen(members) -> int:
+    return len(members[0]) if members and isinstance(members[0], tuple) else 1
+
+
+def _encode_members(members):
+    if isinstance(members, dict):
+        return [[_encode_members([key])[0], _encode_members(values)] for key, values in members.items()]
+    return [list(m) if isinstance(m, tuple) else m for m in members]
+
+
+def _decode_members(members, indexed: bool):
+    if indexed:
+        return {_decode_members([key], False)[0]: _decode_members(values, False) for key, values in members}
+    return [tuple(m) if isinstance(m, list) else m for m in members]
+
+
+def _encode_array(array: np.ndarray) -> dict[str, np.ndarray]:
+    # Arrays of Python numbers keep which values are integers, so they are written as before
+    if array.dtype != object:
+        return {"": array}
+    flat = array.ravel().tolist()
+    ints = np.array([v.__class__ is int for v in flat], dtype=bool).reshape(array.shape)
+    values = np.array([np.nan if v is None else v for v in flat], dtype=float).reshape(array.shape)
+    return {"": values, ".ints": ints}
+
+
+def _decode_array(values: np.ndarray, ints: np.ndarray | None) -> np.ndarray:
+    if ints is None:
+        return values
+    array = values.astype(object)
+    array[ints] = [int(v) for v in values[ints]]
+    return array
+
+
+def write_snapshot(path: Path, snapshot: SolutionSnapshot, resolved: SolutionSnapshot | None = None) -> None:
+    """
+    Write a snapshot to a compressed .npz file.
+
+    :param path: The file.
+    :param snapshot: Snapshot of the solution.
+    :param resolved: Snapshot of the solution of the resolve for the operational duals, if any.
+        Only its variables and duals are written.
+    """
+    manifest = {
+        "sets": {name: _encode_members(members) for name, members in snapshot.sets.items()},
+        "indexed_sets": [name for name, members in snapshot.sets.items() if isinstance(members, dict)],
+        "index_sets": snapshot.index_sets,
+        "variables": snapshot.variables,
+        "duals": list(snapshot.duals),
+        "resolved_duals": list(resolved.duals) if resolved is not None else None,
+        "metadata": snapshot.metadata,
+    }
+    files = {"manifest": np.array(json.dumps(manifest))}
+    for name, array in snapshot.arrays.items():
+        files.update({f"values.{name}{suffix}": a for suffix, a in _encode_array(array).items()})
+    for name, array in snapshot.duals.items():
+        files[f"duals.{name}"] = array
+    if resolved is not None:
+        for name in resolved.variables:
+            files.update({f"{_RESOLVED}values.{name}{suffix}": a
+                          for suffix, a in _encode_array(resolved.arrays[name]).items()})
+        for name, array in resolved.duals.items():
+            files[f"{_RESOLVED}duals.{name}"] = array
+    with open(path, "wb") as file:
+        np.savez_compressed(file, **files)
+    logger.info("Solution snapshot written to: %s", path)
+
+
+def read_snapshot(path: Path) -> tuple[SolutionSnapshot, SolutionSnapshot | None]:
+    """
+    Read a snapshot written by :func:`write_snapshot`.
+
+    :param path: The .npz file.
+    :return: Snapshot of the solution, and of the solution of the resolve for the operational
+        duals, or None if the run was not resolved.
+    """
+    with np.load(path) as files:
+        manifest = json.loads(files["manifest"].item())
+        indexed = set(manifest["indexed_sets"])
+        sets = {name: _decode_members(members, name in indexed) for name, members in manifest["sets"].items()}
+
+        def values(prefix):
+            names = [key[len(prefix):] for key in files.files if key.startswith(prefix) and not key.endswith(".ints")]
+            return {name: _decode_array(files[prefix + name], files[f"{prefix}{name}.ints"]
+                                        if f"{prefix}{name}.ints" in files.files else None) for name in names}
+
+        arrays = values("values.")
+        duals = {name: files[f"duals.{name}"] for name in manifest["duals"]}
+        snapshot = SolutionSnapshot(sets, arrays, duals, manifest["index_sets"], manifest["variables"],
+                                    manifest["metadata"])
+        if manifest["resolved_duals"] is None:
+            return snapshot, None
+        resolved_arrays = {**arrays, **values(f"{_RESOLVED}values.")}
+        resolved_duals = {name: files[f"{_RESOLVED}duals.{name}"] for name in manifest["resolved_duals"]}
+        resolved = SolutionSnapshot(sets, resolved_arrays, resolved_duals, manifest["index_sets"],
+                                    manifest["variables"], manifest["metadata"])
+    return snapshot, resolved
@@ -0,0 +1,115 @@
+"""
+Creation of the solver interfaces used to solve EMPIRE.
+
+Every solver has a file-based interface, where Pyomo writes the model to a file that is read
+by the solver executable. CPLEX, Xpress and Gurobi also have a persistent interface, where
+the model is kept in the solver through its Python API. Changes to the instance, such as
+fixing the investment variables for the operational duals, are then passed to the solver as
+updates instead of writing and reading the model again. Both interfaces set the same options.
+With the barrier method without crossover there is no basis, so a re-solve starts from scratch.
+
+HiGHS is used through highspy, which Pyomo passes the model to directly, so no file is written.
+"""
+import logging
+
+from pyomo.environ import SolverFactory
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
+
+logger = logging.getLogger(__name__)
+
+SOLVERS = ["CPLEX", "Xpress", "Gurobi", "GLPK", "HiGHS"]
+
+PERSISTENT_SOLVERS = {
+    "CPLEX": "cplex_persistent",
+    "Xpress": "xpress_persistent",
+    "Gurobi": "gurobi_persistent",
+}
+
+# Options of the solvers, the same for the file-based and the persistent interface
+SOLVER_OPTIONS = {
+    "CPLEX": {"lpmethod": 4, "solutiontype": 2},
+    "Xpress": {"defaultAlg": 4, "crossover": 0, "lpLog": 1, "Trace": 1},
+    "Gurobi": {"Crossover": 0, "Method": 2},
+}
+
+
+class _HiGHS:
+    # The Pyomo interface of highspy takes the log file as a HiGHS option, not as an argument
+    def __init__(self):
+        self._opt = SolverFactory("highs")
+        self.options = {}
+
+    def available(self, exception_flag: bool = True) -> bool:
+        return self._opt.available(exception_flag=exception_flag)
+
+    def solve(self, instance, tee: bool = False, logfile=None, **kwargs):
+        options = dict(self.options)
+        if logfile is not None:
+            options["log_file"] = str(logfile)
+        return self._opt.solve(instance, tee=tee, options=options, **kwargs)
+
+
+def _file_solver(solver: str):
+    if solver == "CPLEX":
+        opt = SolverFactory("cplex", Verbose=True)
+    if solver == "Xpress":
+        opt = SolverFactory("xpress")
+    if solver == "Gurobi":
+        opt = SolverFactory("gurobi", Verbose=True)
+    if solver == "GLPK":
+        opt = SolverFactory("glpk", Verbose=True)
+    if solver == "HiGHS":
+        opt = _HiGHS()
+    opt.options.update(SOLVER_OPTIONS.get(solver, {}))
+    return opt
+
+
+def _persistent_solver(solver: str):
+    opt = SolverFactory(PERSISTENT_SOLVERS[solver])
+    opt.options.update(SOLVER_OPTIONS[solver])
+    return opt
+
+
+def create_solver(solver: str, persistent: bool = False):
+    """
+    Create the interface to a solver, with the options used for EMPIRE.
+
+    If a persistent interface is requested but the solver does not have one (GLPK, HiGHS), or
+    its Python API is not installed, the file-based interface is returned instead.
+
+    :param solver: Name of the solver. Options: "CPLEX", "Xpress", "Gurobi", "GLPK", "HiGHS".
+    :param persistent: If true, return the persistent interface of the solver if available.
+    :return: Pyomo solver object.
+    :raises ValueError: If the solver is not supported.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Invalid solver {solver!r}. Options: {', '.join(SOLVERS)}")
+
+    if persistent and solver in PERSISTENT_SOLVERS:
+        if SolverFactory(PERSISTENT_SOLVERS[solver]).available(exception_flag=False):
+            return _persistent_solver(solver)
+        logger.warning("Python API of %s not available, using the file-based interface", solver)
+
+    return _file_solver(solver)
+
+
+def is_persistent(opt) -> bool:
+    """
+    Check if a solver object keeps the model in the solver.
+
+    :param opt: Pyomo solver object.
+    :return: True for persistent interfaces.
+    """
+    return isinstance(opt, PersistentSolver)
+
+
+def fix_variable(opt, var) -> None:
+    """
+    Fix a variable at its current value, also in the solver if the interface is persistent.
+
+    :param opt: Pyomo solver object the instance is solved with.
+    :param var: Variable data of the instance.
+    """
+    var.fix()
+    if is_persistent(opt):
+        opt.update_var(var)
@@ -0,0 +1,314 @@
+"""
+Synthetic EMPIRE datasets of any size.
+
+The generator writes the six input workbooks and the raw scenario data (the hourly profiles in
+ScenarioData) of a dataset with a given number of nodes, generators per node, transmission
+lines, seasons and hours, so the model can be built and solved at sizes between the test
+dataset and the European datasets. Costs, capacities and profiles are plausible but made up:
+the datasets are meant for testing and benchmarking, not for analysis.
+
+A share of the generators, lines and storages can be made inert: without initial capacity and
+not buildable, so the model reduction leaves them out.
+
+The nodes are named by their code, e.g. 'N001', which is also the column of the node in the
+scenario data, so the datasets do not depend on config/countries.json. The offshore wind of
+the datasets is not split into grounded and floating, so they are run with ``north_sea: False``.
+"""
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# generator, technology, thermal, hydro, hydro with reservoir, stochastic availability.
+# Datasets with fewer generators per node leave out the last ones. Every node has the
+# generators with stochastic availability, as the scenario generation samples them for all
+# nodes, and the .tab files of the sets of thermal and regulated hydro generators cannot be
+# empty, so there are at least MIN_GENERATORS.
+GENERATORS = [
+    ("Solar", "Solar", False, False, False, True),
+    ("Windonshore", "Wind_onshr", False, False, False, True),
+    ("Windoffshore", "Wind_offshr", False, False, False, True),
+    ("Hydrorun-of-the-river", "Hydro_ror", False, True, False, True),
+    ("GasCCGT", "Gas", True, False, False, False),
+    ("Hydroregulated", "Hydro_regulated", False, True, True, False),
+    ("Nuclear", "Nuclear", True, False, False, False),
+    ("Coal", "Coal", True, False, False, False),
+    ("CoalCCS", "CCS", True, False, False, False),
+]
+MIN_GENERATORS = 6
+# storage, dependent (energy capacity proportional to power capacity)
+STORAGES = [("Li-Ion_BESS", False), ("HydroPumpStorage", True)]
+LINE_TYPES = ["HVAC_OverheadLine", "HVDC_Cable"]
+
+CAPITAL_COST = {"Solar": 500, "Windonshore": 1200, "Windoffshore": 2500, "Hydrorun-of-the-river": 3000,
+                "GasCCGT": 800, "Hydroregulated": 3000, "Nuclear": 6000, "Coal": 1600, "CoalCCS": 3000}
+FUEL_COST = {"GasCCGT": 8.0, "Nuclear": 1.0, "Coal": 3.0, "CoalCCS": 3.0}
+CO2_CONTENT = {"GasCCGT": 0.056, "Coal": 0.095, "CoalCCS": 0.095}
+
+
+def _sheet(columns: list[str], rows) -> pd.DataFrame:
+    # Sheets of parameters have a description and a unit row below the header
+    meta = [["description"] + [""] * (len(columns) - 1), ["unit"] + [""] * (len(columns) - 1)]
+    return pd.DataFrame(meta + [list(row) for row in rows], columns=columns)
+
+
+def _write_workbook(file_path: Path, sheets: dict[str, pd.DataFrame]) -> None:
+    with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+        for name, sheet in sheets.items():
+            sheet.to_excel(writer, sheet_name=name, index=False)
+
+
+def _lines(nodes: list[str], line_density: float, rng: np.random.Generator) -> list[tuple[str, str]]:
+    # A chain connects all nodes, other pairs are connected with probability line_density
+    lines = []
+    for i in range(len(nodes)):
+        for j in range(i + 1, len(nodes)):
+            if j == i + 1 or rng.random() < line_density:
+                lines.append((nodes[i], nodes[j]))
+    return lines
+
+
+def _inert(keys: list, inert_share: float, rng: np.random.Generator) -> set:
+    # A random selection of the share of the keys
+    return {keys[k] for k in rng.permutation(len(keys))[:round(inert_share * len(keys))]}
+
+
+def generate_synthetic_dataset(
+    dataset_path: Path,
+    n_nodes: int = 4,
+    generators_per_node: int = len(GENERATORS),
+    line_density: float = 0.0,
+    n_periods: int = 2,
+    regular_seasons: tuple[str, ...] | list[str] = ("winter", "spring", "summer", "fall"),
+    length_of_regular_season: int = 24,
+    len_peak_season: int = 24,
+    n_years: int = 3,
+    seed: int = 1,
+    inert_share: float = 0.0,
+) -> None:
+    """
+    Write a synthetic dataset.
+
+    :param dataset_path: Folder to write the workbooks to, with the scenario data in ScenarioData.
+    :param n_nodes: Number of nodes.
+    :param generators_per_node: Number of generator types in every node, from 6 to 9.
+    :param line_density: Probability that two nodes that are not neighbours in the chain of all
+        nodes are connected, in [0, 1].
+    :param n_periods: Number of investment periods.
+    :param regular_seasons: Regular seasons, a subset of winter, spring, summer and fall.
+    :param length_of_regular_season: Number of hours in a regular season.
+    :param len_peak_season: Number of hours in a peak season.
+    :param n_years: Number of years of hourly scenario data, from 2015.
+    :param seed: Seed of the random capacities and profiles.
+    :param inert_share: Share of the generators of the nodes, the lines and the storages of the
+        nodes that have no initial capacity and can not be built, in [0, 1].
+    :raises ValueError: If a size is out of range.
+    """
+    if n_nodes < 1 or not MIN_GENERATORS <= generators_per_node <= len(GENERATORS):
+        raise ValueError(
+            f"Need at least one node and between {MIN_GENERATORS} and {len(GENERATORS)} generators per node."
+        )
+    if not 0.0 <= line_density <= 1.0:
+        raise ValueError("line_density has to be in range [0,1]")
+    if not 0.0 <= inert_share <= 1.0:
+        raise ValueError("inert_share has to be in range [0,1]")
+
+    rng = np.random.default_rng(seed)
+    dataset_path.mkdir(parents=True, exist_ok=True)
+    nodes = [f"N{k + 1:03d}" for k in range(n_nodes)]
+    periods = list(range(1, n_periods + 1))
+    generators = GENERATORS[:generators_per_node]
+    technologies = sorted({g[1] for g in generators})
+    storages = [s for s, _ in STORAGES]
+    lines = _lines(nodes, line_density, rng)
+    directional_lines = lines + [(b, a) for a, b in lines]
+    # The inert components are drawn separately, so the rest of the dataset does not depend on them
+    inert_rng = np.random.default_rng([seed, 1])
+    inert_generators = _inert([(n, g) for n in nodes for g in generators], inert_share, inert_rng)
+    inert_lines = _inert(lines, inert_share, inert_rng)
+    inert_storages = _inert([(n, s) for n in nodes for s in storages], inert_share, inert_rng)
+    logger.info("Writing synthetic dataset with %d nodes, %d generators per node and %d lines to: %s",
+                n_nodes, generators_per_node, len(lines), dataset_path)
+
+    sets = {
+        "Nodes": pd.DataFrame({"Node": nodes}),
+        "OffshoreNodes": pd.DataFrame({"OffshoreNode": []}),
+        "Horizon": pd.DataFrame({"Horizon": periods}),
+        "LineType": pd.DataFrame({"LineType": LINE_TYPES}),
+        "Technology": pd.DataFrame({"Technology": technologies}),
+        "Storage": pd.DataFrame({
+            "Storage": pd.Series(storages),
+            "DependentStorage": pd.Series([s for s, dependent in STORAGES if dependent]),
+        }),
+        "Generators": pd.DataFrame({
+            "Generator": pd.Series([g[0] for g in generators]),
+            "ThermalGenerators": pd.Series([g[0] for g in generators if g[2]]),
+            "HydroGenerator": pd.Series([g[0] for g in generators if g[3]]),
+            "HydroGeneratorWithReservoir": pd.Series([g[0] for g in generators if g[4]]),
+        }),
+        "StorageOfNodes": _sheet(["Node", "Storage"], [(n, s) for n in nodes for s in storages]),
+        "DirectionalLines": _sheet(["FromNode", "ToNode"], directional_lines),
+        "LineTypeOfDirectionalLines": _sheet(["FromNode", "ToNode", "LineType"],
+                                             [(a, b, LINE_TYPES[k % 2]) for k, (a, b) in enumerate(lines)]),
+        "GeneratorsOfNode": _sheet(["Node", "Generator"], [(n, g[0]) for n in nodes for g in generators]),
+        "GeneratorsOfTechnology": _sheet(["Technology", "Generator"], [(g[1], g[0]) for g in generators]),
+        "Coords": _sheet(["Node", "Lat", "Lon"], [(n, 45 + (k % 10), 5 + k // 10) for k, n in enumerate(nodes)]),
+    }
+    _write_workbook(dataset_path / "Sets.xlsx", sets)
+
+    # Every generator has its own technology
+    inert_technologies = {n: {g[1] for m, g in inert_generators if m == n} for n in nodes}
+    generator_sheets = {
+        "CapitalCosts": _sheet(["GeneratorTechnology", "Period", "generatorCapitalCost in euro per kW"],
+                               [(g[0], i, CAPITAL_COST[g[0]] * (1 - 0.05 * i)) for g in generators for i in periods]),
+        "FixedOMCosts": _sheet(["GeneratorTechnology", "Period", "generatorFixedOMCost in euro per kW"],
+                               [(g[0], i, CAPITAL_COST[g[0]] * 0.02) for g in generators for i in periods]),
+        "VariableOMCosts": _sheet(["GeneratorTechnology", "generatorVariableOMcosts in euro per MWh"],
+                                  [(g[0], 2.0 if g[2] else 0.5) for g in generators]),
+        "FuelCosts": _sheet(["GeneratorTechnology", "Period", "generatorTypeFuelCost in euro per GJ"],
+                            [(g[0], i, FUEL_COST.get(g[0], 0.0)) for g in generators for i in periods]),
+        "CCSCostTSVariable": _sheet(["Period", "CCSCostTSVariable in euro per ton"], [(i, 10.0) for i in periods]),
+        "Efficiency": _sheet(["GeneratorTechnology", "Period", "generatorEfficiency"],
+                             [(g[0], i, 0.55 if g[2] else 1.0) for g in generators for i in periods]),
+        "RefInitialCap": _sheet(["Node", "GeneratorTechnology", "generatorRefInitialCap in MW"],
+                                [(n, g[0], 0.0 if (n, g) in inert_generators else capacity)
+                                 for n in nodes for g in generators
+                                 for capacity in [float(rng.integers(0, 3000))]]),
+        "ScaleFactorInitialCap": _sheet(["GeneratorTechnology", "Period", "generatorScaleFactorInitialCap"],
+                                        [(g[0], i, 0.1 * (i - 1)) for g in generators for i in periods]),
+        "InitialCapacity": _sheet(["Node", "GeneratorTechnology", "Period", "generatorInitialCapacity in MW"],
+                                  [(n, g[0], i, 0.0) for n in nodes for g in generators for i in periods]),
+        "MaxBuiltCapacity": _sheet(["Node", "GeneratorTechnology", "Period", "generatorMaxBuildCapacity in MW"],
+                                   [(n, t, i, 0.0 if t in inert_technologies[n] else 20000.0)
+                                    for n in nodes for t in technologies for i in periods]),
+        "MaxInstalledCapacity": _sheet(["Node", "GeneratorTechnology", "generatorMaxInstallCapacity in MW"],
+                                       [(n, t, 1000.0 if t == "Hydro_regulated" else 50000.0)
+                                        for n in nodes for t in technologies]),
+        "RampRate": _sheet(["ThermalGenerators", "RampRate"], [(g[0], 0.5) for g in generators if g[2]]),
+        "GeneratorTypeAvailability": _sheet(["Generator", "GeneratorTypeAvailability"],
+                                            [(g[0], 0.0 if g[5] else 0.9) for g in generators]),
+        "CO2Content": _sheet(["GeneratorTechnology", "CO2Content_in_tCO2/GJ"],
+                             [(g[0], CO2_CONTENT.get(g[0], 0.0)) for g in generators]),
+        "Lifetime": _sheet(["GeneratorTechnology", "Lifetime"], [(g[0], 30.0) for g in generators]),
+    }
+    _write_workbook(dataset_path / "Generator.xlsx", generator_sheets)
+
+    lines_of_periods = [(a, b, i) for a, b in lines for i in periods]
+    transmission_sheets = {
+        "lineEfficiency": _sheet(["FromNode", "ToNode", "lineEfficiency"], [(a, b, 0.97) for a, b in directional_lines]),
+        "MaxBuiltCapacity": _sheet(["InterconnectorLinks", "ToNode", "Period", "MaxBuildCapacity"],
+                                   [(a, b, i, 0.0 if (a, b) in inert_lines else 5000.0)
+                                    for a, b, i in lines_of_periods]),
+        "Length": _sheet(["FromNode", "ToNode", "Length in km"],
+                         [(a, b, float(rng.integers(200, 800))) for a, b in lines]),
+        "TypeCapitalCost": _sheet(["Type", "Period", "TypeCapitalCost"],
+                                  [(t, i, 1000.0 + 500 * k) for k, t in enumerate(LINE_TYPES) for i in periods]),
+        "TypeFixedOMCost": _sheet(["Type", "Period", "TypeFixedOMCost"],
+                                  [(t, i, 10.0) for t in LINE_TYPES for i in periods]),
+        "InitialCapacity": _sheet(["FromNode", "ToNode", "Period", "InitialCapacity"],
+                                  [(a, b, i, 0.0 if (a, b) in inert_lines else 1000.0)
+                                   for a, b, i in lines_of_periods]),
+        "MaxInstallCapacityRaw": _sheet(["FromNode", "ToNode", "Period", "MaxRawInstalledCapacity"],
+                                        [(a, b, i, 8000.0) for a, b, i in lines_of_periods]),
+        "Lifetime": _sheet(["FromNode", "ToNode", "Lifetime"], [(a, b, 40.0) for a, b in lines]),
+    }
+    _write_workbook(dataset_path / "Transmission.xlsx", transmission_sheets)
+
+    demand_scale = rng.uniform(0.5, 1.5, n_nodes)
+    node_sheets = {
+        "ElectricAnnualDemand": _sheet(["Node", "Period", "ElectricAdjustment in MWh per hour"],
+                                       [(n, i, 5.0e7 * demand_scale[k] * (1 + 0.05 * i))
+                                        for k, n in enumerate(nodes) for i in periods]),
+        "NodeLostLoadCost": _sheet(["Node", "Period", "NodeLostLoadCost"],
+                                   [(n, i, 22000.0) for n in nodes for i in periods]),
+        "HydroGenMaxAnnualProduction": _sheet(["Node", "HydroGenMaxAnnualProduction"], [(n, 1.0e7) for n in nodes]),
+    }
+    _write_workbook(dataset_path / "Node.xlsx", node_sheets)
+
+    regular_scale = (8760 - 2 * len_peak_season) / (len(regular_seasons) * length_of_regular_season)
+    general_sheets = {
+        "seasonScale": _sheet(["Season", "seasonScale"],
+                              [(s, regular_scale) for s in regular_seasons] + [("peak1", 1.0), ("peak2", 1.0)]),
+        "CO2Cap": _sheet(["Period", "CO2Cap in Mton CO2eq"], [(i, 50.0 * n_nodes / i) for i in periods]),
+        "CO2Price": _sheet(["Period", "CO2Price in euro per tCO2"], [(i, 30.0 * i) for i in periods]),
+    }
+    _write_workbook(dataset_path / "General.xlsx", general_sheets)
+
+    storages_of_periods = [(n, s, i) for n in nodes for s in storages for i in periods]
+    storage_sheets = {
+        "InitialPowerCapacity": _sheet(["Node", "StorageTypes", "Period", "InitialPowerCapacity"],
+                                       [(n, s, i, 0.0 if (n, s) in inert_storages else 100.0)
+                                        for n, s, i in storages_of_periods]),
+        "PowerCapitalCost": _sheet(["StorageTypes", "Period", "PowerCapitalCost"],
+                                   [(s, i, 300.0) for s in storages for i in periods]),
+        "PowerFixedOMCost": _sheet(["StorageTypes", "Period", "PowerFixedOMCost"],
+                                   [(s, i, 5.0) for s in storages for i in periods]),
+        "PowerMaxBuiltCapacity": _sheet(["Node", "StorageTypes", "Period", "PowerMaxBuiltCapacity"],
+                                        [(n, s, i, 0.0 if (n, s) in inert_storages else 5000.0)
+                                         for n, s, i in storages_of_periods]),
+        "EnergyCapitalCost": _sheet(["StorageTypes", "Period", "EnergyCapitalCost"],
+                                    [(s, i, 150.0) for s in storages for i in periods]),
+        "EnergyFixedOMCost": _sheet(["StorageTypes", "Period", "EnergyFixedOMCost"],
+                                    [(s, i, 2.0) for s in storages for i in periods]),
+        "EnergyInitialCapacity": _sheet(["Node", "StorageTypes", "Period", "EnergyInitialCapacity"],
+                                        [(n, s, i, 0.0 if (n, s) in inert_storages else 400.0)
+                                         for n, s, i in storages_of_periods]),
+        "EnergyMaxBuiltCapacity": _sheet(["Node", "StorageTypes", "Period", "EnergyMaxBuiltCapacity"],
+                                         [(n, s, i, 0.0 if (n, s) in inert_storages else 20000.0)
+                                          for n, s, i in storages_of_periods]),
+        "EnergyMaxInstalledCapacity": _sheet(["Node", "StorageTypes", "EnergyMaxInstalledCapacity"],
+                                             [(n, s, 50000.0) for n in nodes for s in storages]),
+        "PowerMaxInstalledCapacity": _sheet(["Node", "StorageTypes", "PowerMaxInstalledCapacity"],
+                                            [(n, s, 20000.0) for n in nodes for s in storages]),
+        "StorageInitialEnergyLevel": _sheet(["StorageTypes", "StorageInitialEnergyLevel"],
+                                            [(s, 0.5) for s in storages]),
+        "StorageChargeEff": _sheet(["StorageTypes", "StorageChargeEff"], [(s, 0.9) for s in storages]),
+        "StorageDischargeEff": _sheet(["StorageTypes", "StorageDischargeEff"], [(s, 0.9) for s in storages]),
+        "StoragePowToEnergy": _sheet(["DependentStorageTypes", "StoragePowToEnergy"],
+                                     [(s, 0.25) for s, dependent in STORAGES if dependent]),
+        "StorageBleedEfficiency": _sheet(["StorageTypes", "StorageBleedEfficiency"], [(s, 0.999) for s in storages]),
+        "Lifetime": _sheet(["StorageTypes", "Lifetime"], [(s, 20.0) for s in storages]),
+    }
+    _write_workbook(dataset_path / "Storage.xlsx", storage_sheets)
+
+    write_synthetic_scenario_data(dataset_path / "ScenarioData", nodes, n_years, rng)
+
+
+def write_synthetic_scenario_data(scenario_data_path: Path, nodes: list[str], n_years: int,
+                                  rng: np.random.Generator) -> None:
+    """
+    Write hourly profiles of the raw scenario data, with daily and yearly cycles and noise.
+
+    The load peaks in the middle of January and is lower around new year, so the peak seasons
+    sampled around the peak hours of every year fit within the year.
+
+    :param scenario_data_path: Folder to write the CSV files to.
+    :param nodes: Node codes, the columns of the profiles.
+    :param n_years: Number of years, from 2015.
+    :param rng: Random generator of the noise.
+    """
+    scenario_data_path.mkdir(parents=True, exist_ok=True)
+    time = pd.date_range("2015-01-01", f"{2015 + n_years - 1}-12-31 23:00", freq="h")
+    shape = (len(time), len(nodes))
+    day = np.sin(2 * np.pi * time.hour.to_numpy() / 24)[:, None]
+    day_of_year = time.dayofyear.to_numpy()
+    year = np.cos(2 * np.pi * day_of_year / 365)[:, None]
+    winter_peak = np.cos(2 * np.pi * (day_of_year - 15) / 365)[:, None]
+    holidays = np.where((day_of_year <= 7) | (day_of_year >= 358), 0.9, 1.0)[:, None]
+
+    profiles = {
+        "solar": np.clip(day * (0.6 - 0.3 * year) + 0.05 * rng.standard_normal(shape), 0, 1),
+        "windonshore": np.clip(0.35 + 0.15 * year + 0.2 * rng.standard_normal(shape), 0, 1),
+        "windoffshore": np.clip(0.45 + 0.15 * year + 0.2 * rng.standard_normal(shape), 0, 1),
+        "hydroror": np.clip(0.5 - 0.2 * year + 0.05 * rng.standard_normal(shape), 0, 1),
+        "hydroseasonal": np.clip(500 + 200 * year + 50 * rng.standard_normal(shape), 0, None),
+        "electricload": 5000 * holidays * (1 + 0.2 * winter_peak + 0.1 * day) + rng.uniform(-300, 300, shape),
+    }
+    timestamps = time.strftime("%d/%m/%Y %H:%M")
+    for name, values in profiles.items():
+        frame = pd.DataFrame(values, columns=nodes)
+        frame.insert(0, "time", timestamps)
+        frame.to_csv(scenario_data_path / f"{name}.csv", index=False, float_format="%.4f")
@@ -0,0 +1,246 @@
+"""
+Performance telemetry of EMPIRE runs.
+
+A run records the wall time, CPU time and peak memory of its stages, e.g. scenario
+generation, writing the .tab files, building the instance, solving and writing the results,
+together with the size of the linear program and the statistics reported by the solver. The
+record is written to ``perf.json`` in the results folder, so runs can be compared to find
+regressions and to size the resources requested on a cluster.
+
+CPU times include the child processes that have finished, such as file-based solvers. Peak
+memory is the maximum resident set size of the process reached by the end of a stage, as
+reported by the operating system, so it only increases from one stage to the next. It is not
+recorded on Windows.
+
+Stages are nested: every stage records the stage it ran within as its parent, e.g. solving
+within ``run_empire`` within ``total``. The whole run, ``total``, is written at the top level
+and not among the stages. Only the stages with the same parent can be summed without counting
+time twice.
+"""
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PERF_FILE = "perf.json"
+PERF_FILE_OUT_OF_SAMPLE = "perf_out_of_sample.json"
+
+# Metrics of a stage compared between runs.
+STAGE_METRICS = ["wall_time", "cpu_time", "peak_rss_mb"]
+
+
+def _peak_rss_mb(who) -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def _cpu_time() -> float:
+    if resource is None:
+        return time.process_time()
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return sum(u.ru_utime + u.ru_stime for u in usage)
+
+
+def _number(value) -> float | int | None:
+    # Values the solver did not report are undefined or NaN in the Pyomo results
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and not math.isnan(value):
+        return value
+    return None
+
+
+class RunTelemetry:
+    """
+    Timings, memory use, model size and solver statistics of a run.
+
+    :param run_name: Name of the run.
+    """
+
+    def __init__(self, run_name: str):
+        self.run_name = run_name
+        self.created = datetime.now().isoformat(timespec="seconds")
+        self.stages = []
+        self.model = {}
+        self._open_stages = []
+        self.solver = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Record the wall time, CPU time and peak memory of the code in a ``with`` block.
+
+        Stages may be nested, e.g. building the instance within the whole run. A stage is
+        recorded with the name of the stage it is nested in when the block is left, also if it
+        raises.
+
+        :param name: Name of the stage.
+        """
+        parent = self._open_stages[-1] if self._open_stages else None
+        self._open_stages.append(name)
+        wall, cpu = time.perf_counter(), _cpu_time()
+        try:
+            yield
+        finally:
+            self._open_stages.pop()
+            self.stages.append({
+                "name": name,
+                "parent": parent,
+                "wall_time": time.perf_counter() - wall,
+                "cpu_time": _cpu_time() - cpu,
+                "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+                "peak_rss_children_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            })
+
+    def record_model(self, rows: int, columns: int, nonzeros: int | None, source: str) -> None:
+        """
+        Record the size of the linear program.
+
+        :param rows: Number of constraints.
+        :param columns: Number of variables.
+        :param nonzeros: Number of nonzero coefficients, None if not known.
+        :param source: Where the size is taken from, e.g. 'solver' or 'matrix'.
+        """
+        self.model = {"rows": rows, "columns": columns, "nonzeros": nonzeros, "source": source}
+
+    def record_solver_results(self, results, instance=None) -> None:
+        """
+        Record the model size and statistics in the results of a Pyomo solver.
+
+        Solvers that do not report the model size, such as some persistent interfaces, report
+        zero rows. The size is then counted in the instance, if given.
+
+        :param results: Pyomo ``SolverResults``.
+        :param instance: The solved instance.
+        """
+        problem, solver = results.problem, results.solver
+        rows, columns = _number(problem.number_of_constraints), _number(problem.number_of_variables)
+        if rows:
+            self.record_model(rows, columns, _number(problem.number_of_nonzeros), "solver")
+        elif instance is not None:
+            self.record_model(instance.nconstraints(), instance.nvariables(), None, "instance")
+        self.solver.update({
+            "status": str(solver.status),
+            "termination_condition": str(solver.termination_condition),
+            "time": _number(getattr(solver, "time", None)),
+            "wallclock_time": _number(getattr(solver, "wallclock_time", None)),
+        })
+
+    def record_matrix_solution(self, lp, solution) -> None:
+        """
+        Record the model size and the solver statistics of a linear program solved as a matrix.
+
+        :param lp: The :class:`empire.core.matrix_model.LinearProgram`.
+        :param solution: Its :class:`empire.core.matrix_model.MatrixSolution`.
+        """
+        statistics = dict(solution.statistics)
+        self.record_model(lp.n_rows, lp.n_cols, statistics.pop("nonzeros", None), "matrix")
+        self.record_solver(**statistics)
+
+    def record_solver(self, **statistics) -> None:
+        """
+        Record statistics of the solver, e.g. the number of iterations.
+
+        :param statistics: Statistics by name.
+        """
+        self.solver.update(statistics)
+
+    def to_dict(self) -> dict:
+        total = [stage for stage in self.stages if stage["name"] == "total"]
+        return {
+            "run_name": self.run_name,
+            "created": self.created,
+            "host": {
+                "node": platform.node(),
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpu_count": os.cpu_count(),
+            },
+            "total": total[-1] if total else None,
+            "stages": [stage for stage in self.stages if stage["name"] != "total"],
+            "model": self.model,
+            "solver": self.solver,
+        }
+
+    def write(self, path: Path) -> None:
+        """
+        Write the record as JSON.
+
+        :param path: File to write.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=4)
+        logger.info("Performance telemetry written to: %s", path)
+
+
+def read_perf(path: Path) -> dict:
+    """
+    Read a record written by :meth:`RunTelemetry.write`.
+
+    :param path: The perf.json file, or the results folder containing it.
+    :return: The record.
+    """
+    if path.is_dir():
+        path = path / PERF_FILE
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def perf_table(perf: dict) -> pd.Series:
+    """
+    Flatten a record to one value per metric.
+
+    Stages that were run several times, such as the points of a sensitivity sweep, are summed,
+    and the peak memory is the maximum. The whole run is included as the stage 'total'.
+
+    :param perf: Record read by :func:`read_perf`.
+    :return: Values indexed by metric, e.g. 'solve.wall_time' or 'model.rows'.
+    """
+    # Records written before the whole run was left out of the stages also list it there
+    stages = [stage for stage in perf["stages"] if stage["name"] != "total"]
+    if perf.get("total"):
+        stages.append(dict(perf["total"], name="total"))
+    values = {}
+    for stage in stages:
+        for metric in STAGE_METRICS:
+            key, value = f"{stage['name']}.{metric}", stage.get(metric)
+            if value is None:
+                continue
+            combine = max if metric == "peak_rss_mb" else sum
+            values[key] = combine([values[key], value]) if key in values else value
+    for section in ["model", "solver"]:
+        for name, value in perf.get(section, {}).items():
+            if _number(value) is not None:
+                values[f"{section}.{name}"] = value
+    return pd.Series(values, dtype=float)
+
+
+def compare_perf(base: dict, other: dict) -> pd.DataFrame:
+    """
+    Compare the metrics of two runs.
+
+    :param base: Record of the reference run.
+    :param other: Record of the run compared to it.
+    :return: Table with the metric of both runs, the change and the relative change, by metric.
+        Metrics only recorded by one of the runs are left out.
+    """
+    table = pd.concat([perf_table(base), perf_table(other)], axis=1, keys=["base", "other"], join="inner")
+    table["change"] = table["other"] - table["base"]
+    table["relative_change"] = table["change"] / table["base"].where(table["base"] != 0)
+    return table
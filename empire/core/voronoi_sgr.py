@@ -3,7 +3,9 @@
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from scipy.spatial import Voronoi
+from numpy.lib import recfunctions
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.spatial import Voronoi, cKDTree
 from sklearn.decomposition import PCA
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D  # Add 3D plotting capability
@@ -14,7 +16,8 @@ from empire.core.scenario_utils import make_datetime, year_season_filter, remove
 def compute_voronoi_clusters(candidates: np.ndarray,
                              n_cluster: int = 10,
                              output_dir: Path | None = None,
-                             mu_percentile: int = 80) -> pd.DataFrame:
+                             mu_percentile: int = 80,
+                             n_components: int = 4) -> pd.DataFrame:
     """Compute Voronoi clusters from candidate windows.
 
     Args:
@@ -23,6 +26,7 @@ def compute_voronoi_clusters(candidates: np.ndarray,
         n_cluster: Number of clusters to create
         output_dir: Optional directory to save plots. If None, uses current working directory.
         mu_percentile: Percentile used for automatic mu calculation (default: 80)
+        n_components: Number of PCA components the Voronoi diagram is computed in (default: 4)
 
     Returns:
         DataFrame containing cluster assignments
@@ -36,15 +40,15 @@ def compute_voronoi_clusters(candidates: np.ndarray,
     
     # Extract numeric features for PCA
     feature_columns = [col for col in candidates.dtype.names if col.startswith('Feature')]
-    features = np.column_stack([candidates[col] for col in feature_columns])
+    features = recfunctions.structured_to_unstructured(candidates[feature_columns], dtype=float)
     
-    # Reduce dimensionality to 4D using PCA
+    # Reduce dimensionality using PCA
     print("Reducing dimensionality with PCA...")
-    pca = PCA(n_components=4)
+    pca = PCA(n_components=n_components)
     candidates_4d = pca.fit_transform(features)
     print(f"Reduced candidates shape: {candidates_4d.shape}")    
     total_explained_variance = np.sum(pca.explained_variance_ratio_)
-    print(f"Total explained variance by first 4 components: {total_explained_variance:.2%}")
+    print(f"Total explained variance by first {n_components} components: {total_explained_variance:.2%}")
     
     # Create and save 3D scatter plot of the first three components
     fig = plt.figure(figsize=(10, 8))
@@ -64,12 +68,8 @@ def compute_voronoi_clusters(candidates: np.ndarray,
     # Compute the Voronoi diagram on the reduced data
     vor = Voronoi(candidates_4d)
     
-    # Compute the "radius" for each Voronoi vertex
-    vertex_radii = []
-    for vertex in vor.vertices:
-        r = np.min(np.linalg.norm(candidates_4d - vertex, axis=1))
-        vertex_radii.append(r)
-    vertex_radii = np.array(vertex_radii)
+    # Compute the "radius" for each Voronoi vertex: the distance to its nearest candidate
+    vertex_radii, _ = cKDTree(candidates_4d).query(vor.vertices)
     
     # Calculate mu using the specified percentile
     sorted_radii = np.sort(vertex_radii)
@@ -79,19 +79,13 @@ def compute_voronoi_clusters(candidates: np.ndarray,
     
     # Sort vertex indices by ascending radius and take first n_cluster as prototypes
     proto_ids = np.argsort(vertex_radii)[:n_cluster]
-    label_lookup = {idx: k for k, idx in enumerate(proto_ids)}
     
-    def nearest_proto(pt):
-        dists = np.linalg.norm(vor.vertices[proto_ids] - pt, axis=1)
-        k = np.argmin(dists)
-        min_dist = dists[k]
-        is_singleton = min_dist > mu
-        if is_singleton:
-            print(f"Found singleton with distance {min_dist:.4f} > mu={mu:.4f}")
-        return k if not is_singleton else -1  # -1 for singletons
-    
-    # Assign each point to its nearest prototype
-    cluster_assignments = np.array([nearest_proto(pt) for pt in candidates_4d])
+    # Assign each point to its nearest prototype, -1 for singletons farther than mu from all prototypes
+    proto_dists, cluster_assignments = cKDTree(vor.vertices[proto_ids]).query(candidates_4d)
+    is_singleton = proto_dists > mu
+    for min_dist in proto_dists[is_singleton]:
+        print(f"Found singleton with distance {min_dist:.4f} > mu={mu:.4f}")
+    cluster_assignments[is_singleton] = -1
     
     # Print cluster statistics
     n_singletons = np.sum(cluster_assignments == -1)
@@ -181,7 +175,6 @@ def extract_candidate_windows(scenario_data_path: Path, season: str, regularSeas
     all_candidates = []
     all_sample_hours = []
     all_years = []
-    all_seasons = []
     
     for year in available_years:
         print(f"Processing year {year}")
@@ -198,33 +191,31 @@ def extract_candidate_windows(scenario_data_path: Path, season: str, regularSeas
             continue
             
         # Calculate the maximum starting index for the candidate windows
-        max_start = n_rows - regularSeasonHours - 1
+        max_start = max(n_rows - regularSeasonHours - 1, 0)
         
-        # Slide the window over the data
-        for i in range(max_start):
-            # Flatten the window (all columns concatenated)
-            window = df_numeric.iloc[i:i + regularSeasonHours].values.flatten()
-            all_candidates.append(window)
-            all_sample_hours.append(i)
-            all_years.append(year)
-            all_seasons.append(season)
+        # Slide the window over the data and flatten every window (all columns concatenated)
+        windows = sliding_window_view(df_numeric.to_numpy(dtype=float), regularSeasonHours, axis=0)[:max_start]
+        all_candidates.append(windows.transpose(0, 2, 1).reshape(max_start, -1))
+        all_sample_hours.append(np.arange(max_start))
+        all_years.append(np.full(max_start, year))
     
-    if not all_candidates:
+    if not all_candidates or sum(len(c) for c in all_candidates) == 0:
         raise ValueError(f"No valid windows found for season {season}")
     
     # Convert to numpy arrays
-    candidates = np.array(all_candidates, dtype=float)  # Ensure numeric type
-    sample_hours = np.array(all_sample_hours)
-    years = np.array(all_years)
-    seasons = np.array(all_seasons)
+    candidates = np.concatenate(all_candidates)
+    sample_hours = np.concatenate(all_sample_hours)
+    years = np.concatenate(all_years)
+    seasons = np.full(len(candidates), season)
     
     # Create a structured array to hold both numeric and string data
     dtype = [('Year', int), ('Season', 'U10')] + [('Feature{}'.format(i), float) for i in range(candidates.shape[1])]
     structured_candidates = np.zeros(len(candidates), dtype=dtype)
     structured_candidates['Year'] = years
     structured_candidates['Season'] = seasons
-    for i in range(candidates.shape[1]):
-        structured_candidates['Feature{}'.format(i)] = candidates[:, i]
+    feature_columns = ['Feature{}'.format(i) for i in range(candidates.shape[1])]
+    structured_candidates[feature_columns] = recfunctions.unstructured_to_structured(
+        candidates, dtype=structured_candidates[feature_columns].dtype)
     
     print(f"Final candidates array shape: {structured_candidates.shape}")
     return structured_candidates, sample_hours
@@ -233,7 +224,8 @@ def make_voronoi_filter(scenario_data_path: Path,
                         regularSeasonHours: int, 
                         time_format: str, 
                         n_cluster: int = 10,
-                        mu_percentile: int = 80) -> pd.DataFrame:
+                        mu_percentile: int = 80,
+                        n_components: int = 4) -> pd.DataFrame:
     """
     Create a Voronoi-based filter for scenario generation.
     
@@ -243,6 +235,7 @@ def make_voronoi_filter(scenario_data_path: Path,
       time_format: Datetime format used in the CSV file.
       n_cluster: Number of clusters to create.
       mu_percentile: Percentile used for automatic mu calculation (default: 80)
+      n_components: Number of PCA components the Voronoi diagram is computed in (default: 4)
       
     Returns:
       A DataFrame containing the filter with columns:
@@ -269,7 +262,8 @@ def make_voronoi_filter(scenario_data_path: Path,
         
         # Compute Voronoi clusters
         clusters_df = compute_voronoi_clusters(
-            candidates, n_cluster=n_cluster, output_dir=output_dir, mu_percentile=mu_percentile)
+            candidates, n_cluster=n_cluster, output_dir=output_dir, mu_percentile=mu_percentile,
+            n_components=n_components)
         
         # Add sample hours to the DataFrame
         clusters_df['SampleIndex'] = sample_hours
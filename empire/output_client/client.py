@@ -1,5 +1,3 @@
-import os
-import subprocess
 from dataclasses import dataclass
 from functools import lru_cache
 from io import StringIO
@@ -7,6 +5,9 @@ from pathlib import Path
 
 import pandas as pd
 
+from empire.core.result_tables import parquet_path, read_parquet_table, read_result_table
+from empire.output_client.result_index import ResultIndex
+
 
 @dataclass
 class ResultFile:
@@ -26,6 +27,8 @@ class EmpireOutputClient:
     """
     A output client for to the Empire dataset.
 
+    Tabular results are read from Parquet if the run wrote them in that format, otherwise from CSV.
+
     Note that API calls are cached, and changes to underlying dataset will not be detected by the client. 
     """
 
@@ -37,6 +40,7 @@ class EmpireOutputClient:
         """
         self.output_path = output_path
         self.files = ResultFile()
+        self._indexes = {}
 
     def _read_file_and_split(self, filename: str) -> list:
         """
@@ -152,7 +156,7 @@ class EmpireOutputClient:
 
         :return: A DataFrame containing the curtailed production data.
         """
-        return pd.read_csv(self.output_path / self.files.curtailed_prod)
+        return read_result_table(self.output_path / self.files.curtailed_prod)
 
     @lru_cache(maxsize=None)
     def get_curtailed_operational(self) -> pd.DataFrame:
@@ -161,7 +165,7 @@ class EmpireOutputClient:
 
         :return: A DataFrame containing the curtailed operational data.
         """
-        return pd.read_csv(self.output_path / self.files.curtailed_operational)
+        return read_result_table(self.output_path / self.files.curtailed_operational)
 
     @lru_cache(maxsize=None)
     def get_generators_values(self) -> pd.DataFrame:
@@ -170,7 +174,7 @@ class EmpireOutputClient:
 
         :return: A DataFrame containing the generator values.
         """
-        return pd.read_csv(self.output_path / self.files.gen)
+        return read_result_table(self.output_path / self.files.gen)
 
     @lru_cache(maxsize=None)
     def get_storage_values(self) -> pd.DataFrame:
@@ -179,7 +183,7 @@ class EmpireOutputClient:
 
         :return: A DataFrame containing the storage values.
         """
-        return pd.read_csv(self.output_path / self.files.stor)
+        return read_result_table(self.output_path / self.files.stor)
 
     @lru_cache(maxsize=None)
     def get_transmission_values(self) -> pd.DataFrame:
@@ -188,50 +192,85 @@ class EmpireOutputClient:
 
         :return: A DataFrame containing the transmission values.
         """
-        return pd.read_csv(self.output_path / self.files.transmision)
+        return read_result_table(self.output_path / self.files.transmision)
 
-    def _slice_file_with_grep(self, file: Path, node: str | None = None) -> pd.DataFrame:
+    def _read_rows(
+        self,
+        file: Path,
+        key_columns: list[str],
+        node: str | None = None,
+        node_columns: tuple = ("Node",),
+        period: str | None = None,
+        scenario: str | None = None,
+    ) -> pd.DataFrame:
         """
-        Slice the file contents based on the provided node using grep (for Unix-like systems).
+        Read the rows of a result table that match a node, period and scenario.
+
+        The node matches exactly in any of the node columns. Parquet results are filtered while
+        reading, and CSV results through a sidecar index on the key columns, built on first access.
 
-        :param file: The path to the file to be sliced.
+        :param file: The path to the result file.
+        :param key_columns: Columns the CSV result file is indexed on.
         :param node: The node to filter by. Defaults to None.
-        :returns: A DataFrame containing the sliced data.
+        :param node_columns: Columns that can contain the node.
+        :param period: The period to filter by, e.g. '2020-2025'. Defaults to None.
+        :param scenario: The scenario to filter by, e.g. 'scenario1'. Defaults to None.
+        :returns: A DataFrame containing the matching rows.
         """
-
+        conditions = [(col, "==", val) for col, val in [("Period", period), ("Scenario", scenario)] if val]
         if node:
-            if os.name == "posix":
-                # Use grep to filter rows containing the node
-                with open(file, "r") as f:
-                    header = f.readline()
-                result = subprocess.run(["grep", node, file], stdout=subprocess.PIPE)
-                buffer = StringIO(header + result.stdout.decode())
-                return pd.read_csv(buffer)
-            else:
-                df = pd.read_csv(file)
-                return df.loc[df["Node"] == node]
-
-        return pd.read_csv(file)
+            filters = [[(col, "==", node)] + conditions for col in node_columns]
+        else:
+            filters = [conditions] if conditions else None
+
+        if parquet_path(file).exists():
+            return read_parquet_table(parquet_path(file), filters=filters)
+        if filters is None:
+            return pd.read_csv(file)
+        if file not in self._indexes:
+            self._indexes[file] = ResultIndex.load_or_build(file, key_columns)
+        return self._indexes[file].read(filters)
 
     @lru_cache(maxsize=None)
-    def get_transmission_operational(self, node: str | None = None) -> pd.DataFrame:
+    def get_transmission_operational(
+        self, node: str | None = None, period: str | None = None, scenario: str | None = None
+    ) -> pd.DataFrame:
         """
-        Retrieve operational transmission data, optionally filtered by a specific node.
+        Retrieve operational transmission data, optionally filtered by node, period and scenario.
 
-        :param node: The node to filter by. Defaults to None.
+        :param node: The node to filter by, matched as sending or receiving node. Defaults to None.
+        :param period: The period to filter by. Defaults to None.
+        :param scenario: The scenario to filter by. Defaults to None.
         :returns: A DataFrame containing the operational transmission data.
         """
-        return self._slice_file_with_grep(file=self.output_path / self.files.transmision_operational, node=node)
+        return self._read_rows(
+            file=self.output_path / self.files.transmision_operational,
+            key_columns=["FromNode", "ToNode", "Period"],
+            node=node,
+            node_columns=("FromNode", "ToNode"),
+            period=period,
+            scenario=scenario,
+        )
 
     @lru_cache(maxsize=None)
-    def get_node_operational_values(self, node: str | None = None) -> pd.DataFrame:
+    def get_node_operational_values(
+        self, node: str | None = None, period: str | None = None, scenario: str | None = None
+    ) -> pd.DataFrame:
         """
-        Retrieve operational values for a specific node.
+        Retrieve operational values, optionally filtered by node, period and scenario.
 
         :param node: The node to filter by. Defaults to None.
+        :param period: The period to filter by. Defaults to None.
+        :param scenario: The scenario to filter by. Defaults to None.
         :returns: A DataFrame containing the operational values for the specified node.
         """
-        return self._slice_file_with_grep(file=self.output_path / self.files.operational, node=node)
+        return self._read_rows(
+            file=self.output_path / self.files.operational,
+            key_columns=["Node", "Period", "Scenario"],
+            node=node,
+            period=period,
+            scenario=scenario,
+        )
 
 
 if __name__ == "__main__":
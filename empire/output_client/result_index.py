@@ -0,0 +1,161 @@
+import csv
+import json
+import logging
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".index.json"
+
+
+class ResultIndex:
+    """
+    Byte-offset index of a CSV result file.
+
+    The rows of the file are grouped into runs of consecutive rows with the same values in
+    the key columns (e.g. Node, Period and Scenario). For every run the index stores the key
+    values and the byte range of its rows, so a lookup only reads the matching rows. The index
+    is stored next to the result file and rebuilt when the result file changes.
+    """
+
+    def __init__(self, file: Path, key_columns: list[str], header: bytes, runs: list[list]):
+        """
+        :param file: Path to the CSV result file.
+        :param key_columns: Columns the rows are indexed on.
+        :param header: Header line of the result file.
+        :param runs: List of [*key values, start byte, end byte] for consecutive rows.
+        """
+        self.file = Path(file)
+        self.key_columns = list(key_columns)
+        self.header = header
+        self.runs = runs
+
+    @staticmethod
+    def index_path(file: Path) -> Path:
+        """
+        Location of the sidecar index of a result file.
+
+        :param file: Path to the CSV result file.
+        :return: Path to the index file.
+        """
+        return Path(file).with_name(Path(file).name + INDEX_SUFFIX)
+
+    @classmethod
+    def build(cls, file: Path, key_columns: list[str]) -> "ResultIndex":
+        """
+        Scan a result file once and store its index next to it.
+
+        :param file: Path to the CSV result file.
+        :param key_columns: Columns to index the rows on.
+        :return: The index.
+        """
+        logger.info("Building index of %s on %s", file, key_columns)
+        runs = []
+        with open(file, "rb") as f:
+            header = f.readline()
+            columns = next(csv.reader([header.decode()]))
+            positions = [columns.index(col) for col in key_columns]
+            maxsplit = max(positions) + 1
+
+            offset = start = len(header)
+            current = None
+            for line in f:
+                if b'"' in line:
+                    fields = next(csv.reader([line.decode()]))
+                    key = [fields[p] for p in positions]
+                else:
+                    fields = line.split(b",", maxsplit)
+                    key = [fields[p].decode().rstrip("\r\n") for p in positions]
+                if key != current:
+                    if current is not None:
+                        runs.append([*current, start, offset])
+                    current, start = key, offset
+                offset += len(line)
+            if current is not None:
+                runs.append([*current, start, offset])
+
+        index = cls(file, key_columns, header, runs)
+        index._save()
+        return index
+
+    @classmethod
+    def load_or_build(cls, file: Path, key_columns: list[str]) -> "ResultIndex":
+        """
+        Load the stored index of a result file, or build it if it is missing or outdated.
+
+        :param file: Path to the CSV result file.
+        :param key_columns: Columns to index the rows on.
+        :return: The index.
+        """
+        index_path = cls.index_path(file)
+        if index_path.exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored["key_columns"] == list(key_columns) and stored["file"] == cls._file_signature(file):
+                return cls(file, stored["key_columns"], stored["header"].encode(), stored["runs"])
+        return cls.build(file, key_columns)
+
+    @staticmethod
+    def _file_signature(file: Path) -> dict:
+        stat = Path(file).stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _save(self) -> None:
+        try:
+            with open(self.index_path(self.file), "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "file": self._file_signature(self.file),
+                        "key_columns": self.key_columns,
+                        "header": self.header.decode(),
+                        "runs": self.runs,
+                    },
+                    f,
+                )
+        except OSError as e:
+            logger.warning("Could not store index of %s: %s", self.file, e)
+
+    def read(self, filters: list[list[tuple]]) -> pd.DataFrame:
+        """
+        Read the rows matching any of the given conjunctions of equality filters.
+
+        Filters use the disjunctive form of pyarrow, e.g. ``[[("FromNode", "==", "NO1")],
+        [("ToNode", "==", "NO1")]]``. Conditions on key columns select the byte ranges to
+        read; conditions on other columns are applied to the rows read.
+
+        :param filters: List of conjunctions of (column, "==", value) conditions.
+        :return: DataFrame with the matching rows.
+        """
+        n_keys = len(self.key_columns)
+        ranges = []
+        for run in self.runs:
+            key = dict(zip(self.key_columns, run[:n_keys]))
+            if any(
+                all(str(val) == key[col] for col, _, val in conjunction if col in key) for conjunction in filters
+            ):
+                if ranges and ranges[-1][1] == run[n_keys]:
+                    ranges[-1][1] = run[n_keys + 1]
+                else:
+                    ranges.append([run[n_keys], run[n_keys + 1]])
+
+        buffer = BytesIO()
+        buffer.write(self.header)
+        with open(self.file, "rb") as f:
+            for start, end in ranges:
+                f.seek(start)
+                buffer.write(f.read(end - start))
+        buffer.seek(0)
+        df = pd.read_csv(buffer)
+
+        mask = pd.Series(False, index=df.index)
+        for conjunction in filters:
+            condition = pd.Series(True, index=df.index)
+            for col, op, val in conjunction:
+                if op != "==":
+                    raise ValueError(f"Unsupported filter operator '{op}'.")
+                condition &= df[col].astype(str) == str(val)
+            mask |= condition
+        return df.loc[mask].reset_index(drop=True)
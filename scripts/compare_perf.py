@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+import logging
+from argparse import ArgumentParser
+from pathlib import Path
+
+import pandas as pd
+
+from empire.core.telemetry import compare_perf, read_perf
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+parser = ArgumentParser(
+    description="A CLI script to compare the performance telemetry (perf.json) of Empire runs with a base run."
+)
+
+parser.add_argument("base", help="perf.json of the base run, or its output folder", type=Path)
+parser.add_argument("paths", help="perf.json of the runs to compare, or their output folders", type=Path, nargs="+")
+parser.add_argument(
+    "-t",
+    "--threshold",
+    help="Only show metrics whose relative change exceeds the threshold, e.g. 0.1 for 10%%",
+    type=float,
+    default=0.0,
+)
+
+args = parser.parse_args()
+
+base = read_perf(args.base)
+pd.set_option("display.width", 200)
+
+for path in args.paths:
+    other = read_perf(path)
+    table = compare_perf(base, other)
+    table = table[table["relative_change"].abs().fillna(0.0) >= args.threshold]
+    logger.info("%s (%s) compared to %s (%s):", path, other["run_name"], args.base, base["run_name"])
+    print(table.to_string(float_format=lambda v: f"{v:.4g}"))
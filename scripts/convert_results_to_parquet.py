@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+import logging
+from argparse import ArgumentParser
+from pathlib import Path
+
+from empire.core.result_tables import convert_results_to_parquet
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+parser = ArgumentParser(description="A CLI script to convert the CSV result files of Empire runs to Parquet.")
+
+parser.add_argument("paths", help="Output folders of Empire runs", type=Path, nargs="+")
+parser.add_argument("-r", "--remove-csv", help="Remove CSV files after converting them", action="store_true")
+
+args = parser.parse_args()
+
+for output_path in args.paths:
+    if not output_path.is_dir():
+        logger.warning("Skipping %s, not a folder.", output_path)
+        continue
+    converted = convert_results_to_parquet(output_path=output_path, remove_csv=args.remove_csv)
+    logger.info("Converted %d result files in %s", len(converted), output_path)
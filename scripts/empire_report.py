@@ -0,0 +1,4 @@
+#!/usr/bin/env python
+from empire.core.reports import main
+
+main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+import logging
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+import pandas as pd
+
+from empire.core.benchmark import (
+    BENCHMARK_GRIDS,
+    find_regressions,
+    read_baseline,
+    run_benchmarks,
+    summarize_benchmarks,
+    write_baseline,
+)
+from empire.core.config import read_config_file
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+parser = ArgumentParser(
+    description="A CLI script to benchmark Empire on synthetic datasets of a size grid and compare the timings with a "
+    "stored baseline."
+)
+
+parser.add_argument("-g", "--grid", help="Size grid", choices=list(BENCHMARK_GRIDS), default="small")
+parser.add_argument("-s", "--solver", help="Solver", choices=["GLPK", "HiGHS", "Gurobi", "CPLEX", "Xpress"],
+                    default="HiGHS")
+parser.add_argument("-c", "--config-file", help="Path to config file.", default="config/testrun.yaml")
+parser.add_argument("-r", "--run-path", help="Folder of the benchmark runs.", type=Path, default=None)
+parser.add_argument("-b", "--baseline", help="Baseline file.", type=Path, default=None)
+parser.add_argument("--save-baseline", help="Store the results as the new baseline", action="store_true")
+parser.add_argument(
+    "-t", "--tolerance", help="Relative increase of a stage time or the peak memory allowed", type=float, default=0.25
+)
+parser.add_argument(
+    "-m", "--min-seconds", help="Only compare stages taking at least this long in the baseline", type=float,
+    default=1.0
+)
+
+args = parser.parse_args()
+
+run_path = args.run_path or Path.cwd() / f"Results/benchmarks/{args.grid}_{args.solver}"
+baseline_path = args.baseline or Path.cwd() / f"benchmarks/baseline_{args.grid}_{args.solver}.json"
+
+config = read_config_file(Path(args.config_file))
+results = run_benchmarks(BENCHMARK_GRIDS[args.grid], config, args.solver, run_path)
+
+pd.set_option("display.width", 200)
+print(summarize_benchmarks(results).to_string(float_format=lambda v: f"{v:.3g}"))
+
+if args.save_baseline:
+    write_baseline(baseline_path, args.solver, results)
+    sys.exit(0)
+
+if not baseline_path.exists():
+    logger.warning("No baseline at %s. Store one with --save-baseline.", baseline_path)
+    sys.exit(0)
+
+baseline = read_baseline(baseline_path)
+if baseline["solver"] != args.solver:
+    logger.warning("The baseline was run with %s, not %s.", baseline["solver"], args.solver)
+
+regressions = find_regressions(baseline["cases"], results, tolerance=args.tolerance, min_seconds=args.min_seconds)
+if not regressions.empty:
+    logger.error("Performance regressions compared to %s:\n%s", baseline_path, regressions.to_string(index=False))
+    sys.exit(1)
+logger.info("No performance regressions compared to %s.", baseline_path)
@@ -0,0 +1,123 @@
+from argparse import ArgumentParser
+from itertools import product
+from pathlib import Path
+
+from empire.core.config import EmpireConfiguration, read_config_file
+from empire.core.model_runner import run_empire_model, setup_run_paths
+from empire.core.sensitivity import AvailabilityUpdate, CapitalCostUpdate, MaxInstalledCapacityUpdate, SensitivityPoint
+from empire.input_client.client import EmpireInputClient
+from empire.input_data_manager import MaxTransmissionCapacityManager
+from empire.logger import get_empire_logger
+from empire.utils import restricted_float
+
+parser = ArgumentParser(
+    description="A CLI script to run the analysis of scripts/run_analysis.py for all combinations of the values in one "
+    "sweep, building the instance once."
+)
+
+parser.add_argument(
+    "-ncc", "--nuclear-capital-cost", help="Nuclear capacity costs", type=float, nargs="+", required=True
+)
+parser.add_argument(
+    "-na", "--nuclear-availability", help="Nuclear availabilities", type=restricted_float, nargs="+", required=True
+)
+parser.add_argument(
+    "-w",
+    "--max-wind-norway",
+    help="Maximum installed onshore and grounded offshore wind in Norwegian areas. "
+    "If lower than initial, initial will be used.",
+    type=float,
+    nargs="+",
+    required=True,
+)
+
+parser.add_argument(
+    "-p",
+    "--protective",
+    help="Protective development of north sea with no international grid connection",
+    action="store_true",
+)
+
+parser.add_argument("-t", "--test-run", help="Test run without optimization", action="store_true")
+
+args = parser.parse_args()
+
+version = "europe_v51"
+norway = ["NO1", "NO2", "NO3", "NO4", "NO5"]
+
+## Read config and setup folders ##
+config = read_config_file(Path("config/run.yaml"))
+empire_config = EmpireConfiguration.from_dict(config=config)
+
+run_path = Path.cwd() / f"Results/run_analysis_sweep/p{args.protective}"
+run_config = setup_run_paths(version=version, empire_config=empire_config, run_path=run_path)
+logger = get_empire_logger(run_config=run_config)
+
+points = [
+    SensitivityPoint(
+        name=f"ncc{ncc}_na{na}_w{w}_wog{w}",
+        updates=[
+            AvailabilityUpdate(generator_technology="Nuclear", availability=na),
+            CapitalCostUpdate(generator_technology="Nuclear", capital_cost=ncc),
+            MaxInstalledCapacityUpdate(generator_technology="Wind_onshr", nodes=norway, max_installed_capacity=w),
+            MaxInstalledCapacityUpdate(
+                generator_technology="Wind_offshr_grounded", nodes=norway, max_installed_capacity=w
+            ),
+        ],
+    )
+    for ncc, na, w in product(args.nuclear_capital_cost, args.nuclear_availability, args.max_wind_norway)
+]
+
+logger.info("Running sensitivity sweep of %d points with:", len(points))
+logger.info(f"Nuclear capital costs: {args.nuclear_capital_cost}")
+logger.info(f"Nuclear availabilities: {args.nuclear_availability}")
+logger.info(f"Max installed onshore and grounded offshore wind per elspot area in Norway: {args.max_wind_norway}")
+logger.info(f"Dataset version: {version}")
+
+client = EmpireInputClient(dataset_path=run_config.dataset_path)
+
+# The transmission policy is the same for all points, so it is applied to the input data
+data_managers = []
+if args.protective:
+    logger.info(
+        "Protective north-sea transmission policy with no collaboration on transmission capacity between countries."
+    )
+    # Remove international connections
+    remove_transmission = [
+        ["HollandseeKust", "DoggerBank"],
+        ["Nordsoen", "DoggerBank"],
+        ["SorligeNordsjoII", "DoggerBank"],
+        ["Borssele", "EastAnglia"],
+        ["SorligeNordsjoI", "FirthofForth"],
+        ["Nordsoen", "HelgolanderBucht"],
+        ["SorligeNordsjoI", "HelgolanderBucht"],
+        ["SorligeNordsjoII", "HelgolanderBucht"],
+        ["Borssele", "Hornsea"],
+        ["HollandseeKust", "Hornsea"],
+        ["UtsiraNord", "MorayFirth"],
+        ["Borssele", "Norfolk"],
+        ["HollandseeKust", "Norfolk"],
+        ["HollandseeKust", "Belgium"],
+        ["Hornsea", "DoggerBank"],
+        ["Borssele", "Netherlands"],
+        ["HelgolanderBucht", "Netherlands"],
+        ["SorligeNordsjoI", "Nordsoen"],
+        ["SorligeNordsjoII", "Nordsoen"],
+        ["UtsiraNord", "Nordsoen"],
+    ]
+
+    for from_node, to_node in remove_transmission:
+        data_managers.append(
+            MaxTransmissionCapacityManager(
+                client=client, from_node=from_node, to_node=to_node, max_installed_capacity=0.0
+            )
+        )
+
+## Run empire model, with the results of every point in Output/<point>
+run_empire_model(
+    empire_config=empire_config,
+    run_config=run_config,
+    data_managers=data_managers,
+    test_run=args.test_run,
+    sensitivity_points=points,
+)
@@ -1,8 +1,11 @@
 import json
 import logging
 from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
 from empire.core.config import EmpireConfiguration, read_config_file
 from empire.core.scenario_random import generate_random_scenario
 
@@ -22,6 +25,8 @@ parser.add_argument("-c", "--config-file", help="Path to config file.", default=
 # Tree size
 parser.add_argument("-nt", "--num-trees", help="Number of out-of-sample trees", type=int, required=True)
 parser.add_argument("-ns", "--num-scenarios", help="Number of scenarios in out-of-sample trees", type=int, required=True)
+parser.add_argument("-s", "--seed", help="Master seed of the out-of-sample trees", type=int, default=None)
+parser.add_argument("-w", "--workers", help="Number of trees generated in parallel", type=int, default=1)
 
 
 # User inputs
@@ -50,8 +55,14 @@ with open(empire_path / "config/countries.json", "r", encoding="utf-8") as file:
 
 scenario_data_path = empire_path / f"Data handler/{dataset}/ScenarioData"
 
-logger.info(f"Generating out of sample trees for {dataset} ...")
-for n in range(1, num_trees + 1):
+# Every tree gets its own seed from the master seed, so the trees do not depend on the number of workers
+seed_sequence = np.random.SeedSequence(args.seed)
+logger.info(f"Master seed of the out-of-sample trees: {seed_sequence.entropy}")
+tree_seeds = seed_sequence.generate_state(num_trees, dtype=np.uint64)
+
+
+def generate_tree(n: int) -> int:
+    empire_config.scenario_seed = int(tree_seeds[n - 1])
     tab_file_path = empire_path / f"OutOfSample/dataset_{dataset}/oos_tree{str(n)}"
     generate_random_scenario(
                 empire_config=empire_config,
@@ -59,4 +70,11 @@ for n in range(1, num_trees + 1):
                 scenario_data_path=scenario_data_path,
                 tab_file_path=tab_file_path,
             )
-    logger.info(f"Done with tree number: {n}")
\ No newline at end of file
+    return n
+
+
+if __name__ == "__main__":
+    logger.info(f"Generating out of sample trees for {dataset} ...")
+    with ProcessPoolExecutor(args.workers) as pool:
+        for n in pool.map(generate_tree, range(1, num_trees + 1)):
+            logger.info(f"Done with tree number: {n}")
\ No newline at end of file
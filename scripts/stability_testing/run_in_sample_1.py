@@ -44,6 +44,7 @@ else:
 empire_config.use_scenario_generation = True
 empire_config.use_fixed_sample = False
 empire_config.number_of_scenarios = num_scenarios
+empire_config.use_instance_cache = True
 
 # If routine = 'filter' or 'copula', make sure filters are created once beforehand
 # This can be done by a basic run on the dataset with the desired number of clusters and the parameters below set to 'True'
@@ -54,6 +54,8 @@ empire_config = EmpireConfiguration.from_dict(config=config)
 # Modifications to config
 empire_config.use_scenario_generation = False
 empire_config.use_fixed_sample = True
+empire_config.use_instance_cache = True
+empire_config.out_of_sample_workers = 10
 
 ### CHANGE THIS ###
 empire_config.number_of_scenarios = 60
@@ -75,51 +77,47 @@ for run_path in all_run_paths:
     if sgr_method != method or num_scenarios != ns or instance_num not in instances:
         continue
     
-    for j in range(1, num_oos_trees + 1): 
-        print(run_details)
-
-        out_of_sample_path = empire_path / f"OutOfSample/dataset_{dataset}/oos_tree{j}"
-
-        # Part of run config setup
-        dataset_path = run_path / "Input" / "Xlsx"
-        results_file_path = run_path / "Output"
-
-        # Workaround to avoid manual copying scenario files
-        tab_path = scenario_data_path = run_path / "Input" / "Tab"
-
-        # Save objective values in dataframe 
-        df_out_of_sample = pd.DataFrame({"Sample tree": [], "Objective value": []})
-
-        sample_file_path = out_of_sample_path
+    print(run_details)
+
+    out_of_sample_paths = [empire_path / f"OutOfSample/dataset_{dataset}/oos_tree{j}" for j in range(1, num_oos_trees + 1)]
+
+    # Part of run config setup
+    dataset_path = run_path / "Input" / "Xlsx"
+    results_file_path = run_path / "Output"
+
+    # Workaround to avoid manual copying scenario files
+    tab_path = scenario_data_path = run_path / "Input" / "Tab"
+
+    # Set up run config manually to avoid duplicate input files and easier output struct
+    run_name = get_name_of_last_folder_in_path(run_path) + "_out-of-sample"
+    run_config = EmpireRunConfiguration(
+                    run_name=run_name,
+                    dataset_path=dataset_path,
+                    tab_path=tab_path,
+                    scenario_data_path=scenario_data_path,
+                    results_path=results_file_path,
+                    empire_path=empire_path
+                )
+
+    logger = get_empire_logger(run_config=run_config)
+    logger.info("Running EMPIRE Model")
+
+    ## Build the model once and evaluate all out-of-sample trees on it
+    obj_values = run_empire_model(
+        empire_config=empire_config,
+        run_config=run_config,
+        data_managers=[],
+        test_run=False,
+        OUT_OF_SAMPLE=True,
+        sample_file_path=out_of_sample_paths[0],
+        out_of_sample_trees=out_of_sample_paths,
+    )
+
+    for out_of_sample_path, obj_value in zip(out_of_sample_paths, obj_values):
         sample_tree = get_name_of_last_folder_in_path(out_of_sample_path)
 
-        # Set up run config manually to avoid duplicate input files and easier output struct
-        run_name = get_name_of_last_folder_in_path(run_path) + f"_out-of-sample_{sample_tree}"
-        run_config = EmpireRunConfiguration(
-                        run_name=run_name,
-                        dataset_path=dataset_path,
-                        tab_path=tab_path,
-                        scenario_data_path=scenario_data_path,
-                        results_path=results_file_path,
-                        empire_path=empire_path
-                    )
-
-        logger = get_empire_logger(run_config=run_config)
-        logger.info("Running EMPIRE Model")
-
-        ## Run empire model
-        obj_value = run_empire_model(
-            empire_config=empire_config,
-            run_config=run_config,
-            data_managers=[],
-            test_run=False,
-            OUT_OF_SAMPLE=True,
-            sample_file_path=sample_file_path
-        )
-
-        # Append objective value to df for current out-of-sample tree
-        df_row = pd.DataFrame({"Sample tree": [sample_tree], "Objective value": [obj_value]})
-        df_out_of_sample = pd.concat([df_out_of_sample, df_row], ignore_index = True)
+        # Save objective value of the current out-of-sample tree
+        df_out_of_sample = pd.DataFrame({"Sample tree": [sample_tree], "Objective value": [obj_value]})
 
         out_of_sample_results_path = empire_path / f"OutOfSample/dataset_{dataset}" / run_details / sample_tree
 
@@ -0,0 +1,28 @@
+import copy
+
+from empire.core.benchmark import find_regressions
+
+
+def _perf(solve_time, build_time, peak_rss_mb):
+    return {
+        "total": {"wall_time": solve_time + build_time, "peak_rss_mb": peak_rss_mb},
+        "stages": [
+            {"name": "build_instance", "wall_time": build_time, "cpu_time": build_time, "peak_rss_mb": peak_rss_mb},
+            {"name": "solve", "wall_time": solve_time, "cpu_time": solve_time, "peak_rss_mb": peak_rss_mb},
+        ],
+        "model": {"rows": 100, "columns": 200},
+        "solver": {},
+    }
+
+
+def test_find_regressions():
+    baseline = {"case": _perf(solve_time=10.0, build_time=0.1, peak_rss_mb=500.0)}
+    assert find_regressions(baseline, copy.deepcopy(baseline)).empty
+
+    # The build is too short to be compared
+    results = {"case": _perf(solve_time=14.0, build_time=0.5, peak_rss_mb=700.0), "new_case": _perf(1.0, 1.0, 1.0)}
+    regressions = find_regressions(baseline, results, tolerance=0.25, min_seconds=1.0)
+    assert set(regressions["metric"]) == {"solve.wall_time", "solve.peak_rss_mb", "build_instance.peak_rss_mb",
+                                          "total.wall_time", "total.peak_rss_mb"}
+    assert (regressions["case"] == "case").all()
+    assert regressions.set_index("metric").loc["solve.wall_time", "change"] == 4.0
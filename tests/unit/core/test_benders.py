@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from pyomo.environ import ConcreteModel, Constraint, Suffix, Var
+
+from empire.core.benders import BendersDecomposition, SubproblemPool, load_solution, solve_benders
+from empire.core.matrix_model import LinearProgram, MatrixSolution, solve_matrix_model
+
+
+def _two_stage_program(seed: int = 0, investment: float | None = None) -> LinearProgram:
+    rng = np.random.default_rng(seed)
+    generators, hours, periods, scenarios = ["a", "b", "c"], [1, 2, 3, 4], [1, 2], [1, 2, 3]
+    lp = LinearProgram()
+    if investment is None:
+        inv = lp.add_variables("genInvCap", [generators, periods])
+        installed = lp.add_variables("genInstalledCap", [generators, periods])
+    else:
+        # Fixed investments, as the parameters of an out-of-sample instance
+        inv = lp.add_variables("genInvCap", [generators, periods], lower=investment, upper=investment)
+        cumulative = investment * np.arange(1, len(periods) + 1)
+        installed = lp.add_variables("genInstalledCap", [generators, periods], lower=cumulative, upper=cumulative)
+    gen = lp.add_variables("genOperational", [generators, hours, periods, scenarios])
+    shed = lp.add_variables("loadShed", [["n"], hours, periods, scenarios])
+    lp.add_objective(inv, rng.uniform(5, 20, inv.shape))
+    lp.add_objective(gen, rng.uniform(1, 5, (3, 1, 1, 1)))
+    lp.add_objective(shed, 100.0)
+
+    rows = lp.add_constraints("installedCapDefinitionGen", installed.shape, lower=0.0, upper=0.0)
+    lp.add_terms(rows, installed, -1.0)
+    lp.add_terms(rows[:, :, None], inv[:, None, :], np.tril(np.ones((2, 2))))
+    load = rng.uniform(5, 15, shed.shape)
+    rows = lp.add_constraints("FlowBalance", shed.shape, lower=load, upper=load)
+    lp.add_terms(rows, gen, 1.0)
+    lp.add_terms(rows, shed, 1.0)
+    rows = lp.add_constraints("maxGenProduction", gen.shape, upper=0.0)
+    lp.add_terms(rows, gen, 1.0)
+    lp.add_terms(rows, installed[:, None, :, None], -rng.uniform(0.2, 1, (3, 4, 1, 3)))
+    # Couples the scenarios of a period
+    rows = lp.add_constraints("hydro_node_limit", (1, 2), upper=20.0)
+    lp.add_terms(rows[:, None, :, None], gen[:1], np.full((1, 4, 1, 3), 1 / 3))
+    return lp
+
+
+def test_decomposition_splits_rows_coupling_subproblems():
+    lp = _two_stage_program()
+
+    decomposition = BendersDecomposition(lp)
+
+    assert decomposition.labels == [(1, 1), (1, 2), (1, 3), (2, 1), (2, 2), (2, 3)]
+    # 12 first stage columns and a budget for every (period, scenario) of the hydro rows
+    assert len(decomposition.master_cols) == 12 + 6
+    assert len(decomposition.master_rows) == 6 + 2
+    assert all(len(cols) == 16 for cols in decomposition.block_cols)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_benders_matches_extensive_form(workers):
+    pytest.importorskip("highspy")
+    lp = _two_stage_program()
+
+    solution = solve_benders(lp, workers=workers, tolerance=1e-9)
+
+    reference = solve_matrix_model(lp, "GLPK")
+    assert solution.objective == pytest.approx(reference.objective, rel=1e-7)
+    assert solution.x @ lp.objective == pytest.approx(solution.objective)
+    assert np.all(lp.values("genOperational", solution.x)[0].sum(axis=(0, 2)) / 3 <= 20.0 + 1e-9)
+
+
+class _FailingSubproblem:
+    def __init__(self, error):
+        self.error = error
+
+    def evaluate(self, x_master):
+        raise self.error
+
+
+@pytest.mark.parametrize("error", [RuntimeError("infeasible"), KeyError("bug")])
+def test_pool_stops_on_errors_of_the_workers(error):
+    pool = SubproblemPool([_FailingSubproblem(error), _FailingSubproblem(error)], workers=2)
+    with pool, pytest.raises(RuntimeError):
+        pool.evaluate(np.zeros(1))
+
+
+def test_load_solution_sets_variables_and_duals():
+    lp = LinearProgram()
+    lp.add_variables("x", [["a", "b"], [1, 2]])
+    lp.add_constraints("FlowBalance", (2,))
+    instance = ConcreteModel()
+    instance.x = Var(["a", "b"], [1, 2])
+    instance.FlowBalance = Constraint([1, 2], rule=lambda m, i: m.x["a", i] >= 0)
+    instance.dual = Suffix(direction=Suffix.IMPORT)
+
+    load_solution(instance, lp, MatrixSolution(0.0, np.array([1.0, 2.0, 3.0, 4.0]), np.array([5.0, 6.0])))
+
+    assert instance.x["a", 2].value == 2.0 and instance.x["b", 1].value == 3.0
+    assert instance.dual[instance.FlowBalance[2]] == 6.0
+
+
+def test_period_pieces_sum_to_objective_with_fixed_investments():
+    pytest.importorskip("highspy")
+    lp = _two_stage_program(investment=10.0)
+
+    decomposition = BendersDecomposition(lp, by_scenario=False)
+
+    assert decomposition.labels == [1, 2] and decomposition.n_budgets == 0
+    x_master = decomposition.master_col_lower
+    operational = sum(subproblem.evaluate(x_master)[0] for subproblem in decomposition.subproblems)
+    objective = decomposition.master_cost @ x_master + operational
+    assert objective == pytest.approx(solve_matrix_model(lp, "GLPK").objective, rel=1e-9)
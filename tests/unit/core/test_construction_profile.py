@@ -0,0 +1,44 @@
+import pstats
+
+from pyomo.environ import AbstractModel, BuildAction, Constraint, Param, Set, Var
+
+from empire.core.construction_profile import PROFILE_FILE, ConstructionProfiler
+
+
+def _model():
+    model = AbstractModel()
+    model.Node = Set(initialize=["A", "B", "C"])
+    model.demand = Param(model.Node, initialize={"A": 1.0, "B": 2.0, "C": 3.0}, mutable=True)
+
+    def prep_demand_rule(model):
+        for n in model.Node:
+            model.demand[n] = 2 * model.demand[n]
+
+    model.build_demand = BuildAction(rule=prep_demand_rule)
+    model.gen = Var(model.Node)
+    model.imp = Var(model.Node)
+
+    def balance_rule(model, n):
+        return model.gen[n] + model.imp[n] >= model.demand[n]
+
+    model.balance = Constraint(model.Node, rule=balance_rule)
+    return model
+
+
+def test_components_are_profiled(tmp_path):
+    with ConstructionProfiler() as profiler:
+        instance = _model().create_instance()
+    table = profiler.write(tmp_path).set_index("component")
+    assert len(instance.balance) == 3
+
+    assert set(table.index) >= {"Node", "demand", "build_demand", "gen", "balance"}
+    assert table.loc["balance", "rule_calls"] == 3
+    assert table.loc["balance", "rows"] == 3
+    assert table.loc["balance", "nonzeros"] == 6
+    assert table.loc["build_demand", "rule_calls"] == 1
+    assert (table["seconds"] >= 0).all()
+
+    folded = (tmp_path / f"{PROFILE_FILE}.folded").read_text().splitlines()
+    assert len(folded) == len(table)
+    assert any(line.startswith("create_instance;Constraint;balance ") for line in folded)
+    pstats.Stats(str(tmp_path / f"{PROFILE_FILE}.prof"))
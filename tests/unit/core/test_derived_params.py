@@ -0,0 +1,287 @@
+import pytest
+from pyomo.environ import ConcreteModel, Param, Set, value
+
+from empire.core.derived_params import (
+    ADJUSTED_LOAD,
+    DERIVED_PARAMS,
+    InstanceInput,
+    bidirectional_arcs,
+    derive_params,
+    update_derived_params,
+    write_adjusted_load,
+)
+
+
+def _instance(annual_demand_n2=0.5):
+    # Two regular seasons of two hours and a peak season of one hour, in one period with two scenarios
+    instance = ConcreteModel()
+    instance.Node = Set(initialize=["N1", "N2"])
+    instance.PeriodActive = Set(initialize=[1])
+    instance.Scenario = Set(initialize=["s1", "s2"])
+    instance.Season = Set(initialize=["winter", "summer", "peak"])
+    instance.Operationalhour = Set(initialize=[1, 2, 3, 4, 5])
+    instance.HoursOfSeason = Set(dimen=2, initialize=[("winter", 1), ("winter", 2), ("summer", 3), ("summer", 4),
+                                                      ("peak", 5)])
+    instance.FirstHoursOfRegSeason = Set(initialize=[1, 3])
+    instance.lengthRegSeason = Param(initialize=2)
+    instance.seasScale = Param(instance.Season, initialize={"winter": 2.0, "summer": 3.0, "peak": 1.0})
+    instance.sloadAnnualDemand = Param(instance.Node, instance.PeriodActive,
+                                       initialize={("N1", 1): 100.0, ("N2", 1): annual_demand_n2})
+    instance.sloadRaw = Param(instance.Node, instance.Operationalhour, instance.Scenario, instance.PeriodActive,
+                              default=0.0, mutable=True, initialize={("N1", h, s, 1): float(h) for h in range(1, 6)
+                                                                     for s in ["s1", "s2"]})
+    instance.sloadMod = Param(instance.Node, instance.Operationalhour, instance.Scenario, instance.PeriodActive,
+                              default=0.0, initialize={("N1", 5, "s2", 1): -100.0})
+    instance.sload = Param(instance.Node, instance.Operationalhour, instance.PeriodActive, instance.Scenario,
+                           default=0.0, mutable=True)
+    instance.maxRegHydroGenRaw = Param(instance.Node, instance.PeriodActive, instance.Season, instance.Operationalhour,
+                                       instance.Scenario, default=0.0, mutable=True,
+                                       initialize={("N1", 1, "winter", 1, "s1"): 1.0,
+                                                   ("N1", 1, "winter", 2, "s1"): 2.0,
+                                                   # Not an hour of the season
+                                                   ("N1", 1, "winter", 3, "s1"): 4.0,
+                                                   ("N2", 1, "peak", 5, "s2"): 8.0})
+    instance.maxRegHydroGen = Param(instance.Node, instance.PeriodActive, instance.Season, instance.Scenario,
+                                    default=0.0, mutable=True)
+    return instance
+
+
+def test_bidirectional_arcs():
+    links = [("N1", "N2"), ("N2", "N1"), ("N1", "N1"), ("N2", "N3"), ("N3", "N2")]
+    assert bidirectional_arcs(links) == [("N1", "N2"), ("N2", "N3")]
+
+
+def test_reg_hydro_limits():
+    derived, adjusted = derive_params(InstanceInput(_instance()), ["maxRegHydroGen"])
+
+    limits = derived["maxRegHydroGen"]
+    assert adjusted is None
+    assert len(limits) == 2 * 1 * 3 * 2
+    assert limits[("N1", 1, "winter", "s1")] == 3.0
+    assert limits[("N2", 1, "peak", "s2")] == 8.0
+    assert limits[("N1", 1, "summer", "s1")] == 0.0
+
+
+def test_electric_load():
+    instance = _instance()
+    adjusted = update_derived_params(instance, ["sload"])
+
+    # The raw load of both scenarios in the regular seasons, weighted by the season scales
+    raw_demand = 2.0 * (1 + 2) + 3.0 * (3 + 4)
+    scale = 100.0 / raw_demand
+    assert instance.sload["N1", 3, 1, "s1"].value == pytest.approx(3 * scale)
+    assert instance.sload["N1", 5, 1, "s1"].value == pytest.approx(5 * scale)
+    # No load below an annual demand of 1
+    assert instance.sload["N2", 1, 1, "s1"].value == 0.0
+    # The negative load of the peak hour is adjusted and reported
+    assert instance.sload["N1", 5, 1, "s2"].value == ADJUSTED_LOAD
+    assert adjusted.to_dict("records") == [
+        {"Node": "N1", "Operationalhour": 5, "Period": 1, "Scenario": "s2",
+         "ElectricLoad": pytest.approx(5 * scale - 100)}
+    ]
+
+
+def test_electric_load_without_raw_load():
+    with pytest.raises(ValueError, match="N2"):
+        derive_params(InstanceInput(_instance(annual_demand_n2=10.0)), ["sload"])
+
+
+def _model():
+    # Integers, CCS, two types of the same line, a node without demand and a negative load cover the
+    # cases the build actions treated specially
+    instance = ConcreteModel()
+    instance.Node = Set(initialize=["N1", "N2", "N3"])
+    instance.PeriodActive = Set(initialize=[1, 2])
+    instance.Scenario = Set(initialize=["s1", "s2"])
+    instance.Season = Set(initialize=["winter", "summer", "peak"])
+    instance.Operationalhour = Set(initialize=[1, 2, 3, 4, 5])
+    instance.HoursOfSeason = Set(dimen=2, initialize=[("winter", 1), ("winter", 2), ("summer", 3), ("summer", 4),
+                                                      ("peak", 5)])
+    instance.FirstHoursOfRegSeason = Set(initialize=[1, 3])
+    instance.Generator = Set(initialize=["Gas", "GasCCS", "Solar"])
+    instance.Technology = Set(initialize=["Gas", "CCS", "Solar", "Wind"])
+    instance.GeneratorsOfTechnology = Set(dimen=2, initialize=[("Gas", "Gas"), ("CCS", "GasCCS"), ("Gas", "GasCCS"),
+                                                               ("Solar", "Solar")])
+    instance.GeneratorsOfNode = Set(dimen=2, initialize=[("N1", "Gas"), ("N1", "GasCCS"), ("N2", "Solar"),
+                                                         ("N2", "Gas")])
+    instance.GeneratorsOfTechnologyAtNode = Set(
+        instance.Technology, instance.Node, ordered=True,
+        initialize=lambda m, t, n: [g for g in m.Generator if (t, g) in m.GeneratorsOfTechnology
+                                    and (n, g) in m.GeneratorsOfNode])
+    instance.Storage = Set(initialize=["Battery"])
+    instance.TransmissionType = Set(initialize=["AC", "DC"])
+    instance.DirectionalLink = Set(dimen=2, initialize=[("N1", "N2"), ("N2", "N1"), ("N2", "N3"), ("N3", "N2")])
+    instance.BidirectionalArc = Set(dimen=2, initialize=[("N1", "N2"), ("N2", "N3")])
+    instance.TransmissionTypeOfDirectionalLink = Set(dimen=3, initialize=[("N1", "N2", "DC"), ("N1", "N2", "AC"),
+                                                                          ("N2", "N3", "AC")])
+
+    instance.WACC = Param(initialize=0.05)
+    instance.discountrate = Param(initialize=0.03)
+    instance.LeapYearsInvestment = Param(initialize=5)
+    instance.lengthRegSeason = Param(initialize=2)
+    instance.CCSCostTSFix = Param(initialize=1149873.72)
+    instance.CCSRemFrac = Param(initialize=0.9)
+    instance.sceProbab = Param(instance.Scenario, mutable=True, initialize=0.5)
+    instance.seasScale = Param(instance.Season, default=1.0, mutable=True,
+                               initialize={"winter": 2190.0 / 2, "summer": 1460.3})
+
+    periods = [1, 2]
+    instance.genCapitalCost = Param(instance.Generator, periods, default=0, mutable=True,
+                                    initialize={("Gas", 1): 700, ("Gas", 2): 650.3, ("GasCCS", 2): 1300.7,
+                                                ("Solar", 1): 411.1})
+    instance.genFixedOMCost = Param(instance.Generator, periods, default=0, mutable=True,
+                                    initialize={("Gas", 1): 20.1, ("GasCCS", 1): 33, ("Solar", 2): 7.7})
+    instance.genLifetime = Param(instance.Generator, default=0.0, mutable=True,
+                                 initialize={"Gas": 30, "GasCCS": 8.0, "Solar": 25.0})
+    instance.genCO2TypeFactor = Param(instance.Generator, default=0.0, mutable=True, initialize={"GasCCS": 0.202})
+    instance.genEfficiency = Param(instance.Generator, periods, default=1.0, mutable=True,
+                                   initialize={("GasCCS", 1): 0.51, ("GasCCS", 2): 0.537})
+    instance.genInvCost = Param(instance.Generator, periods, default=9000000, mutable=True)
+    for kind, capital_cost, fixed_cost in [("PW", 301.9, 3.1), ("EN", 97.3, 0)]:
+        instance.add_component(f"stor{kind}CapitalCost", Param(instance.Storage, periods, default=0, mutable=True,
+                                                              initialize={("Battery", 1): capital_cost}))
+        instance.add_component(f"stor{kind}FixedOMCost", Param(instance.Storage, periods, default=0, mutable=True,
+                                                              initialize={("Battery", 2): fixed_cost}))
+        instance.add_component(f"stor{kind}InvCost", Param(instance.Storage, periods, default=1000000, mutable=True))
+    instance.storageLifetime = Param(instance.Storage, default=0.0, mutable=True, initialize={"Battery": 15.0})
+    instance.transmissionTypeCapitalCost = Param(instance.TransmissionType, periods, default=0, mutable=True,
+                                                 initialize={("AC", 1): 0.91, ("DC", 1): 1.7, ("AC", 2): 0.83})
+    instance.transmissionTypeFixedOMCost = Param(instance.TransmissionType, periods, default=0, mutable=True,
+                                                 initialize={("AC", 2): 0.013})
+    instance.transmissionLength = Param(instance.BidirectionalArc, default=0, mutable=True,
+                                        initialize={("N1", "N2"): 437.7, ("N2", "N3"): 120})
+    instance.transmissionLifetime = Param(instance.BidirectionalArc, default=40.0, mutable=True,
+                                          initialize={("N2", "N3"): 6.0})
+    instance.transmissionInvCost = Param(instance.BidirectionalArc, periods, default=3000000, mutable=True)
+
+    instance.genInitCap = Param(instance.GeneratorsOfNode, periods, default=0.0, mutable=True,
+                                initialize={("N1", "Gas", 1): 500})
+    instance.genRefInitCap = Param(instance.GeneratorsOfNode, default=0.0, mutable=True,
+                                   initialize={("N1", "Gas"): 500, ("N2", "Gas"): 300, ("N1", "GasCCS"): 71.3})
+    instance.genScaleInitCap = Param(instance.Generator, periods, default=0.0, mutable=True,
+                                     initialize={("Gas", 2): 0.3, ("GasCCS", 1): 0.1, ("GasCCS", 2): 0.7})
+    instance.genMaxInstalledCapRaw = Param(instance.Node, instance.Technology, default=0.0, mutable=True,
+                                           initialize={("N1", "Gas"): 400.0, ("N2", "Solar"): 1000.0,
+                                                       ("N2", "Wind"): 50.0})
+    instance.genMaxInstalledCap = Param(instance.Node, instance.Technology, periods, default=0.0, mutable=True)
+
+    instance.maxRegHydroGenRaw = Param(instance.Node, periods, instance.Season, instance.Operationalhour,
+                                       instance.Scenario, default=0.0, mutable=True,
+                                       initialize={("N1", 1, "winter", h, s): 0.1 * h + 0.7 for h in [1, 2, 3]
+                                                   for s in ["s1", "s2"]})
+    instance.maxRegHydroGen = Param(instance.Node, periods, instance.Season, instance.Scenario, default=0.0,
+                                    mutable=True)
+
+    instance.genCapAvailTypeRaw = Param(instance.Generator, default=1.0, mutable=True,
+                                        initialize={"Gas": 1, "Solar": 0})
+    instance.genCapAvailStochRaw = Param(instance.GeneratorsOfNode, instance.Operationalhour, instance.Scenario,
+                                         periods, default=0.0, mutable=True,
+                                         initialize={("N2", "Solar", h, "s1", 1): 0.13 * h for h in [2, 3]})
+    instance.genCapAvail = Param(instance.GeneratorsOfNode, instance.Operationalhour, instance.Scenario, periods,
+                                 default=0.0, mutable=True)
+
+    instance.sloadAnnualDemand = Param(instance.Node, periods, default=0.0, mutable=True,
+                                       initialize={("N1", 1): 1000.3, ("N1", 2): 1100, ("N2", 1): 77.7,
+                                                   ("N2", 2): 70.1})
+    instance.sloadRaw = Param(instance.Node, instance.Operationalhour, instance.Scenario, periods, default=0.0,
+                              mutable=True, initialize={(n, h, s, i): 0.37 * h + 0.11 * i + (s == "s2") * 0.29
+                                                        for n in ["N1", "N2", "N3"] for h in range(1, 6)
+                                                        for s in ["s1", "s2"] for i in periods})
+    instance.sloadMod = Param(instance.Node, instance.Operationalhour, instance.Scenario, periods, default=0.0,
+                              mutable=True, initialize={("N2", 5, "s2", 2): -100.0, ("N3", 1, "s1", 1): 3.3})
+    instance.sload = Param(instance.Node, instance.Operationalhour, periods, instance.Scenario, default=0.0,
+                           mutable=True)
+    return instance
+
+
+def _build_actions(model, LeapYearsInvestment, FirstHoursOfRegSeason, LOADCHANGEMODULE):
+    # The build actions the derived parameters were computed with before, to compare with
+    for g in model.Generator:
+        for i in model.PeriodActive:
+            costperyear=(model.WACC/(1-((1+model.WACC)**(-model.genLifetime[g]))))*model.genCapitalCost[g,i]+model.genFixedOMCost[g,i]
+            costperperiod=costperyear*1000*(1-(1+model.discountrate)**-(min(value((len(model.PeriodActive)-i+1)*LeapYearsInvestment), value(model.genLifetime[g]))))/(1-(1/(1+model.discountrate)))
+            if ('CCS',g) in model.GeneratorsOfTechnology:
+                costperperiod+=model.CCSCostTSFix*model.CCSRemFrac*model.genCO2TypeFactor[g]*(3.6/model.genEfficiency[g,i])
+            model.genInvCost[g,i]=costperperiod
+    for b in model.Storage:
+        for i in model.PeriodActive:
+            costperyearPW=(model.WACC/(1-((1+model.WACC)**(-model.storageLifetime[b]))))*model.storPWCapitalCost[b,i]+model.storPWFixedOMCost[b,i]
+            costperperiodPW=costperyearPW*1000*(1-(1+model.discountrate)**-(min(value((len(model.PeriodActive)-i+1)*LeapYearsInvestment), value(model.storageLifetime[b]))))/(1-(1/(1+model.discountrate)))
+            model.storPWInvCost[b,i]=costperperiodPW
+            costperyearEN=(model.WACC/(1-((1+model.WACC)**(-model.storageLifetime[b]))))*model.storENCapitalCost[b,i]+model.storENFixedOMCost[b,i]
+            costperperiodEN=costperyearEN*1000*(1-(1+model.discountrate)**-(min(value((len(model.PeriodActive)-i+1)*LeapYearsInvestment), value(model.storageLifetime[b]))))/(1-(1/(1+model.discountrate)))
+            model.storENInvCost[b,i]=costperperiodEN
+    for (n1,n2) in model.BidirectionalArc:
+        for i in model.PeriodActive:
+            for t in model.TransmissionType:
+                if (n1,n2,t) in model.TransmissionTypeOfDirectionalLink:
+                    costperyear=(model.WACC/(1-((1+model.WACC)**(-model.transmissionLifetime[n1,n2]))))*model.transmissionLength[n1,n2]*model.transmissionTypeCapitalCost[t,i]+model.transmissionTypeFixedOMCost[t,i]
+                    costperperiod=costperyear*(1-(1+model.discountrate)**-(min(value((len(model.PeriodActive)-i+1)*LeapYearsInvestment), value(model.transmissionLifetime[n1,n2]))))/(1-(1/(1+model.discountrate)))
+                    model.transmissionInvCost[n1,n2,i]=costperperiod
+
+    for (n,g) in model.GeneratorsOfNode:
+        for i in model.PeriodActive:
+            if value(model.genInitCap[n,g,i]) == 0:
+                model.genInitCap[n,g,i] = model.genRefInitCap[n,g]*(1-model.genScaleInitCap[g,i])
+    for t in model.Technology:
+        for n in model.Node:
+            for i in model.PeriodActive:
+                if value(model.genMaxInstalledCapRaw[n,t] <= sum(model.genInitCap[n,g,i] for g in model.GeneratorsOfTechnologyAtNode[t,n])):
+                    model.genMaxInstalledCap[n,t,i]=sum(model.genInitCap[n,g,i] for g in model.GeneratorsOfTechnologyAtNode[t,n])
+                else:
+                    model.genMaxInstalledCap[n,t,i]=model.genMaxInstalledCapRaw[n,t]
+
+    for n in model.Node:
+        for s in model.Season:
+            for i in model.PeriodActive:
+                for sce in model.Scenario:
+                    model.maxRegHydroGen[n,i,s,sce]=sum(model.maxRegHydroGenRaw[n,i,s,h,sce] for h in model.Operationalhour if (s,h) in model.HoursOfSeason)
+    for (n,g) in model.GeneratorsOfNode:
+        for h in model.Operationalhour:
+            for s in model.Scenario:
+                for i in model.PeriodActive:
+                    if value(model.genCapAvailTypeRaw[g]) == 0:
+                        model.genCapAvail[n,g,h,s,i]=model.genCapAvailStochRaw[n,g,h,s,i]
+                    else:
+                        model.genCapAvail[n,g,h,s,i]=model.genCapAvailTypeRaw[g]
+
+    counter = 0
+    lines = []
+    for n in model.Node:
+        for i in model.PeriodActive:
+            noderawdemand = 0
+            for (s,h) in model.HoursOfSeason:
+                if value(h) < value(FirstHoursOfRegSeason[-1] + model.lengthRegSeason):
+                    for sce in model.Scenario:
+                            noderawdemand += value(model.sceProbab[sce]*model.seasScale[s]*model.sloadRaw[n,h,sce,i])
+            if value(model.sloadAnnualDemand[n,i]) < 1:
+                hourlyscale = 0
+            else:
+                hourlyscale = value(model.sloadAnnualDemand[n,i]) / noderawdemand
+            for h in model.Operationalhour:
+                for sce in model.Scenario:
+                    model.sload[n, h, i, sce] = model.sloadRaw[n,h,sce,i]*hourlyscale
+                    if LOADCHANGEMODULE:
+                        model.sload[n,h,i,sce] = model.sload[n,h,i,sce] + model.sloadMod[n,h,sce,i]
+                    if value(model.sload[n,h,i,sce]) < 0:
+                        lines.append('Adjusted electricity load: ' + str(value(model.sload[n,h,i,sce])) + ', 10 MW for hour ' + str(h) + ' and scenario ' + str(sce) + ' in ' + str(n) + "\n")
+                        model.sload[n,h,i,sce] = 10
+                        counter += 1
+    return "".join(lines) + 'Hours with too small raw electricity load: ' + str(counter)
+
+
+@pytest.mark.parametrize("load_change", [True, False])
+def test_derived_params_match_the_build_actions(tmp_path, load_change):
+    expected, instance = _model(), _model()
+    if not load_change:
+        expected.del_component("sloadMod")
+        instance.del_component("sloadMod")
+    adjusted_load = _build_actions(expected, LeapYearsInvestment=5, FirstHoursOfRegSeason=[1, 3],
+                                   LOADCHANGEMODULE=load_change)
+    write_adjusted_load(update_derived_params(instance), tmp_path, "run")
+
+    # The same values to the last digit, and integers where the build actions stored integers
+    for name in DERIVED_PARAMS:
+        assert {key: (type(v.value), v.value) for key, v in instance.component(name).items()} == \
+            {key: (type(v.value), v.value) for key, v in expected.component(name).items()}, name
+    assert (tmp_path / "AdjustedNegativeLoad_run.txt").read_text() == adjusted_load
@@ -0,0 +1,59 @@
+import os
+
+import openpyxl
+import pandas as pd
+
+from empire.core.input_cache import InputCache, sheet_digests
+
+
+def _workbook(path):
+    workbook = openpyxl.Workbook()
+    first = workbook.active
+    first.title = "CapitalCosts"
+    first.append(["Generator", "Cost"])
+    first.append(["Gas", 760.0])
+    second = workbook.create_sheet("Lifetime")
+    second.append(["Generator", "Lifetime"])
+    second.append(["Gas", 30])
+    workbook.save(path)
+
+
+def test_sheet_digest_only_changes_for_edited_sheet(tmp_path):
+    path = tmp_path / "Generator.xlsx"
+    _workbook(path)
+    before = sheet_digests(path)
+
+    workbook = openpyxl.load_workbook(path)
+    workbook["Lifetime"]["B2"] = 40
+    workbook.save(path)
+    after = sheet_digests(path)
+
+    assert after["CapitalCosts"] == before["CapitalCosts"]
+    assert after["Lifetime"] != before["Lifetime"]
+
+
+def test_cache_returns_stored_tables(tmp_path):
+    cache = InputCache(tmp_path / "cache")
+    key = InputCache.key("digest", [0, 1])
+    table = pd.DataFrame({"Generator": ["Gas"], "Cost": [760.0]})
+
+    assert cache.get(key) is None
+    cache.put(key, {"Generator_CapitalCosts.tab": table})
+
+    pd.testing.assert_frame_equal(cache.get(key)["Generator_CapitalCosts.tab"], table)
+    assert InputCache.key("digest", [0, 1, 2]) != key
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    table = pd.DataFrame({"Value": range(10000)})
+    cache = InputCache(tmp_path / "cache", max_size_mb=1)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, {"table.tab": table})
+        os.utime(cache.cache_dir / f"{key}.pkl", (i, i))
+    cache.get("a")
+
+    entry_size = (cache.cache_dir / "a.pkl").stat().st_size
+    cache.max_size_mb = 2.5 * entry_size / 1024**2
+    cache.evict()
+
+    assert sorted(p.stem for p in cache.cache_dir.glob("*.pkl")) == ["a", "c"]
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+from pyomo.environ import AbstractModel, DataPortal, Param, Set
+
+from empire.core.input_data import InputDataPortal, _parse_token, _process_token
+from empire.core.reader import write_tab_file
+
+
+def _model():
+    model = AbstractModel()
+    model.Generator = Set(ordered=True)
+    model.Period = Set(ordered=True)
+    model.GeneratorsOfNode = Set(dimen=2)
+    model.genCapitalCost = Param(model.Generator, model.Period, default=0.0)
+    return model
+
+
+def _tables(tab_file_path):
+    return {
+        tab_file_path / "Sets_Generator.tab": pd.DataFrame({"Generator": ["Gas", "Solar", "1e3"]}),
+        tab_file_path / "Sets_Horizon.tab": pd.DataFrame({"Horizon": [1, 2]}),
+        tab_file_path / "Sets_GeneratorsOfNode.tab": pd.DataFrame({"Node": ["A", "B"], "Generator": ["Gas", "Solar"]}),
+        tab_file_path / "Generator_CapitalCosts.tab": pd.DataFrame(
+            {"Generator": ["Gas", "Solar"], "Period": [1.0, 2.0], "Cost": [0.1 + 0.2, 450]}
+        ),
+    }
+
+
+def _load(data, model, tab_file_path):
+    data.load(filename=str(tab_file_path / "Sets_Generator.tab"), format="set", set=model.Generator)
+    data.load(filename=str(tab_file_path / "Sets_Horizon.tab"), format="set", set=model.Period)
+    data.load(filename=str(tab_file_path / "Sets_GeneratorsOfNode.tab"), format="set", set=model.GeneratorsOfNode)
+    data.load(filename=str(tab_file_path / "Generator_CapitalCosts.tab"), param=model.genCapitalCost, format="table")
+
+
+def test_in_memory_tables_give_same_data_as_tab_files(tmp_path):
+    model = _model()
+    for path, table in _tables(tmp_path / "files").items():
+        write_tab_file(table, path)
+
+    from_files = DataPortal()
+    _load(from_files, model, tmp_path / "files")
+    in_memory = InputDataPortal(_tables(tmp_path / "memory"))
+    _load(in_memory, model, tmp_path / "memory")
+
+    assert not (tmp_path / "memory").exists()
+    assert in_memory.data() == from_files.data()
+    assert repr(in_memory.data()) == repr(from_files.data())
+
+
+def test_instance_is_created_from_in_memory_tables(tmp_path):
+    model = _model()
+    data = InputDataPortal(_tables(tmp_path))
+    _load(data, model, tmp_path)
+
+    instance = model.create_instance(data.to_data_portal())
+
+    assert list(instance.Generator) == ["Gas", "Solar", 1000.0]
+    assert instance.genCapitalCost["Solar", 2] == 450
+
+
+@pytest.mark.parametrize("token", ["Gas", "1e3", "1E-2", "2", "2.0", "-3", ".5", "0.30000000000000004", "True",
+                                   "false", '"Gas"', "[1,'a',2.5]", "Hydro_ror", "N001"])
+def test_fallback_parser_parses_tokens_as_pyomo(token):
+    if _process_token is None:
+        pytest.skip("The parser of Pyomo can not be imported")
+    parsed = _parse_token(token)
+
+    assert (type(parsed), parsed) == (type(_process_token(token)), _process_token(token))
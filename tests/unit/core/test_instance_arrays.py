@@ -0,0 +1,45 @@
+import numpy as np
+from pyomo.environ import ConcreteModel, Param, Set, Var
+
+from empire.core.instance_arrays import InstanceArrays
+
+
+def _model():
+    model = ConcreteModel()
+    model.Node = Set(initialize=["A", "B"], ordered=True)
+    model.Generator = Set(initialize=["Gas", "Solar"], ordered=True)
+    model.GeneratorsOfNode = Set(dimen=2, initialize=[("A", "Gas"), ("B", "Gas"), ("B", "Solar")], ordered=True)
+    model.Operationalhour = Set(initialize=[1, 2, 3], ordered=True)
+    model.genOperational = Var(model.GeneratorsOfNode, model.Operationalhour)
+    model.genEfficiency = Param(model.Generator, default=1.0, mutable=True, initialize={"Gas": 0.5})
+    model.capacity = Param(model.Node, initialize={"A": 10, "B": 2.5})
+    for k, (n, g, h) in enumerate(model.genOperational):
+        model.genOperational[n, g, h].value = float(k)
+    return model
+
+
+def test_variable_array_follows_index_sets():
+    arrays = InstanceArrays(_model())
+    gen_op = arrays["genOperational"]
+
+    assert gen_op.shape == (3, 3)
+    assert gen_op.dtype == float
+    assert gen_op[arrays.positions("GeneratorsOfNode")["B", "Solar"], 2] == 8.0
+
+
+def test_parameter_array_fills_defaults_and_keeps_integers():
+    arrays = InstanceArrays(_model())
+
+    np.testing.assert_array_equal(arrays["genEfficiency"], [0.5, 1.0])
+    assert arrays["capacity"].tolist() == [10, 2.5]
+    assert type(arrays["capacity"].tolist()[0]) is int
+
+
+def test_variables_that_are_not_constructed_are_zero():
+    model = _model()
+    model.storOperational = Var(model.GeneratorsOfNode, model.Operationalhour, dense=False)
+    model.storOperational["B", "Solar", 2] = 4.0
+    arrays = InstanceArrays(model)
+
+    assert arrays["storOperational"].sum() == 4.0
+    assert arrays["storOperational"][arrays.positions("GeneratorsOfNode")["B", "Solar"], 1] == 4.0
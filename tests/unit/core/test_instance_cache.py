@@ -0,0 +1,74 @@
+import importlib
+import sys
+
+from pyomo.environ import AbstractModel, DataPortal, Param, Set
+
+from empire.core import instance_cache
+from empire.core.instance_cache import InstanceCache, update_stochastic_params
+
+
+def _model():
+    model = AbstractModel()
+    model.Node = Set(ordered=True)
+    model.Operationalhour = Set(ordered=True, initialize=[1, 2])
+    model.sloadAnnualDemand = Param(model.Node, default=0.0, mutable=True)
+    model.sloadRaw = Param(model.Node, model.Operationalhour, default=0.0, mutable=True)
+    return model
+
+
+def _data(demand, load):
+    data = DataPortal()
+    data["Node"] = {None: ["A", "B"]}
+    data["sloadAnnualDemand"] = demand
+    data["sloadRaw"] = load
+    return data
+
+
+def test_key_ignores_stochastic_data():
+    key = InstanceCache.key(_data({"A": 1.0}, {("A", 1): 5.0}), north_sea=False)
+
+    assert InstanceCache.key(_data({"A": 1.0}, {("B", 2): 7.0}), north_sea=False) == key
+    assert InstanceCache.key(_data({"A": 2.0}, {("A", 1): 5.0}), north_sea=False) != key
+    assert InstanceCache.key(_data({"A": 1.0}, {("A", 1): 5.0}), north_sea=True) != key
+
+
+def test_cached_instance_gets_stochastic_data_of_new_run(tmp_path):
+    model = _model()
+    cache = InstanceCache(tmp_path)
+    old_data = _data({"A": 1.0}, {("A", 1): 5.0, ("B", 1): 3.0})
+    cache.put("key", model.create_instance(old_data))
+
+    instance = cache.get("key")
+    new_data = _data({"A": 1.0}, {("B", 2): 7.0})
+    update_stochastic_params(instance, new_data)
+
+    expected = model.create_instance(new_data)
+    for index in expected.sloadRaw:
+        assert instance.sloadRaw[index].value == expected.sloadRaw[index].value
+
+
+def test_key_changes_with_the_code_that_builds_the_instance(tmp_path, monkeypatch):
+    data = _data({"A": 1.0}, {("A", 1): 5.0})
+    key = InstanceCache.key(data, north_sea=False)
+    derived_params = tmp_path / "derived_params.py"
+    derived_params.write_text("# changed")
+    monkeypatch.setattr(instance_cache, "MODEL_FILES", (*instance_cache.MODEL_FILES[:-1], derived_params))
+
+    assert InstanceCache.key(data, north_sea=False) != key
+
+
+def test_entry_that_can_not_be_loaded_is_a_miss_and_removed(tmp_path, monkeypatch):
+    cache = InstanceCache(tmp_path / "cache")
+    # An entry pickled by a module that no longer exists
+    (tmp_path / "removed_module.py").write_text("class Removed:\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    cache.put("a", importlib.import_module("removed_module").Removed())
+    (tmp_path / "removed_module.py").unlink()
+    monkeypatch.delitem(sys.modules, "removed_module")
+    # A truncated entry
+    cache.put("b", {"x": 1})
+    (cache.cache_dir / "b.pkl").write_bytes((cache.cache_dir / "b.pkl").read_bytes()[:5])
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert list(cache.cache_dir.glob("*.pkl")) == []
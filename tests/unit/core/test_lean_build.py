@@ -0,0 +1,35 @@
+from pyomo.environ import ConcreteModel, Constraint, Param, Suffix, Var
+
+from empire.core.lean_build import drop_raw_params, keep_duals
+
+
+def _instance():
+    instance = ConcreteModel()
+    instance.sloadRaw = Param([1, 2], initialize={1: 1.0, 2: 2.0}, mutable=True)
+    instance.sload = Param([1, 2], initialize={1: 1.0, 2: 2.0}, mutable=True)
+    instance.x = Var([1, 2])
+    instance.FlowBalance = Constraint([1, 2], rule=lambda m, n: m.x[n] >= m.sload[n])
+    instance.genMaxProd = Constraint([1, 2], rule=lambda m, n: m.x[n] <= 10)
+    instance.dual = Suffix(direction=Suffix.IMPORT)
+    return instance
+
+
+def test_drop_raw_params():
+    instance = _instance()
+    drop_raw_params(instance)
+
+    assert not hasattr(instance, "sloadRaw")
+    assert instance.sload[2].value == 2.0
+
+
+def test_keep_duals():
+    instance = _instance()
+    for n in [1, 2]:
+        instance.dual[instance.FlowBalance[n]] = 10.0 * n
+        instance.dual[instance.genMaxProd[n]] = 1.0
+
+    keep_duals(instance)
+
+    assert len(instance.dual) == 2
+    assert instance.dual[instance.FlowBalance[2]] == 20.0
+    assert instance.genMaxProd[1] not in instance.dual
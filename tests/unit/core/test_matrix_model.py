@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from pyomo.environ import ConcreteModel, Set, Suffix, Var
+
+from empire.core.matrix_model import LinearProgram, MatrixModelSolver, solve_matrix_model
+
+
+def test_terms_are_broadcast_and_summed():
+    lp = LinearProgram()
+    x = lp.add_variables("x", [["a", "b"], [1, 2, 3]])
+    rows = lp.add_constraints("sum_x", (2,), upper=[1.0, 2.0])
+    lp.add_terms(rows[:, None], x, 1.0)
+    lp.add_terms(rows[:, None], x[:, :1], 2.0)
+
+    matrix = lp.matrix().toarray()
+
+    assert x.shape == (2, 3)
+    np.testing.assert_array_equal(matrix, [[3, 1, 1, 0, 0, 0], [0, 0, 0, 3, 1, 1]])
+    np.testing.assert_array_equal(lp.row_lower, [-np.inf, -np.inf])
+    np.testing.assert_array_equal(lp.row_upper, [1.0, 2.0])
+
+
+def test_solve_with_highs():
+    pytest.importorskip("highspy")
+    lp = LinearProgram()
+    x = lp.add_variables("x", [["a", "b"]])
+    lp.add_objective(x, [-1.0, -2.0])
+    rows = lp.add_constraints("capacity", (1,), upper=4.0)
+    lp.add_terms(rows, x, 1.0)
+    rows = lp.add_constraints("equal", (1,), lower=0.0, upper=0.0)
+    lp.add_terms(rows, x, [1.0, -1.0])
+
+    solution = solve_matrix_model(lp, "GLPK")
+
+    assert solution.objective == pytest.approx(-6.0)
+    np.testing.assert_allclose(lp.values("x", solution.x), [2.0, 2.0])
+
+
+def test_matrix_model_solver_loads_solution_and_keeps_fixed_variables():
+    pytest.importorskip("highspy")
+    instance = ConcreteModel()
+    instance.Item = Set(initialize=["a", "b"], ordered=True)
+    instance.x = Var(instance.Item)
+    instance.dual = Suffix(direction=Suffix.IMPORT)
+    lp = LinearProgram()
+    x = lp.add_variables("x", [["a", "b"]])
+    lp.add_objective(x, [-1.0, -2.0])
+    rows = lp.add_constraints("capacity", (1,), upper=4.0)
+    lp.add_terms(rows, x, 1.0)
+    opt = MatrixModelSolver(lp, "HiGHS")
+
+    opt.solve(instance)
+    assert [instance.x[i].value for i in instance.Item] == pytest.approx([0.0, 4.0])
+
+    instance.x["b"].fix(1.0)
+    solution = opt.solve(instance, tee=True)
+    assert solution.objective == pytest.approx(-5.0)
+    assert [instance.x[i].value for i in instance.Item] == pytest.approx([3.0, 1.0])
@@ -0,0 +1,87 @@
+import logging
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from pyomo.environ import ConcreteModel, Param, Set
+
+from empire.core.benchmark import BenchmarkCase, run_benchmark_case
+from empire.core.config import read_config_file
+from empire.core.derived_params import InstanceInput
+from empire.core.model_reduction import find_inert_components
+
+
+def _instance():
+    instance = ConcreteModel()
+    instance.Node = Set(initialize=["N1", "N2", "N3"])
+    instance.PeriodActive = Set(initialize=[1, 2])
+    instance.Technology = Set(initialize=["Gas", "Solar"])
+    instance.Generator = Set(initialize=["GasCCGT", "Solar"])
+    instance.GeneratorsOfNode = Set(dimen=2, initialize=[("N1", "GasCCGT"), ("N2", "GasCCGT"), ("N1", "Solar"),
+                                                         ("N2", "Solar")])
+    instance.GeneratorsOfTechnology = Set(dimen=2, initialize=[("Gas", "GasCCGT"), ("Solar", "Solar")])
+    instance.DirectionalLink = Set(dimen=2, initialize=[("N1", "N2"), ("N2", "N1"), ("N2", "N3"), ("N3", "N2")])
+    instance.BidirectionalArc = Set(dimen=2, initialize=[("N1", "N2"), ("N2", "N3")])
+    instance.StoragesOfNode = Set(dimen=2, initialize=[("N1", "Battery"), ("N2", "Battery")])
+
+    # GasCCGT can not be installed in N1, and can only be built in the second period in N2
+    instance.genInitCap = Param(instance.GeneratorsOfNode, instance.PeriodActive, default=0.0, mutable=True)
+    instance.genRefInitCap = Param(instance.GeneratorsOfNode, default=0.0, mutable=True)
+    instance.genScaleInitCap = Param(instance.Generator, instance.PeriodActive, default=0.0, mutable=True)
+    instance.genMaxInstalledCapRaw = Param(instance.Node, instance.Technology, default=0.0, mutable=True,
+                                           initialize={("N2", "Gas"): 100.0, ("N1", "Solar"): 100.0,
+                                                       ("N2", "Solar"): 100.0})
+    instance.genMaxInstalledCap = Param(instance.Node, instance.Technology, instance.PeriodActive, default=0.0,
+                                        mutable=True)
+    instance.genMaxBuiltCap = Param(instance.Node, instance.Technology, instance.PeriodActive, default=500.0,
+                                    mutable=True, initialize={("N2", "Gas", 1): 0.0})
+    # Solar has no availability in N2
+    instance.genCapAvailTypeRaw = Param(instance.Generator, default=1.0, mutable=True, initialize={"Solar": 0.0})
+    instance.genCapAvailStochRaw = Param(instance.GeneratorsOfNode, [1, 2], ["s1"], instance.PeriodActive,
+                                         default=0.0, mutable=True, initialize={("N1", "Solar", 2, "s1", 1): 0.5})
+
+    # The line between N1 and N2 was removed
+    instance.transmissionInitCap = Param(instance.BidirectionalArc, instance.PeriodActive, default=0.0, mutable=True)
+    instance.transmissionMaxBuiltCap = Param(instance.BidirectionalArc, instance.PeriodActive, default=20000.0,
+                                             mutable=True)
+    instance.transmissionMaxInstalledCapRaw = Param(instance.BidirectionalArc, instance.PeriodActive, default=0.0,
+                                                    mutable=True, initialize={("N2", "N3", 2): 500.0})
+
+    # The battery in N1 has an initial energy capacity, the one in N2 can not be built
+    for capacity in ["storPW", "storEN"]:
+        instance.add_component(f"{capacity}InitCap", Param(instance.StoragesOfNode, instance.PeriodActive,
+                                                           default=0.0, mutable=True))
+        instance.add_component(f"{capacity}MaxBuiltCap", Param(instance.StoragesOfNode, instance.PeriodActive,
+                                                               default=500000.0, mutable=True))
+        instance.add_component(f"{capacity}MaxInstalledCapRaw", Param(instance.StoragesOfNode, default=0.0,
+                                                                      mutable=True))
+    instance.storENInitCap["N1", "Battery", 1] = 10.0
+    return instance
+
+
+def test_find_inert_components():
+    inert = find_inert_components(InstanceInput(_instance()))
+
+    assert inert["InertGeneratorsOfNode"] == [("N1", "GasCCGT"), ("N2", "Solar")]
+    assert inert["InertDirectionalLink"] == [("N1", "N2"), ("N2", "N1")]
+    assert inert["InertStoragesOfNode"] == [("N2", "Battery")]
+
+
+def _objective(run_path):
+    return float((run_path / "Output" / "results_objective.csv").read_text().split(":")[1])
+
+
+def test_reduced_model_has_the_solution_of_the_full_model(tmp_path, caplog):
+    pytest.importorskip("highspy")
+    case = BenchmarkCase("n3_inert", n_nodes=3, generators_per_node=6, line_density=1.0, number_of_scenarios=1,
+                         n_periods=1, regular_seasons=["winter"], length_of_regular_season=6, inert_share=0.3)
+    config = read_config_file(Path("config/testrun.yaml"))
+    caplog.set_level(logging.INFO, logger="empire.core.model_reduction")
+    for reduced in [False, True]:
+        run_benchmark_case(case, {**config, "use_model_reduction": reduced}, "HiGHS", tmp_path / str(reduced))
+
+    assert "Model reduction: 5 generators, 2 directional lines and 2 storages can not operate" in caplog.messages
+    assert _objective(tmp_path / "True") == pytest.approx(_objective(tmp_path / "False"), rel=1e-9)
+    full = pd.read_csv(tmp_path / "False" / "Output" / "results_output_Operational.csv")
+    reduced = pd.read_csv(tmp_path / "True" / "Output" / "results_output_Operational.csv")
+    pd.testing.assert_frame_equal(reduced, full, rtol=1e-6)
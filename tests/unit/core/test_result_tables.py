@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from empire.core.result_tables import (
+    convert_results_to_parquet,
+    open_result_table,
+    parquet_path,
+    read_parquet_table,
+    read_result_table,
+)
+
+pytest.importorskip("pyarrow")
+
+HEADER = ["Node", "Period", "Scenario", "Hour", "LoadShed_MW"]
+ROWS = [
+    ["NO1", "2020-2025", "scenario1", 1, 0.5],
+    ["NO1", "2020-2025", "scenario2", 1, 0],
+    ["NO10", "2025-2030", "scenario1", 2, 1.25],
+]
+
+
+def test_parquet_table_reads_back_like_csv(tmp_path):
+    with open_result_table(tmp_path / "table.csv", HEADER, "csv") as writer:
+        writer.writerows(ROWS)
+    with open_result_table(tmp_path / "other.csv", HEADER, "parquet") as writer:
+        writer.writerows(ROWS)
+
+    assert (tmp_path / "other.parquet" / "Period=2020-2025" / "Scenario=scenario1").is_dir()
+    pd.testing.assert_frame_equal(
+        read_result_table(tmp_path / "other.csv"), read_result_table(tmp_path / "table.csv"), check_dtype=False
+    )
+
+
+def test_columns_are_written_as_rows(tmp_path):
+    columns = [
+        np.array(["NO1", "NO1", "NO 1, south"], dtype=object),
+        np.array(["2020-2025", "2020-2025", "2025-2030"], dtype=object),
+        "scenario1",
+        np.array([1, 2, 3]),
+        np.array([0.1, -0.0, 1e-05]),
+        np.array([0, 2.5, float("nan")], dtype=object),
+    ]
+    header = ["Node", "Period", "Scenario", "Hour", "Load_MW", "Price_EURperMWh"]
+    with open_result_table(tmp_path / "rows.csv", header, "csv") as writer:
+        writer.writerows(zip(*[c.tolist() if isinstance(c, np.ndarray) else [c] * 3 for c in columns]))
+    with open_result_table(tmp_path / "columns.csv", header, "csv") as writer:
+        writer.write_columns(columns)
+
+    assert (tmp_path / "columns.csv").read_bytes() == (tmp_path / "rows.csv").read_bytes()
+
+
+def test_parquet_table_is_written_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr("empire.core.result_tables.BATCH_ROWS", 2)
+    rows = [[node, period, "scenario1", hour, hour * 0.5] for node in ["NO2", "NO1"]
+            for period in ["2025-2030", "2020-2025"] for hour in [1, 2, 3]]
+    with open_result_table(tmp_path / "table.csv", HEADER, "parquet") as writer:
+        writer.writerows(rows)
+        writer.write_columns(["NO3", "2020-2025", "scenario1", np.array([1, 2]), 0])
+
+    df = read_result_table(tmp_path / "table.csv")
+    assert df.values.tolist() == rows + [["NO3", "2020-2025", "scenario1", hour, 0.0] for hour in [1, 2]]
+    assert df["LoadShed_MW"].dtype == float
+
+
+def test_parquet_filters_match_exact_node(tmp_path):
+    with open_result_table(tmp_path / "table.csv", HEADER, "parquet") as writer:
+        writer.writerows(ROWS)
+
+    df = read_parquet_table(parquet_path(tmp_path / "table.csv"), filters=[("Node", "==", "NO1")])
+    assert df["Node"].unique().tolist() == ["NO1"]
+    assert len(df) == 2
+
+
+def test_convert_results_to_parquet(tmp_path):
+    pd.DataFrame(ROWS, columns=HEADER).to_csv(tmp_path / "results_output_Operational.csv", index=False)
+
+    converted = convert_results_to_parquet(tmp_path, remove_csv=True)
+
+    assert converted == [tmp_path / "results_output_Operational.parquet"]
+    assert not (tmp_path / "results_output_Operational.csv").exists()
+    assert read_result_table(tmp_path / "results_output_Operational.csv")["LoadShed_MW"].tolist() == [0.5, 0.0, 1.25]
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import kurtosis, skew, wasserstein_distance
+
+from empire.core.config import EmpireConfiguration
+from empire.core.scenario_random import (
+    ProfileArray,
+    ScenarioTreeSampler,
+    _best_tree,
+    load_moments,
+    make_mean,
+    node_columns,
+    stack_samples,
+    window_wasserstein_distances,
+)
+from empire.core.scenario_utils import make_datetime
+
+
+def _profiles():
+    time = pd.date_range("2015-01-01", periods=24 * 181, freq="h")
+    data = pd.DataFrame(
+        {"time": time.strftime("%Y-%m-%d %H:%M"), "AT": np.arange(len(time), dtype=float), "NO": -np.arange(len(time))}
+    )
+    return ProfileArray(make_datetime(data, "%Y-%m-%d %H:%M"), ["winter", "spring"])
+
+
+def test_sample_gathers_windows_of_season_and_peaks():
+    profiles = _profiles()
+    spring_start = 24 * 90
+
+    regular, peak = profiles.sample([(2015, "winter", 5), (2015, "spring", 0)], [(2015, 10, 100)], 3, 4)
+
+    assert regular.shape == (1, 2, 3, 2)
+    np.testing.assert_array_equal(regular[0, :, :, 0], [[5, 6, 7], [spring_start, spring_start + 1, spring_start + 2]])
+    np.testing.assert_array_equal(peak[0, :, :, 0], [[8, 9, 10, 11], [98, 99, 100, 101]])
+
+    with pytest.raises(ValueError):
+        profiles.sample([(2015, "spring", 24 * 91 - 2)], [(2015, 10, 100)], 3, 4)
+
+
+def test_stack_samples_orders_rows_by_season_source_node_and_hour():
+    profiles = _profiles()
+    regular, peak = profiles.sample([(2015, "winter", 0), (2015, "spring", 0)], [(2015, 2, 2)], 1, 2)
+    sources = [("Solar", regular, peak, *node_columns(profiles.columns, "Solar"))]
+
+    table = stack_samples(sources, [(1, 1)], ["winter", "spring"], 1, 2)
+
+    nodes = ["AT", "NO1", "NO2", "NO3", "NO4", "NO5"]
+    assert node_columns(profiles.columns, "Windoffshore")[1] == ["AT", "NO2", "NO3", "NO4", "NO5"]
+    assert table["Node"].tolist() == nodes * 2 + [n for n in nodes for _ in range(4)]
+    assert table["Operationalhour"].tolist()[:7] == [1, 1, 1, 1, 1, 1, 2]
+    assert table["Operationalhour"].tolist()[12:16] == [3, 4, 5, 6]
+    assert table["Season"].tolist()[12:16] == ["peak1", "peak1", "peak2", "peak2"]
+    assert table["Value"].tolist()[:3] == [0, 0, 0]
+    assert set(table["Scenario"]) == {"scenario1"} and set(table["Period"]) == {1}
+
+
+def test_trees_are_reproducible_from_their_seed():
+    empire_config = EmpireConfiguration.from_dict(
+        {
+            "temporary_directory": "/tmp",
+            "forecast_horizon_year": 2030,
+            "number_of_scenarios": 2,
+            "length_of_regular_season": 3,
+            "len_peak_season": 4,
+            "regular_seasons": ["winter", "spring"],
+            "n_cluster": 3,
+        }
+    )
+    profiles = _profiles()
+    sample_filter = pd.DataFrame({"Year": 2015, "Season": "winter", "SampleIndex": [0, 10, 20], "ClusterGroup": [0, 1, 2]})
+    sampler = ScenarioTreeSampler(empire_config, [("Solar", profiles)], profiles, profiles, peak_hours={2015: (50, 60)})
+    seeds = np.random.SeedSequence(1).spawn(2)
+
+    keys = sampler.draw(np.random.default_rng(seeds[0]))
+    assert keys == sampler.draw(np.random.default_rng(seeds[0]))
+    assert keys != sampler.draw(np.random.default_rng(seeds[1]))
+    assert len(keys[1]) == 2 * 2 * 2 and keys[2] == [(2015, 60, 50)] * 4
+
+    sampler.seasons = ["winter"]
+    sampler.sample_filter = sample_filter
+    hours = [hour for *_, hour in sampler.draw(np.random.default_rng(seeds[0]), tree=1)[1]]
+    assert hours == [10, 20, 0, 10]
+
+
+def test_load_moments_and_streaming_tree_selection():
+    values = np.random.default_rng(0).gamma(2.0, size=(3, 2, 24, 4))
+
+    moments = load_moments(values, axis=(0, 2))
+
+    season = values[:, 1, :, 2].ravel()
+    assert moments["mean"].shape == (2, 4)
+    assert moments["mean"][1, 2] == pytest.approx(np.mean(season))
+    assert moments["var"][1, 2] == pytest.approx(np.var(season))
+    assert moments["skew"][1, 2] == pytest.approx(skew(season))
+    assert moments["kurt"][1, 2] == pytest.approx(kurtosis(season))
+
+    results = iter([(3.0, "a"), (1.0, "b"), (2.0, "c"), (1.0, "d")])
+    assert _best_tree(results) == (1, 1.0, "b")
+
+
+def test_window_statistics_match_per_window_computation():
+    rng = np.random.default_rng(0)
+    distribution = rng.integers(0, 20, size=500).astype(float)
+    windows = rng.integers(0, 30, size=(50, 24)).astype(float)
+
+    distances = window_wasserstein_distances(distribution, windows)
+
+    expected = [wasserstein_distance(distribution, window) for window in windows]
+    np.testing.assert_allclose(distances, expected, rtol=1e-12)
+
+    time = pd.date_range("2015-01-01", periods=24 * 90, freq="h")
+    data = make_datetime(pd.DataFrame({"time": time, "AT": np.arange(len(time), dtype=float), "BE": 1.0}), None)
+    means = make_mean(data, 24, ["winter"])
+    assert len(means) == 24 * 90 - 24 - 1
+    assert means["Value"].iloc[5] == pytest.approx(np.mean(np.arange(5, 29)) + 1)
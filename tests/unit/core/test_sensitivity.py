@@ -0,0 +1,67 @@
+import pytest
+from pyomo.environ import ConcreteModel, Param, Set, value
+
+from empire.core.sensitivity import (
+    AvailabilityUpdate,
+    CapitalCostUpdate,
+    MaxTransmissionCapacityUpdate,
+    SensitivityPoint,
+    SensitivitySweep,
+    run_sweep_pool,
+)
+
+
+def _instance():
+    instance = ConcreteModel()
+    instance.Generator = Set(initialize=["Nuclear", "Solar"])
+    instance.Period = Set(initialize=[1, 2])
+    instance.BidirectionalArc = Set(initialize=[("A", "B")], dimen=2)
+    instance.genCapitalCost = Param(instance.Generator, instance.Period, initialize=5000.0, mutable=True)
+    instance.genInvCost = Param(instance.Generator, instance.Period, default=0.0, mutable=True)
+    instance.transmissionMaxInstalledCapRaw = Param(instance.BidirectionalArc, instance.Period, default=0.0,
+                                                    mutable=True)
+    return instance
+
+
+def _prep_inv_cost(instance):
+    for index in instance.genCapitalCost:
+        instance.genInvCost[index] = 2 * value(instance.genCapitalCost[index])
+
+
+def _names(points):
+    return [point.name for point in points]
+
+
+def test_points_are_applied_to_the_input_data():
+    instance = _instance()
+    sweep = SensitivitySweep(instance, {"genCapitalCost": _prep_inv_cost}, "GLPK")
+
+    sweep.apply(SensitivityPoint("ncc2000", [CapitalCostUpdate("Nuclear", 2000.0)]))
+
+    assert value(instance.genCapitalCost["Nuclear", 2]) == 2000.0
+    assert value(instance.genInvCost["Nuclear", 2]) == 4000.0
+    assert value(instance.genInvCost["Solar", 2]) == 10000.0
+
+    sweep.apply(SensitivityPoint("line", [MaxTransmissionCapacityUpdate("B", "A", 100.0)]))
+
+    # The capital cost of the earlier point is set back to the input data
+    assert value(instance.genCapitalCost["Nuclear", 2]) == 5000.0
+    assert value(instance.genInvCost["Nuclear", 2]) == 10000.0
+    assert value(instance.transmissionMaxInstalledCapRaw["A", "B", 1]) == 100.0
+
+
+def test_invalid_updates_raise():
+    instance = _instance()
+    sweep = SensitivitySweep(instance, {}, "GLPK")
+
+    with pytest.raises(ValueError):
+        AvailabilityUpdate("Nuclear", 1.5)
+    with pytest.raises(ValueError):
+        sweep.apply(SensitivityPoint("wind", [CapitalCostUpdate("Wind", 2000.0)]))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sweep_pool_returns_results_in_order_of_points(workers):
+    points = [SensitivityPoint(f"point{k}") for k in range(5)]
+
+    assert run_sweep_pool(_names, points, workers=workers) == _names(points)
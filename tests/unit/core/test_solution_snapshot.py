@@ -0,0 +1,101 @@
+import importlib
+import sys
+
+from pyomo.environ import ConcreteModel, Constraint, Objective, Param, Set, Suffix, Var
+
+from empire.core.reports import write_first_stage_tab_files
+from empire.core.solution_snapshot import SolutionSnapshot, read_snapshot, write_snapshot
+
+
+def _model():
+    model = ConcreteModel()
+    model.Node = Set(initialize=["A", "B"], ordered=True)
+    model.Generator = Set(initialize=["Gas", "Solar"], ordered=True)
+    model.GeneratorsOfNode = Set(dimen=2, initialize=[("A", "Gas"), ("B", "Gas"), ("B", "Solar")], ordered=True)
+    model.GeneratorsAtNode = Set(model.Node, initialize={"A": ["Gas"], "B": ["Gas", "Solar"]})
+    model.Operationalhour = Set(initialize=[1, 2], ordered=True)
+    model.genOperational = Var(model.GeneratorsOfNode, model.Operationalhour)
+    model.capacity = Param(model.Node, initialize={"A": 10, "B": 2.5})
+    model.Obj = Objective(expr=sum(model.genOperational.values()))
+    model.FlowBalance = Constraint(model.Node, model.Operationalhour, rule=lambda m, n, h: sum(
+        m.genOperational[n, g, h] for g in m.GeneratorsAtNode[n]) >= 1)
+    model.dual = Suffix(direction=Suffix.IMPORT)
+    for k, (n, g, h) in enumerate(model.genOperational):
+        model.genOperational[n, g, h].value = float(k)
+    for (n, h), constraint in model.FlowBalance.items():
+        model.dual[constraint] = 10.0 * h + (n == "B")
+    return model
+
+
+def test_snapshot_values_by_index():
+    snapshot = SolutionSnapshot.from_instance(_model(), emission_cap=False)
+    instance = snapshot.instance
+
+    assert instance.GeneratorsOfNode == [("A", "Gas"), ("B", "Gas"), ("B", "Solar")]
+    assert instance.GeneratorsAtNode["B"] == ["Gas", "Solar"]
+    assert instance.genOperational["B", "Solar", 2] == 5.0
+    assert instance.capacity["A"] == 10
+    assert instance.Obj == 15.0
+    assert instance.dual[instance.FlowBalance["B", 2]] == 21.0
+    assert snapshot.positions("GeneratorsOfNode")["B", "Gas"] == 1
+
+
+def test_snapshot_file_round_trip(tmp_path):
+    model = _model()
+    snapshot = SolutionSnapshot.from_instance(model, emission_cap=True)
+    model.genOperational["A", "Gas", 1].value = 7.0
+    resolved = snapshot.with_solution_of(model)
+    write_snapshot(tmp_path / "snapshot.npz", snapshot, resolved)
+
+    read, read_resolved = read_snapshot(tmp_path / "snapshot.npz")
+
+    assert read.metadata == {"emission_cap": True}
+    assert read.instance.GeneratorsAtNode == {"A": ["Gas"], "B": ["Gas", "Solar"]}
+    assert read.instance.capacity["A"] == 10
+    assert type(read.instance.capacity["A"]) is int
+    assert read.instance.genOperational["A", "Gas", 1] == 0.0
+    assert read_resolved.instance.genOperational["A", "Gas", 1] == 7.0
+    assert read_resolved.instance.dual[read_resolved.instance.FlowBalance["A", 1]] == 10.0
+
+
+def _first_stage_model():
+    model = _model()
+    model.PeriodActive = Set(initialize=[1], ordered=True)
+    model.LeapYearsInvestment = Param(initialize=5)
+    model.BidirectionalArc = Set(dimen=2, initialize=[("A", "B")])
+    model.StoragesOfNode = Set(dimen=2, initialize=[])
+    for name, index in [("genInvCap", model.GeneratorsOfNode), ("genInstalledCap", model.GeneratorsOfNode),
+                        ("transmisionInvCap", model.BidirectionalArc),
+                        ("transmissionInstalledCap", model.BidirectionalArc)]:
+        model.add_component(name, Var(index, model.PeriodActive, initialize=2.0))
+    for name in ["storPWInvCap", "storENInvCap", "storPWInstalledCap", "storENInstalledCap"]:
+        model.add_component(name, Var(model.StoragesOfNode, model.PeriodActive))
+    return model
+
+
+def test_report_from_snapshot(tmp_path):
+    write_snapshot(tmp_path / "snapshot.npz", SolutionSnapshot.from_instance(_first_stage_model()))
+
+    snapshot, resolved = read_snapshot(tmp_path / "snapshot.npz")
+    write_first_stage_tab_files(snapshot, tmp_path)
+
+    assert resolved is None
+    assert (tmp_path / "genInvCap.tab").read_text().splitlines() == [
+        "Node\tGenerator\tPeriod\tgenInvCap", "A\tGas\t1\t2.0", "B\tGas\t1\t2.0", "B\tSolar\t1\t2.0"
+    ]
+    assert (tmp_path / "storENInstalledCap.tab").read_text() == "Node\tStorage\tPeriod\tstorENInstalledCap\n"
+
+
+def test_empire_report_without_pyomo(tmp_path, monkeypatch):
+    write_snapshot(tmp_path / "snapshot.npz", SolutionSnapshot.from_instance(_first_stage_model()))
+    # Import the reports again with Pyomo blocked
+    for name in list(sys.modules):
+        if name.split(".")[0] in ("pyomo", "empire"):
+            monkeypatch.delitem(sys.modules, name)
+    monkeypatch.setitem(sys.modules, "pyomo", None)
+
+    reports = importlib.import_module("empire.core.reports")
+    reports.main([str(tmp_path / "snapshot.npz"), "--reports", "first_stage", "--output", str(tmp_path / "out")])
+
+    assert (tmp_path / "out" / "genInvCap.tab").read_text().splitlines()[1] == "A\tGas\t1\t2.0"
+    assert not any(name.startswith("pyomo.") for name in sys.modules)
@@ -0,0 +1,49 @@
+import pytest
+from pyomo.environ import ConcreteModel, Var
+
+from empire.core import solvers
+
+
+class _PersistentSolver:
+    def __init__(self):
+        self.options = {}
+        self.updated = []
+
+    def available(self, exception_flag=True):
+        return True
+
+    def update_var(self, var):
+        self.updated.append(var)
+
+
+def test_create_solver_falls_back_to_file_interface():
+    opt = solvers.create_solver("GLPK", persistent=True)
+
+    assert not solvers.is_persistent(opt)
+
+    with pytest.raises(ValueError):
+        solvers.create_solver("CBC")
+
+
+def test_fixed_variables_are_updated_in_persistent_solver(monkeypatch):
+    persistent = _PersistentSolver()
+    monkeypatch.setattr(solvers, "SolverFactory", lambda name, **kwds: persistent)
+    monkeypatch.setattr(solvers, "PersistentSolver", _PersistentSolver)
+
+    opt = solvers.create_solver("Gurobi", persistent=True)
+    assert opt is persistent
+    assert opt.options == {"Crossover": 0, "Method": 2}
+
+    model = ConcreteModel()
+    model.x = Var(initialize=2.0)
+    solvers.fix_variable(opt, model.x)
+
+    assert model.x.fixed
+    assert persistent.updated == [model.x]
+
+
+@pytest.mark.parametrize("solver", list(solvers.PERSISTENT_SOLVERS))
+def test_persistent_solver_has_the_options_of_the_file_solver(monkeypatch, solver):
+    monkeypatch.setattr(solvers, "SolverFactory", lambda name, **kwds: _PersistentSolver())
+
+    assert solvers._persistent_solver(solver).options == solvers._file_solver(solver).options
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from empire.core.synthetic_dataset import GENERATORS, generate_synthetic_dataset
+
+
+def test_synthetic_dataset_has_requested_size(tmp_path):
+    generate_synthetic_dataset(tmp_path, n_nodes=3, generators_per_node=7, line_density=1.0, n_periods=2,
+                               regular_seasons=["winter", "summer"], n_years=1)
+
+    assert {path.name for path in tmp_path.glob("*.xlsx")} == {
+        "Sets.xlsx", "Generator.xlsx", "Transmission.xlsx", "Node.xlsx", "General.xlsx", "Storage.xlsx"
+    }
+    # Parameter sheets have a description and a unit row below the header
+    generators_of_node = pd.read_excel(tmp_path / "Sets.xlsx", sheet_name="GeneratorsOfNode").iloc[2:]
+    assert len(generators_of_node) == 3 * 7
+    assert set(generators_of_node["Generator"]) == {g[0] for g in GENERATORS[:7]}
+    lines = pd.read_excel(tmp_path / "Sets.xlsx", sheet_name="DirectionalLines").iloc[2:]
+    assert len(lines) == 2 * 3
+
+    load = pd.read_csv(tmp_path / "ScenarioData" / "electricload.csv")
+    assert list(load.columns) == ["time", "N001", "N002", "N003"]
+    assert len(load) == 8760
+    assert (load[["N001", "N002", "N003"]] > 0).all().all()
+
+
+@pytest.mark.parametrize("n_nodes, generators_per_node, line_density", [(0, 9, 0.0), (2, 5, 0.0), (2, 10, 0.0),
+                                                                        (2, 9, 1.5)])
+def test_synthetic_dataset_size_out_of_range(tmp_path, n_nodes, generators_per_node, line_density):
+    with pytest.raises(ValueError):
+        generate_synthetic_dataset(tmp_path, n_nodes=n_nodes, generators_per_node=generators_per_node,
+                                   line_density=line_density)
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from empire.core.telemetry import PERF_FILE, RunTelemetry, compare_perf, read_perf
+
+
+def _perf(run_name, solve_time, rows):
+    telemetry = RunTelemetry(run_name)
+    with telemetry.stage("total"):
+        with telemetry.stage("run_empire"), telemetry.stage("build_instance"):
+            pass
+        for _ in range(2):
+            with telemetry.stage("solve"):
+                pass
+    telemetry.record_model(rows, 2 * rows, None, "matrix")
+    telemetry.record_solver(simplex_iterations=10, status="ok")
+    perf = telemetry.to_dict()
+    for stage in perf["stages"]:
+        if stage["name"] == "solve":
+            stage["wall_time"] = solve_time
+    return perf
+
+
+def test_stages_are_recorded_and_written(tmp_path):
+    telemetry = RunTelemetry("run")
+    with pytest.raises(ValueError), telemetry.stage("solve"):
+        raise ValueError()
+    telemetry.write(tmp_path / PERF_FILE)
+
+    perf = read_perf(tmp_path)
+    assert perf == json.loads(json.dumps(telemetry.to_dict()))
+    assert [stage["name"] for stage in perf["stages"]] == ["solve"]
+    assert perf["stages"][0]["wall_time"] >= 0.0
+
+
+def test_compare_perf_sums_repeated_stages():
+    table = compare_perf(_perf("base", 1.0, 100), _perf("other", 3.0, 150))
+
+    assert table.loc["solve.wall_time", "base"] == 2.0
+    assert table.loc["solve.wall_time", "relative_change"] == 2.0
+    assert table.loc["model.rows", "change"] == 50
+    assert "model.nonzeros" not in table.index
+    assert "solver.status" not in table.index
+    assert table.loc["solver.simplex_iterations", "change"] == 0
+
+
+def test_stages_record_their_parent_and_total_is_not_a_stage():
+    perf = _perf("run", 1.0, 100)
+
+    assert perf["total"]["parent"] is None
+    assert [(stage["name"], stage["parent"]) for stage in perf["stages"]] == [
+        ("build_instance", "run_empire"), ("run_empire", "total"), ("solve", "total"), ("solve", "total")]
+    assert compare_perf(perf, perf).loc["total.wall_time", "base"] == perf["total"]["wall_time"]
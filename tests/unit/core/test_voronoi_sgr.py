@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from empire.core.voronoi_sgr import compute_voronoi_clusters, extract_candidate_windows
+
+
+def test_candidate_windows_are_flattened_by_hour_and_clustered(tmp_path):
+    time = pd.date_range("2015-04-01", periods=24 * 30, freq="h")
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({"time": time.strftime("%d/%m/%Y %H:%M"), "AT": rng.random(len(time)), "BE": rng.random(len(time))})
+    data.to_csv(tmp_path / "electricload.csv", index=False)
+
+    candidates, sample_hours = extract_candidate_windows(tmp_path, "spring", 3, "%d/%m/%Y %H:%M")
+
+    assert len(candidates) == len(sample_hours) == 24 * 30 - 3 - 1
+    features = [candidates[f"Feature{i}"][5] for i in range(6)]
+    np.testing.assert_allclose(features, data[["AT", "BE"]].to_numpy()[5:8].flatten())
+    assert set(candidates["Year"]) == {2015} and set(candidates["Season"]) == {"spring"}
+
+    clusters = compute_voronoi_clusters(candidates, n_cluster=3, output_dir=tmp_path, n_components=3)
+
+    assert clusters["ClusterGroup"].isin([-1, 0, 1, 2]).all()
+    assert clusters["ClusterGroup"].ge(0).any()
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from empire.core.result_tables import convert_results_to_parquet
+from empire.output_client.client import EmpireOutputClient
+from empire.output_client.result_index import ResultIndex
+
+
+def _write_operational(path):
+    rows = [
+        [node, period, scenario, hour, float(hour)]
+        for node in ["NO1", "NO10", "NO2"]
+        for period in ["2020-2025", "2025-2030"]
+        for scenario in ["scenario1", "scenario2"]
+        for hour in [1, 2]
+    ]
+    df = pd.DataFrame(rows, columns=["Node", "Period", "Scenario", "Hour", "LoadShed_MW"])
+    df.to_csv(path / "results_output_Operational.csv", index=False)
+    return df
+
+
+def test_node_lookup_matches_node_exactly(tmp_path):
+    df = _write_operational(tmp_path)
+    client = EmpireOutputClient(output_path=tmp_path)
+
+    result = client.get_node_operational_values("NO1")
+
+    pd.testing.assert_frame_equal(result, df.loc[df["Node"] == "NO1"].reset_index(drop=True))
+    assert ResultIndex.index_path(tmp_path / "results_output_Operational.csv").exists()
+
+
+def test_node_lookup_by_period_and_scenario(tmp_path):
+    _write_operational(tmp_path)
+    client = EmpireOutputClient(output_path=tmp_path)
+
+    result = client.get_node_operational_values("NO10", period="2025-2030", scenario="scenario2")
+
+    assert result[["Node", "Period", "Scenario"]].drop_duplicates().values.tolist() == [
+        ["NO10", "2025-2030", "scenario2"]
+    ]
+    assert result["Hour"].tolist() == [1, 2]
+
+
+def test_parquet_rows_are_read_in_csv_order(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = _write_operational(tmp_path)
+    convert_results_to_parquet(tmp_path, remove_csv=True)
+    client = EmpireOutputClient(output_path=tmp_path)
+
+    pd.testing.assert_frame_equal(client.get_node_operational_values(), df, check_dtype=False)
+    pd.testing.assert_frame_equal(
+        client.get_node_operational_values("NO10"),
+        df.loc[df["Node"] == "NO10"].reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_index_is_rebuilt_when_file_changes(tmp_path):
+    _write_operational(tmp_path)
+    file = tmp_path / "results_output_Operational.csv"
+    ResultIndex.load_or_build(file, ["Node", "Period", "Scenario"])
+
+    with open(file, "a") as f:
+        f.write("NO3,2020-2025,scenario1,1,1.0\n")
+
+    index = ResultIndex.load_or_build(file, ["Node", "Period", "Scenario"])
+    assert index.read([[("Node", "==", "NO3")]])["Node"].tolist() == ["NO3"]